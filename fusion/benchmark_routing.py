@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+UFO Galaxy Fusion - Routing Benchmark
+
+对比 SHORTEST_PATH 策略的两种实现:
+1. 实时 Dijkstra (每次路由对每个候选节点运行一次 nx.shortest_path_length)
+2. 预计算路由表 (RoutingTable 查表)
+
+使用 config/topology.json (generate_topology_config.py 生成的拓扑)
+
+用法:
+    python fusion/benchmark_routing.py [--iterations 2000]
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fusion.topology_manager import TopologyManager, RoutingStrategy
+
+
+def _build_queries(manager: TopologyManager, iterations: int, seed: int = 42):
+    """生成随机路由请求 (源节点, 域)"""
+    rng = random.Random(seed)
+    node_ids = sorted(manager.nodes.keys())
+    domains = sorted(manager.domains.keys())
+    return [
+        (rng.choice(node_ids), rng.choice(domains + [None]))
+        for _ in range(iterations)
+    ]
+
+
+def _run(manager: TopologyManager, queries) -> float:
+    """执行路由请求，返回每次请求的平均耗时 (微秒)"""
+    start = time.perf_counter()
+    for source, domain in queries:
+        manager.find_best_node(
+            domain=domain,
+            source_node=source,
+            strategy=RoutingStrategy.SHORTEST_PATH
+        )
+    elapsed = time.perf_counter() - start
+    return elapsed / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TopologyManager routing benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument(
+        "--topology",
+        default=str(PROJECT_ROOT / "config" / "topology.json")
+    )
+    args = parser.parse_args()
+
+    # 路由时的 INFO 日志会淹没计时
+    logging.disable(logging.INFO)
+
+    start = time.perf_counter()
+    dijkstra = TopologyManager(args.topology, use_routing_table=False)
+    dijkstra_load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    table = TopologyManager(args.topology, use_routing_table=True)
+    table_load_ms = (time.perf_counter() - start) * 1000
+
+    queries = _build_queries(table, args.iterations)
+
+    # 两种模式必须给出相同的最短距离
+    for source, domain in queries[:200]:
+        a = dijkstra.find_best_node(domain=domain, source_node=source,
+                                    strategy=RoutingStrategy.SHORTEST_PATH)
+        b = table.find_best_node(domain=domain, source_node=source,
+                                 strategy=RoutingStrategy.SHORTEST_PATH)
+        if a != b:
+            da = table.routing_table.distance(source, a)
+            db = table.routing_table.distance(source, b)
+            assert da == db, f"Mismatch for {source}/{domain}: {a} ({da}) vs {b} ({db})"
+
+    dijkstra_us = _run(dijkstra, queries)
+    table_us = _run(table, queries)
+
+    print("=" * 60)
+    print(f"Topology: {len(table.nodes)} nodes, {len(table.graph.edges)} edges")
+    print(f"Iterations: {args.iterations}")
+    print("-" * 60)
+    print(f"{'mode':<20}{'init (ms)':>15}{'per route (us)':>20}")
+    print(f"{'dijkstra':<20}{dijkstra_load_ms:>15.2f}{dijkstra_us:>20.2f}")
+    print(f"{'routing_table':<20}{table_load_ms:>15.2f}{table_us:>20.2f}")
+    print("-" * 60)
+    print(f"Speedup: {dijkstra_us / table_us:.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
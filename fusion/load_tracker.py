@@ -0,0 +1,280 @@
+"""
+UFO Galaxy Fusion - Load Tracker
+
+节点负载跟踪器
+
+功能:
+1. 跟踪每个节点的在途请求数 (in-flight)
+2. 维护每个节点延迟的指数加权移动平均 (EWMA)
+3. 按能力维护索引最小堆，O(log n) 选出负载最低的节点
+4. 支持 power-of-two-choices 随机选择，避免并发调度扎堆到同一节点
+
+负载分数:
+    score = (1 + reported_load) * (1 + inflight) * ewma_latency_ms
+
+没有在途请求和延迟样本时，分数只由 update_load 上报的负载决定，
+与旧的 load_tracker 行为一致。
+
+作者: Manus AI
+日期: 2026-01-26
+"""
+
+import logging
+import random
+from heapq import heappush, heappop
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Set, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+ALL_NODES = "*"
+
+
+class IndexedMinHeap:
+    """
+    索引二叉最小堆
+
+    记录每个键在堆数组中的位置，支持 O(log n) 的更新和删除。
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._pos: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pos
+
+    def push(self, key: str, priority: float):
+        """插入键，已存在时更新优先级"""
+        if key in self._pos:
+            self.update(key, priority)
+            return
+        self._heap.append((priority, key))
+        self._pos[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def update(self, key: str, priority: float):
+        """更新键的优先级"""
+        i = self._pos[key]
+        old = self._heap[i][0]
+        self._heap[i] = (priority, key)
+        if priority < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, key: str):
+        """删除键"""
+        i = self._pos.pop(key, None)
+        if i is None:
+            return
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            self._pos[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self._pos[last[1]])
+
+    def peek(self) -> Optional[str]:
+        """返回优先级最低的键"""
+        return self._heap[0][1] if self._heap else None
+
+    def first_matching(self, accept: Callable[[str], bool]) -> Optional[str]:
+        """
+        按优先级从低到高返回第一个满足条件的键
+
+        使用最优优先遍历堆数组，只展开比结果更小的元素，不修改堆。
+        """
+        if not self._heap:
+            return None
+        frontier = [(self._heap[0], 0)]
+        while frontier:
+            (_, key), i = heappop(frontier)
+            if accept(key):
+                return key
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._heap):
+                    heappush(frontier, (self._heap[child], child))
+        return None
+
+    def _swap(self, i: int, j: int):
+        self._heap[i], self._heap[j] = self._heap[j], self._heap[i]
+        self._pos[self._heap[i][1]] = i
+        self._pos[self._heap[j][1]] = j
+
+    def _sift_up(self, i: int):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self._heap[i] < self._heap[parent]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i: int):
+        n = len(self._heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self._heap[child] < self._heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                break
+            self._swap(i, smallest)
+            i = smallest
+
+
+@dataclass
+class NodeLoad:
+    """单个节点的负载状态"""
+    inflight: int = 0
+    ewma_latency_ms: Optional[float] = None
+    reported_load: float = 0.0
+    completed: int = 0
+    failed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return asdict(self)
+
+
+class NodeLoadTracker:
+    """
+    节点负载跟踪器
+
+    ExecutionPool 在请求开始时调用 begin()，结束时调用 end() 上报延迟；
+    TopologyManager 通过 least_loaded() / two_choices() 选择节点。
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        default_latency_ms: float = 100.0,
+        seed: Optional[int] = None
+    ):
+        """
+        初始化负载跟踪器
+
+        Args:
+            alpha: EWMA 平滑系数 (越大越偏向最新样本)
+            default_latency_ms: 尚无延迟样本时使用的延迟估计
+            seed: power-of-two-choices 随机数种子
+        """
+        self.alpha = alpha
+        self.default_latency_ms = default_latency_ms
+        self.loads: Dict[str, NodeLoad] = {}
+        self._capabilities: Dict[str, Set[str]] = {}
+        # 能力 -> 索引最小堆 (ALL_NODES 为全体节点)
+        self._heaps: Dict[str, IndexedMinHeap] = {ALL_NODES: IndexedMinHeap()}
+        self._rng = random.Random(seed)
+
+    def add_node(self, node_id: str, capabilities: List[str]):
+        """注册节点 (重复注册时合并能力)"""
+        load = self.loads.setdefault(node_id, NodeLoad())
+        caps = self._capabilities.setdefault(node_id, set())
+        caps.update(capabilities)
+        score = self._score(load)
+        self._heaps[ALL_NODES].push(node_id, score)
+        for cap in caps:
+            self._heaps.setdefault(cap, IndexedMinHeap()).push(node_id, score)
+
+    def remove_node(self, node_id: str):
+        """注销节点"""
+        self.loads.pop(node_id, None)
+        self._heaps[ALL_NODES].remove(node_id)
+        for cap in self._capabilities.pop(node_id, set()):
+            heap = self._heaps.get(cap)
+            if heap is None:
+                continue
+            heap.remove(node_id)
+            if not heap:
+                del self._heaps[cap]
+
+    def set_reported_load(self, node_id: str, load: float):
+        """记录节点自身上报的负载"""
+        if node_id in self.loads:
+            self.loads[node_id].reported_load = load
+            self._reindex(node_id)
+
+    def begin(self, node_id: str):
+        """请求开始，在途数 +1"""
+        if node_id in self.loads:
+            self.loads[node_id].inflight += 1
+            self._reindex(node_id)
+
+    def end(self, node_id: str, latency_ms: float, success: bool = True):
+        """请求结束，在途数 -1 并更新延迟 EWMA"""
+        load = self.loads.get(node_id)
+        if load is None:
+            return
+        load.inflight = max(0, load.inflight - 1)
+        if load.ewma_latency_ms is None:
+            load.ewma_latency_ms = latency_ms
+        else:
+            load.ewma_latency_ms += self.alpha * (latency_ms - load.ewma_latency_ms)
+        if success:
+            load.completed += 1
+        else:
+            load.failed += 1
+        self._reindex(node_id)
+
+    def score(self, node_id: str) -> float:
+        """节点当前负载分数 (越低越空闲)"""
+        load = self.loads.get(node_id)
+        return self._score(load) if load else float('inf')
+
+    def least_loaded(
+        self,
+        accept: Callable[[str], bool],
+        capabilities: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        返回满足条件的负载最低节点
+
+        Args:
+            accept: 候选节点判定函数
+            capabilities: 所需能力 (用于选择最小的能力堆)
+        """
+        heap = self._heaps[ALL_NODES]
+        for cap in capabilities or []:
+            cap_heap = self._heaps.get(cap)
+            if cap_heap is None:
+                return None
+            if len(cap_heap) < len(heap):
+                heap = cap_heap
+        return heap.first_matching(accept)
+
+    def two_choices(self, candidates: List[str]) -> Optional[str]:
+        """power-of-two-choices: 随机抽两个候选，取负载较低者"""
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        a, b = self._rng.sample(candidates, 2)
+        return a if self.score(a) <= self.score(b) else b
+
+    def total_inflight(self) -> int:
+        """所有节点的在途请求总数"""
+        return sum(load.inflight for load in self.loads.values())
+
+    def get_node_load(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """获取节点负载详情"""
+        load = self.loads.get(node_id)
+        if load is None:
+            return None
+        return {**load.to_dict(), "score": self._score(load)}
+
+    def _score(self, load: NodeLoad) -> float:
+        latency = load.ewma_latency_ms
+        if latency is None:
+            latency = self.default_latency_ms
+        return (1.0 + load.reported_load) * (1 + load.inflight) * latency
+
+    def _reindex(self, node_id: str):
+        score = self._score(self.loads[node_id])
+        self._heaps[ALL_NODES].update(node_id, score)
+        for cap in self._capabilities.get(node_id, ()):
+            self._heaps[cap].update(node_id, score)
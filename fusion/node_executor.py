@@ -17,11 +17,15 @@ UFO Galaxy Fusion - Node Executor (Gateway Optimized & Reinforced)
 
 import asyncio
 import logging
-import aiohttp
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, TYPE_CHECKING
 from dataclasses import dataclass
 
+from shared.node_rpc import NodeRPCClient, get_node_rpc_client
+
+if TYPE_CHECKING:
+    from .load_tracker import NodeLoadTracker
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("NodeExecutor")
@@ -41,20 +45,37 @@ class ExecutionPool:
     执行池 - 优化为通过统一网关进行通信
     """
     
-    def __init__(self, gateway_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        gateway_url: str = "http://localhost:8000",
+        load_tracker: Optional["NodeLoadTracker"] = None,
+        rpc: Optional[NodeRPCClient] = None
+    ):
         self.gateway_url = gateway_url.rstrip('/')
-        self.session: Optional[aiohttp.ClientSession] = None
+        # 共享连接池: 到网关的长连接复用，按目标节点限流并统计延迟
+        self.rpc = rpc or get_node_rpc_client()
+        self.request_timeout = 30  # 网关模式建议超时设置长一点
         self._node_status: Dict[str, bool] = {}
+        # 在途请求和延迟上报目标 (通常是 TopologyManager.node_loads)
+        self.load_tracker = load_tracker
         logger.info(f"🎯 ExecutionPool initialized using gateway: {self.gateway_url}")
 
-    async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30) # 网关模式建议超时设置长一点
-            )
-        return self.session
-
     async def execute_on_node(self, node_id: str, command: str, params: Optional[Dict[str, Any]] = None) -> ExecutionResult:
+        """通过网关在指定节点上执行命令，并向负载跟踪器上报在途数和延迟"""
+        if self.load_tracker is None:
+            return await self._execute_via_gateway(node_id, command, params)
+        
+        self.load_tracker.begin(node_id)
+        start_time = time.time()
+        success = False
+        try:
+            result = await self._execute_via_gateway(node_id, command, params)
+            success = result.success
+            return result
+        finally:
+            self.load_tracker.end(node_id, (time.time() - start_time) * 1000, success)
+
+    async def _execute_via_gateway(self, node_id: str, command: str, params: Optional[Dict[str, Any]] = None) -> ExecutionResult:
         """通过网关在指定节点上执行命令 (真实逻辑)"""
         start_time = time.time()
         # 统一网关路由格式
@@ -71,24 +92,22 @@ class ExecutionPool:
         
         for attempt in range(max_retries + 1):
             try:
-                session = await self._get_session()
-                async with session.post(url, json=payload) as response:
-                    latency = (time.time() - start_time) * 1000
-                    if response.status == 200:
-                        res_json = await response.json()
-                        success = res_json.get("success", True)
-                        self._node_status[node_id] = success
-                        return ExecutionResult(
-                            node_id=node_id,
-                            success=success,
-                            data=res_json.get("data"),
-                            error=res_json.get("error"),
-                            latency_ms=latency,
-                            timestamp=time.time()
-                        )
-                    else:
-                        error_text = await response.text()
-                        last_error = f"Gateway Error {response.status}: {error_text}"
+                response = await self.rpc.post(url, node=node_id, json=payload, timeout=self.request_timeout)
+                latency = (time.time() - start_time) * 1000
+                if response.status_code == 200:
+                    res_json = response.json()
+                    success = res_json.get("success", True)
+                    self._node_status[node_id] = success
+                    return ExecutionResult(
+                        node_id=node_id,
+                        success=success,
+                        data=res_json.get("data"),
+                        error=res_json.get("error"),
+                        latency_ms=latency,
+                        timestamp=time.time()
+                    )
+                else:
+                    last_error = f"Gateway Error {response.status_code}: {response.text}"
             except Exception as e:
                 last_error = f"Connection Error: {str(e)}"
             
@@ -107,21 +126,14 @@ class ExecutionPool:
     async def check_node_health(self, node_id: str) -> bool:
         """检查单个节点的健康状态"""
         url = f"{self.gateway_url}/api/nodes/{node_id}/health"
-        try:
-            session = await self._get_session()
-            async with session.get(url, timeout=5) as response:
-                is_healthy = response.status == 200
-                self._node_status[node_id] = is_healthy
-                return is_healthy
-        except Exception:
-            self._node_status[node_id] = False
-            return False
+        is_healthy = await self.rpc.check_health(url, node=node_id, timeout=5)
+        self._node_status[node_id] = is_healthy
+        return is_healthy
 
     async def close_all(self):
-        """关闭网关连接会话"""
-        if self.session and not self.session.closed:
-            await self.session.close()
-            logger.info("✅ Gateway session closed")
+        """释放执行池（连接池为共享或外部传入，由其所有者在退出时关闭）"""
+        self._node_status.clear()
+        logger.info("✅ Execution pool closed")
 
     def get_pool_status(self) -> Dict[str, Any]:
         """获取连接池状态统计"""
@@ -131,5 +143,6 @@ class ExecutionPool:
             "total_tracked_nodes": total,
             "online_nodes": online,
             "offline_nodes": total - online,
-            "gateway_url": self.gateway_url
+            "gateway_url": self.gateway_url,
+            "transport": self.rpc.get_stats()
         }
@@ -32,6 +32,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from fusion.topology_manager import TopologyManager
 from fusion.unified_orchestrator import UnifiedOrchestrator, Task, TaskType, TaskPriority
 from fusion.node_executor import ExecutionPool
+from shared.node_rpc import close_node_rpc_client
 
 # 配置日志
 logging.basicConfig(
@@ -116,6 +117,7 @@ class FusionSystem:
         
         if self.execution_pool:
             await self.execution_pool.close_all()
+        await close_node_rpc_client()
             
         if self.gateway_process:
             logger.info("Terminating gateway process...")
@@ -0,0 +1,51 @@
+"""
+UFO Galaxy Fusion - 候选位图索引单元测试
+
+在小规模随机拓扑上，把 _filter_candidates 的位图筛选结果与逐节点筛选的
+暴力实现对比，覆盖未知领域/能力、排除列表，以及注销后重新注册时位图 ID 的复用。
+
+用法:
+    python -m pytest fusion/test_candidate_index.py -q
+
+作者: Manus AI
+日期: 2026-01-26
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fusion.test_routing import RoutingTestCase, _brute_force_candidates, _random_node, _random_query
+
+
+class TestCandidateIndex(RoutingTestCase):
+    """位图候选筛选 vs 逐节点筛选"""
+
+    def assert_candidates_match(self, queries: int = 200):
+        for _ in range(queries):
+            domain, layer, capabilities, exclude = _random_query(self.rng, self.manager)
+            expected = _brute_force_candidates(self.manager, domain, layer, capabilities, exclude)
+            actual = self.manager._filter_candidates(domain, layer, capabilities, exclude)
+            self.assertEqual(len(actual), len(set(actual)))
+            self.assertEqual(set(actual), expected, (domain, layer, capabilities, exclude))
+
+    def test_filter_matches_brute_force(self):
+        self.assert_candidates_match()
+
+    def test_filter_after_churn(self):
+        # 注销后重新注册会复用位图 ID，旧位不能残留
+        for node_id in self.rng.sample(self.node_ids, 8):
+            self.manager.unregister_node(node_id)
+        self.assert_candidates_match(100)
+
+        for i in range(8):
+            self.manager.register_node(_random_node(self.rng, f"re{i}", list(self.manager.nodes)))
+        self.assert_candidates_match()
+
+
+if __name__ == "__main__":
+    unittest.main()
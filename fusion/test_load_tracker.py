@@ -0,0 +1,110 @@
+"""
+UFO Galaxy Fusion - 负载跟踪单元测试
+
+把索引最小堆、NodeLoadTracker 的最小负载查询和 LOAD_BALANCED 策略的结果
+与全量排序/全量比较的暴力实现对比，并验证二选一策略偏向低负载节点。
+
+用法:
+    python -m pytest fusion/test_load_tracker.py -q
+
+作者: Manus AI
+日期: 2026-01-26
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fusion.load_tracker import IndexedMinHeap, NodeLoadTracker
+from fusion.topology_manager import RoutingStrategy
+from fusion.test_routing import CAPABILITIES, RoutingTestCase, _brute_force_candidates, _random_query
+
+
+class TestLoadBalancedRouting(RoutingTestCase):
+    """LOAD_BALANCED 策略 vs 候选集合上的全量比较"""
+
+    def test_load_balanced_picks_least_loaded_candidate(self):
+        for node_id in self.node_ids:
+            self.manager.update_load(node_id, self.rng.random())
+
+        for _ in range(100):
+            domain, layer, capabilities, exclude = _random_query(self.rng, self.manager)
+            expected = _brute_force_candidates(self.manager, domain, layer, capabilities, exclude)
+            selected = self.manager.find_best_node(
+                domain=domain,
+                layer=layer,
+                capabilities=capabilities,
+                exclude_nodes=exclude,
+                strategy=RoutingStrategy.LOAD_BALANCED
+            )
+            if not expected:
+                self.assertIsNone(selected)
+                continue
+            best = min(self.manager.node_loads.score(n) for n in expected)
+            self.assertIn(selected, expected)
+            self.assertEqual(self.manager.node_loads.score(selected), best)
+
+
+class TestLoadTracker(unittest.TestCase):
+    """索引最小堆和负载跟踪 vs 全量排序"""
+
+    def test_indexed_heap_matches_sorted(self):
+        rng = random.Random(3)
+        heap = IndexedMinHeap()
+        priorities = {}
+        for step in range(500):
+            key = f"k{rng.randint(0, 30)}"
+            if key in priorities and rng.random() < 0.3:
+                heap.remove(key)
+                del priorities[key]
+            else:
+                priorities[key] = rng.random()
+                heap.push(key, priorities[key])
+
+            self.assertEqual(len(heap), len(priorities))
+            if priorities:
+                self.assertEqual(heap.peek(), min(priorities, key=lambda k: (priorities[k], k)))
+                allowed = set(rng.sample(sorted(priorities), max(1, len(priorities) // 3)))
+                expected = min(allowed, key=lambda k: (priorities[k], k))
+                self.assertEqual(heap.first_matching(lambda k: k in allowed), expected)
+
+    def test_least_loaded_matches_brute_force(self):
+        rng = random.Random(5)
+        tracker = NodeLoadTracker(seed=1)
+        capabilities = {f"n{i}": rng.sample(CAPABILITIES, 2) for i in range(20)}
+        for node_id, caps in capabilities.items():
+            tracker.add_node(node_id, caps)
+
+        for _ in range(300):
+            node_id = rng.choice(sorted(capabilities))
+            action = rng.random()
+            if action < 0.4:
+                tracker.begin(node_id)
+            elif action < 0.8:
+                tracker.end(node_id, rng.uniform(5, 200), success=rng.random() < 0.9)
+            else:
+                tracker.set_reported_load(node_id, rng.random())
+
+            cap = rng.choice(CAPABILITIES)
+            allowed = {n for n, caps in capabilities.items() if cap in caps}
+            selected = tracker.least_loaded(lambda n: n in allowed, [cap])
+            best = min(tracker.score(n) for n in allowed)
+            self.assertEqual(tracker.score(selected), best)
+
+    def test_two_choices_prefers_lower_score(self):
+        tracker = NodeLoadTracker(seed=2)
+        tracker.add_node("busy", [])
+        tracker.add_node("idle", [])
+        for _ in range(5):
+            tracker.begin("busy")
+        for _ in range(20):
+            self.assertEqual(tracker.two_choices(["busy", "idle"]), "idle")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+UFO Galaxy Fusion - 路由单元测试
+
+在小规模随机拓扑上，把预计算路由表的距离和路径与实时 Dijkstra 逐一对比。
+随机拓扑夹具也供 test_candidate_index.py 和 test_load_tracker.py 使用。
+
+用法:
+    python -m pytest fusion/test_routing.py -q
+
+作者: Manus AI
+日期: 2026-01-26
+"""
+
+import json
+import logging
+import math
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import networkx as nx
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fusion.topology_manager import NodeInfo, RoutingStrategy, TopologyManager
+
+LAYERS = ["core", "cognitive", "perception"]
+DOMAINS = ["vision", "nlu", "state_management", "storage"]
+CAPABILITIES = ["ocr", "asr", "plan", "store", "search", "render"]
+
+
+def _random_node(rng: random.Random, node_id: str, node_ids: list) -> NodeInfo:
+    return NodeInfo(
+        node_id=node_id,
+        node_name=node_id,
+        layer=rng.choice(LAYERS),
+        domain=rng.choice(DOMAINS),
+        coordinates=(rng.uniform(0, math.pi), rng.uniform(0, 2 * math.pi), rng.choice([1.0, 2.0, 3.0])),
+        capabilities=rng.sample(CAPABILITIES, rng.randint(0, 3)),
+        neighbors=rng.sample(node_ids, min(len(node_ids), rng.randint(0, 3))),
+        api_url="",
+        metadata={}
+    )
+
+
+def _write_topology(path: Path, nodes: list):
+    config = {
+        "version": "test",
+        "nodes": [
+            {
+                "id": node.node_id,
+                "name": node.node_name,
+                "layer": node.layer,
+                "domain": node.domain,
+                "coordinates": dict(zip(("theta", "phi", "radius"), node.coordinates)),
+                "capabilities": node.capabilities,
+                "neighbors": node.neighbors
+            }
+            for node in nodes
+        ]
+    }
+    path.write_text(json.dumps(config), encoding="utf-8")
+
+
+def _brute_force_candidates(manager: TopologyManager, domain, layer, capabilities, exclude) -> set:
+    """旧实现: 逐节点按条件筛选"""
+    if capabilities and any(cap not in manager.capability_index for cap in capabilities):
+        return set()
+    result = set()
+    for node_id, node in manager.nodes.items():
+        if node_id in exclude:
+            continue
+        if domain in manager.domains and node.domain != domain:
+            continue
+        if layer in manager.layers and node.layer != layer:
+            continue
+        if capabilities and not all(cap in node.capabilities for cap in capabilities):
+            continue
+        result.add(node_id)
+    return result
+
+
+def _random_query(rng: random.Random, manager: TopologyManager):
+    """随机的 (domain, layer, capabilities, exclude) 筛选条件，含未知取值"""
+    domain = rng.choice(DOMAINS + [None, "unknown"])
+    layer = rng.choice(LAYERS + [None])
+    capabilities = rng.sample(CAPABILITIES + ["missing"], rng.randint(0, 2)) or None
+    exclude = rng.sample(list(manager.nodes), rng.randint(0, 3))
+    return domain, layer, capabilities, exclude
+
+
+def _dijkstra_distance(graph: nx.DiGraph, source: str, target: str) -> float:
+    try:
+        return nx.shortest_path_length(graph, source, target, weight='weight')
+    except nx.NetworkXNoPath:
+        return float('inf')
+
+
+class RoutingTestCase(unittest.TestCase):
+    """随机拓扑的公共夹具"""
+
+    NODE_COUNT = 24
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.INFO)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.rng = random.Random(7)
+        node_ids = [f"n{i:02d}" for i in range(self.NODE_COUNT)]
+        self.node_ids = node_ids
+        nodes = [_random_node(self.rng, node_id, node_ids) for node_id in node_ids]
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.config_path = Path(self._tmp.name) / "topology.json"
+        _write_topology(self.config_path, nodes)
+        self.manager = TopologyManager(str(self.config_path), use_routing_table=True)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assert_table_matches_dijkstra(self):
+        table = self.manager.routing_table
+        graph = self.manager.graph
+        for source in graph.nodes:
+            for target in graph.nodes:
+                expected = _dijkstra_distance(graph, source, target)
+                actual = table.distance(source, target)
+                if math.isinf(expected):
+                    self.assertTrue(math.isinf(actual), f"{source}->{target}")
+                    self.assertIsNone(table.path(source, target))
+                    continue
+                self.assertAlmostEqual(actual, expected, places=9, msg=f"{source}->{target}")
+
+                # 沿下一跳重建的路径必须真实存在且长度等于最短距离
+                path = table.path(source, target)
+                self.assertEqual(path[0], source)
+                self.assertEqual(path[-1], target)
+                length = sum(graph[u][v]['weight'] for u, v in zip(path, path[1:]))
+                self.assertAlmostEqual(length, expected, places=9)
+
+
+class TestRoutingTable(RoutingTestCase):
+    """预计算路由表 vs 实时 Dijkstra"""
+
+    def test_initial_table(self):
+        self.assert_table_matches_dijkstra()
+
+    def test_edge_updates(self):
+        for _ in range(40):
+            source, target = self.rng.sample(self.node_ids, 2)
+            action = self.rng.random()
+            if action < 0.4:
+                self.manager.add_edge(source, target, weight=self.rng.uniform(0.1, 5.0))
+            elif action < 0.7 and self.manager.graph.has_edge(source, target):
+                # 已有边的权重升高
+                weight = self.manager.graph[source][target]['weight']
+                self.manager.add_edge(source, target, weight=weight * 3)
+            elif self.manager.graph.number_of_edges():
+                u, v = self.rng.choice(list(self.manager.graph.edges))
+                self.manager.remove_edge(u, v)
+            self.assert_table_matches_dijkstra()
+
+    def test_register_and_unregister(self):
+        for node_id in self.rng.sample(self.node_ids, 6):
+            self.manager.unregister_node(node_id)
+            self.assert_table_matches_dijkstra()
+
+        for i in range(4):
+            node = _random_node(self.rng, f"new{i}", list(self.manager.nodes))
+            self.manager.register_node(node)
+            self.assert_table_matches_dijkstra()
+
+    def test_shortest_path_strategy(self):
+        dijkstra = TopologyManager(str(self.config_path), use_routing_table=False)
+        for source in self.node_ids:
+            for domain in DOMAINS + [None]:
+                a = dijkstra.find_best_node(domain=domain, source_node=source, strategy=RoutingStrategy.SHORTEST_PATH)
+                b = self.manager.find_best_node(domain=domain, source_node=source, strategy=RoutingStrategy.SHORTEST_PATH)
+                table = self.manager.routing_table
+                self.assertEqual(table.distance(source, a), table.distance(source, b))
+
+    def test_get_shortest_path(self):
+        graph = self.manager.graph
+        for source in self.node_ids[:6]:
+            for target in self.node_ids:
+                path = self.manager.get_shortest_path(source, target)
+                expected = _dijkstra_distance(graph, source, target)
+                if path is None:
+                    self.assertTrue(math.isinf(expected))
+                else:
+                    length = sum(graph[u][v]['weight'] for u, v in zip(path, path[1:]))
+                    self.assertAlmostEqual(length, expected, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,12 +16,15 @@ UFO Galaxy Fusion - Topology Manager
 
 import json
 import logging
+import math
 import networkx as nx
 from typing import Dict, List, Optional, Tuple, Set, Any
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .load_tracker import NodeLoadTracker
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +34,7 @@ class RoutingStrategy(Enum):
     SHORTEST_PATH = "shortest_path"      # 最短路径
     DOMAIN_AFFINITY = "domain_affinity"  # 域亲和
     LAYER_PRIORITY = "layer_priority"    # 层级优先
+    POWER_OF_TWO = "power_of_two"        # 随机两选一 (抑制并发扎堆)
 
 
 @dataclass
@@ -51,6 +55,196 @@ class NodeInfo:
         return asdict(self)
 
 
+class RoutingTable:
+    """
+    全对最短路径路由表
+
+    预先计算所有节点对之间的距离矩阵和下一跳矩阵，路由决策只需查表。
+    边变化时增量更新:
+    - 新增边 / 权重降低: O(n^2) 松弛
+    - 删除边 / 权重升高: 只对依赖该边的源节点重新运行 Dijkstra
+
+    节点负载不参与距离计算，因此负载变化不会使路由表失效。
+    """
+
+    def __init__(self, graph: nx.DiGraph):
+        self.graph = graph
+        # dist[source][target] -> 最短距离 (不可达的目标不出现)
+        self.dist: Dict[str, Dict[str, float]] = {}
+        # next_hop[source][target] -> 从 source 出发的下一跳节点
+        self.next_hop: Dict[str, Dict[str, str]] = {}
+        self.rebuild()
+
+    def rebuild(self):
+        """全量重建路由表"""
+        self.dist.clear()
+        self.next_hop.clear()
+        for source in self.graph.nodes:
+            self._compute_row(source)
+
+    def _compute_row(self, source: str):
+        """用单源 Dijkstra 计算 source 所在行"""
+        lengths, paths = nx.single_source_dijkstra(self.graph, source, weight='weight')
+        self.dist[source] = dict(lengths)
+        self.next_hop[source] = {
+            target: (path[1] if len(path) > 1 else target)
+            for target, path in paths.items()
+        }
+
+    def distance(self, source: str, target: str) -> float:
+        """查询最短距离，不可达时返回 inf"""
+        return self.dist.get(source, {}).get(target, float('inf'))
+
+    def path(self, source: str, target: str) -> Optional[List[str]]:
+        """沿下一跳矩阵重建最短路径，不可达时返回 None"""
+        if target not in self.dist.get(source, {}):
+            return None
+        path = [source]
+        current = source
+        while current != target:
+            current = self.next_hop[current][target]
+            path.append(current)
+        return path
+
+    def add_node(self, node_id: str):
+        """新增孤立节点 (其边随后通过 relax_edge 加入)"""
+        self.dist[node_id] = {node_id: 0.0}
+        self.next_hop[node_id] = {node_id: node_id}
+
+    def remove_node(self, node_id: str, had_out_edges: bool):
+        """
+        移除已从图中删除的节点
+
+        Args:
+            node_id: 节点 ID
+            had_out_edges: 删除前该节点是否有出边 (没有出边时不可能作为中转节点)
+        """
+        self.dist.pop(node_id, None)
+        self.next_hop.pop(node_id, None)
+        for source, row in self.dist.items():
+            if node_id not in row:
+                continue
+            if had_out_edges:
+                self._compute_row(source)
+            else:
+                row.pop(node_id)
+                self.next_hop[source].pop(node_id, None)
+
+    def relax_edge(self, u: str, v: str, weight: float):
+        """新增边或边权重降低后的增量松弛"""
+        row_v = self.dist.get(v, {})
+        for source, row in self.dist.items():
+            d_su = row.get(u)
+            if d_su is None:
+                continue
+            via = d_su + weight
+            hop = v if source == u else self.next_hop[source][u]
+            hops = self.next_hop[source]
+            for target, d_vt in row_v.items():
+                candidate = via + d_vt
+                if candidate < row.get(target, float('inf')):
+                    row[target] = candidate
+                    hops[target] = hop
+
+    def sources_using_edge(self, u: str, v: str, weight: float) -> Set[str]:
+        """返回最短路径可能经过边 (u, v) 的源节点集合"""
+        affected = set()
+        for source, row in self.dist.items():
+            d_su = row.get(u)
+            d_sv = row.get(v)
+            if d_su is None or d_sv is None:
+                continue
+            if math.isclose(d_su + weight, d_sv, rel_tol=1e-9, abs_tol=1e-12):
+                affected.add(source)
+        return affected
+
+    def recompute_sources(self, sources: Set[str]):
+        """删除边或边权重升高后，重算受影响的源节点"""
+        for source in sources:
+            self._compute_row(source)
+
+
+class CandidateIndex:
+    """
+    候选节点位图索引
+
+    每个节点分配一个稠密整数 ID，每个域、层级、能力对应一个位图 (Python int)。
+    多条件筛选只需几次按位与运算。支持节点的增量注册和注销，
+    注销释放的 ID 会被后续注册复用。
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._node_ids: List[Optional[str]] = []
+        self._free_ids: List[int] = []
+        self.all_mask = 0
+        self.domain_masks: Dict[str, int] = {}
+        self.layer_masks: Dict[str, int] = {}
+        self.capability_masks: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, node: NodeInfo):
+        """注册节点 (同一节点重复注册时位图取并集)"""
+        index = self._ids.get(node.node_id)
+        if index is None:
+            if self._free_ids:
+                index = self._free_ids.pop()
+                self._node_ids[index] = node.node_id
+            else:
+                index = len(self._node_ids)
+                self._node_ids.append(node.node_id)
+            self._ids[node.node_id] = index
+
+        bit = 1 << index
+        self.all_mask |= bit
+        self.domain_masks[node.domain] = self.domain_masks.get(node.domain, 0) | bit
+        self.layer_masks[node.layer] = self.layer_masks.get(node.layer, 0) | bit
+        for cap in node.capabilities:
+            self.capability_masks[cap] = self.capability_masks.get(cap, 0) | bit
+
+    def remove(self, node_id: str):
+        """注销节点"""
+        index = self._ids.pop(node_id, None)
+        if index is None:
+            return
+
+        keep = ~(1 << index)
+        self.all_mask &= keep
+        for masks in (self.domain_masks, self.layer_masks, self.capability_masks):
+            for key in list(masks):
+                masks[key] &= keep
+                if not masks[key]:
+                    del masks[key]
+
+        self._node_ids[index] = None
+        self._free_ids.append(index)
+
+    def contains(self, mask: int, node_id: str) -> bool:
+        """判断节点是否在位图中"""
+        index = self._ids.get(node_id)
+        return index is not None and (mask >> index) & 1 == 1
+    
+    def mask_of(self, node_ids: List[str]) -> int:
+        """将节点 ID 列表编码为位图 (未知节点忽略)"""
+        mask = 0
+        for node_id in node_ids:
+            index = self._ids.get(node_id)
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        """将位图解码为节点 ID 列表"""
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self._node_ids[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+
 class TopologyManager:
     """
     三层球体拓扑管理器
@@ -67,14 +261,17 @@ class TopologyManager:
     - 拓扑可视化
     """
     
-    def __init__(self, topology_config_path: str):
+    def __init__(self, topology_config_path: str, use_routing_table: bool = True):
         """
         初始化拓扑管理器
         
         Args:
             topology_config_path: 拓扑配置文件路径 (JSON)
+            use_routing_table: 是否使用预计算的全对最短路径路由表
+                (False 时每次路由都实时运行 Dijkstra)
         """
         self.config_path = Path(topology_config_path)
+        self.use_routing_table = use_routing_table
         self.graph = nx.DiGraph()  # 有向图
         self.nodes: Dict[str, NodeInfo] = {}
         
@@ -88,12 +285,21 @@ class TopologyManager:
         # 域索引
         self.domains: Dict[str, List[str]] = {}
         
-        # 负载跟踪
+        # 负载跟踪 (节点上报的负载值)
         self.load_tracker: Dict[str, float] = {}
         
+        # 在途请求 + 延迟 EWMA 负载跟踪 (由 ExecutionPool 上报)
+        self.node_loads = NodeLoadTracker()
+        
         # 能力索引
         self.capability_index: Dict[str, List[str]] = {}
         
+        # 候选节点位图索引
+        self.candidate_index = CandidateIndex()
+        
+        # 预计算路由表
+        self.routing_table: Optional[RoutingTable] = None
+        
         # 加载拓扑
         self._load_topology()
         
@@ -131,34 +337,7 @@ class TopologyManager:
                 metadata=node_data.get('metadata', {})
             )
             
-            # 添加到节点字典
-            self.nodes[node.node_id] = node
-            
-            # 添加到层级索引
-            self.layers[node.layer].append(node.node_id)
-            
-            # 添加到域索引
-            if node.domain not in self.domains:
-                self.domains[node.domain] = []
-            self.domains[node.domain].append(node.node_id)
-            
-            # 添加到能力索引
-            for cap in node.capabilities:
-                if cap not in self.capability_index:
-                    self.capability_index[cap] = []
-                self.capability_index[cap].append(node.node_id)
-            
-            # 添加到图
-            self.graph.add_node(
-                node.node_id,
-                layer=node.layer,
-                domain=node.domain,
-                coordinates=node.coordinates,
-                capabilities=node.capabilities
-            )
-            
-            # 初始化负载
-            self.load_tracker[node.node_id] = 0.0
+            self._index_node(node)
         
         # 添加边 (基于邻居关系)
         for node_id, node in self.nodes.items():
@@ -168,12 +347,69 @@ class TopologyManager:
                     weight = self._calculate_distance(node_id, neighbor_id)
                     self.graph.add_edge(node_id, neighbor_id, weight=weight)
         
+        # 构建路由表
+        if self.use_routing_table:
+            self.routing_table = RoutingTable(self.graph)
+        
         logger.info(f"✅ Topology loaded:")
         logger.info(f"   - Total nodes: {len(self.nodes)}")
         logger.info(f"   - Total edges: {len(self.graph.edges)}")
         logger.info(f"   - Layers: {[(k, len(v)) for k, v in self.layers.items()]}")
         logger.info(f"   - Domains: {list(self.domains.keys())}")
     
+    def _index_node(self, node: NodeInfo):
+        """将节点加入节点字典、各类索引、图和负载跟踪"""
+        # 添加到节点字典
+        self.nodes[node.node_id] = node
+        
+        # 添加到层级索引
+        self.layers[node.layer].append(node.node_id)
+        
+        # 添加到域索引
+        if node.domain not in self.domains:
+            self.domains[node.domain] = []
+        self.domains[node.domain].append(node.node_id)
+        
+        # 添加到能力索引
+        for cap in node.capabilities:
+            if cap not in self.capability_index:
+                self.capability_index[cap] = []
+            self.capability_index[cap].append(node.node_id)
+        
+        # 添加到图
+        self.graph.add_node(
+            node.node_id,
+            layer=node.layer,
+            domain=node.domain,
+            coordinates=node.coordinates,
+            capabilities=node.capabilities
+        )
+        
+        # 初始化负载
+        self.load_tracker[node.node_id] = 0.0
+        
+        # 添加到位图索引
+        self.candidate_index.add(node)
+        
+        # 添加到负载堆
+        self.node_loads.add_node(node.node_id, node.capabilities)
+    
+    def _unindex_node(self, node_id: str):
+        """将节点从节点字典、各类索引、图和负载跟踪中移除"""
+        self.nodes.pop(node_id)
+        
+        # 配置中可能出现重复 ID，因此扫描所有索引而不只是节点自己的域和能力
+        for index in (self.layers, self.domains, self.capability_index):
+            for key in list(index):
+                index[key] = [n for n in index[key] if n != node_id]
+                if not index[key] and index is not self.layers:
+                    del index[key]
+        
+        self.graph.remove_node(node_id)
+        self.load_tracker.pop(node_id, None)
+        self.candidate_index.remove(node_id)
+        self.node_loads.remove_node(node_id)
+    
     def _calculate_distance(self, node_id_1: str, node_id_2: str) -> float:
         """
         计算两个节点之间的球面距离
@@ -227,38 +463,42 @@ class TopologyManager:
             最佳节点 ID，如果没有找到则返回 None
         """
         # 1. 筛选候选节点
-        candidates = self._filter_candidates(
+        candidate_mask = self._filter_mask(
             domain=domain,
             layer=layer,
             capabilities=capabilities,
             exclude_nodes=exclude_nodes or []
         )
         
-        if not candidates:
+        if not candidate_mask:
             logger.warning(
                 f"⚠️  No candidates found for domain={domain}, layer={layer}, "
                 f"capabilities={capabilities}"
             )
             return None
         
-        logger.debug(f"🔍 Found {len(candidates)} candidate nodes")
+        logger.debug(f"🔍 Found {bin(candidate_mask).count('1')} candidate nodes")
         
         # 2. 根据策略选择
+        decode = self.candidate_index.decode
         if strategy == RoutingStrategy.LOAD_BALANCED:
-            selected = self._select_by_load(candidates)
+            selected = self._select_by_mask(candidate_mask, capabilities)
         elif strategy == RoutingStrategy.SHORTEST_PATH and source_node:
-            selected = self._select_by_path(candidates, source_node)
+            selected = self._select_by_path(decode(candidate_mask), source_node)
         elif strategy == RoutingStrategy.DOMAIN_AFFINITY:
-            selected = self._select_by_domain(candidates, domain)
+            selected = self._select_by_domain(decode(candidate_mask), domain)
         elif strategy == RoutingStrategy.LAYER_PRIORITY:
-            selected = self._select_by_layer(candidates, layer)
+            selected = self._select_by_layer(decode(candidate_mask), layer)
+        elif strategy == RoutingStrategy.POWER_OF_TWO:
+            selected = self.node_loads.two_choices(decode(candidate_mask))
         else:
             # 默认: 负载均衡
-            selected = self._select_by_load(candidates)
+            selected = self._select_by_mask(candidate_mask, capabilities)
         
         logger.info(
             f"✅ Selected node: {selected} "
-            f"(strategy={strategy.value}, load={self.load_tracker.get(selected, 0.0):.2f})"
+            f"(strategy={strategy.value}, load={self.load_tracker.get(selected, 0.0):.2f}, "
+            f"inflight={self.node_loads.loads[selected].inflight})"
         )
         
         return selected
@@ -271,34 +511,55 @@ class TopologyManager:
         exclude_nodes: List[str]
     ) -> List[str]:
         """筛选候选节点"""
-        candidates = set(self.nodes.keys())
+        return self.candidate_index.decode(
+            self._filter_mask(domain, layer, capabilities, exclude_nodes)
+        )
+    
+    def _filter_mask(
+        self,
+        domain: Optional[str],
+        layer: Optional[str],
+        capabilities: Optional[List[str]],
+        exclude_nodes: List[str]
+    ) -> int:
+        """筛选候选节点，返回位图 (位图按位与)"""
+        index = self.candidate_index
+        candidates = index.all_mask
         
         # 排除节点
         if exclude_nodes:
-            candidates -= set(exclude_nodes)
+            candidates &= ~index.mask_of(exclude_nodes)
         
         # 按域筛选
         if domain and domain in self.domains:
-            candidates &= set(self.domains[domain])
+            candidates &= index.domain_masks.get(domain, 0)
         
         # 按层级筛选
         if layer and layer in self.layers:
-            candidates &= set(self.layers[layer])
+            candidates &= index.layer_masks.get(layer, 0)
         
         # 按能力筛选
         if capabilities:
             for cap in capabilities:
                 if cap in self.capability_index:
-                    candidates &= set(self.capability_index[cap])
+                    candidates &= index.capability_masks.get(cap, 0)
                 else:
                     # 如果某个能力不存在，返回空集
-                    return []
+                    return 0
         
-        return list(candidates)
+        return candidates
     
     def _select_by_load(self, candidates: List[str]) -> str:
         """按负载选择 (选择负载最低的)"""
-        return min(candidates, key=lambda n: self.load_tracker.get(n, 0.0))
+        return self._select_by_mask(self.candidate_index.mask_of(candidates))
+    
+    def _select_by_mask(self, mask: int, capabilities: Optional[List[str]] = None) -> str:
+        """从负载堆中取出第一个落在候选位图内的节点"""
+        contains = self.candidate_index.contains
+        return self.node_loads.least_loaded(
+            lambda n: contains(mask, n),
+            capabilities
+        )
     
     def _select_by_path(self, candidates: List[str], source_node: str) -> str:
         """按路径长度选择 (选择最短路径)"""
@@ -306,6 +567,16 @@ class TopologyManager:
             logger.warning(f"⚠️  Source node {source_node} not in graph, fallback to load balancing")
             return self._select_by_load(candidates)
         
+        # 查表: 距离相同时选择负载更低的节点
+        if self.routing_table is not None:
+            return min(
+                candidates,
+                key=lambda n: (
+                    self.routing_table.distance(source_node, n),
+                    self.node_loads.score(n)
+                )
+            )
+        
         # 计算到每个候选节点的最短路径
         paths = {}
         for candidate in candidates:
@@ -366,10 +637,109 @@ class TopologyManager:
         """
         if node_id in self.load_tracker:
             self.load_tracker[node_id] = load
+            self.node_loads.set_reported_load(node_id, load)
             logger.debug(f"📊 Node {node_id} load updated: {load:.2f}")
         else:
             logger.warning(f"⚠️  Node {node_id} not found in load tracker")
     
+    def register_node(self, node: NodeInfo):
+        """
+        热注册节点
+        
+        节点的出边来自 node.neighbors，已有节点中把它列为邻居的也会补上入边。
+        
+        Args:
+            node: 节点信息
+        """
+        if node.node_id in self.nodes:
+            logger.warning(f"⚠️  Node {node.node_id} already registered, replacing")
+            self.unregister_node(node.node_id)
+        
+        self._index_node(node)
+        if self.routing_table is not None:
+            self.routing_table.add_node(node.node_id)
+        
+        for neighbor_id in node.neighbors:
+            if neighbor_id in self.nodes and neighbor_id != node.node_id:
+                self.add_edge(node.node_id, neighbor_id)
+        for other_id, other in self.nodes.items():
+            if other_id != node.node_id and node.node_id in other.neighbors:
+                self.add_edge(other_id, node.node_id)
+        
+        logger.info(f"✅ Node registered: {node.node_id}")
+    
+    def unregister_node(self, node_id: str):
+        """
+        注销节点
+        
+        Args:
+            node_id: 节点 ID
+        """
+        if node_id not in self.nodes:
+            logger.warning(f"⚠️  Node {node_id} not found")
+            return
+        
+        had_out_edges = self.graph.out_degree(node_id) > 0
+        self._unindex_node(node_id)
+        if self.routing_table is not None:
+            self.routing_table.remove_node(node_id, had_out_edges)
+        
+        logger.info(f"✅ Node unregistered: {node_id}")
+    
+    def add_edge(self, source: str, target: str, weight: Optional[float] = None):
+        """
+        新增或更新一条边，并增量更新路由表
+        
+        Args:
+            source: 源节点 ID
+            target: 目标节点 ID
+            weight: 边权重 (默认使用球面距离)
+        """
+        if source not in self.nodes or target not in self.nodes:
+            logger.warning(f"⚠️  Cannot add edge {source} -> {target}: unknown node")
+            return
+        
+        if weight is None:
+            weight = self._calculate_distance(source, target)
+        
+        old_weight = None
+        if self.graph.has_edge(source, target):
+            old_weight = self.graph[source][target].get('weight', 1.0)
+        
+        affected = set()
+        if self.routing_table is not None and old_weight is not None and weight > old_weight:
+            affected = self.routing_table.sources_using_edge(source, target, old_weight)
+        
+        self.graph.add_edge(source, target, weight=weight)
+        
+        if self.routing_table is not None:
+            if affected:
+                self.routing_table.recompute_sources(affected)
+            else:
+                self.routing_table.relax_edge(source, target, weight)
+    
+    def remove_edge(self, source: str, target: str):
+        """
+        删除一条边，并增量更新路由表
+        
+        Args:
+            source: 源节点 ID
+            target: 目标节点 ID
+        """
+        if not self.graph.has_edge(source, target):
+            logger.warning(f"⚠️  Edge {source} -> {target} not found")
+            return
+        
+        weight = self.graph[source][target].get('weight', 1.0)
+        affected = set()
+        if self.routing_table is not None:
+            affected = self.routing_table.sources_using_edge(source, target, weight)
+        
+        self.graph.remove_edge(source, target)
+        
+        if self.routing_table is not None:
+            self.routing_table.recompute_sources(affected)
+    
     def get_load(self, node_id: str) -> float:
         """获取节点负载"""
         return self.load_tracker.get(node_id, 0.0)
@@ -383,7 +753,8 @@ class TopologyManager:
             "total_edges": len(self.graph.edges),
             "average_load": sum(self.load_tracker.values()) / len(self.load_tracker) if self.load_tracker else 0.0,
             "max_load": max(self.load_tracker.values()) if self.load_tracker else 0.0,
-            "min_load": min(self.load_tracker.values()) if self.load_tracker else 0.0
+            "min_load": min(self.load_tracker.values()) if self.load_tracker else 0.0,
+            "inflight_requests": self.node_loads.total_inflight()
         }
     
     def get_shortest_path(self, source: str, target: str) -> Optional[List[str]]:
@@ -397,6 +768,16 @@ class TopologyManager:
         Returns:
             路径节点列表，如果不存在路径则返回 None
         """
+        if (
+            self.routing_table is not None
+            and source in self.routing_table.dist
+            and target in self.graph
+        ):
+            path = self.routing_table.path(source, target)
+            if path is None:
+                logger.warning(f"⚠️  No path found between {source} and {target}")
+            return path
+        
         try:
             path = nx.shortest_path(self.graph, source, target, weight='weight')
             return path
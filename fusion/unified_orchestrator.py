@@ -110,6 +110,10 @@ class UnifiedOrchestrator:
         self.enable_predictive_routing = enable_predictive_routing
         self.enable_adaptive_balancing = enable_adaptive_balancing
         
+        # 让执行池向拓扑管理器上报在途请求和延迟
+        if getattr(self.execution_pool, 'load_tracker', False) is None:
+            self.execution_pool.load_tracker = topology_manager.node_loads
+        
         # 任务管理
         self.tasks: Dict[str, Task] = {}
         self.task_queue = asyncio.Queue()
@@ -211,15 +215,9 @@ class UnifiedOrchestrator:
                 
                 logger.info(f"⚡ Executing subtask on node: {node_id}")
                 
-                # 更新节点负载
-                self.topology.update_load(node_id, 10)
-                
-                # 真实执行逻辑，包含重试
+                # 真实执行逻辑，包含重试 (在途请求和延迟由执行池上报)
                 res = await self._execute_with_retry(node_id, subtask)
                 
-                # 释放节点负载
-                self.topology.update_load(node_id, -10)
-                
                 if res.success:
                     results.append(res.data)
                 else:
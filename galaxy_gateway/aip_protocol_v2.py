@@ -6,7 +6,7 @@ UFO³ Galaxy - AIP v2.0 协议（Agent Interaction Protocol）
 2. 支持多种消息类型（文本、二进制、流）
 3. 消息确认和重传机制
 4. 心跳和重连机制
-5. 消息编解码
+5. 消息编解码（JSON / 二进制，按 version 字段协商）
 
 作者：Manus AI
 日期：2026-01-22
@@ -15,14 +15,22 @@ UFO³ Galaxy - AIP v2.0 协议（Agent Interaction Protocol）
 
 import json
 import hashlib
+import struct
 import time
 import uuid
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 from datetime import datetime, timezone
 import base64
 
+# ============================================================================
+# 协议版本
+# ============================================================================
+
+PROTOCOL_VERSION = "2.0"          # JSON 编码
+BINARY_PROTOCOL_VERSION = "2.1"   # 支持二进制头部 + 独立负载帧
+
 # ============================================================================
 # 枚举定义
 # ============================================================================
@@ -96,7 +104,7 @@ class MessagePayload:
 @dataclass
 class AIPMessage:
     """AIP v2.0 消息"""
-    version: str = "2.0"                   # 协议版本
+    version: str = PROTOCOL_VERSION        # 协议版本（支持二进制编解码的对端发送 2.1）
     message_id: str = field(default_factory=lambda: f"msg_{uuid.uuid4().hex[:16]}")
     timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     from_device: Optional[DeviceInfo] = None
@@ -138,7 +146,7 @@ class AIPMessage:
         payload = MessagePayload(**data["payload"]) if data.get("payload") else None
         
         return cls(
-            version=data.get("version", "2.0"),
+            version=data.get("version", PROTOCOL_VERSION),
             message_id=data["message_id"],
             timestamp=data["timestamp"],
             from_device=from_device,
@@ -222,14 +230,25 @@ class MessageBuilder:
         to_device: DeviceInfo,
         image_data: bytes,
         format: str = "jpeg",
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        raw: bool = False
     ) -> AIPMessage:
-        """创建图片消息"""
-        # 如果图片小于 1MB，直接包含在消息中（Base64 编码）
+        """
+        创建图片消息
+        
+        Args:
+            raw: 保留原始字节而不做 Base64 编码（用于二进制编解码器，
+                JSON 编码时会自动回退为 Base64）
+        """
+        # 如果图片小于 1MB，直接包含在消息中（Base64 编码或原始字节）
         # 否则，使用 P2P 传输
         size = len(image_data)
         transfer_method = TransferMethod.GATEWAY.value if size < 1024*1024 else TransferMethod.P2P.value
         
+        data = None
+        if size < 1024*1024:
+            data = bytes(image_data) if raw else base64.b64encode(image_data).decode('utf-8')
+        
         payload = MessagePayload(
             data_type="image",
             format=format,
@@ -237,7 +256,7 @@ class MessageBuilder:
             checksum=MessageBuilder._calculate_checksum(image_data),
             transfer_method=transfer_method,
             metadata=metadata or {},
-            data=base64.b64encode(image_data).decode('utf-8') if size < 1024*1024 else None
+            data=data
         )
         
         return AIPMessage(
@@ -343,20 +362,49 @@ class MessageBuilder:
 # ============================================================================
 
 class MessageCodec:
-    """消息编解码器"""
+    """消息编解码器（JSON，所有版本的对端都支持）"""
     
     @staticmethod
     def encode(message: AIPMessage) -> bytes:
-        """编码消息为字节"""
-        json_str = message.to_json()
-        return json_str.encode('utf-8')
+        """编码消息为字节（原始字节负载回退为 Base64）"""
+        data = message.to_dict()
+        payload = data.get("payload")
+        if payload and isinstance(payload.get("data"), (bytes, bytearray, memoryview)):
+            payload["data"] = base64.b64encode(payload["data"]).decode('ascii')
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
     
     @staticmethod
     def decode(data: bytes) -> AIPMessage:
-        """解码字节为消息"""
-        json_str = data.decode('utf-8')
+        """解码字节为消息（自动识别二进制帧）"""
+        if BinaryMessageCodec.is_binary(data):
+            return BinaryMessageCodec.decode(data)
+        json_str = bytes(data).decode('utf-8')
         return AIPMessage.from_json(json_str)
     
+    @staticmethod
+    def negotiate_version(peer_version: Optional[str]) -> str:
+        """
+        根据对端消息中的 version 字段协商编码版本
+        
+        对端版本不低于 2.1 时使用二进制编解码，否则（包括无法解析的版本）
+        回退到 2.0 JSON，老版本对端保持可用。
+        """
+        try:
+            major, minor = (int(part) for part in str(peer_version).split(".")[:2])
+        except (TypeError, ValueError):
+            return PROTOCOL_VERSION
+        
+        if (major, minor) >= (2, 1):
+            return BINARY_PROTOCOL_VERSION
+        return PROTOCOL_VERSION
+    
+    @staticmethod
+    def for_version(version: Optional[str]) -> type:
+        """获取协商版本对应的编解码器"""
+        if MessageCodec.negotiate_version(version) == BINARY_PROTOCOL_VERSION:
+            return BinaryMessageCodec
+        return MessageCodec
+    
     @staticmethod
     def validate(message: AIPMessage) -> tuple[bool, Optional[str]]:
         """验证消息"""
@@ -385,6 +433,244 @@ class MessageCodec:
         
         return True, None
 
+# ============================================================================
+# 二进制编解码器
+# ============================================================================
+
+class BinaryMessageCodec:
+    """
+    二进制编解码器（AIP 2.1）
+    
+    消息分为两帧：
+    - 头部帧：前导 + struct 布局的消息字段（枚举编码为序号，字符串带长度前缀）
+    - 负载帧：payload.data 的原始字节，不做 Base64
+    
+    前导: magic(4) | 帧格式版本(1) | 标志(1) | 头部长度(4) | 负载长度(4)
+    
+    WebSocket 等基于消息的传输可以分别发送两帧（encode_frames /
+    decode_frames）；基于流的传输使用 encode / decode 的拼接形式。
+    """
+    
+    MAGIC = b"AIPB"
+    FRAME_VERSION = 1
+    PREAMBLE = struct.Struct("!4sBBII")
+    FIXED = struct.Struct("!BBBI")          # 类型、内容类型、优先级、TTL
+    PAYLOAD_FIXED = struct.Struct("!Qqq")   # 大小、分块数、分块大小（-1 表示无）
+    LENGTH = struct.Struct("!I")
+    NONE_LENGTH = 0xFFFFFFFF
+    
+    FLAG_PAYLOAD_DATA = 0x01    # 负载帧携带 payload.data
+    FLAG_PAYLOAD_TEXT = 0x02    # payload.data 为字符串（UTF-8）
+    FLAG_REQUIRES_ACK = 0x04
+    
+    MESSAGE_TYPES = list(MessageType)
+    CONTENT_TYPES = list(ContentType)
+    PRIORITIES = list(Priority)
+    MESSAGE_TYPE_INDEX = {member: i for i, member in enumerate(MESSAGE_TYPES)}
+    CONTENT_TYPE_INDEX = {member: i for i, member in enumerate(CONTENT_TYPES)}
+    PRIORITY_INDEX = {member: i for i, member in enumerate(PRIORITIES)}
+    
+    # ========================================================================
+    # 编码
+    # ========================================================================
+    
+    @staticmethod
+    def is_binary(data: bytes) -> bool:
+        """是否为二进制帧"""
+        return bytes(data[:4]) == BinaryMessageCodec.MAGIC
+    
+    @classmethod
+    def encode_frames(cls, message: AIPMessage) -> Tuple[bytes, bytes]:
+        """
+        编码消息为 (头部帧, 负载帧)
+        
+        Returns:
+            Tuple[bytes, bytes]: 头部帧；负载帧（无数据时为空字节串）
+        """
+        flags = cls.FLAG_REQUIRES_ACK if message.requires_ack else 0
+        payload_frame = b""
+        
+        parts = [
+            cls.FIXED.pack(
+                cls.MESSAGE_TYPE_INDEX[message.message_type],
+                cls.CONTENT_TYPE_INDEX[message.content_type],
+                cls.PRIORITY_INDEX[message.priority],
+                message.ttl
+            ),
+            cls._pack_str(message.version),
+            cls._pack_str(message.message_id),
+            cls._pack_str(message.timestamp),
+            cls._pack_str(message.correlation_id),
+            cls._pack_device(message.from_device),
+            cls._pack_device(message.to_device),
+        ]
+        
+        payload = message.payload
+        if payload is None:
+            parts.append(b"\x00")
+        else:
+            parts.append(b"\x01")
+            parts.append(cls.PAYLOAD_FIXED.pack(
+                payload.size,
+                -1 if payload.chunks is None else payload.chunks,
+                -1 if payload.chunk_size is None else payload.chunk_size
+            ))
+            for value in (payload.data_type, payload.format, payload.checksum,
+                          payload.transfer_method, payload.data_url):
+                parts.append(cls._pack_str(value))
+            parts.append(cls._pack_str(
+                json.dumps(payload.metadata, ensure_ascii=False) if payload.metadata else None
+            ))
+            
+            if isinstance(payload.data, str):
+                flags |= cls.FLAG_PAYLOAD_DATA | cls.FLAG_PAYLOAD_TEXT
+                payload_frame = payload.data.encode('utf-8')
+            elif payload.data is not None:
+                flags |= cls.FLAG_PAYLOAD_DATA
+                payload_frame = payload.data
+        
+        header = b"".join(parts)
+        preamble = cls.PREAMBLE.pack(
+            cls.MAGIC, cls.FRAME_VERSION, flags, len(header), len(payload_frame)
+        )
+        return preamble + header, payload_frame
+    
+    @classmethod
+    def encode(cls, message: AIPMessage) -> bytes:
+        """编码消息为单个字节串（头部帧 + 负载帧）"""
+        header_frame, payload_frame = cls.encode_frames(message)
+        return header_frame + payload_frame
+    
+    @classmethod
+    def _pack_str(cls, value: Optional[str]) -> bytes:
+        """带长度前缀的字符串"""
+        if value is None:
+            return cls.LENGTH.pack(cls.NONE_LENGTH)
+        encoded = value.encode('utf-8')
+        return cls.LENGTH.pack(len(encoded)) + encoded
+    
+    @classmethod
+    def _pack_device(cls, device: Optional[DeviceInfo]) -> bytes:
+        """设备信息"""
+        if device is None:
+            return b"\x00"
+        return b"\x01" + b"".join(
+            cls._pack_str(value) for value in
+            (device.device_id, device.device_name, device.device_type, device.ip_address)
+        )
+    
+    # ========================================================================
+    # 解码
+    # ========================================================================
+    
+    @classmethod
+    def decode_frames(cls, header_frame: bytes, payload_frame: Optional[bytes] = None) -> AIPMessage:
+        """从 (头部帧, 负载帧) 解码消息"""
+        view = bytes(header_frame)
+        magic, frame_version, flags, header_len, payload_len = cls.PREAMBLE.unpack_from(view)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a binary AIP frame")
+        if frame_version != cls.FRAME_VERSION:
+            raise ValueError(f"Unsupported binary AIP frame version: {frame_version}")
+        
+        offset = cls.PREAMBLE.size
+        if len(view) < offset + header_len:
+            raise ValueError("Truncated binary AIP header")
+        
+        type_index, content_index, priority_index, ttl = cls.FIXED.unpack_from(view, offset)
+        offset += cls.FIXED.size
+        
+        version, offset = cls._unpack_str(view, offset)
+        message_id, offset = cls._unpack_str(view, offset)
+        timestamp, offset = cls._unpack_str(view, offset)
+        correlation_id, offset = cls._unpack_str(view, offset)
+        from_device, offset = cls._unpack_device(view, offset)
+        to_device, offset = cls._unpack_device(view, offset)
+        
+        payload = None
+        has_payload = view[offset]
+        offset += 1
+        if has_payload:
+            size, chunks, chunk_size = cls.PAYLOAD_FIXED.unpack_from(view, offset)
+            offset += cls.PAYLOAD_FIXED.size
+            fields = []
+            for _ in range(6):
+                value, offset = cls._unpack_str(view, offset)
+                fields.append(value)
+            data_type, format, checksum, transfer_method, data_url, metadata = fields
+            
+            data = None
+            if flags & cls.FLAG_PAYLOAD_DATA:
+                if payload_frame is None:
+                    raise ValueError("Missing binary AIP payload frame")
+                if len(payload_frame) != payload_len:
+                    raise ValueError(
+                        f"Payload frame size mismatch: expected {payload_len}, got {len(payload_frame)}"
+                    )
+                data = bytes(payload_frame)
+                if flags & cls.FLAG_PAYLOAD_TEXT:
+                    data = data.decode('utf-8')
+            
+            payload = MessagePayload(
+                data_type=data_type,
+                format=format,
+                size=size,
+                checksum=checksum,
+                transfer_method=transfer_method,
+                chunks=None if chunks < 0 else chunks,
+                chunk_size=None if chunk_size < 0 else chunk_size,
+                metadata=json.loads(metadata) if metadata else {},
+                data=data,
+                data_url=data_url
+            )
+        
+        return AIPMessage(
+            version=version,
+            message_id=message_id,
+            timestamp=timestamp,
+            from_device=from_device,
+            to_device=to_device,
+            message_type=cls.MESSAGE_TYPES[type_index],
+            content_type=cls.CONTENT_TYPES[content_index],
+            payload=payload,
+            priority=cls.PRIORITIES[priority_index],
+            ttl=ttl,
+            requires_ack=bool(flags & cls.FLAG_REQUIRES_ACK),
+            correlation_id=correlation_id
+        )
+    
+    @classmethod
+    def decode(cls, data: bytes) -> AIPMessage:
+        """解码单个字节串（头部帧 + 负载帧）"""
+        view = memoryview(data)
+        _, _, _, header_len, payload_len = cls.PREAMBLE.unpack_from(view)
+        header_end = cls.PREAMBLE.size + header_len
+        if len(view) < header_end + payload_len:
+            raise ValueError("Truncated binary AIP message")
+        return cls.decode_frames(view[:header_end], view[header_end:header_end + payload_len])
+    
+    @classmethod
+    def _unpack_str(cls, view: bytes, offset: int) -> Tuple[Optional[str], int]:
+        """读取带长度前缀的字符串"""
+        (length,) = cls.LENGTH.unpack_from(view, offset)
+        offset += 4
+        if length == cls.NONE_LENGTH:
+            return None, offset
+        return view[offset:offset + length].decode('utf-8'), offset + length
+    
+    @classmethod
+    def _unpack_device(cls, view: bytes, offset: int) -> Tuple[Optional[DeviceInfo], int]:
+        """读取设备信息"""
+        present = view[offset]
+        offset += 1
+        if not present:
+            return None, offset
+        values = []
+        for _ in range(4):
+            value, offset = cls._unpack_str(view, offset)
+            values.append(value)
+        return DeviceInfo(*values), offset
+
 # ============================================================================
 # 使用示例
 # ============================================================================
@@ -490,6 +776,22 @@ def example_usage():
     print(f"验证结果: {'有效' if valid else '无效'}")
     if error:
         print(f"错误: {error}")
+    
+    # 示例 9: 二进制编解码（按对端版本协商）
+    print("\n示例 9: 二进制编解码")
+    print("-"*80)
+    codec = MessageCodec.for_version(BINARY_PROTOCOL_VERSION)
+    raw_image_msg = MessageBuilder.create_image_message(
+        from_device=phone_a,
+        to_device=pc,
+        image_data=fake_image_data,
+        raw=True
+    )
+    header_frame, payload_frame = codec.encode_frames(raw_image_msg)
+    print(f"JSON 编码大小: {len(MessageCodec.encode(raw_image_msg))} 字节")
+    print(f"二进制编码大小: {len(header_frame)} + {len(payload_frame)} 字节")
+    decoded = codec.decode_frames(header_frame, payload_frame)
+    print(f"负载一致: {decoded.payload.data == fake_image_data}")
 
 if __name__ == "__main__":
     example_usage()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+UFO³ Galaxy - AIP 编解码基准测试
+
+对比两种编解码器在典型消息上的大小与编解码耗时:
+1. MessageCodec (AIP 2.0, JSON, 图片负载 Base64)
+2. BinaryMessageCodec (AIP 2.1, struct 头部 + 原始字节负载帧)
+
+消息:
+- text: 控制/文本消息 (无二进制负载)
+- image: 约 300KB 的截图 (内联发送)
+- file: 500MB 文件的描述消息 (数据走 P2P 分块传输)
+
+用法:
+    python galaxy_gateway/benchmark_aip_codec.py [--iterations 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from aip_protocol_v2 import (
+    BinaryMessageCodec,
+    DeviceInfo,
+    MessageBuilder,
+    MessageCodec,
+)
+
+
+def _build_messages(image_size: int):
+    """构造典型消息 (名称, JSON 版消息, 二进制版消息)"""
+    phone = DeviceInfo("phone_a", "手机A", "android", "192.168.1.100")
+    pc = DeviceInfo("pc", "电脑", "windows", "192.168.1.10")
+
+    text = MessageBuilder.create_control_message(
+        phone, pc, "open_app", {"app": "chrome", "url": "https://example.com"}
+    )
+
+    # 随机字节近似已压缩的 JPEG 截图
+    image_data = os.urandom(image_size)
+    metadata = {"width": 1920, "height": 1080, "filename": "screen.jpg"}
+    image_json = MessageBuilder.create_image_message(
+        phone, pc, image_data, metadata=metadata
+    )
+    image_binary = MessageBuilder.create_image_message(
+        phone, pc, image_data, metadata=metadata, raw=True
+    )
+
+    file_msg = MessageBuilder.create_file_message(
+        phone, pc, "/sdcard/recording.mp4", 500 * 1024 * 1024,
+        "sha256:" + "0" * 64, chunks=500,
+        metadata={"filename": "recording.mp4", "duration": 300}
+    )
+
+    return [
+        ("text", text, text),
+        ("image", image_json, image_binary),
+        ("file", file_msg, file_msg),
+    ]
+
+
+def _time_per_op(func, iterations: int) -> float:
+    """返回单次调用的平均耗时 (微秒)"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AIP codec benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--image-size", type=int, default=300 * 1024)
+    args = parser.parse_args()
+
+    print("=" * 88)
+    print(
+        f"{'message':<8}{'codec':<8}{'bytes':>12}"
+        f"{'encode (us)':>16}{'decode (us)':>16}{'round trip (us)':>18}"
+    )
+    print("-" * 88)
+
+    for name, json_msg, binary_msg in _build_messages(args.image_size):
+        iterations = args.iterations if name != "image" else max(args.iterations // 10, 1)
+
+        json_bytes = MessageCodec.encode(json_msg)
+        json_encode = _time_per_op(lambda: MessageCodec.encode(json_msg), iterations)
+        json_decode = _time_per_op(lambda: MessageCodec.decode(json_bytes), iterations)
+
+        header, payload = BinaryMessageCodec.encode_frames(binary_msg)
+        binary_encode = _time_per_op(
+            lambda: BinaryMessageCodec.encode_frames(binary_msg), iterations
+        )
+        binary_decode = _time_per_op(
+            lambda: BinaryMessageCodec.decode_frames(header, payload), iterations
+        )
+
+        # 两种编解码器还原出同一份负载
+        decoded = BinaryMessageCodec.decode_frames(header, payload)
+        assert decoded.payload.checksum == MessageCodec.decode(json_bytes).payload.checksum
+        assert decoded.payload.data == binary_msg.payload.data
+
+        for codec, size, enc, dec in (
+            ("json", len(json_bytes), json_encode, json_decode),
+            ("binary", len(header) + len(payload), binary_encode, binary_decode),
+        ):
+            print(f"{name:<8}{codec:<8}{size:>12}{enc:>16.1f}{dec:>16.1f}{enc + dec:>18.1f}")
+
+    print("=" * 88)
+
+
+if __name__ == "__main__":
+    main()
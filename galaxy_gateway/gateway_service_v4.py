@@ -18,7 +18,6 @@ Galaxy Gateway v4.0 - 完整的视觉操控系统
 
 import os
 import asyncio
-import httpx
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
@@ -28,6 +27,9 @@ from pydantic import BaseModel
 # 导入之前的模块
 import sys
 sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.node_rpc import get_node_rpc_client
 
 try:
     from enhanced_nlu_v2 import EnhancedNLU
@@ -91,15 +93,20 @@ class VisionCommandRequest(BaseModel):
 # ============================================================================
 
 async def call_node(url: str, endpoint: str, data: dict) -> dict:
-    """调用节点"""
+    """调用节点（共享连接池，复用到各节点的长连接）"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(f"{url}{endpoint}", json=data)
-            response.raise_for_status()
-            return response.json()
+        return await get_node_rpc_client().call_json(f"{url}{endpoint}", data, timeout=60.0)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+async def probe_node(url: str) -> str:
+    """检查节点健康状态: healthy / unknown / unhealthy"""
+    try:
+        response = await get_node_rpc_client().get(f"{url}/health", timeout=5.0)
+        return "healthy" if response.status_code == 200 else "unknown"
+    except Exception:
+        return "unhealthy"
+
 # ============================================================================
 # API 端点 - 基础功能
 # ============================================================================
@@ -107,34 +114,12 @@ async def call_node(url: str, endpoint: str, data: dict) -> dict:
 @app.get("/health")
 async def health():
     """健康检查"""
-    # 检查所有节点
-    node_90_status = "unknown"
-    node_91_status = "unknown"
-    node_92_status = "unknown"
-    
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{NODE_90_VISION_URL}/health")
-            if response.status_code == 200:
-                node_90_status = "healthy"
-    except:
-        node_90_status = "unhealthy"
-    
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{NODE_91_AGENT_URL}/health")
-            if response.status_code == 200:
-                node_91_status = "healthy"
-    except:
-        node_91_status = "unhealthy"
-    
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{NODE_92_CONTROL_URL}/health")
-            if response.status_code == 200:
-                node_92_status = "healthy"
-    except:
-        node_92_status = "unhealthy"
+    # 并发检查所有节点
+    node_90_status, node_91_status, node_92_status = await asyncio.gather(
+        probe_node(NODE_90_VISION_URL),
+        probe_node(NODE_91_AGENT_URL),
+        probe_node(NODE_92_CONTROL_URL)
+    )
     
     return {
         "status": "healthy",
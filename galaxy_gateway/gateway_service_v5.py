@@ -19,9 +19,9 @@ Galaxy Gateway v5.0 - 自主学习和编程版本
 """
 
 import os
+import sys
 import json
 import asyncio
-import httpx
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -29,6 +29,10 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.node_rpc import NodeRPCClient, get_node_rpc_client
+
 app = FastAPI(title="Galaxy Gateway v5.0", version="5.0.0")
 app.add_middleware(
     CORSMiddleware,
@@ -97,18 +101,19 @@ class AutonomousProgrammingRequest(BaseModel):
 # ============================================================================
 
 class NodeClient:
-    """节点服务客户端"""
+    """节点服务客户端（所有实例共用一个连接池）"""
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, rpc: Optional[NodeRPCClient] = None):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = rpc or get_node_rpc_client()
     
     async def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """POST 请求"""
         try:
             response = await self.client.post(
                 f"{self.base_url}{endpoint}",
-                json=data
+                json=data,
+                timeout=60.0
             )
             if response.status_code == 200:
                 return response.json()
@@ -120,7 +125,7 @@ class NodeClient:
     async def get(self, endpoint: str) -> Dict[str, Any]:
         """GET 请求"""
         try:
-            response = await self.client.get(f"{self.base_url}{endpoint}")
+            response = await self.client.get(f"{self.base_url}{endpoint}", timeout=60.0)
             if response.status_code == 200:
                 return response.json()
             else:
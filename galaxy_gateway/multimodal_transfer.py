@@ -159,8 +159,9 @@ class MultimodalTransferManager:
         if not message.payload or not message.payload.data:
             raise ValueError("No image data in message")
         
-        # 解码 Base64
-        image_data = base64.b64decode(message.payload.data)
+        # 二进制编解码器直接携带原始字节，JSON 编码为 Base64
+        data = message.payload.data
+        image_data = data if isinstance(data, bytes) else base64.b64decode(data)
         
         # 验证校验和
         calculated_checksum = self._calculate_checksum(image_data)
@@ -6,22 +6,27 @@ UFO³ Galaxy - P2P 连接器
 2. NAT 穿透（STUN/TURN）
 3. 连接管理和维护
 4. 数据同步
+5. 流多路复用（控制、心跳与批量数据共用一条连接，互不阻塞）
 
 作者：Manus AI
 日期：2026-01-22
-版本：1.0
+版本：1.1
 """
 
 import asyncio
+import logging
 import socket as sock_module
 import struct
 import json
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
 import aiohttp
 
+logger = logging.getLogger(__name__)
+
 # ============================================================================
 # 配置
 # ============================================================================
@@ -43,11 +48,19 @@ class P2PConfig:
     # 连接超时
     CONNECTION_TIMEOUT = 10  # 秒
     
+    # 握手超时（旧版对端不回复握手，超时后按旧协议通信）
+    HANDSHAKE_TIMEOUT = 5  # 秒
+    
     # 心跳间隔
     HEARTBEAT_INTERVAL = 30  # 秒
     
     # 重连间隔
     RECONNECT_INTERVAL = 5  # 秒
+    
+    # 多路复用
+    MULTIPLEX_VERSION = 1                # 握手中声明的多路复用协议版本
+    MAX_FRAME_SIZE = 64 * 1024           # 单个数据帧的最大负载（字节）
+    STREAM_WINDOW = 4 * 1024 * 1024      # 每个流的发送额度（字节），单条消息不超过其一半
 
 # ============================================================================
 # 枚举
@@ -69,6 +82,31 @@ class NATType(Enum):
     PORT_RESTRICTED_CONE = "port_restricted_cone"  # 端口限制锥形 NAT
     SYMMETRIC = "symmetric"                # 对称 NAT
 
+class FrameType(IntEnum):
+    """多路复用帧类型"""
+    MESSAGE = 0      # 控制消息（JSON）
+    HEARTBEAT = 1    # 心跳
+    OPEN = 2         # 打开流（负载为 JSON 元数据）
+    DATA = 3         # 流数据（原始字节，不经过 JSON）
+    WINDOW = 4       # 归还发送额度（负载为 !I 字节数）
+    CLOSE = 5        # 关闭流
+
+class StreamPriority(IntEnum):
+    """发送优先级（数值越小越先发送）"""
+    HEARTBEAT = 0
+    CONTROL = 1
+    BULK = 2
+
+# 帧格式: 长度(!I，不含自身) + 类型(!B) + 标志(!B) + 流 ID(!I) + 负载
+FRAME_HEADER = struct.Struct('!IBBI')
+FRAME_BODY_HEADER_SIZE = FRAME_HEADER.size - 4
+
+# 帧标志: 消息的最后一个分片
+FLAG_END = 0x01
+
+# 分块消息头: 分块索引
+CHUNK_HEADER = struct.Struct('!I')
+
 # ============================================================================
 # 数据结构
 # ============================================================================
@@ -93,6 +131,7 @@ class P2PConnection:
     reader: Optional[asyncio.StreamReader] = None
     writer: Optional[asyncio.StreamWriter] = None
     last_heartbeat: float = field(default_factory=time.time)
+    mux: Optional['StreamMultiplexer'] = None  # 对端不支持多路复用时为 None
     
 # ============================================================================
 # STUN 客户端（用于 NAT 穿透）
@@ -182,6 +221,529 @@ class STUNClient:
             print(f"STUN 错误: {e}")
             return None, None
 
+# ============================================================================
+# 流多路复用
+# ============================================================================
+
+class MuxStream:
+    """
+    多路复用流
+    
+    面向消息：每次 write() 发送一条完整消息（批量数据会被切成多个数据帧），
+    对端 read() 收到的也是一条完整消息。发送受对端归还的额度限制，
+    慢消费者只会阻塞自己的流，不会阻塞同一连接上的其他流量。
+    """
+    
+    def __init__(
+        self,
+        mux: 'StreamMultiplexer',
+        stream_id: int,
+        priority: StreamPriority,
+        metadata: Dict[str, Any]
+    ):
+        self.mux = mux
+        self.stream_id = stream_id
+        self.priority = priority
+        self.metadata = metadata
+        
+        # 发送方向
+        self.send_credit = mux.window
+        self.local_closed = False
+        self.bytes_sent = 0
+        self._credit_event = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        
+        # 接收方向
+        self.remote_closed = False
+        self.bytes_received = 0
+        self._inbound: asyncio.Queue = asyncio.Queue()
+        self._fragments: List[bytes] = []
+        self._unacked = 0  # 已被读取但尚未归还给对端的额度
+        self._eof = False  # 对端正常关闭
+        
+        self._error: Optional[Exception] = None
+    
+    @property
+    def max_message_size(self) -> int:
+        """单条消息的最大字节数（窗口的一半，保证收发双方不会互相等待额度）"""
+        return self.mux.window // 2
+    
+    async def write(self, *parts: Union[bytes, bytearray, memoryview]):
+        """
+        发送一条消息
+        
+        Args:
+            parts: 消息内容，多个片段按顺序拼接（不复制）
+        
+        Raises:
+            ValueError: 消息超过 max_message_size
+            ConnectionError: 流或连接已关闭
+        """
+        views = [memoryview(part).cast('B') for part in parts]
+        remaining = sum(len(view) for view in views)
+        
+        if remaining > self.max_message_size:
+            raise ValueError(
+                f"Message too large: {remaining} > {self.max_message_size}"
+            )
+        
+        async with self._write_lock:
+            if self.local_closed:
+                raise ConnectionError(f"Stream {self.stream_id} is closed")
+            
+            pending = deque(view for view in views if len(view))
+            while True:
+                size = min(remaining, self.mux.max_frame_size)
+                await self._acquire_credit(size)
+                
+                # 从待发送片段中切出一个数据帧
+                fragment = []
+                filled = 0
+                while filled < size:
+                    view = pending[0]
+                    take = min(len(view), size - filled)
+                    fragment.append(view[:take])
+                    filled += take
+                    if take == len(view):
+                        pending.popleft()
+                    else:
+                        pending[0] = view[take:]
+                
+                remaining -= size
+                self.bytes_sent += size
+                last = remaining == 0
+                future = self.mux._enqueue(
+                    self.priority,
+                    FrameType.DATA,
+                    FLAG_END if last else 0,
+                    self.stream_id,
+                    fragment,
+                    wait=last
+                )
+                if last:
+                    break
+        
+        # 在锁外等待最后一帧写出，后续消息可以继续排队
+        await future
+    
+    async def read(self) -> Optional[bytes]:
+        """
+        读取下一条完整消息
+        
+        Returns:
+            消息内容，流结束时返回 None
+        """
+        message = await self._inbound.get()
+        
+        if message is None:
+            # 保留结束标记，后续 read() 同样返回 None
+            self._inbound.put_nowait(None)
+            if self._error and not self._eof:
+                raise self._error
+            return None
+        
+        self._release(len(message))
+        return message
+    
+    async def send_chunk(self, chunk_index: int, chunk_data: bytes):
+        """
+        发送文件分块
+        
+        签名与 ResumableTransferManager.send_file 的 send_chunk_callback 一致，
+        可以直接作为回调传入。
+        """
+        await self.write(CHUNK_HEADER.pack(chunk_index), chunk_data)
+    
+    async def read_chunk(self) -> Optional[Tuple[int, memoryview]]:
+        """
+        读取 send_chunk() 发送的分块
+        
+        Returns:
+            (chunk_index, chunk_data)，流结束时返回 None
+        """
+        message = await self.read()
+        
+        if message is None:
+            return None
+        
+        chunk_index = CHUNK_HEADER.unpack_from(message)[0]
+        return chunk_index, memoryview(message)[CHUNK_HEADER.size:]
+    
+    async def close(self):
+        """
+        关闭发送方向（对端 read() 读完剩余消息后返回 None）
+        
+        双方都调用 close() 后流从连接中移除。
+        """
+        async with self._write_lock:
+            if self.local_closed or self.mux.closed:
+                self.local_closed = True
+                return
+            
+            self.local_closed = True
+            future = self.mux._enqueue(
+                self.priority, FrameType.CLOSE, 0, self.stream_id, (), wait=True
+            )
+        
+        await future
+        self._maybe_discard()
+    
+    async def _acquire_credit(self, size: int):
+        """等待足够的发送额度"""
+        while self.send_credit < size:
+            if self._error:
+                raise self._error
+            self._credit_event.clear()
+            await self._credit_event.wait()
+        
+        if self._error:
+            raise self._error
+        
+        self.send_credit -= size
+    
+    def _release(self, size: int):
+        """应用层消费了数据，累计到窗口的一半后归还额度"""
+        self._unacked += size
+        
+        if self._unacked >= self.mux.window // 2 and not self.mux.closed:
+            self.mux._enqueue(
+                StreamPriority.HEARTBEAT,
+                FrameType.WINDOW,
+                0,
+                self.stream_id,
+                (struct.pack('!I', self._unacked),)
+            )
+            self._unacked = 0
+    
+    def _on_data(self, flags: int, payload: bytes):
+        """收到数据帧"""
+        self.bytes_received += len(payload)
+        self._fragments.append(payload)
+        
+        if flags & FLAG_END:
+            if len(self._fragments) == 1:
+                message = self._fragments[0]
+            else:
+                message = b"".join(self._fragments)
+            self._fragments = []
+            self._inbound.put_nowait(message)
+    
+    def _on_window(self, increment: int):
+        """对端归还额度"""
+        self.send_credit += increment
+        self._credit_event.set()
+    
+    def _on_close(self):
+        """对端关闭发送方向"""
+        self._eof = True
+        if not self.remote_closed:
+            self.remote_closed = True
+            self._inbound.put_nowait(None)
+        self._maybe_discard()
+    
+    def _abort(self, error: Exception):
+        """连接断开，唤醒所有等待者"""
+        self._error = error
+        self.local_closed = True
+        self._credit_event.set()
+        if not self.remote_closed:
+            self.remote_closed = True
+            self._inbound.put_nowait(None)
+    
+    def _maybe_discard(self):
+        """双向都关闭后从连接中移除"""
+        if self.local_closed and self.remote_closed:
+            self.mux.streams.pop(self.stream_id, None)
+
+class StreamMultiplexer:
+    """
+    连接级多路复用器
+    
+    所有帧经由单个写任务发出，按优先级调度：心跳/额度更新 > 控制消息 > 批量数据。
+    批量数据被切成不超过 MAX_FRAME_SIZE 的数据帧，控制消息最多只需等待一个数据帧，
+    大文件传输不会阻塞同一连接上的心跳和控制消息。
+    
+    接收循环从不等待应用层：流数据进入各自的队列，控制消息由单独的分发任务
+    按顺序交给回调。两者都在被消费后才归还额度，慢回调只会让对端暂停发送。
+    
+    流 ID 与 HTTP/2 相同：连接发起方使用奇数，接受方使用偶数，0 保留给连接级消息。
+    """
+    
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        initiator: bool,
+        message_handler: Callable[[bytes], Awaitable[None]],
+        stream_handler: Optional[Callable[[MuxStream], Awaitable[None]]] = None,
+        window: Optional[int] = None,
+        max_frame_size: Optional[int] = None
+    ):
+        self.writer = writer
+        self.window = window or P2PConfig.STREAM_WINDOW
+        self.max_frame_size = max_frame_size or P2PConfig.MAX_FRAME_SIZE
+        self.streams: Dict[int, MuxStream] = {}
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+        
+        # 统计
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        
+        self._message_handler = message_handler
+        self._stream_handler = stream_handler
+        self._next_stream_id = 1 if initiator else 2
+        self._queues = [deque() for _ in StreamPriority]
+        self._ready = asyncio.Event()
+        self._handler_tasks = set()
+        
+        # 控制消息（流 0）的额度，与单个流相同
+        self.message_credit = self.window
+        self._message_credit_event = asyncio.Event()
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self._message_unacked = 0
+        
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+    
+    async def send_message(self, data: bytes, priority: StreamPriority = StreamPriority.CONTROL):
+        """发送控制消息，等待其写入连接（对端回调积压时等待额度）"""
+        size = min(len(data), self.window)
+        while self.message_credit < size:
+            if self.closed:
+                raise ConnectionError("Connection is closed")
+            self._message_credit_event.clear()
+            await self._message_credit_event.wait()
+        
+        if self.closed:
+            raise ConnectionError("Connection is closed")
+        
+        self.message_credit -= size
+        await self._enqueue(priority, FrameType.MESSAGE, FLAG_END, 0, (data,), wait=True)
+    
+    def send_heartbeat(self, data: bytes):
+        """发送心跳（不等待）"""
+        self._enqueue(StreamPriority.HEARTBEAT, FrameType.HEARTBEAT, FLAG_END, 0, (data,))
+    
+    def open_stream(
+        self,
+        priority: StreamPriority = StreamPriority.BULK,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> MuxStream:
+        """
+        打开新流
+        
+        Args:
+            priority: 流数据的发送优先级
+            metadata: 随 OPEN 帧发送给对端的元数据（例如传输会话 ID）
+        
+        Returns:
+            MuxStream: 新流
+        """
+        if self.closed:
+            raise ConnectionError("Connection is closed")
+        
+        stream_id = self._next_stream_id
+        self._next_stream_id += 2
+        
+        stream = MuxStream(self, stream_id, StreamPriority(priority), metadata or {})
+        self.streams[stream_id] = stream
+        
+        # OPEN 帧的优先级不低于流数据，保证对端先看到 OPEN
+        payload = json.dumps({"priority": int(priority), "metadata": stream.metadata})
+        self._enqueue(
+            min(StreamPriority.CONTROL, stream.priority),
+            FrameType.OPEN,
+            0,
+            stream_id,
+            (payload.encode('utf-8'),)
+        )
+        
+        return stream
+    
+    async def accept_stream(self) -> MuxStream:
+        """等待对端打开的下一个流（未注册 stream_handler 时使用）"""
+        stream = await self.incoming.get()
+        
+        if stream is None:
+            self.incoming.put_nowait(None)
+            raise ConnectionError("Connection is closed")
+        
+        return stream
+    
+    async def handle_frame(self, frame_type: int, flags: int, stream_id: int, payload: bytes):
+        """分发接收循环读到的一帧"""
+        if frame_type == FrameType.MESSAGE:
+            # 交给分发任务，接收循环继续读取其他流的帧
+            self._messages.put_nowait(payload)
+        
+        elif frame_type == FrameType.HEARTBEAT:
+            # 心跳时间已在接收循环中更新
+            return
+        
+        elif frame_type == FrameType.WINDOW and stream_id == 0:
+            self.message_credit += struct.unpack('!I', payload)[0]
+            self._message_credit_event.set()
+        
+        elif frame_type == FrameType.OPEN:
+            info = json.loads(payload.decode('utf-8'))
+            stream = MuxStream(
+                self,
+                stream_id,
+                StreamPriority(info.get("priority", StreamPriority.BULK)),
+                info.get("metadata") or {}
+            )
+            self.streams[stream_id] = stream
+            
+            if self._stream_handler:
+                task = asyncio.create_task(self._stream_handler(stream))
+                self._handler_tasks.add(task)
+                task.add_done_callback(self._handler_tasks.discard)
+            else:
+                self.incoming.put_nowait(stream)
+        
+        else:
+            stream = self.streams.get(stream_id)
+            if stream is None:
+                # 流已双向关闭后仍可能收到迟到的额度更新
+                logger.debug(f"Frame {frame_type} for unknown stream {stream_id}")
+                return
+            
+            if frame_type == FrameType.DATA:
+                stream._on_data(flags, payload)
+            elif frame_type == FrameType.WINDOW:
+                stream._on_window(struct.unpack('!I', payload)[0])
+            elif frame_type == FrameType.CLOSE:
+                stream._on_close()
+    
+    async def close(self, error: Optional[Exception] = None):
+        """关闭多路复用器，中止所有流"""
+        if self.closed:
+            return
+        
+        self._fail(error or ConnectionError("Connection is closed"))
+        
+        for task in (self._writer_task, self._dispatch_task):
+            if task is asyncio.current_task():
+                # 消息回调中关闭连接，分发任务读到结束标记后自行退出
+                continue
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+    
+    def _enqueue(
+        self,
+        priority: int,
+        frame_type: FrameType,
+        flags: int,
+        stream_id: int,
+        parts,
+        wait: bool = False
+    ) -> Optional[asyncio.Future]:
+        """
+        将一帧放入对应优先级的发送队列
+        
+        Returns:
+            wait=True 时返回帧写出后完成的 Future
+        """
+        if self.closed:
+            raise ConnectionError("Connection is closed")
+        
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._queues[priority].append((frame_type, flags, stream_id, parts, future))
+        self._ready.set()
+        return future
+    
+    def _next_frame(self):
+        """取出优先级最高的一帧"""
+        for queue in self._queues:
+            if queue:
+                return queue.popleft()
+        return None
+    
+    async def _write_loop(self):
+        """写循环（单写者，按优先级调度）"""
+        future = None
+        try:
+            while True:
+                future = None
+                frame = self._next_frame()
+                
+                if frame is None:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                
+                frame_type, flags, stream_id, parts, future = frame
+                size = sum(len(part) for part in parts)
+                
+                self.writer.write(
+                    FRAME_HEADER.pack(size + FRAME_BODY_HEADER_SIZE, frame_type, flags, stream_id)
+                )
+                for part in parts:
+                    self.writer.write(part)
+                
+                self.frames_sent += 1
+                self.bytes_sent += size
+                
+                # 每帧之后让出，传输缓冲区超过水位时等待，
+                # 这样新到的高优先级帧最多排在一个数据帧之后
+                await self.writer.drain()
+                
+                if future and not future.done():
+                    future.set_result(True)
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ P2P write error: {e}")
+            if future and not future.done():
+                future.set_exception(e)
+            self._fail(e)
+    
+    async def _dispatch_loop(self):
+        """按到达顺序把控制消息交给回调，处理完后归还额度"""
+        while True:
+            payload = await self._messages.get()
+            
+            if payload is None:
+                return
+            
+            try:
+                await self._message_handler(payload)
+            except Exception as e:
+                logger.error(f"❌ P2P message handler error: {e}")
+            
+            self._message_unacked += min(len(payload), self.window)
+            if self._message_unacked >= self.window // 2 and not self.closed:
+                self._enqueue(
+                    StreamPriority.HEARTBEAT,
+                    FrameType.WINDOW,
+                    0,
+                    0,
+                    (struct.pack('!I', self._message_unacked),)
+                )
+                self._message_unacked = 0
+    
+    def _fail(self, error: Exception):
+        """标记关闭并唤醒所有等待者"""
+        self.closed = True
+        self._message_credit_event.set()
+        
+        for queue in self._queues:
+            while queue:
+                future = queue.popleft()[4]
+                if future and not future.done():
+                    future.set_exception(error)
+        
+        for stream in list(self.streams.values()):
+            stream._abort(error)
+        self.streams.clear()
+        
+        self.incoming.put_nowait(None)
+        self._messages.put_nowait(None)
+
 # ============================================================================
 # P2P 连接器
 # ============================================================================
@@ -194,6 +756,22 @@ class P2PConnector:
         self.connections: Dict[str, P2PConnection] = {}
         self.server_task: Optional[asyncio.Task] = None
         self.heartbeat_task: Optional[asyncio.Task] = None
+        
+        # 业务回调
+        self.message_handlers: List[Callable[[str, Dict[str, Any]], Awaitable[None]]] = []
+        self.stream_handler: Optional[Callable[[str, MuxStream], Awaitable[None]]] = None
+    
+    def on_message(self, handler: Callable[[str, Dict[str, Any]], Awaitable[None]]):
+        """注册控制消息回调 handler(device_id, message)"""
+        self.message_handlers.append(handler)
+    
+    def on_stream(self, handler: Callable[[str, MuxStream], Awaitable[None]]):
+        """
+        注册对端打开流的回调 handler(device_id, stream)
+        
+        未注册时，对端打开的流通过 accept_stream() 获取。
+        """
+        self.stream_handler = handler
     
     async def start(self):
         """启动 P2P 连接器"""
@@ -217,8 +795,8 @@ class P2PConnector:
     
     async def stop(self):
         """停止 P2P 连接器"""
-        # 关闭所有连接
-        for conn in self.connections.values():
+        # 关闭所有连接（关闭时会从字典中移除）
+        for conn in list(self.connections.values()):
             await self._close_connection(conn)
         
         # 停止任务
@@ -280,11 +858,17 @@ class P2PConnector:
                     print(f"公网连接失败 ({peer.device_id}): {e}")
             
             if connected:
+                # 发送握手消息，对端回复声明支持多路复用后才按帧通信
+                await self._send_handshake(conn)
+                multiplex, early_message = await self._receive_handshake_reply(conn.reader)
+                if multiplex:
+                    self._attach_multiplexer(conn, initiator=True)
+                
                 conn.state = ConnectionState.CONNECTED
                 conn.last_heartbeat = time.time()
                 
-                # 发送握手消息
-                await self._send_handshake(conn)
+                if early_message is not None:
+                    await self._handle_data(conn, early_message)
                 
                 # 启动接收任务
                 asyncio.create_task(self._receive_loop(conn))
@@ -319,6 +903,11 @@ class P2PConnector:
             return False
         
         try:
+            if conn.mux:
+                # 控制消息优先于批量数据发送
+                await conn.mux.send_message(data)
+                return True
+            
             # 发送数据长度（4 字节）+ 数据
             conn.writer.write(struct.pack('!I', len(data)))
             conn.writer.write(data)
@@ -329,6 +918,76 @@ class P2PConnector:
             await self._close_connection(conn)
             return False
     
+    def open_stream(
+        self,
+        device_id: str,
+        priority: StreamPriority = StreamPriority.BULK,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[MuxStream]:
+        """
+        在到对等节点的连接上打开一个流
+        
+        例如与 ResumableTransferManager 配合传输文件：
+        
+            stream = connector.open_stream(device_id, metadata={"session_id": sid})
+            await manager.send_file(sid, stream.send_chunk)
+            await stream.close()
+        
+        Args:
+            device_id: 设备 ID
+            priority: 流数据的发送优先级
+            metadata: 随流发送给对端的元数据
+        
+        Returns:
+            MuxStream，未连接或对端不支持多路复用时返回 None
+        """
+        conn = self.connections.get(device_id)
+        
+        if not conn or conn.state != ConnectionState.CONNECTED or not conn.mux:
+            return None
+        
+        return conn.mux.open_stream(priority, metadata)
+    
+    async def accept_stream(self, device_id: str, timeout: Optional[float] = None) -> Optional[MuxStream]:
+        """
+        等待对等节点打开的下一个流（未注册 on_stream 回调时使用）
+        
+        Args:
+            device_id: 设备 ID
+            timeout: 超时时间（秒）
+        
+        Returns:
+            MuxStream，连接不可用或超时返回 None
+        """
+        conn = self.connections.get(device_id)
+        
+        if not conn or not conn.mux:
+            return None
+        
+        try:
+            return await asyncio.wait_for(conn.mux.accept_stream(), timeout=timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+    
+    def _attach_multiplexer(self, conn: P2PConnection, initiator: bool):
+        """握手完成后为连接创建多路复用器"""
+        device_id = conn.peer.device_id
+        
+        async def handle_message(data: bytes):
+            await self._handle_data(conn, data)
+        
+        stream_handler = None
+        if self.stream_handler:
+            async def stream_handler(stream: MuxStream):
+                await self.stream_handler(device_id, stream)
+        
+        conn.mux = StreamMultiplexer(
+            conn.writer,
+            initiator=initiator,
+            message_handler=handle_message,
+            stream_handler=stream_handler
+        )
+    
     async def _run_server(self):
         """运行服务器（监听连接）"""
         try:
@@ -349,13 +1008,15 @@ class P2PConnector:
         """处理客户端连接"""
         try:
             # 接收握手消息
-            peer_info = await self._receive_handshake(reader)
+            handshake = await self._receive_handshake(reader)
             
-            if not peer_info:
+            if not handshake:
                 writer.close()
                 await writer.wait_closed()
                 return
             
+            peer_info, multiplex = handshake
+            
             # 创建连接
             conn = P2PConnection(
                 peer=peer_info,
@@ -367,6 +1028,12 @@ class P2PConnector:
             
             self.connections[peer_info.device_id] = conn
             
+            # 旧版对端不声明多路复用，继续使用长度前缀 + JSON；
+            # 新版对端需要收到回复的握手才会切换到多路复用帧
+            if multiplex:
+                await self._send_handshake(conn)
+                self._attach_multiplexer(conn, initiator=False)
+            
             print(f"接受来自 {peer_info.device_id} 的连接")
             
             # 启动接收任务
@@ -386,7 +1053,8 @@ class P2PConnector:
             "local_ip": self.local_device.local_ip,
             "local_port": self.local_device.local_port,
             "public_ip": self.local_device.public_ip,
-            "public_port": self.local_device.public_port
+            "public_port": self.local_device.public_port,
+            "multiplex": P2PConfig.MULTIPLEX_VERSION
         }
         
         data = json.dumps(handshake).encode('utf-8')
@@ -394,21 +1062,25 @@ class P2PConnector:
         conn.writer.write(data)
         await conn.writer.drain()
     
-    async def _receive_handshake(self, reader: asyncio.StreamReader) -> Optional[PeerInfo]:
-        """接收握手消息"""
+    async def _receive_handshake(self, reader: asyncio.StreamReader) -> Optional[Tuple[PeerInfo, bool]]:
+        """接收握手消息，返回 (对端信息, 是否支持多路复用)"""
         try:
             # 读取长度
-            length_data = await asyncio.wait_for(reader.readexactly(4), timeout=5)
+            length_data = await asyncio.wait_for(
+                reader.readexactly(4), timeout=P2PConfig.HANDSHAKE_TIMEOUT
+            )
             length = struct.unpack('!I', length_data)[0]
             
             # 读取数据
-            data = await asyncio.wait_for(reader.readexactly(length), timeout=5)
+            data = await asyncio.wait_for(
+                reader.readexactly(length), timeout=P2PConfig.HANDSHAKE_TIMEOUT
+            )
             handshake = json.loads(data.decode('utf-8'))
             
             if handshake.get("type") != "handshake":
                 return None
             
-            return PeerInfo(
+            peer_info = PeerInfo(
                 device_id=handshake["device_id"],
                 device_name=handshake["device_name"],
                 local_ip=handshake["local_ip"],
@@ -416,13 +1088,61 @@ class P2PConnector:
                 public_ip=handshake.get("public_ip"),
                 public_port=handshake.get("public_port")
             )
+            return peer_info, bool(handshake.get("multiplex"))
         except:
             return None
     
+    async def _receive_handshake_reply(self, reader: asyncio.StreamReader) -> Tuple[bool, Optional[bytes]]:
+        """
+        等待对端回复握手
+        
+        新版对端收到声明多路复用的握手后回复自己的握手；旧版对端不回复，
+        超时后按旧协议通信。
+        
+        Returns:
+            (对端是否支持多路复用, 旧版对端先发来的一条消息)
+        """
+        try:
+            # 数据不完整时 readexactly 不消费缓冲区，超时取消不会丢字节
+            length_data = await asyncio.wait_for(
+                reader.readexactly(4), timeout=P2PConfig.HANDSHAKE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            return False, None
+        
+        length = struct.unpack('!I', length_data)[0]
+        data = await asyncio.wait_for(
+            reader.readexactly(length), timeout=P2PConfig.HANDSHAKE_TIMEOUT
+        )
+        
+        try:
+            reply = json.loads(data.decode('utf-8'))
+        except ValueError:
+            return False, data
+        
+        if reply.get("type") != "handshake":
+            return False, data
+        
+        return bool(reply.get("multiplex")), None
+    
     async def _receive_loop(self, conn: P2PConnection):
         """接收循环"""
         try:
             while conn.state == ConnectionState.CONNECTED:
+                if conn.mux:
+                    # 读取帧头（长度 + 类型 + 标志 + 流 ID）
+                    header = await conn.reader.readexactly(FRAME_HEADER.size)
+                    length, frame_type, flags, stream_id = FRAME_HEADER.unpack(header)
+                    
+                    # 读取负载（数据帧为原始字节，不做 JSON 解析）
+                    payload = await conn.reader.readexactly(length - FRAME_BODY_HEADER_SIZE)
+                    
+                    # 任何帧都证明连接存活
+                    conn.last_heartbeat = time.time()
+                    
+                    await conn.mux.handle_frame(frame_type, flags, stream_id, payload)
+                    continue
+                
                 # 读取数据长度
                 length_data = await conn.reader.readexactly(4)
                 length = struct.unpack('!I', length_data)[0]
@@ -453,7 +1173,10 @@ class P2PConnector:
                 return
                 
             logger.info(f"📩 Received P2P message from {conn.peer.device_id}: {msg_type}")
-            # 触发业务逻辑回调（此处可扩展）
+            
+            # 触发业务逻辑回调
+            for handler in self.message_handlers:
+                await handler(conn.peer.device_id, message)
         except Exception as e:
             logger.error(f"❌ Error handling P2P data: {e}")
     
@@ -475,9 +1198,12 @@ class P2PConnector:
                         await self._close_connection(conn)
                         continue
                     
-                    # 发送心跳
+                    # 发送心跳（多路复用连接上以最高优先级插队，不被批量数据阻塞）
                     heartbeat = json.dumps({"type": "heartbeat", "timestamp": current_time}).encode('utf-8')
                     try:
+                        if conn.mux:
+                            conn.mux.send_heartbeat(heartbeat)
+                            continue
                         conn.writer.write(struct.pack('!I', len(heartbeat)))
                         conn.writer.write(heartbeat)
                         await conn.writer.drain()
@@ -491,13 +1217,19 @@ class P2PConnector:
     
     async def _close_connection(self, conn: P2PConnection):
         """关闭连接"""
+        conn.state = ConnectionState.DISCONNECTED
+        
+        if conn.mux:
+            await conn.mux.close()
+        
         if conn.writer:
             conn.writer.close()
-            await conn.writer.wait_closed()
-        
-        conn.state = ConnectionState.DISCONNECTED
+            try:
+                await conn.writer.wait_closed()
+            except Exception:
+                pass
         
-        if conn.peer.device_id in self.connections:
+        if self.connections.get(conn.peer.device_id) is conn:
             del self.connections[conn.peer.device_id]
 
 # ============================================================================
@@ -544,11 +1276,35 @@ async def example_usage():
     if success:
         # 发送数据
         print("\n设备 A 发送数据到设备 B...")
-        data = b"Hello from Device A!"
+        data = json.dumps({"type": "greeting", "text": "Hello from Device A!"}).encode('utf-8')
         await connector_a.send(device_b.device_id, data)
         
         # 等待接收
         await asyncio.sleep(1)
+        
+        # 在同一连接上传输批量数据，同时发送控制消息
+        print("\n设备 A 通过流发送 8 个 1MB 分块，期间发送控制消息...")
+        stream = connector_a.open_stream(device_b.device_id, metadata={"session_id": "demo"})
+        
+        async def send_chunks():
+            for index in range(8):
+                await stream.send_chunk(index, bytes(1024 * 1024))
+            await stream.close()
+        
+        async def receive_chunks():
+            incoming = await connector_b.accept_stream(device_a.device_id, timeout=5)
+            received = 0
+            while await incoming.read_chunk() is not None:
+                received += 1
+            await incoming.close()
+            print(f"设备 B 收到 {received} 个分块 (会话: {incoming.metadata['session_id']})")
+        
+        control = json.dumps({"type": "control", "action": "pause"}).encode('utf-8')
+        await asyncio.gather(
+            send_chunks(),
+            receive_chunks(),
+            connector_a.send(device_b.device_id, control)
+        )
     
     # 清理
     await connector_a.stop()
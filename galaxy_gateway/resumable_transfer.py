@@ -17,7 +17,11 @@ import os
 import asyncio
 import hashlib
 import json
+import mmap
+import struct
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, field
 from enum import Enum
@@ -33,6 +37,11 @@ class TransferConfig:
     MAX_RETRIES = 3           # 最大重试次数
     RETRY_DELAY = 1           # 重试延迟（秒）
     PROGRESS_INTERVAL = 1     # 进度更新间隔（秒）
+    WINDOW_SIZE = 8           # 同时在途的分块数
+    HASH_WORKERS = 4          # 读取/校验分块的线程数
+    CHECKPOINT_CHUNKS = 64    # 每传输 N 个分块保存一次会话
+    CHECKPOINT_INTERVAL = 2.0 # 或距上次保存超过 T 秒时保存一次会话
+    COMPACT_RECORDS = 4096    # 日志超过 N 条记录时压缩为位图快照
 
 # ============================================================================
 # 枚举
@@ -61,6 +70,31 @@ class ChunkInfo:
     transferred: bool = False
     retries: int = 0
 
+def _build_chunks(file_size: int, chunk_size: int) -> List[ChunkInfo]:
+    """按固定大小计算分块"""
+    chunks = []
+    offset = 0
+    index = 0
+    
+    while offset < file_size:
+        size = min(chunk_size, file_size - offset)
+        chunks.append(ChunkInfo(
+            index=index,
+            offset=offset,
+            size=size
+        ))
+        offset += size
+        index += 1
+    
+    return chunks
+
+def _popcount(bitmap: bytearray) -> int:
+    """统计位图中置位的个数"""
+    value = int.from_bytes(bitmap, "little")
+    if hasattr(value, "bit_count"):
+        return value.bit_count()
+    return bin(value).count("1")
+
 @dataclass
 class TransferSession:
     """传输会话"""
@@ -75,16 +109,71 @@ class TransferSession:
     start_time: float = 0
     end_time: float = 0
     error: Optional[str] = None
+    bitmap: bytearray = field(default_factory=bytearray, repr=False)
+    
+    def _ensure_bitmap(self):
+        """分块列表变化后按 transferred 标志重建位图"""
+        if len(self.bitmap) == (len(self.chunks) + 7) // 8:
+            return
+        self.bitmap = bytearray((len(self.chunks) + 7) // 8)
+        for chunk in self.chunks:
+            if chunk.transferred:
+                self.bitmap[chunk.index >> 3] |= 1 << (chunk.index & 7)
+    
+    def mark_transferred(self, index: int, checksum: Optional[str] = None) -> bool:
+        """
+        标记分块已传输
+        
+        Returns:
+            bool: 是否为首次标记（重复写入同一分块不重复计数）
+        """
+        self._ensure_bitmap()
+        chunk = self.chunks[index]
+        if checksum is not None:
+            chunk.checksum = checksum
+        
+        mask = 1 << (index & 7)
+        if self.bitmap[index >> 3] & mask:
+            return False
+        
+        self.bitmap[index >> 3] |= mask
+        chunk.transferred = True
+        self.transferred_bytes += chunk.size
+        return True
+    
+    @property
+    def completed_chunks(self) -> int:
+        """已传输的分块数（位图 popcount）"""
+        self._ensure_bitmap()
+        return _popcount(self.bitmap)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典（用于保存/恢复）"""
-        return {
+    @property
+    def is_complete(self) -> bool:
+        """是否所有分块都已传输"""
+        return self.completed_chunks == len(self.chunks)
+    
+    def to_dict(self, include_chunks: bool = True) -> Dict[str, Any]:
+        """
+        转换为字典（用于保存/恢复）
+        
+        Args:
+            include_chunks: 是否包含分块列表；会话日志存储分块状态时只保存头部
+        """
+        data = {
             "session_id": self.session_id,
             "file_path": self.file_path,
             "file_size": self.file_size,
             "file_checksum": self.file_checksum,
             "chunk_size": self.chunk_size,
-            "chunks": [
+            "state": self.state.value,
+            "transferred_bytes": self.transferred_bytes,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "error": self.error
+        }
+        
+        if include_chunks:
+            data["chunks"] = [
                 {
                     "index": c.index,
                     "offset": c.offset,
@@ -94,17 +183,13 @@ class TransferSession:
                     "retries": c.retries
                 }
                 for c in self.chunks
-            ],
-            "state": self.state.value,
-            "transferred_bytes": self.transferred_bytes,
-            "start_time": self.start_time,
-            "end_time": self.end_time,
-            "error": self.error
-        }
+            ]
+        
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TransferSession':
-        """从字典创建"""
+        """从字典创建（不含分块列表时按文件大小重新计算分块）"""
         session = cls(
             session_id=data["session_id"],
             file_path=data["file_path"],
@@ -118,6 +203,10 @@ class TransferSession:
             error=data.get("error")
         )
         
+        if "chunks" not in data:
+            session.chunks = _build_chunks(session.file_size, session.chunk_size)
+            return session
+        
         session.chunks = [
             ChunkInfo(
                 index=c["index"],
@@ -132,6 +221,210 @@ class TransferSession:
         
         return session
 
+# ============================================================================
+# 会话日志
+# ============================================================================
+
+class TransferJournal:
+    """
+    会话日志（仅追加）
+    
+    分块状态不再随会话 JSON 整体重写，而是保存在两个二进制文件中：
+    - {session_id}.journal: 预写日志，每个完成的分块追加一条定长记录
+      （分块索引、重试次数、SHA-256 摘要）
+    - {session_id}.chunks: 压缩快照，已完成分块的位图加全部分块摘要
+    
+    日志超过 COMPACT_RECORDS 条时写入新快照并清空日志。加载时先读快照，
+    再重放日志；崩溃留下的不完整尾记录会被忽略。
+    """
+    
+    RECORD = struct.Struct("<IH32s")
+    SNAPSHOT_HEADER = struct.Struct("<4sHI")
+    SNAPSHOT_MAGIC = b"UFOJ"
+    SNAPSHOT_VERSION = 1
+    EMPTY_DIGEST = bytes(32)
+    
+    def __init__(self, state_dir: str, session_id: str, config: TransferConfig):
+        self.journal_file = os.path.join(state_dir, f"{session_id}.journal")
+        self.snapshot_file = os.path.join(state_dir, f"{session_id}.chunks")
+        self.config = config
+        self._file = None
+        self._records = 0
+        self._unsynced = 0
+        self._last_sync = time.time()
+    
+    # ========================================================================
+    # 写入
+    # ========================================================================
+    
+    def append(self, chunk: ChunkInfo):
+        """追加一条分块完成记录（写入操作系统缓冲区，不立即 fsync）"""
+        if self._file is None:
+            self._file = open(self.journal_file, 'ab')
+        
+        digest = bytes.fromhex(chunk.checksum) if chunk.checksum else self.EMPTY_DIGEST
+        self._file.write(self.RECORD.pack(chunk.index, min(chunk.retries, 0xFFFF), digest))
+        self._file.flush()
+        self._records += 1
+        self._unsynced += 1
+    
+    def checkpoint(self, session: TransferSession, force: bool = False) -> bool:
+        """
+        每 CHECKPOINT_CHUNKS 条记录或每 CHECKPOINT_INTERVAL 秒将日志落盘，
+        日志过长时压缩为快照
+        
+        Returns:
+            bool: 是否执行了落盘
+        """
+        now = time.time()
+        if not force and self._unsynced < self.config.CHECKPOINT_CHUNKS \
+                and now - self._last_sync < self.config.CHECKPOINT_INTERVAL:
+            return False
+        
+        if self._records >= self.config.COMPACT_RECORDS:
+            self.compact(session)
+        elif self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        
+        self._unsynced = 0
+        self._last_sync = now
+        return True
+    
+    def compact(self, session: TransferSession):
+        """写入位图快照并清空日志"""
+        session._ensure_bitmap()
+        digests = b"".join(
+            bytes.fromhex(c.checksum) if c.checksum else self.EMPTY_DIGEST
+            for c in session.chunks
+        )
+        temp_file = self.snapshot_file + ".tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(self.SNAPSHOT_HEADER.pack(
+                self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION, len(session.chunks)
+            ))
+            f.write(session.bitmap)
+            f.write(digests)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.snapshot_file)
+        
+        # 快照落盘后日志中的记录都已包含在快照里
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_file, 'wb')
+        self._records = 0
+        self._unsynced = 0
+    
+    def reset(self):
+        """清空日志和快照（新建会话时）"""
+        self.close()
+        for path in (self.journal_file, self.snapshot_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self._records = 0
+        self._unsynced = 0
+    
+    def close(self):
+        """关闭日志文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    # ========================================================================
+    # 重放
+    # ========================================================================
+    
+    def replay(self, session: TransferSession):
+        """从快照和日志恢复分块状态"""
+        for chunk in session.chunks:
+            chunk.transferred = False
+        session.bitmap = bytearray()
+        session.transferred_bytes = 0
+        session._ensure_bitmap()
+        
+        if os.path.exists(self.snapshot_file):
+            self._load_snapshot(session)
+        
+        if os.path.exists(self.journal_file):
+            record_size = self.RECORD.size
+            with open(self.journal_file, 'rb') as f:
+                data = f.read()
+            
+            usable = len(data) - len(data) % record_size
+            for index, retries, digest in self.RECORD.iter_unpack(data[:usable]):
+                if index >= len(session.chunks):
+                    continue
+                session.chunks[index].retries = retries
+                checksum = digest.hex() if digest != self.EMPTY_DIGEST else None
+                session.mark_transferred(index, checksum)
+            self._records = usable // record_size
+            
+            # 截掉崩溃时写了一半的尾记录，后续追加保持对齐
+            if usable != len(data):
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(usable)
+    
+    def _load_snapshot(self, session: TransferSession):
+        """读取位图快照"""
+        with open(self.snapshot_file, 'rb') as f:
+            data = f.read()
+        
+        header_size = self.SNAPSHOT_HEADER.size
+        magic, version, chunk_count = self.SNAPSHOT_HEADER.unpack_from(data)
+        if magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION:
+            raise ValueError(f"Invalid transfer snapshot: {self.snapshot_file}")
+        if chunk_count != len(session.chunks):
+            raise ValueError(
+                f"Snapshot chunk count mismatch: expected {len(session.chunks)}, got {chunk_count}"
+            )
+        
+        bitmap_size = (chunk_count + 7) // 8
+        bitmap = data[header_size:header_size + bitmap_size]
+        digest_offset = header_size + bitmap_size
+        for chunk in session.chunks:
+            digest = data[digest_offset + chunk.index * 32:digest_offset + (chunk.index + 1) * 32]
+            if digest != self.EMPTY_DIGEST:
+                chunk.checksum = digest.hex()
+            if bitmap[chunk.index >> 3] & (1 << (chunk.index & 7)):
+                session.mark_transferred(chunk.index)
+
+# ============================================================================
+# 分块读取
+# ============================================================================
+
+class ChunkReader:
+    """
+    分块读取器
+
+    整个传输过程只打开一次文件并做只读内存映射，各线程可并发按偏移读取；
+    无法映射时（空文件、不支持 mmap 的文件系统）退化为加锁的 seek + read。
+    """
+
+    def __init__(self, file_path: str):
+        self._file = open(file_path, 'rb')
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._mmap = None
+
+    def read(self, offset: int, size: int) -> bytes:
+        """读取指定偏移的数据"""
+        if self._mmap is not None:
+            return self._mmap[offset:offset + size]
+
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def close(self):
+        """关闭映射和文件句柄"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
 # ============================================================================
 # 断点续传管理器
 # ============================================================================
@@ -143,6 +436,8 @@ class ResumableTransferManager:
         self.state_dir = state_dir
         self.sessions: Dict[str, TransferSession] = {}
         self.config = TransferConfig()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._journals: Dict[str, TransferJournal] = {}
         
         # 确保状态目录存在
         os.makedirs(state_dir, exist_ok=True)
@@ -176,19 +471,7 @@ class ResumableTransferManager:
         chunk_size = chunk_size or self.config.CHUNK_SIZE
         
         # 计算分块
-        chunks = []
-        offset = 0
-        index = 0
-        
-        while offset < file_size:
-            size = min(chunk_size, file_size - offset)
-            chunks.append(ChunkInfo(
-                index=index,
-                offset=offset,
-                size=size
-            ))
-            offset += size
-            index += 1
+        chunks = _build_chunks(file_size, chunk_size)
         
         session = TransferSession(
             session_id=session_id,
@@ -200,6 +483,7 @@ class ResumableTransferManager:
         )
         
         self.sessions[session_id] = session
+        self._get_journal(session_id).reset()
         self._save_session(session)
         
         return session
@@ -226,22 +510,62 @@ class ResumableTransferManager:
             data = json.load(f)
         
         session = TransferSession.from_dict(data)
+        
+        # 旧格式的会话文件自带分块列表，新格式从日志重放
+        journal = self._get_journal(session_id)
+        if "chunks" not in data:
+            journal.replay(session)
+        else:
+            # 迁移到快照；之后头部按新格式保存，不再包含分块列表
+            journal.compact(session)
+        
         self.sessions[session_id] = session
         
         return session
     
     def _save_session(self, session: TransferSession):
-        """保存会话状态"""
+        """
+        保存会话头部（紧凑 JSON，先写临时文件再原子替换）
+        
+        分块状态由会话日志保存，这里只在状态变化时写入少量字段，并把日志落盘。
+        """
         state_file = os.path.join(self.state_dir, f"{session.session_id}.json")
+        temp_file = state_file + ".tmp"
         
-        with open(state_file, 'w') as f:
-            json.dump(session.to_dict(), f, indent=2)
+        with open(temp_file, 'w') as f:
+            json.dump(session.to_dict(include_chunks=False), f, separators=(',', ':'))
+        os.replace(temp_file, state_file)
+        
+        self._get_journal(session.session_id).checkpoint(session, force=True)
+    
+    def _get_journal(self, session_id: str) -> TransferJournal:
+        """获取会话日志"""
+        journal = self._journals.get(session_id)
+        if journal is None:
+            journal = TransferJournal(self.state_dir, session_id, self.config)
+            self._journals[session_id] = journal
+        return journal
+    
+    def _record_chunk(self, session: TransferSession, chunk: ChunkInfo) -> bool:
+        """
+        记录分块完成：更新位图并追加日志记录
+        
+        Returns:
+            bool: 是否为首次完成
+        """
+        if not session.mark_transferred(chunk.index, chunk.checksum):
+            return False
+        self._get_journal(session.session_id).append(chunk)
+        return True
     
     def delete_session(self, session_id: str):
         """删除会话"""
         if session_id in self.sessions:
             del self.sessions[session_id]
         
+        self._get_journal(session_id).reset()
+        self._journals.pop(session_id, None)
+        
         state_file = os.path.join(self.state_dir, f"{session_id}.json")
         if os.path.exists(state_file):
             os.remove(state_file)
@@ -254,15 +578,24 @@ class ResumableTransferManager:
         self,
         session_id: str,
         send_chunk_callback: Callable[[int, bytes], asyncio.Future],
-        progress_callback: Callable[[float, float], None] = None
+        progress_callback: Callable[[float, float], None] = None,
+        window_size: int = None
     ) -> bool:
         """
         发送文件（支持断点续传）
         
+        以滑动窗口方式发送：最多 window_size 个分块同时在途，分块通过同一个
+        内存映射读取并在线程池中计算校验和；每个完成的分块
+        追加一条日志记录，日志每 CHECKPOINT_CHUNKS 个分块或每 CHECKPOINT_INTERVAL
+        秒落盘一次。中断后恢复时，最后一次落盘之后已发送的分块可能被重发，
+        接收端按索引写入，重发是幂等的。
+        
         Args:
             session_id: 会话 ID
-            send_chunk_callback: 发送分块的回调函数 (chunk_index, chunk_data) -> Future
+            send_chunk_callback: 发送分块的回调函数 (chunk_index, chunk_data) -> Future，
+                可能被并发调用
             progress_callback: 进度回调函数 (progress, speed) -> None
+            window_size: 同时在途的分块数（可选，1 表示逐块发送）
         
         Returns:
             bool: 是否成功
@@ -276,49 +609,82 @@ class ResumableTransferManager:
         session.start_time = time.time()
         self._save_session(session)
         
-        try:
-            last_progress_time = time.time()
-            last_transferred_bytes = session.transferred_bytes
+        window_size = max(1, window_size or self.config.WINDOW_SIZE)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        reader = ChunkReader(session.file_path)
+        in_flight = set()
+        
+        journal = self._get_journal(session_id)
+        last_progress_time = time.time()
+        last_transferred_bytes = session.transferred_bytes
+        
+        async def transfer(chunk: ChunkInfo) -> ChunkInfo:
+            # 读取分块并计算校验和（线程池）
+            chunk_data = await loop.run_in_executor(
+                executor, self._load_chunk, reader, chunk
+            )
             
+            # 发送分块（带重试）
+            for retry in range(self.config.MAX_RETRIES):
+                try:
+                    await send_chunk_callback(chunk.index, chunk_data)
+                    return chunk
+                except Exception as e:
+                    chunk.retries += 1
+                    if retry < self.config.MAX_RETRIES - 1:
+                        await asyncio.sleep(self.config.RETRY_DELAY)
+                    else:
+                        raise e
+            
+            raise Exception(f"Failed to send chunk {chunk.index}")
+        
+        def collect(done) -> None:
+            nonlocal last_progress_time, last_transferred_bytes
+            
+            error = None
+            for task in done:
+                if task.exception() is not None:
+                    error = error or task.exception()
+                    continue
+                # 更新状态
+                self._record_chunk(session, task.result())
+            
+            if error is not None:
+                raise error
+            
+            # 批量落盘
+            journal.checkpoint(session)
+            
+            # 更新进度
+            current_time = time.time()
+            if progress_callback and current_time - last_progress_time >= self.config.PROGRESS_INTERVAL:
+                progress = session.transferred_bytes / session.file_size
+                speed = (session.transferred_bytes - last_transferred_bytes) / (current_time - last_progress_time)
+                progress_callback(progress, speed)
+                
+                last_progress_time = current_time
+                last_transferred_bytes = session.transferred_bytes
+        
+        try:
             for chunk in session.chunks:
                 # 跳过已传输的分块
                 if chunk.transferred:
                     continue
                 
-                # 读取分块数据
-                chunk_data = await self._read_chunk(session.file_path, chunk)
-                
-                # 发送分块（带重试）
-                success = False
-                for retry in range(self.config.MAX_RETRIES):
-                    try:
-                        await send_chunk_callback(chunk.index, chunk_data)
-                        success = True
-                        break
-                    except Exception as e:
-                        chunk.retries += 1
-                        if retry < self.config.MAX_RETRIES - 1:
-                            await asyncio.sleep(self.config.RETRY_DELAY)
-                        else:
-                            raise e
+                if len(in_flight) >= window_size:
+                    done, in_flight = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    collect(done)
                 
-                if not success:
-                    raise Exception(f"Failed to send chunk {chunk.index}")
-                
-                # 更新状态
-                chunk.transferred = True
-                session.transferred_bytes += chunk.size
-                self._save_session(session)
-                
-                # 更新进度
-                current_time = time.time()
-                if progress_callback and current_time - last_progress_time >= self.config.PROGRESS_INTERVAL:
-                    progress = session.transferred_bytes / session.file_size
-                    speed = (session.transferred_bytes - last_transferred_bytes) / (current_time - last_progress_time)
-                    progress_callback(progress, speed)
-                    
-                    last_progress_time = current_time
-                    last_transferred_bytes = session.transferred_bytes
+                in_flight.add(asyncio.create_task(transfer(chunk)))
+            
+            while in_flight:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                collect(done)
             
             # 完成
             session.state = TransferState.COMPLETED
@@ -328,22 +694,48 @@ class ResumableTransferManager:
             return True
         
         except Exception as e:
+            # 取消仍在途的分块；取消前已发送完成的分块记入会话，恢复时不再重发
+            for task in in_flight:
+                task.cancel()
+            for result in await asyncio.gather(*in_flight, return_exceptions=True):
+                if isinstance(result, ChunkInfo):
+                    self._record_chunk(session, result)
+            
             session.state = TransferState.FAILED
             session.error = str(e)
             self._save_session(session)
             return False
-    
-    async def _read_chunk(self, file_path: str, chunk: ChunkInfo) -> bytes:
-        """读取分块数据"""
-        with open(file_path, 'rb') as f:
-            f.seek(chunk.offset)
-            data = f.read(chunk.size)
         
-        # 计算校验和
+        finally:
+            reader.close()
+    
+    def _load_chunk(self, reader: ChunkReader, chunk: ChunkInfo) -> bytes:
+        """读取分块数据并计算校验和（在线程池中执行）"""
+        data = reader.read(chunk.offset, chunk.size)
         chunk.checksum = self._calculate_checksum(data)
-        
         return data
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取读取/校验线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.HASH_WORKERS,
+                thread_name_prefix="transfer-hash"
+            )
+        return self._executor
+    
+    def close(self):
+        """关闭线程池，并将所有会话日志落盘"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        
+        for session_id, journal in self._journals.items():
+            session = self.sessions.get(session_id)
+            if session is not None:
+                journal.checkpoint(session, force=True)
+            journal.close()
+    
     # ========================================================================
     # 接收端
     # ========================================================================
@@ -384,19 +776,7 @@ class ResumableTransferManager:
                 f.truncate(file_size)
             
             # 计算分块
-            chunks = []
-            offset = 0
-            index = 0
-            
-            while offset < file_size:
-                size = min(chunk_size, file_size - offset)
-                chunks.append(ChunkInfo(
-                    index=index,
-                    offset=offset,
-                    size=size
-                ))
-                offset += size
-                index += 1
+            chunks = _build_chunks(file_size, chunk_size)
             
             session = TransferSession(
                 session_id=session_id,
@@ -410,6 +790,7 @@ class ResumableTransferManager:
             )
             
             self.sessions[session_id] = session
+            self._get_journal(session_id).reset()
             self._save_session(session)
         
         return session
@@ -450,13 +831,12 @@ class ResumableTransferManager:
             f.seek(chunk.offset)
             f.write(chunk_data)
         
-        # 更新状态
-        chunk.transferred = True
+        # 更新状态（重复写入同一分块不重复计数）
         chunk.checksum = self._calculate_checksum(chunk_data)
-        session.transferred_bytes += chunk.size
+        self._record_chunk(session, chunk)
         
-        # 检查是否完成
-        if all(c.transferred for c in session.chunks):
+        # 检查是否完成（位图 popcount）
+        if session.is_complete:
             # 验证文件校验和
             actual_checksum = self._calculate_file_checksum(session.file_path)
             if actual_checksum == session.file_checksum:
@@ -465,8 +845,9 @@ class ResumableTransferManager:
             else:
                 session.state = TransferState.FAILED
                 session.error = f"Checksum mismatch: expected {session.file_checksum}, got {actual_checksum}"
-        
-        self._save_session(session)
+            self._save_session(session)
+        else:
+            self._get_journal(session_id).checkpoint(session)
         
         return True
     
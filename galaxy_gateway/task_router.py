@@ -14,13 +14,31 @@ UFO³ Galaxy - 任务路由和调度模块
 """
 
 import asyncio
+import heapq
 import json
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+import os
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 from datetime import datetime
 import aiohttp
 
+# ============================================================================
+# 配置
+# ============================================================================
+
+def _env_concurrency_limit(name: str) -> Optional[int]:
+    """读取并发上限环境变量，未设置、空或 <= 0 表示不限"""
+    value = os.getenv(name, "").strip()
+    if not value:
+        return None
+    limit = int(value)
+    return limit if limit > 0 else None
+
+# 每设备并发上限（例如设备端 UI 自动化只能串行时设为 1）
+TASK_MAX_CONCURRENT_PER_DEVICE = _env_concurrency_limit("TASK_MAX_CONCURRENT_PER_DEVICE")
+
 # ============================================================================
 # 数据结构定义
 # ============================================================================
@@ -52,18 +70,39 @@ class ExecutionPlan:
     plan_id: str
     tasks: List[Any]  # Task 对象列表
     execution_order: List[List[str]]  # 执行顺序（分层，每层可并行）
-    estimated_duration: float  # 预计总时间（秒）
+    estimated_duration: float  # 预计总时间（秒），按列表调度模拟得出
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)  # 生效的依赖（已剔除未知与成环的依赖）
+    priorities: Dict[str, float] = field(default_factory=dict)  # 剩余关键路径长度（秒），越大越先执行
+    critical_path: List[str] = field(default_factory=list)  # 关键路径上的任务 ID
+    estimated_start: Dict[str, float] = field(default_factory=dict)  # 模拟的开始时间（秒）
+    max_concurrent_per_device: Optional[int] = None  # 每设备并发上限（None 表示不限）
 
 # ============================================================================
 # 任务调度器
 # ============================================================================
 
 class TaskScheduler:
-    """任务调度器 - 管理任务执行顺序和依赖"""
+    """
+    任务调度器 - 管理任务执行顺序和依赖
     
-    def __init__(self):
-        """初始化组件"""
+    采用关键路径列表调度：任务的依赖全部完成后即可开始，
+    就绪任务按剩余关键路径长度（自身及后继链上 estimated_duration 之和的最大值）
+    从大到小分派，同时每个设备的并发任务数不超过上限。
+    """
+    
+    # 每设备默认并发上限：默认不限，与引入上限之前的行为一致；
+    # 可通过 TASK_MAX_CONCURRENT_PER_DEVICE 环境变量或构造参数设置
+    DEFAULT_MAX_CONCURRENT_PER_DEVICE = TASK_MAX_CONCURRENT_PER_DEVICE
+    
+    def __init__(self, max_concurrent_per_device: Optional[int] = DEFAULT_MAX_CONCURRENT_PER_DEVICE):
+        """
+        初始化组件
+        
+        Args:
+            max_concurrent_per_device: 每设备并发上限（None 表示不限）
+        """
         self.initialized_at = datetime.now()
+        self.max_concurrent_per_device = max_concurrent_per_device
     
     def create_execution_plan(self, tasks: List[Any]) -> ExecutionPlan:
         """
@@ -75,48 +114,229 @@ class TaskScheduler:
         Returns:
             执行计划
         """
-        # 构建依赖图
         task_map = {task.task_id: task for task in tasks}
         
-        # 拓扑排序，分层执行
-        execution_order = []
-        executed = set()
+        # 构建依赖图（未知的依赖不阻塞执行）
+        dependencies: Dict[str, List[str]] = {}
+        for task in tasks:
+            deps = []
+            for dep_id in dict.fromkeys(task.depends_on):
+                if dep_id in task_map and dep_id != task.task_id:
+                    deps.append(dep_id)
+                else:
+                    print(f"Warning: Task {task.task_id} depends on missing task {dep_id}, ignored")
+            dependencies[task.task_id] = deps
+        
+        # 拓扑排序（Kahn 算法，O(V+E)）
+        order = self._topological_order(tasks, dependencies)
+        
+        if len(order) < len(task_map):
+            # 检测到循环依赖：环上（及其下游）的任务忽略彼此之间的依赖，强制执行
+            print("Warning: Circular dependency detected!")
+            resolved = set(order)
+            forced = [task.task_id for task in tasks if task.task_id not in resolved]
+            for task_id in forced:
+                dependencies[task_id] = [dep_id for dep_id in dependencies[task_id] if dep_id in resolved]
+            order.extend(self._topological_order([task_map[task_id] for task_id in forced], dependencies))
+        
+        # 分层（层号 = 最长依赖链上的任务数），层内保持原始顺序
+        layer_of: Dict[str, int] = {}
+        for task_id in order:
+            layer_of[task_id] = max((layer_of[dep_id] + 1 for dep_id in dependencies[task_id]), default=0)
+        
+        execution_order: List[List[str]] = [[] for _ in range(max(layer_of.values(), default=-1) + 1)]
+        for task_id in task_map:
+            execution_order[layer_of[task_id]].append(task_id)
+        
+        # 剩余关键路径长度：逆拓扑序累加
+        successors = self.build_successors(order, dependencies)
+        priorities: Dict[str, float] = {}
+        for task_id in reversed(order):
+            priorities[task_id] = self._duration(task_map[task_id]) + max(
+                (priorities[succ_id] for succ_id in successors[task_id]), default=0.0
+            )
         
-        while len(executed) < len(tasks):
-            # 找出当前可以执行的任务（依赖都已完成）
-            current_layer = []
-            
-            for task in tasks:
-                if task.task_id in executed:
-                    continue
-                
-                # 检查依赖是否都已执行
-                dependencies_met = all(dep_id in executed for dep_id in task.depends_on)
-                
-                if dependencies_met:
-                    current_layer.append(task.task_id)
-            
-            if not current_layer:
-                # 检测到循环依赖
-                print("Warning: Circular dependency detected!")
-                # 强制执行剩余任务
-                current_layer = [task.task_id for task in tasks if task.task_id not in executed]
-            
-            execution_order.append(current_layer)
-            executed.update(current_layer)
+        # 关键路径：从优先级最高的入口任务开始，沿优先级最高的后继前进
+        critical_path: List[str] = []
+        entries = [task_id for task_id in order if not dependencies[task_id]]
+        current = max(entries, key=lambda task_id: priorities[task_id], default=None)
+        while current is not None:
+            critical_path.append(current)
+            current = max(successors[current], key=lambda task_id: priorities[task_id], default=None)
         
-        # 计算预计总时间
-        estimated_duration = sum(
-            max(task_map[task_id].estimated_duration for task_id in layer)
-            for layer in execution_order
-        )
+        # 模拟列表调度，估算每个任务的开始时间与总时间
+        estimated_start, estimated_duration = self._simulate(task_map, order, dependencies, successors, priorities)
         
         return ExecutionPlan(
             plan_id=f"plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
             tasks=tasks,
             execution_order=execution_order,
-            estimated_duration=estimated_duration
+            estimated_duration=estimated_duration,
+            dependencies=dependencies,
+            priorities=priorities,
+            critical_path=critical_path,
+            estimated_start=estimated_start,
+            max_concurrent_per_device=self.max_concurrent_per_device
         )
+    
+    def device_has_capacity(self, running: Dict[str, int], device_id: str) -> bool:
+        """
+        检查设备是否还能再启动一个任务
+        
+        Args:
+            running: 各设备正在执行的任务数
+            device_id: 设备 ID
+        
+        Returns:
+            是否未达到并发上限
+        """
+        if self.max_concurrent_per_device is None:
+            return True
+        return running.get(device_id, 0) < self.max_concurrent_per_device
+    
+    @staticmethod
+    def _duration(task: Any) -> float:
+        """任务的预计执行时间（秒）"""
+        return max(float(task.estimated_duration or 0.0), 0.0)
+    
+    @staticmethod
+    def _topological_order(tasks: List[Any], dependencies: Dict[str, List[str]]) -> List[str]:
+        """
+        Kahn 拓扑排序（只考虑 tasks 内部的依赖）
+        
+        Returns:
+            拓扑序的任务 ID（成环的任务不在其中）
+        """
+        task_ids = {task.task_id for task in tasks}
+        indegree = {task.task_id: 0 for task in tasks}
+        successors: Dict[str, List[str]] = {task.task_id: [] for task in tasks}
+        for task in tasks:
+            for dep_id in dependencies[task.task_id]:
+                if dep_id in task_ids:
+                    indegree[task.task_id] += 1
+                    successors[dep_id].append(task.task_id)
+        
+        queue = deque(task_id for task_id, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            task_id = queue.popleft()
+            order.append(task_id)
+            for succ_id in successors[task_id]:
+                indegree[succ_id] -= 1
+                if indegree[succ_id] == 0:
+                    queue.append(succ_id)
+        return order
+    
+    @staticmethod
+    def build_successors(order: List[str], dependencies: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """由依赖表构建后继表"""
+        successors: Dict[str, List[str]] = {task_id: [] for task_id in order}
+        for task_id in order:
+            for dep_id in dependencies[task_id]:
+                successors[dep_id].append(task_id)
+        return successors
+    
+    def _simulate(
+        self,
+        task_map: Dict[str, Any],
+        order: List[str],
+        dependencies: Dict[str, List[str]],
+        successors: Dict[str, List[str]],
+        priorities: Dict[str, float]
+    ) -> Tuple[Dict[str, float], float]:
+        """
+        按预计执行时间模拟事件驱动的列表调度
+        
+        Returns:
+            (各任务的开始时间, 总时间)
+        """
+        remaining = {task_id: len(dependencies[task_id]) for task_id in order}
+        ready = ReadyQueue(self, task_map, order, priorities)
+        for task_id in order:
+            if remaining[task_id] == 0:
+                ready.push(task_id)
+        
+        events: List[Tuple[float, int, str]] = []  # (结束时间, 序号, 任务 ID)
+        start_times: Dict[str, float] = {}
+        now = 0.0
+        
+        while True:
+            for task_id in ready.dispatch():
+                start_times[task_id] = now
+                heapq.heappush(events, (now + self._duration(task_map[task_id]), ready.rank[task_id], task_id))
+            
+            if not events:
+                break
+            
+            # 推进到下一个完成事件，并释放同一时刻完成的所有任务
+            now = events[0][0]
+            while events and events[0][0] == now:
+                _, _, task_id = heapq.heappop(events)
+                ready.release(task_id)
+                for succ_id in successors[task_id]:
+                    remaining[succ_id] -= 1
+                    if remaining[succ_id] == 0:
+                        ready.push(succ_id)
+        
+        return start_times, now
+
+class ReadyQueue:
+    """
+    就绪队列 - 每个设备一个按剩余关键路径长度排序的堆
+    
+    设备之间互不影响，因此只需在设备有空闲名额时弹出该设备优先级最高的任务。
+    """
+    
+    def __init__(self, scheduler: TaskScheduler, task_map: Dict[str, Any], order: List[str], priorities: Dict[str, float]):
+        """
+        初始化就绪队列
+        
+        Args:
+            scheduler: 任务调度器（提供并发上限）
+            task_map: 任务 ID 到任务的映射
+            order: 拓扑序（优先级相同时先出现者优先）
+            priorities: 剩余关键路径长度
+        """
+        self.scheduler = scheduler
+        self.task_map = task_map
+        self.priorities = priorities
+        self.rank = {task_id: index for index, task_id in enumerate(order)}
+        self.heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        self.running: Dict[str, int] = {}
+        self._dirty: set = set()  # 自上次分派后有新任务或空出名额的设备
+    
+    def push(self, task_id: str):
+        """任务的依赖已全部完成"""
+        device_id = self.task_map[task_id].device_id
+        heapq.heappush(
+            self.heaps.setdefault(device_id, []),
+            (-self.priorities[task_id], self.rank[task_id], task_id)
+        )
+        self._dirty.add(device_id)
+    
+    def release(self, task_id: str):
+        """任务执行结束，归还设备名额"""
+        device_id = self.task_map[task_id].device_id
+        self.running[device_id] -= 1
+        self._dirty.add(device_id)
+    
+    def dispatch(self) -> List[str]:
+        """
+        弹出所有现在可以开始的任务（并计入设备并发数）
+        
+        Returns:
+            按优先级从高到低排列的任务 ID
+        """
+        started = []
+        for device_id in self._dirty:
+            heap = self.heaps.get(device_id)
+            while heap and self.scheduler.device_has_capacity(self.running, device_id):
+                started.append(heapq.heappop(heap))
+                self.running[device_id] = self.running.get(device_id, 0) + 1
+        self._dirty.clear()
+        
+        started.sort()
+        return [task_id for _, _, task_id in started]
 
 # ============================================================================
 # 任务路由器
@@ -125,15 +345,20 @@ class TaskScheduler:
 class TaskRouter:
     """任务路由器 - 将任务发送到目标设备"""
     
-    def __init__(self, device_registry):
+    def __init__(
+        self,
+        device_registry,
+        max_concurrent_per_device: Optional[int] = TaskScheduler.DEFAULT_MAX_CONCURRENT_PER_DEVICE
+    ):
         """
         初始化任务路由器
         
         Args:
             device_registry: 设备注册表
+            max_concurrent_per_device: 每设备并发上限（None 表示不限）
         """
         self.device_registry = device_registry
-        self.scheduler = TaskScheduler()
+        self.scheduler = TaskScheduler(max_concurrent_per_device)
         self.active_tasks: Dict[str, TaskResult] = {}
     
     async def execute_tasks(self, tasks: List[Any]) -> List[TaskResult]:
@@ -156,28 +381,53 @@ class TaskRouter:
         print(f"  计划 ID: {plan.plan_id}")
         print(f"  任务总数: {len(plan.tasks)}")
         print(f"  执行层数: {len(plan.execution_order)}")
+        print(f"  关键路径: {' -> '.join(plan.critical_path)}")
         print(f"  预计时间: {plan.estimated_duration:.1f}秒")
         
-        # 按层执行任务
+        # 事件驱动执行：任务的依赖全部结束后立即分派，不等待整层完成
+        task_map = {task.task_id: task for task in tasks}
+        order = list(task_map)
+        successors = self.scheduler.build_successors(order, plan.dependencies)
+        remaining = {task_id: len(deps) for task_id, deps in plan.dependencies.items()}
+        
+        ready = ReadyQueue(self.scheduler, task_map, order, plan.priorities)
+        for task_id in order:
+            if remaining[task_id] == 0:
+                ready.push(task_id)
+        
         all_results = []
+        running: Dict[asyncio.Task, str] = {}
         
-        for layer_index, layer in enumerate(plan.execution_order):
-            print(f"\n执行第 {layer_index + 1} 层 ({len(layer)} 个任务):")
-            
-            # 并行执行当前层的所有任务
-            layer_tasks = [task for task in tasks if task.task_id in layer]
-            layer_results = await asyncio.gather(
-                *[self._execute_single_task(task) for task in layer_tasks],
-                return_exceptions=True
-            )
-            
-            # 处理结果
-            for result in layer_results:
-                if isinstance(result, Exception):
-                    print(f"  任务执行异常: {result}")
-                else:
-                    all_results.append(result)
-                    print(f"  任务 {result.task_id}: {result.status.value}")
+        try:
+            while True:
+                for task_id in ready.dispatch():
+                    print(f"  启动任务 {task_id} (设备 {task_map[task_id].device_id})")
+                    running[asyncio.create_task(self._execute_single_task(task_map[task_id]))] = task_id
+                
+                if not running:
+                    break
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                
+                for future in done:
+                    task_id = running.pop(future)
+                    ready.release(task_id)
+                    
+                    # 处理结果（依赖结束即视为满足，与成败无关）
+                    if future.exception() is not None:
+                        print(f"  任务执行异常: {future.exception()}")
+                    else:
+                        result = future.result()
+                        all_results.append(result)
+                        print(f"  任务 {result.task_id}: {result.status.value}")
+                    
+                    for succ_id in successors[task_id]:
+                        remaining[succ_id] -= 1
+                        if remaining[succ_id] == 0:
+                            ready.push(succ_id)
+        finally:
+            for future in running:
+                future.cancel()
         
         return all_results
     
@@ -6,7 +6,8 @@ UFO³ Galaxy Gateway v3.0 - 综合测试脚本
 2. 多模态传输
 3. P2P 通信
 4. 断点续传
-5. 完整的端到端流程
+5. 任务调度
+6. 完整的端到端流程
 
 作者：Manus AI
 日期：2026-01-22
@@ -15,14 +16,16 @@ UFO³ Galaxy Gateway v3.0 - 综合测试脚本
 
 import asyncio
 import json
+import struct
 import time
 from pathlib import Path
 
 # 导入测试模块
-from aip_protocol_v2 import MessageBuilder, DeviceInfo, MessageCodec
+from aip_protocol_v2 import MessageBuilder, DeviceInfo, MessageCodec, BinaryMessageCodec
 from multimodal_transfer import MultimodalTransferManager
-from p2p_connector import P2PConnector, PeerInfo
-from resumable_transfer import ResumableTransferManager
+from p2p_connector import P2PConnector, PeerInfo, P2PConfig
+from resumable_transfer import ResumableTransferManager, TransferConfig
+from task_router import TaskRouter, TaskScheduler, TaskResult, TaskStatus
 
 # ============================================================================
 # 测试结果
@@ -126,6 +129,37 @@ async def test_aip_protocol(results: TestResults):
         results.add_result("AIP: 消息验证", True)
     except Exception as e:
         results.add_result("AIP: 消息验证", False, str(e))
+    
+    # 测试 4: 二进制编解码与版本协商
+    try:
+        assert MessageCodec.for_version("2.0") is MessageCodec
+        assert MessageCodec.for_version(None) is MessageCodec
+        assert MessageCodec.for_version("2.1") is BinaryMessageCodec
+        
+        image_data = bytes(range(256)) * 64
+        image_msg = MessageBuilder.create_image_message(
+            from_device=phone_a,
+            to_device=pc,
+            image_data=image_data,
+            metadata={"width": 64, "height": 64},
+            raw=True
+        )
+        
+        header_frame, payload_frame = BinaryMessageCodec.encode_frames(image_msg)
+        assert payload_frame == image_data  # 负载不做 Base64
+        decoded = BinaryMessageCodec.decode_frames(header_frame, payload_frame)
+        assert decoded.to_dict() == image_msg.to_dict()
+        assert MessageCodec.validate(decoded)[0]
+        
+        # 通用解码入口识别二进制帧；老对端收到的 JSON 仍为 Base64
+        assert MessageCodec.decode(BinaryMessageCodec.encode(msg)).to_dict() == msg.to_dict()
+        legacy = MessageCodec.decode(MessageCodec.encode(image_msg))
+        assert isinstance(legacy.payload.data, str)
+        assert MessageCodec.validate(legacy)[0]
+        
+        results.add_result("AIP: 二进制编解码", True)
+    except Exception as e:
+        results.add_result("AIP: 二进制编解码", False, str(e))
 
 async def test_multimodal_transfer(results: TestResults):
     """测试多模态传输"""
@@ -281,6 +315,207 @@ async def test_p2p_connection(results: TestResults):
         results.add_result("P2P: 局域网连接", True)
     except Exception as e:
         results.add_result("P2P: 局域网连接", False, str(e))
+    
+    # 测试 3: 多路复用流（批量数据不阻塞控制消息）
+    try:
+        device_a = PeerInfo(
+            device_id="device_a",
+            device_name="设备A",
+            local_ip="127.0.0.1",
+            local_port=9003
+        )
+        
+        device_b = PeerInfo(
+            device_id="device_b",
+            device_name="设备B",
+            local_ip="127.0.0.1",
+            local_port=9004
+        )
+        
+        connector_a = P2PConnector(device_a)
+        connector_b = P2PConnector(device_b)
+        
+        events = []
+        
+        async def on_message(device_id, message):
+            events.append(("message", message["type"]))
+        
+        connector_b.on_message(on_message)
+        
+        await connector_a.start()
+        await connector_b.start()
+        await asyncio.sleep(0.5)
+        
+        assert await connector_a.connect(device_b)
+        
+        # 等待设备 B 处理完握手
+        for _ in range(100):
+            if "device_a" in connector_b.connections:
+                break
+            await asyncio.sleep(0.01)
+        
+        chunk_count = 8
+        chunk_size = 1024 * 1024
+        stream = connector_a.open_stream("device_b", metadata={"session_id": "s1"})
+        
+        async def send_chunks():
+            for index in range(chunk_count):
+                await stream.send_chunk(index, bytes([index]) * chunk_size)
+            await stream.close()
+        
+        async def receive_chunks():
+            incoming = await connector_b.accept_stream("device_a", timeout=5)
+            assert incoming.metadata == {"session_id": "s1"}
+            while True:
+                chunk = await incoming.read_chunk()
+                if chunk is None:
+                    break
+                index, data = chunk
+                assert len(data) == chunk_size and data[0] == index and data[-1] == index
+                events.append(("chunk", index))
+                # 慢消费者: 发送方在额度用完后等待
+                await asyncio.sleep(0.05)
+            await incoming.close()
+        
+        sender = asyncio.create_task(send_chunks())
+        receiver = asyncio.create_task(receive_chunks())
+        
+        # 等到批量数据占满窗口后再发送控制消息
+        for _ in range(500):
+            if ("chunk", 0) in events or receiver.done():
+                break
+            await asyncio.sleep(0.01)
+        control = json.dumps({"type": "control"}).encode('utf-8')
+        assert await connector_a.send("device_b", control)
+        
+        await asyncio.wait_for(asyncio.gather(sender, receiver), timeout=10)
+        
+        chunks = [index for kind, index in events if kind == "chunk"]
+        assert chunks == list(range(chunk_count))
+        # 控制消息没有排在剩余批量数据之后
+        assert events.index(("message", "control")) < events.index(("chunk", chunk_count // 2))
+        # 发送方受额度限制，在途数据不超过窗口
+        assert stream.send_credit <= P2PConfig.STREAM_WINDOW
+        
+        await connector_a.stop()
+        await connector_b.stop()
+        
+        results.add_result("P2P: 多路复用流", True)
+    except Exception as e:
+        results.add_result("P2P: 多路复用流", False, str(e))
+    
+    # 测试 4: 旧版对端（不回复握手）继续使用长度前缀协议
+    try:
+        received = []
+        
+        async def legacy_peer(reader, writer):
+            # 旧版只读取握手，不回复
+            for _ in range(2):
+                length = struct.unpack('!I', await reader.readexactly(4))[0]
+                received.append(json.loads(await reader.readexactly(length)))
+        
+        server = await asyncio.start_server(legacy_peer, '127.0.0.1', 9005)
+        
+        device_a = PeerInfo(
+            device_id="device_a",
+            device_name="设备A",
+            local_ip="127.0.0.1",
+            local_port=9006
+        )
+        legacy = PeerInfo(
+            device_id="legacy",
+            device_name="旧版设备",
+            local_ip="127.0.0.1",
+            local_port=9005
+        )
+        
+        connector_a = P2PConnector(device_a)
+        P2PConfig.HANDSHAKE_TIMEOUT = 0.2
+        try:
+            assert await connector_a.connect(legacy)
+        finally:
+            P2PConfig.HANDSHAKE_TIMEOUT = 5
+        
+        assert connector_a.connections["legacy"].mux is None
+        assert connector_a.open_stream("legacy") is None
+        assert await connector_a.send("legacy", json.dumps({"type": "control"}).encode('utf-8'))
+        
+        for _ in range(100):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert received[0]["type"] == "handshake"
+        assert received[1] == {"type": "control"}
+        
+        await connector_a.stop()
+        server.close()
+        await server.wait_closed()
+        
+        results.add_result("P2P: 旧版对端兼容", True)
+    except Exception as e:
+        results.add_result("P2P: 旧版对端兼容", False, str(e))
+    
+    # 测试 5: 慢消息回调不阻塞流数据，控制消息保持顺序
+    try:
+        device_a = PeerInfo(
+            device_id="device_a",
+            device_name="设备A",
+            local_ip="127.0.0.1",
+            local_port=9007
+        )
+        device_b = PeerInfo(
+            device_id="device_b",
+            device_name="设备B",
+            local_ip="127.0.0.1",
+            local_port=9008
+        )
+        
+        connector_a = P2PConnector(device_a)
+        connector_b = P2PConnector(device_b)
+        
+        handled = []
+        release = asyncio.Event()
+        
+        async def slow_handler(device_id, message):
+            if message["type"] == "slow":
+                await release.wait()
+            handled.append(message["type"])
+        
+        connector_b.on_message(slow_handler)
+        
+        await connector_a.start()
+        await connector_b.start()
+        await asyncio.sleep(0.5)
+        assert await connector_a.connect(device_b)
+        
+        for _ in range(100):
+            if "device_a" in connector_b.connections:
+                break
+            await asyncio.sleep(0.01)
+        
+        for message_type in ("slow", "after"):
+            assert await connector_a.send("device_b", json.dumps({"type": message_type}).encode('utf-8'))
+        
+        stream = connector_a.open_stream("device_b")
+        await stream.send_chunk(0, b"x" * 1024)
+        incoming = await connector_b.accept_stream("device_a", timeout=2)
+        index, data = await asyncio.wait_for(incoming.read_chunk(), timeout=2)
+        assert index == 0 and len(data) == 1024
+        assert handled == []
+        
+        release.set()
+        for _ in range(100):
+            if len(handled) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert handled == ["slow", "after"]
+        
+        await connector_a.stop()
+        await connector_b.stop()
+        
+        results.add_result("P2P: 慢回调不阻塞流", True)
+    except Exception as e:
+        results.add_result("P2P: 慢回调不阻塞流", False, str(e))
 
 async def test_resumable_transfer(results: TestResults):
     """测试断点续传"""
@@ -352,6 +587,317 @@ async def test_resumable_transfer(results: TestResults):
     except Exception as e:
         results.add_result("断点续传: 文件传输", False, str(e))
 
+    # 测试 3: 窗口发送、失败后恢复
+    try:
+        import os
+        import tempfile
+
+        data = os.urandom(5 * 1024 * 1024 + 123)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".bin") as f:
+            f.write(data)
+            temp_file = f.name
+
+        session = manager.create_session(
+            session_id="test_window",
+            file_path=temp_file,
+            chunk_size=256 * 1024
+        )
+
+        received = {}
+        in_flight = 0
+        max_in_flight = 0
+        fail_once = {10}
+
+        async def windowed_send(chunk_index: int, chunk_data: bytes):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            if chunk_index in fail_once:
+                fail_once.discard(chunk_index)
+                raise ConnectionError("link dropped")
+            received[chunk_index] = chunk_data
+
+        manager.config.MAX_RETRIES = 1
+        success = await manager.send_file(
+            session_id="test_window",
+            send_chunk_callback=windowed_send,
+            window_size=4
+        )
+        assert not success
+        assert max_in_flight == 4
+
+        # 从保存的会话恢复，只补发剩余分块
+        manager.sessions.clear()
+        resumed = manager.load_session("test_window")
+        assert resumed.state.value == "failed"
+        success = await manager.send_file(
+            session_id="test_window",
+            send_chunk_callback=windowed_send,
+            window_size=4
+        )
+
+        assert success
+        assert b"".join(received[i] for i in range(len(resumed.chunks))) == data
+
+        # 清理
+        manager.config.MAX_RETRIES = TransferConfig.MAX_RETRIES
+        os.remove(temp_file)
+        manager.delete_session("test_window")
+
+        results.add_result("断点续传: 窗口发送与恢复", True)
+    except Exception as e:
+        results.add_result("断点续传: 窗口发送与恢复", False, str(e))
+
+    # 测试 4: 失败时在途分块已发送完成，恢复后不重发
+    try:
+        import os
+        import tempfile
+
+        data = os.urandom(2 * 1024 * 1024)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".bin") as f:
+            f.write(data)
+            temp_file = f.name
+
+        manager.create_session(
+            session_id="test_inflight",
+            file_path=temp_file,
+            chunk_size=256 * 1024
+        )
+
+        sent = []
+        fail_once = {2}
+
+        async def acked_send(chunk_index: int, chunk_data: bytes):
+            if chunk_index in fail_once:
+                await asyncio.sleep(0.005)
+                fail_once.discard(chunk_index)
+                raise ConnectionError("link dropped")
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                # 取消到达时对端已确认该分块
+                pass
+            sent.append(chunk_index)
+
+        manager.config.MAX_RETRIES = 1
+        success = await manager.send_file(
+            session_id="test_inflight",
+            send_chunk_callback=acked_send,
+            window_size=4
+        )
+        assert not success
+        assert sorted(sent) == [0, 1, 3]
+
+        manager.sessions.clear()
+        resumed = manager.load_session("test_inflight")
+        assert [c.index for c in resumed.chunks if c.transferred] == [0, 1, 3]
+
+        success = await manager.send_file(
+            session_id="test_inflight",
+            send_chunk_callback=acked_send,
+            window_size=4
+        )
+        assert success
+        assert sorted(sent) == list(range(len(resumed.chunks)))
+
+        # 清理
+        manager.config.MAX_RETRIES = TransferConfig.MAX_RETRIES
+        os.remove(temp_file)
+        manager.delete_session("test_inflight")
+
+        results.add_result("断点续传: 失败时保存在途分块", True)
+    except Exception as e:
+        results.add_result("断点续传: 失败时保存在途分块", False, str(e))
+
+    # 测试 5: 接收端会话日志（压缩、崩溃后重放）
+    try:
+        import hashlib
+        import os
+        import tempfile
+
+        state_dir = tempfile.mkdtemp()
+        receiver = ResumableTransferManager(state_dir=state_dir)
+        receiver.config.COMPACT_RECORDS = 8
+
+        data = os.urandom(64 * 1024 + 17)
+        output_path = os.path.join(state_dir, "received", "out.bin")
+        await receiver.receive_file(
+            session_id="test_journal",
+            output_path=output_path,
+            file_size=len(data),
+            file_checksum=hashlib.sha256(data).hexdigest(),
+            chunk_size=1024
+        )
+
+        chunk_count = len(receiver.sessions["test_journal"].chunks)
+        for index in range(0, chunk_count, 2):
+            await receiver.write_chunk("test_journal", index, data[index * 1024:(index + 1) * 1024])
+        receiver.close()
+
+        # 模拟崩溃：日志末尾留下半条记录
+        with open(os.path.join(state_dir, "test_journal.journal"), "ab") as f:
+            f.write(b"\x01\x02")
+
+        restarted = ResumableTransferManager(state_dir=state_dir)
+        session = restarted.load_session("test_journal")
+        assert session.completed_chunks == (chunk_count + 1) // 2
+        assert not session.is_complete
+
+        for index in range(chunk_count):
+            await restarted.write_chunk("test_journal", index, data[index * 1024:(index + 1) * 1024])
+
+        assert session.state.value == "completed"
+        assert session.transferred_bytes == len(data)
+
+        # 清理
+        restarted.delete_session("test_journal")
+        restarted.close()
+
+        results.add_result("断点续传: 会话日志重放", True)
+    except Exception as e:
+        results.add_result("断点续传: 会话日志重放", False, str(e))
+
+    # 测试 6: 旧格式会话文件（自带分块列表）迁移到会话日志
+    try:
+        import json
+        import os
+        import tempfile
+
+        state_dir = tempfile.mkdtemp()
+        manager = ResumableTransferManager(state_dir=state_dir)
+        data = os.urandom(10 * 1024)
+        temp_file = os.path.join(state_dir, "legacy.bin")
+        with open(temp_file, "wb") as f:
+            f.write(data)
+
+        session = manager.create_session("test_legacy", temp_file, chunk_size=1024)
+        done = [0, 3, 4, 9]
+        for index in done:
+            session.chunks[index].transferred = True
+            session.chunks[index].checksum = "ab" * 32
+        session.bitmap = bytearray()
+        session.transferred_bytes = sum(session.chunks[i].size for i in done)
+        manager.close()
+
+        # 旧版本只写一个带 chunks 列表的 JSON
+        manager.delete_session("test_legacy")
+        with open(os.path.join(state_dir, "test_legacy.json"), "w") as f:
+            json.dump(session.to_dict(include_chunks=True), f)
+
+        upgraded = ResumableTransferManager(state_dir=state_dir)
+        loaded = upgraded.load_session("test_legacy")
+        assert loaded.completed_chunks == len(done)
+        upgraded._save_session(loaded)
+        upgraded.close()
+
+        with open(os.path.join(state_dir, "test_legacy.json")) as f:
+            assert "chunks" not in json.load(f)
+
+        reloaded = ResumableTransferManager(state_dir=state_dir).load_session("test_legacy")
+        assert [c.index for c in reloaded.chunks if c.transferred] == done
+        assert reloaded.chunks[3].checksum == "ab" * 32
+        assert reloaded.transferred_bytes == session.transferred_bytes
+
+        results.add_result("断点续传: 旧格式会话迁移", True)
+    except Exception as e:
+        results.add_result("断点续传: 旧格式会话迁移", False, str(e))
+
+async def test_task_scheduler(results: TestResults):
+    """测试任务调度"""
+    print("\n" + "="*80)
+    print("测试任务调度")
+    print("="*80)
+
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    def make_task(task_id, device_id, depends_on, duration):
+        return SimpleNamespace(
+            task_id=task_id, device_id=device_id, depends_on=depends_on,
+            estimated_duration=duration, intent_type=SimpleNamespace(value="app_control"),
+            action="open", target=None, parameters={}
+        )
+
+    # a(1s) -> d(3s) 与 b(5s) 互不相关；c 依赖 a 和 b；e 与 a、d 同设备
+    tasks = [
+        make_task("a", "phone", [], 1.0),
+        make_task("b", "tablet", [], 5.0),
+        make_task("c", "pc", ["a", "b"], 1.0),
+        make_task("d", "phone", ["a"], 3.0),
+        make_task("e", "phone", [], 0.5),
+    ]
+
+    # 测试 5.1: 关键路径与预计时间
+    try:
+        plan = TaskScheduler(max_concurrent_per_device=1).create_execution_plan(tasks)
+
+        assert plan.execution_order == [["a", "b", "e"], ["c", "d"]]
+        assert plan.critical_path == ["b", "c"]
+        assert plan.priorities["a"] == 4.0 and plan.priorities["b"] == 6.0
+        # phone 上按关键路径优先：a(0-1) -> d(1-4) -> e(4-4.5)，c 在 b 结束后开始
+        assert plan.estimated_start == {"a": 0.0, "b": 0.0, "d": 1.0, "e": 4.0, "c": 5.0}
+        assert plan.estimated_duration == 6.0
+
+        results.add_result("任务调度: 关键路径计划", True)
+    except Exception as e:
+        results.add_result("任务调度: 关键路径计划", False, str(e))
+
+    # 测试 5.2: 依赖满足即启动，不等待整层
+    try:
+        class RecordingRouter(TaskRouter):
+            def __init__(self, max_concurrent_per_device=1):
+                super().__init__(device_registry=None, max_concurrent_per_device=max_concurrent_per_device)
+                self.started = {}
+                self.concurrent = {}
+                self.peak = {}
+
+            async def _execute_single_task(self, task):
+                start_time = datetime.now()
+                self.started[task.task_id] = time.perf_counter()
+                self.concurrent[task.device_id] = self.concurrent.get(task.device_id, 0) + 1
+                self.peak[task.device_id] = max(self.peak.get(task.device_id, 0), self.concurrent[task.device_id])
+                limit = self.scheduler.max_concurrent_per_device
+                assert limit is None or self.concurrent[task.device_id] <= limit, "超过设备并发上限"
+                await asyncio.sleep(task.estimated_duration / 20)
+                self.concurrent[task.device_id] -= 1
+                return TaskResult(
+                    task_id=task.task_id, device_id=task.device_id, status=TaskStatus.COMPLETED,
+                    result=None, error=None, start_time=start_time, end_time=datetime.now(),
+                    duration=task.estimated_duration / 20
+                )
+
+        router = RecordingRouter()
+        begin = time.perf_counter()
+        task_results = await router.execute_tasks(tasks)
+        elapsed = time.perf_counter() - begin
+
+        assert sorted(r.task_id for r in task_results) == ["a", "b", "c", "d", "e"]
+        # d 在 a 结束后立即开始，而不是等 b 所在的整层结束
+        assert router.started["d"] - router.started["b"] < 0.15
+        assert router.started["c"] - router.started["b"] >= 0.24
+        assert elapsed < 0.45
+
+        results.add_result("任务调度: 事件驱动执行", True)
+    except Exception as e:
+        results.add_result("任务调度: 事件驱动执行", False, str(e))
+
+    # 测试 5.3: 默认不限制每设备并发
+    try:
+        assert TaskScheduler.DEFAULT_MAX_CONCURRENT_PER_DEVICE is None
+
+        router = RecordingRouter(max_concurrent_per_device=None)
+        await router.execute_tasks(tasks)
+
+        # a 与 e 同在 phone 上且互不依赖，同时开始
+        assert router.peak["phone"] == 2
+        assert abs(router.started["e"] - router.started["a"]) < 0.02
+
+        results.add_result("任务调度: 默认不限设备并发", True)
+    except Exception as e:
+        results.add_result("任务调度: 默认不限设备并发", False, str(e))
+
 # ============================================================================
 # 主测试函数
 # ============================================================================
@@ -371,6 +917,7 @@ async def run_all_tests():
     await test_multimodal_transfer(results)
     await test_p2p_connection(results)
     await test_resumable_transfer(results)
+    await test_task_scheduler(results)
     
     # 打印汇总
     results.print_summary()
@@ -7,7 +7,7 @@ Concrete Command Implementations
 Implements specific commands for TaskConstellation manipulation.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
 
 from galaxy.agents.schema import TaskConstellationSchema
 
@@ -23,8 +23,15 @@ class BaseConstellationCommand(IUndoableCommand):
     Base class for constellation commands.
 
     Provides common functionality for commands that operate on TaskConstellation.
+
+    Commands record a minimal inverse delta in _create_backup (the objects and
+    fields they are about to change) and undo by applying it. Only commands
+    that replace the whole constellation set _full_snapshot and keep a
+    to_dict() snapshot instead.
     """
 
+    _full_snapshot: bool = False
+
     def __init__(self, constellation: TaskConstellation, description: str):
         """
         Initialize base constellation command.
@@ -36,6 +43,7 @@ class BaseConstellationCommand(IUndoableCommand):
         self._description = description
         self._executed = False
         self._backup_data: Optional[Dict[str, Any]] = None
+        self._inverse_delta: Optional[Dict[str, Any]] = None
 
     @property
     def constellation(self) -> TaskConstellation:
@@ -55,7 +63,15 @@ class BaseConstellationCommand(IUndoableCommand):
     def _create_backup(self) -> None:
         """Create a backup of the constellation state."""
         try:
-            self._backup_data = self._constellation.to_dict()
+            if self._full_snapshot:
+                self._backup_data = self._constellation.to_dict()
+                return
+
+            self._inverse_delta = {
+                "state": self._constellation._state,
+                "updated_at": self._constellation._updated_at,
+                **self._record_delta(),
+            }
         except AttributeError as e:
             raise CommandExecutionError(
                 self, f"Constellation missing required attribute: {e}"
@@ -69,6 +85,31 @@ class BaseConstellationCommand(IUndoableCommand):
 
     def _restore_backup(self) -> None:
         """Restore the constellation from backup."""
+        if self._full_snapshot:
+            self._restore_snapshot()
+            return
+
+        if self._inverse_delta is None:
+            raise CommandUndoError(self, "No backup data available")
+
+        try:
+            self._apply_inverse_delta(self._inverse_delta)
+            self._constellation._state = self._inverse_delta["state"]
+            self._constellation._updated_at = self._inverse_delta["updated_at"]
+
+        except KeyError as e:
+            raise CommandUndoError(self, f"Missing required data in backup: {e}") from e
+        except AttributeError as e:
+            raise CommandUndoError(
+                self, f"Attribute error restoring backup: {e}"
+            ) from e
+        except Exception as e:
+            raise CommandUndoError(
+                self, f"Unexpected error restoring backup: {e}"
+            ) from e
+
+    def _restore_snapshot(self) -> None:
+        """Restore the constellation from the full to_dict() snapshot."""
         if not self._backup_data:
             raise CommandUndoError(self, "No backup data available")
 
@@ -94,6 +135,53 @@ class BaseConstellationCommand(IUndoableCommand):
                 self, f"Unexpected error restoring backup: {e}"
             ) from e
 
+    def _record_delta(self) -> Dict[str, Any]:
+        """
+        Record what this command is about to change.
+
+        :return: Command-specific inverse delta entries
+        """
+        return {}
+
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """
+        Revert this command's changes using the recorded delta.
+
+        Must be idempotent: execute() may restore twice on a failed validation.
+
+        :param delta: Inverse delta recorded by _create_backup
+        """
+
+    def _capture_task_links(
+        self, task_ids: Iterable[str]
+    ) -> Dict[str, Tuple[Set[str], Set[str]]]:
+        """
+        Copy the dependency/dependent sets of the given tasks.
+
+        :param task_ids: IDs of tasks whose links will be touched
+        :return: Dictionary mapping task ID to (dependencies, dependents)
+        """
+        links = {}
+        for task_id in task_ids:
+            task = self._constellation.get_task(task_id)
+            if task is not None:
+                links[task_id] = (set(task._dependencies), set(task._dependents))
+        return links
+
+    def _restore_task_links(
+        self, links: Dict[str, Tuple[Set[str], Set[str]]]
+    ) -> None:
+        """
+        Restore dependency/dependent sets captured by _capture_task_links.
+
+        :param links: Dictionary mapping task ID to (dependencies, dependents)
+        """
+        for task_id, (dependencies, dependents) in links.items():
+            task = self._constellation.get_task(task_id)
+            if task is not None:
+                task._dependencies = set(dependencies)
+                task._dependents = set(dependents)
+
 
 @register_command(
     name="add_task",
@@ -172,15 +260,14 @@ class AddTaskCommand(BaseConstellationCommand):
                 self, "Cannot undo - command not executed or task not added"
             )
 
-        try:
+        self._restore_backup()
+        self._executed = False
+        self._task_added = False
+
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """Remove the added task (and any dependencies attached to it since)."""
+        if self._constellation.get_task(self._task.task_id) is self._task:
             self._constellation.remove_task(self._task.task_id)
-            self._executed = False
-            self._task_added = False
-        except Exception as e:
-            # If removal fails, restore from backup
-            self._restore_backup()
-            self._executed = False
-            self._task_added = False
 
 
 @register_command(
@@ -237,14 +324,9 @@ class RemoveTaskCommand(BaseConstellationCommand):
         self._create_backup()
 
         try:
-            # Store the task being removed for undo
-            self._removed_task = self._constellation.get_task(self._task_id)
-
-            # Store dependencies that will be removed
-            self._removed_dependencies = []
-            for dep in self._constellation.get_all_dependencies():
-                if dep.from_task_id == self._task_id or dep.to_task_id == self._task_id:
-                    self._removed_dependencies.append(dep)
+            # The task and its dependencies were recorded by _create_backup
+            self._removed_task = self._inverse_delta["task"]
+            self._removed_dependencies = self._inverse_delta["dependencies"]
 
             self._constellation.remove_task(self._task_id)
 
@@ -278,7 +360,6 @@ class RemoveTaskCommand(BaseConstellationCommand):
             )
 
         try:
-            # Restore from backup to ensure complete state restoration
             self._restore_backup()
             self._executed = False
             self._removed_task = None
@@ -287,6 +368,34 @@ class RemoveTaskCommand(BaseConstellationCommand):
         except Exception as e:
             raise CommandUndoError(self, f"Failed to undo remove task: {e}")
 
+    def _record_delta(self) -> Dict[str, Any]:
+        """Record the task, its dependencies and its neighbours' links."""
+        dependencies = [
+            dep
+            for dep in self._constellation.get_all_dependencies()
+            if dep.from_task_id == self._task_id or dep.to_task_id == self._task_id
+        ]
+        neighbours = {self._task_id}
+        for dep in dependencies:
+            neighbours.add(dep.from_task_id)
+            neighbours.add(dep.to_task_id)
+
+        return {
+            "task": self._constellation.get_task(self._task_id),
+            "dependencies": dependencies,
+            "links": self._capture_task_links(neighbours),
+        }
+
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """Re-insert the removed task and its dependencies."""
+        task = delta["task"]
+        if self._constellation.get_task(task.task_id) is None:
+            self._constellation.add_task(task)
+        for dependency in delta["dependencies"]:
+            if dependency.line_id not in self._constellation.dependencies:
+                self._constellation.add_dependency(dependency)
+        self._restore_task_links(delta["links"])
+
 
 @register_command(
     name="update_task",
@@ -373,20 +482,16 @@ class UpdateTaskCommand(BaseConstellationCommand):
                 self, "Cannot undo - command not executed or no original values"
             )
 
-        try:
-            task = self._constellation.get_task(self._task_id)
-            if task:
-                for field, original_value in self._original_values.items():
-                    setattr(task, field, original_value)
-
-            self._executed = False
-            self._original_values = {}
+        self._restore_backup()
+        self._executed = False
+        self._original_values = {}
 
-        except Exception as e:
-            # If manual restoration fails, use backup
-            self._restore_backup()
-            self._executed = False
-            self._original_values = {}
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """Set the updated fields back to their original values."""
+        task = self._constellation.get_task(self._task_id)
+        if task:
+            for field, original_value in self._original_values.items():
+                setattr(task, field, original_value)
 
 
 @register_command(
@@ -477,15 +582,24 @@ class AddDependencyCommand(BaseConstellationCommand):
                 self, "Cannot undo - command not executed or dependency not added"
             )
 
-        try:
-            self._constellation.remove_dependency(self._dependency.line_id)
-            self._executed = False
-            self._dependency_added = False
-        except Exception as e:
-            # If removal fails, restore from backup
-            self._restore_backup()
-            self._executed = False
-            self._dependency_added = False
+        self._restore_backup()
+        self._executed = False
+        self._dependency_added = False
+
+    def _record_delta(self) -> Dict[str, Any]:
+        """Record the links of both endpoint tasks."""
+        return {
+            "links": self._capture_task_links(
+                (self._dependency.from_task_id, self._dependency.to_task_id)
+            )
+        }
+
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """Remove the added dependency."""
+        line_id = self._dependency.line_id
+        if self._constellation.get_dependency(line_id) is self._dependency:
+            self._constellation.remove_dependency(line_id)
+        self._restore_task_links(delta["links"])
 
 
 @register_command(
@@ -533,10 +647,8 @@ class RemoveDependencyCommand(BaseConstellationCommand):
         self._create_backup()
 
         try:
-            # Store the dependency being removed for undo
-            self._removed_dependency = self._constellation.get_dependency(
-                self._dependency_id
-            )
+            # The dependency was recorded by _create_backup
+            self._removed_dependency = self._inverse_delta["dependency"]
 
             self._constellation.remove_dependency(self._dependency_id)
 
@@ -570,7 +682,6 @@ class RemoveDependencyCommand(BaseConstellationCommand):
             )
 
         try:
-            # Restore from backup to ensure complete state restoration
             self._restore_backup()
             self._executed = False
             self._removed_dependency = None
@@ -578,6 +689,23 @@ class RemoveDependencyCommand(BaseConstellationCommand):
         except Exception as e:
             raise CommandUndoError(self, f"Failed to undo remove dependency: {e}")
 
+    def _record_delta(self) -> Dict[str, Any]:
+        """Record the dependency and the links of both endpoint tasks."""
+        dependency = self._constellation.get_dependency(self._dependency_id)
+        return {
+            "dependency": dependency,
+            "links": self._capture_task_links(
+                (dependency.from_task_id, dependency.to_task_id)
+            ),
+        }
+
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """Re-insert the removed dependency."""
+        dependency = delta["dependency"]
+        if dependency.line_id not in self._constellation.dependencies:
+            self._constellation.add_dependency(dependency)
+        self._restore_task_links(delta["links"])
+
 
 @register_command(
     name="update_dependency",
@@ -667,20 +795,16 @@ class UpdateDependencyCommand(BaseConstellationCommand):
                 self, "Cannot undo - command not executed or no original values"
             )
 
-        try:
-            dependency = self._constellation.get_dependency(self._dependency_id)
-            if dependency:
-                for field, original_value in self._original_values.items():
-                    setattr(dependency, field, original_value)
-
-            self._executed = False
-            self._original_values = {}
+        self._restore_backup()
+        self._executed = False
+        self._original_values = {}
 
-        except Exception as e:
-            # If manual restoration fails, use backup
-            self._restore_backup()
-            self._executed = False
-            self._original_values = {}
+    def _apply_inverse_delta(self, delta: Dict[str, Any]) -> None:
+        """Set the updated fields back to their original values."""
+        dependency = self._constellation.get_dependency(self._dependency_id)
+        if dependency:
+            for field, original_value in self._original_values.items():
+                setattr(dependency, field, original_value)
 
 
 @register_command(
@@ -691,6 +815,8 @@ class UpdateDependencyCommand(BaseConstellationCommand):
 class BuildConstellationCommand(BaseConstellationCommand):
     """Command to build a constellation from a configuration."""
 
+    _full_snapshot = True
+
     def __init__(
         self,
         constellation: TaskConstellation,
@@ -778,6 +904,8 @@ class BuildConstellationCommand(BaseConstellationCommand):
 class ClearConstellationCommand(BaseConstellationCommand):
     """Command to clear all tasks and dependencies from the constellation."""
 
+    _full_snapshot = True
+
     def __init__(self, constellation: TaskConstellation):
         """
         Initialize clear constellation command.
@@ -854,6 +982,8 @@ class ClearConstellationCommand(BaseConstellationCommand):
 class LoadConstellationCommand(BaseConstellationCommand):
     """Command to load a constellation from JSON file."""
 
+    _full_snapshot = True
+
     def __init__(self, constellation: TaskConstellation, file_path: str):
         """
         Initialize load constellation command.
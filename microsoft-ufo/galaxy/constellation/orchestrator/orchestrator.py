@@ -443,7 +443,9 @@ class TaskConstellationOrchestrator:
         :param constellation: Current orchestrator's constellation
         :return: Updated constellation with merged state
         """
-        if self._logger:
+        debug_enabled = self._logger and self._logger.isEnabledFor(logging.DEBUG)
+
+        if debug_enabled:
             old_ready = [t.task_id for t in constellation.get_ready_tasks()]
             self._logger.debug(f"⚠️ Old Ready tasks: {old_ready}")
 
@@ -456,7 +458,7 @@ class TaskConstellationOrchestrator:
                 )
             )
 
-        if self._logger:
+        if debug_enabled:
             self._logger.debug(
                 f"🆕 Task ID for constellation after editing: {list(constellation.tasks.keys())}"
             )
@@ -9,10 +9,11 @@ dynamic modification, and advanced dependency handling capabilities.
 """
 
 
+import heapq
 import uuid
 from collections import defaultdict, deque
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
 
 from galaxy.constellation.enums import ConstellationState
 from galaxy.visualization.dag_visualizer import DAGVisualizer
@@ -27,6 +28,10 @@ from .task_star_line import TaskStarLine
 if TYPE_CHECKING:
     from galaxy.agents.schema import TaskConstellationSchema
 
+_TERMINAL_STATUSES = frozenset(
+    (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+)
+
 
 class TaskConstellation(IConstellation):
     """
@@ -73,6 +78,26 @@ class TaskConstellation(IConstellation):
         # Metadata
         self._metadata: Dict[str, Any] = {}
 
+        # Ready-set index (kept in sync incrementally, see _rebuild_ready_index)
+        self._incoming: Dict[str, Set[str]] = {}
+        self._outgoing: Dict[str, Set[str]] = {}
+        self._unsatisfied_in: Dict[str, Set[str]] = {}
+        self._terminal_tasks: Set[str] = set()
+        self._task_seq: Dict[str, int] = {}
+        self._next_seq: int = 0
+        self._ready_heap: List[Tuple[int, int, str]] = []
+        self._indexed_line_count: int = 0
+        self._indexed_tasks: Dict[str, TaskStar] = self._tasks
+        self._indexed_dependencies: Dict[str, TaskStarLine] = self._dependencies
+
+        # Analytics cache: structural metrics are keyed on the structure
+        # version, time-weighted metrics also on the status version
+        self._structure_version: int = 0
+        self._status_version: int = 0
+        self._task_statuses: Dict[str, TaskStatus] = {}
+        self._status_counts: Dict[TaskStatus, int] = defaultdict(int)
+        self._analytics_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
     @property
     def constellation_id(self) -> str:
         """Get the constellation ID."""
@@ -143,6 +168,12 @@ class TaskConstellation(IConstellation):
             ).total_seconds()
         return None
 
+    @property
+    def structure_version(self) -> int:
+        """Get the structure version, bumped whenever tasks or dependencies change."""
+        self._ensure_ready_index()
+        return self._structure_version
+
     @property
     def metadata(self) -> Dict[str, Any]:
         """Get a copy of the metadata."""
@@ -163,7 +194,9 @@ class TaskConstellation(IConstellation):
         if task.task_id in self._tasks:
             raise ValueError(f"Task with ID {task.task_id} already exists")
 
+        self._ensure_ready_index()
         self._tasks[task.task_id] = task
+        self._index_task(task)
         self._updated_at = datetime.now(timezone.utc)
 
         # Update constellation state as task composition changed
@@ -184,15 +217,16 @@ class TaskConstellation(IConstellation):
             raise ValueError(f"Cannot remove running task {task_id}")
 
         # Remove all dependencies involving this task
-        dependencies_to_remove = []
-        for dep_id, dep in self._dependencies.items():
-            if dep.from_task_id == task_id or dep.to_task_id == task_id:
-                dependencies_to_remove.append(dep_id)
+        self._ensure_ready_index()
+        dependencies_to_remove = list(
+            self._incoming.get(task_id, set()) | self._outgoing.get(task_id, set())
+        )
 
         for dep_id in dependencies_to_remove:
             self.remove_dependency(dep_id)
 
         del self._tasks[task_id]
+        self._unindex_task(task_id)
         self._updated_at = datetime.now(timezone.utc)
 
         # Update constellation state as task composition changed
@@ -228,6 +262,7 @@ class TaskConstellation(IConstellation):
 
         # Add the dependency
         self._dependencies[dependency.line_id] = dependency
+        self._index_dependency(dependency)
 
         # Update task references
         from_task = self._tasks[dependency.from_task_id]
@@ -250,6 +285,7 @@ class TaskConstellation(IConstellation):
         if dependency_id not in self._dependencies:
             return
 
+        self._ensure_ready_index()
         dependency = self._dependencies[dependency_id]
 
         # Update task references
@@ -262,6 +298,7 @@ class TaskConstellation(IConstellation):
             to_task.remove_dependency(dependency.from_task_id)
 
         del self._dependencies[dependency_id]
+        self._unindex_dependency(dependency)
         self._updated_at = datetime.now(timezone.utc)
 
         # Update constellation state as dependencies changed
@@ -280,18 +317,36 @@ class TaskConstellation(IConstellation):
         """
         Get all tasks that are ready to execute.
 
+        Served from the ready heap, so the cost depends on the number of ready
+        tasks rather than on the size of the DAG.
+
         :return: List of TaskStar instances ready for execution
         """
-        ready_tasks = []
-        for task in self._tasks.values():
-            if task.is_ready_to_execute:
-                # Double-check dependencies are satisfied
-                if self._are_dependencies_satisfied(task.task_id):
-                    ready_tasks.append(task)
-
-        # Sort by priority (higher priority first)
-        ready_tasks.sort(key=lambda t: t.priority.value, reverse=True)
-        return ready_tasks
+        self._ensure_ready_index()
+
+        # Drop stale entries and refresh priorities that changed since push
+        entries = []
+        seen = set()
+        for _, seq, task_id in self._ready_heap:
+            task = self._tasks.get(task_id)
+            if (
+                task is None
+                or task_id in seen
+                or self._unsatisfied_in.get(task_id)
+                or task.is_terminal
+            ):
+                continue
+            seen.add(task_id)
+            entries.append((-task.priority.value, seq, task_id))
+        heapq.heapify(entries)
+        self._ready_heap = entries
+
+        # Sort by priority (higher priority first, insertion order on ties)
+        return [
+            self._tasks[task_id]
+            for _, _, task_id in sorted(entries)
+            if self._tasks[task_id].is_ready_to_execute
+        ]
 
     def get_running_tasks(self) -> List[TaskStar]:
         """Get all currently running tasks."""
@@ -394,16 +449,12 @@ class TaskConstellation(IConstellation):
             self._state = ConstellationState.CREATED
             return
 
-        all_terminal = all(task.is_terminal for task in self._tasks.values())
-        has_running = any(
-            task.status == TaskStatus.RUNNING for task in self._tasks.values()
-        )
-        has_failed = any(
-            task.status == TaskStatus.FAILED for task in self._tasks.values()
-        )
-        has_completed = any(
-            task.status == TaskStatus.COMPLETED for task in self._tasks.values()
-        )
+        self._reconcile_task_statuses()
+
+        all_terminal = len(self._terminal_tasks) == len(self._tasks)
+        has_running = self._status_counts[TaskStatus.RUNNING] > 0
+        has_failed = self._status_counts[TaskStatus.FAILED] > 0
+        has_completed = self._status_counts[TaskStatus.COMPLETED] > 0
 
         if all_terminal:
             if has_failed and has_completed:
@@ -460,20 +511,25 @@ class TaskConstellation(IConstellation):
         else:
             task.complete_with_failure(error)
 
-        # Update dependent tasks
+        # Update dependent tasks (only the outgoing edges of this task)
+        self._ensure_ready_index()
+        self._terminal_tasks.add(task_id)
+        outgoing = [self._dependencies[line_id] for line_id in self._outgoing[task_id]]
+        for dependency in outgoing:
+            self._refresh_line(dependency)
+
         newly_ready = []
-        for dependency in self._dependencies.values():
-            if dependency.from_task_id == task_id:
-                # This completed task is a prerequisite for the dependent task
-                dependent_task = self._tasks.get(dependency.to_task_id)
-                if dependent_task and dependent_task.status == TaskStatus.PENDING:
-                    # Evaluate the dependency condition
-                    if dependency.evaluate_condition(result if success else error):
-                        dependent_task.remove_dependency(task_id)
-
-                        # Check if dependent task is now ready
-                        if self._are_dependencies_satisfied(dependent_task.task_id):
-                            newly_ready.append(dependent_task)
+        for dependency in outgoing:
+            # This completed task is a prerequisite for the dependent task
+            dependent_task = self._tasks.get(dependency.to_task_id)
+            if dependent_task and dependent_task.status == TaskStatus.PENDING:
+                # Evaluate the dependency condition
+                if dependency.evaluate_condition(result if success else error):
+                    dependent_task.remove_dependency(task_id)
+
+                    # Check if dependent task is now ready
+                    if not self._unsatisfied_in.get(dependent_task.task_id):
+                        newly_ready.append(dependent_task)
 
         self.update_state()
         self._updated_at = datetime.now(timezone.utc)
@@ -512,6 +568,12 @@ class TaskConstellation(IConstellation):
         :return: List of task IDs in topological order
         :raises ValueError: If DAG contains cycles
         """
+        return list(
+            self._cached_analytics("topological_order", self._compute_topological_order)
+        )
+
+    def _compute_topological_order(self) -> List[str]:
+        """Compute the topological ordering of the DAG from scratch."""
         # Build adjacency list from dependencies
         in_degree = defaultdict(int)
         adjacency = defaultdict(list)
@@ -552,6 +614,11 @@ class TaskConstellation(IConstellation):
 
         :return: Tuple of (path_length, list_of_task_ids_in_longest_path)
         """
+        length, path = self._cached_analytics("longest_path", self._compute_longest_path)
+        return (length, list(path))
+
+    def _compute_longest_path(self) -> Tuple[int, List[str]]:
+        """Compute the longest path (in tasks) from scratch."""
         if not self._tasks:
             return (0, [])
 
@@ -613,6 +680,10 @@ class TaskConstellation(IConstellation):
 
         :return: Maximum width of the DAG
         """
+        return self._cached_analytics("max_width", self._compute_max_width)
+
+    def _compute_max_width(self) -> int:
+        """Compute the maximum width from scratch."""
         if not self._tasks:
             return 0
 
@@ -655,6 +726,15 @@ class TaskConstellation(IConstellation):
 
         :return: Tuple of (critical_path_duration_seconds, list_of_task_ids_in_critical_path)
         """
+        length, path = self._cached_analytics(
+            "critical_path_length_with_time",
+            self._compute_critical_path_length_with_time,
+            time_weighted=True,
+        )
+        return (length, list(path))
+
+    def _compute_critical_path_length_with_time(self) -> Tuple[float, List[str]]:
+        """Compute the time-weighted critical path from scratch."""
         if not self._tasks:
             return (0.0, [])
 
@@ -727,6 +807,12 @@ class TaskConstellation(IConstellation):
 
         :return: Total work in seconds
         """
+        return self._cached_analytics(
+            "total_work", self._compute_total_work, time_weighted=True
+        )
+
+    def _compute_total_work(self) -> float:
+        """Compute the total work from scratch."""
         total = 0.0
         for task in self._tasks.values():
             duration = task.execution_duration
@@ -747,6 +833,18 @@ class TaskConstellation(IConstellation):
 
         :return: Dictionary with parallelism metrics
         """
+        metrics = dict(
+            self._cached_analytics(
+                "parallelism_metrics",
+                self._compute_parallelism_metrics,
+                time_weighted=True,
+            )
+        )
+        metrics["critical_path_tasks"] = list(metrics["critical_path_tasks"])
+        return metrics
+
+    def _compute_parallelism_metrics(self) -> Dict[str, Any]:
+        """Compute the parallelism metrics from scratch."""
         if not self._tasks:
             return {
                 "critical_path_length": 0,
@@ -802,6 +900,7 @@ class TaskConstellation(IConstellation):
 
         :return: Dictionary with statistics
         """
+        # Counted live: the orchestrator starts tasks directly on the TaskStar
         status_counts = defaultdict(int)
         for task in self._tasks.values():
             status_counts[task.status.value] += 1
@@ -948,6 +1047,8 @@ class TaskConstellation(IConstellation):
             dependency = TaskStarLine.from_dict(dep_data)
             constellation._dependencies[dep_id] = dependency
 
+        constellation._rebuild_ready_index()
+
         return constellation
 
     def to_json(self, save_path: Optional[str] = None) -> str:
@@ -1136,22 +1237,10 @@ class TaskConstellation(IConstellation):
         if not task:
             return False
 
-        for dependency in self._dependencies.values():
-            if dependency.to_task_id == task_id:
-                prerequisite_task = self._tasks.get(dependency.from_task_id)
-                if not prerequisite_task or not prerequisite_task.is_terminal:
-                    return False
-
-                # Check if dependency condition is satisfied
-                if not dependency.is_satisfied:
-                    # Try to evaluate the condition
-                    result = (
-                        prerequisite_task.result
-                        if prerequisite_task.status == TaskStatus.COMPLETED
-                        else prerequisite_task.error
-                    )
-                    if not dependency.evaluate_condition(result):
-                        return False
+        self._ensure_ready_index()
+        for line_id in self._incoming.get(task_id, ()):
+            if not self._line_satisfied(self._dependencies[line_id]):
+                return False
 
         return True
 
@@ -1169,15 +1258,196 @@ class TaskConstellation(IConstellation):
             visited.add(current)
 
             # Check all dependencies where current is the source
-            for dependency in self._dependencies.values():
-                if dependency.from_task_id == current:
-                    if has_path(dependency.to_task_id, target):
-                        return True
+            for line_id in self._outgoing.get(current, ()):
+                if has_path(self._dependencies[line_id].to_task_id, target):
+                    return True
 
             return False
 
+        self._ensure_ready_index()
         return has_path(to_task_id, from_task_id)
 
+    def _line_satisfied(self, dependency: TaskStarLine) -> bool:
+        """Check a single dependency the same way _are_dependencies_satisfied does."""
+        prerequisite_task = self._tasks.get(dependency.from_task_id)
+        if not prerequisite_task or not prerequisite_task.is_terminal:
+            return False
+        if dependency.is_satisfied:
+            return True
+        result = (
+            prerequisite_task.result
+            if prerequisite_task.status == TaskStatus.COMPLETED
+            else prerequisite_task.error
+        )
+        return dependency.evaluate_condition(result)
+
+    def _push_ready(self, task_id: str) -> None:
+        """Push a task whose in-degree dropped to zero onto the ready heap."""
+        task = self._tasks[task_id]
+        heapq.heappush(
+            self._ready_heap, (-task.priority.value, self._task_seq[task_id], task_id)
+        )
+
+    def _mark_line_satisfied(self, dependency: TaskStarLine) -> None:
+        """Remove a dependency from its target's unsatisfied set."""
+        pending = self._unsatisfied_in.get(dependency.to_task_id)
+        if pending is None or dependency.line_id not in pending:
+            return
+        pending.discard(dependency.line_id)
+        if not pending:
+            self._push_ready(dependency.to_task_id)
+
+    def _refresh_line(self, dependency: TaskStarLine) -> None:
+        """Re-evaluate one dependency and update its target's unsatisfied set."""
+        if self._line_satisfied(dependency):
+            self._mark_line_satisfied(dependency)
+        else:
+            self._unsatisfied_in[dependency.to_task_id].add(dependency.line_id)
+
+    def _index_task(self, task: TaskStar) -> None:
+        """Add a task to the ready-set index."""
+        task_id = task.task_id
+        self._structure_version += 1
+        self._task_statuses[task_id] = task.status
+        self._status_counts[task.status] += 1
+        self._task_seq[task_id] = self._next_seq
+        self._next_seq += 1
+        self._incoming[task_id] = set()
+        self._outgoing[task_id] = set()
+        self._unsatisfied_in[task_id] = set()
+        if task.is_terminal:
+            self._terminal_tasks.add(task_id)
+        self._push_ready(task_id)
+
+    def _unindex_task(self, task_id: str) -> None:
+        """Remove a task (whose dependencies are already gone) from the index."""
+        self._structure_version += 1
+        status = self._task_statuses.pop(task_id, None)
+        if status is not None:
+            self._status_counts[status] -= 1
+        self._task_seq.pop(task_id, None)
+        self._incoming.pop(task_id, None)
+        self._outgoing.pop(task_id, None)
+        self._unsatisfied_in.pop(task_id, None)
+        self._terminal_tasks.discard(task_id)
+
+    def _index_dependency(self, dependency: TaskStarLine) -> None:
+        """Add a dependency to the ready-set index."""
+        self._structure_version += 1
+        self._outgoing[dependency.from_task_id].add(dependency.line_id)
+        self._incoming[dependency.to_task_id].add(dependency.line_id)
+        self._indexed_line_count += 1
+        if not self._line_satisfied(dependency):
+            self._unsatisfied_in[dependency.to_task_id].add(dependency.line_id)
+
+    def _unindex_dependency(self, dependency: TaskStarLine) -> None:
+        """Remove a dependency from the ready-set index."""
+        self._structure_version += 1
+        self._outgoing.get(dependency.from_task_id, set()).discard(dependency.line_id)
+        self._incoming.get(dependency.to_task_id, set()).discard(dependency.line_id)
+        self._indexed_line_count -= 1
+        self._mark_line_satisfied(dependency)
+
+    def _rebuild_ready_index(self) -> None:
+        """Rebuild the ready-set index from scratch in O(V + E)."""
+        self._incoming = {}
+        self._outgoing = {}
+        self._unsatisfied_in = {}
+        self._terminal_tasks = set()
+        self._task_seq = {}
+        self._next_seq = 0
+        self._ready_heap = []
+        self._indexed_line_count = 0
+        self._task_statuses = {}
+        self._status_counts = defaultdict(int)
+        self._status_version += 1
+        self._indexed_tasks = self._tasks
+        self._indexed_dependencies = self._dependencies
+
+        for task in self._tasks.values():
+            self._index_task(task)
+        for dependency in self._dependencies.values():
+            if (
+                dependency.from_task_id in self._tasks
+                and dependency.to_task_id in self._tasks
+            ):
+                self._index_dependency(dependency)
+        # Dangling dependencies are never indexed but must not trigger rebuilds
+        self._indexed_line_count = len(self._dependencies)
+
+        self._ready_heap = [
+            entry for entry in self._ready_heap if not self._unsatisfied_in[entry[2]]
+        ]
+        heapq.heapify(self._ready_heap)
+
+    def _ensure_ready_index(self) -> None:
+        """
+        Rebuild the index if the task or dependency dicts were replaced or
+        filled directly (e.g. by from_dict or an editor command restore).
+        """
+        if (
+            self._indexed_tasks is not self._tasks
+            or self._indexed_dependencies is not self._dependencies
+            or len(self._task_seq) != len(self._tasks)
+            or self._indexed_line_count != len(self._dependencies)
+        ):
+            self._rebuild_ready_index()
+
+    def _cached_analytics(
+        self, name: str, compute: Callable[[], Any], time_weighted: bool = False
+    ) -> Any:
+        """
+        Return a cached DAG metric, recomputing it only when it is stale.
+
+        Structural metrics are valid for one structure version; time-weighted
+        metrics are additionally invalidated by task status changes.
+
+        :param name: Cache key of the metric
+        :param compute: Function computing the metric from scratch
+        :param time_weighted: Whether the metric depends on task execution times
+        :return: Cached or freshly computed value (must not be mutated)
+        """
+        self._ensure_ready_index()
+        version = (
+            self._structure_version,
+            self._status_version if time_weighted else 0,
+        )
+        cached = self._analytics_cache.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        value = compute()
+        self._analytics_cache[name] = (version, value)
+        return value
+
+    def _reconcile_task_statuses(self) -> None:
+        """
+        Pick up status changes made directly on TaskStar objects (e.g. merged
+        state from the agent's copy, cancel, retry): update the status counts,
+        invalidate time-weighted analytics and unblock or re-block dependents.
+        """
+        self._ensure_ready_index()
+        for task_id, task in self._tasks.items():
+            status = task.status
+            previous = self._task_statuses[task_id]
+            if status is previous:
+                continue
+            self._task_statuses[task_id] = status
+            self._status_counts[previous] -= 1
+            self._status_counts[status] += 1
+            self._status_version += 1
+
+            is_terminal = status in _TERMINAL_STATUSES
+            if is_terminal == (task_id in self._terminal_tasks):
+                continue
+            if is_terminal:
+                self._terminal_tasks.add(task_id)
+            else:
+                self._terminal_tasks.discard(task_id)
+                self._push_ready(task_id)
+            for line_id in self._outgoing.get(task_id, ()):
+                self._refresh_line(self._dependencies[line_id])
+
     def has_cycle(self) -> bool:
         """Check if the DAG has any cycles."""
         try:
@@ -7,10 +7,12 @@ Event system for Galaxy framework using Observer pattern.
 
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Deque, Dict, Hashable, List, Optional, Set, Tuple
 
 
 class EventType(Enum):
@@ -193,29 +195,203 @@ class IEventPublisher(ABC):
         pass
 
 
+class DispatchMode(Enum):
+    """
+    How the EventBus delivers events to observers.
+    """
+
+    INLINE = "inline"  # Await every observer inside publish_event
+    QUEUED = "queued"  # Per-observer bounded queue drained by its own worker
+
+
+class OverflowPolicy(Enum):
+    """
+    What a queued observer does when its queue is full.
+    """
+
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest pending event
+    COALESCE = "coalesce"  # Discard an older pending event for the same constellation/task
+    BLOCK = "block"  # Make the publisher wait for free space
+
+
+@dataclass
+class ObserverStats:
+    """
+    Delivery counters for a single queued observer.
+    """
+
+    enqueued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    blocked: int = 0
+    max_depth: int = 0
+
+
+@dataclass
+class _Subscription:
+    """
+    An observer together with its queue and worker (queued mode only).
+    """
+
+    observer: IEventObserver
+    max_queue_size: int
+    overflow_policy: OverflowPolicy
+    stats: ObserverStats = field(default_factory=ObserverStats)
+    # Pending (enqueue_time, coalesce_key, event) entries
+    queue: Deque[Tuple[float, Optional[Hashable], Event]] = field(
+        default_factory=deque
+    )
+    worker: Optional["asyncio.Task"] = None
+    not_empty: Optional[asyncio.Event] = None
+    not_full: Optional[asyncio.Event] = None
+    idle: Optional[asyncio.Event] = None
+
+    def ensure_worker(self, logger: logging.Logger) -> None:
+        """Start (or restart on a new event loop) the worker draining the queue."""
+        loop = asyncio.get_running_loop()
+        if (
+            self.worker is not None
+            and not self.worker.done()
+            and self.worker.get_loop() is loop
+        ):
+            return
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.idle = asyncio.Event()
+        if self.queue:
+            self.not_empty.set()
+        else:
+            self.idle.set()
+        if len(self.queue) < self.max_queue_size:
+            self.not_full.set()
+        self.worker = loop.create_task(self._run(logger))
+
+    async def put(self, event: Event) -> None:
+        """Enqueue an event, applying the overflow policy."""
+        key = None
+        if self.overflow_policy == OverflowPolicy.COALESCE:
+            key = _coalesce_key(event)
+
+        if len(self.queue) >= self.max_queue_size:
+            if self.overflow_policy == OverflowPolicy.BLOCK:
+                self.stats.blocked += 1
+                while len(self.queue) >= self.max_queue_size:
+                    self.not_full.clear()
+                    await self.not_full.wait()
+            elif not self._coalesce(key):
+                self.queue.popleft()
+                self.stats.dropped += 1
+
+        self.queue.append((time.monotonic(), key, event))
+        self.stats.enqueued += 1
+        self.stats.max_depth = max(self.stats.max_depth, len(self.queue))
+        self.idle.clear()
+        self.not_empty.set()
+
+    def _coalesce(self, key: Optional[Hashable]) -> bool:
+        """Discard the oldest pending event superseded by a newer one with the same key."""
+        if key is None:
+            return False
+        for index, (_, pending_key, _) in enumerate(self.queue):
+            if pending_key == key:
+                del self.queue[index]
+                self.stats.coalesced += 1
+                return True
+        return False
+
+    def lag_seconds(self) -> float:
+        """Age of the oldest pending event."""
+        if not self.queue:
+            return 0.0
+        return time.monotonic() - self.queue[0][0]
+
+    async def _run(self, logger: logging.Logger) -> None:
+        while True:
+            if not self.queue:
+                self.idle.set()
+                self.not_empty.clear()
+                await self.not_empty.wait()
+                continue
+
+            _, _, event = self.queue.popleft()
+            self.not_full.set()
+            try:
+                await self.observer.on_event(event)
+                self.stats.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(
+                    f"Observer {self.observer} failed on {event.event_type}: {e}"
+                )
+
+
+def _coalesce_key(event: Event) -> Optional[Hashable]:
+    """Key under which pending events supersede each other (type + constellation + task)."""
+    constellation_id = getattr(event, "constellation_id", None)
+    if constellation_id is None and isinstance(event.data, dict):
+        constellation_id = event.data.get("constellation_id")
+    if constellation_id is None:
+        return None
+    return (event.event_type, constellation_id, getattr(event, "task_id", None))
+
+
 class EventBus(IEventPublisher):
     """
     Central event bus for Galaxy framework.
 
     Implements the event publishing system that manages observer
     subscriptions and distributes events throughout the Galaxy system.
+
+    In INLINE mode (default) publish_event awaits all observers. In QUEUED
+    mode every observer gets a bounded queue and a worker task, so a slow
+    observer only delays itself; what happens when its queue is full is
+    chosen per observer with an OverflowPolicy.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        dispatch_mode: DispatchMode = DispatchMode.INLINE,
+        max_queue_size: int = 1000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
         """
         Initialize the event bus.
 
         Sets up observer collections and logger for managing
         event subscriptions and notifications.
 
+        :param dispatch_mode: INLINE or QUEUED delivery
+        :param max_queue_size: Default per-observer queue bound (QUEUED mode)
+        :param overflow_policy: Default overflow policy (QUEUED mode)
         :return: None
         """
         self._observers: Dict[EventType, Set[IEventObserver]] = {}
         self._all_observers: Set[IEventObserver] = set()
+        self._dispatch_mode = dispatch_mode
+        self._default_queue_size = max_queue_size
+        self._default_overflow_policy = overflow_policy
+        self._subscriptions: Dict[IEventObserver, _Subscription] = {}
+        # Precomputed event type -> subscriptions, rebuilt on (un)subscribe
+        self._dispatch_table: Dict[
+            Optional[EventType], Tuple[_Subscription, ...]
+        ] = {}
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def dispatch_mode(self) -> DispatchMode:
+        """Get the dispatch mode."""
+        return self._dispatch_mode
+
     def subscribe(
-        self, observer: IEventObserver, event_types: Set[EventType] = None
+        self,
+        observer: IEventObserver,
+        event_types: Set[EventType] = None,
+        max_queue_size: Optional[int] = None,
+        overflow_policy: Optional[OverflowPolicy] = None,
     ) -> None:
         """
         Subscribe an observer to specific event types or all events.
@@ -225,6 +401,8 @@ class EventBus(IEventPublisher):
 
         :param observer: The observer object that will handle events
         :param event_types: Set of event types to subscribe to, None for all events
+        :param max_queue_size: Queue bound for this observer (QUEUED mode)
+        :param overflow_policy: Overflow policy for this observer (QUEUED mode)
         :return: None
         """
         if event_types is None:
@@ -235,10 +413,25 @@ class EventBus(IEventPublisher):
                 if event_type not in self._observers:
                     self._observers[event_type] = set()
                 self._observers[event_type].add(observer)
-                self.logger.info(
+                self.logger.debug(
                     f"Observer {observer} subscribed to event type {event_type}."
                 )
 
+        subscription = self._subscriptions.get(observer)
+        if subscription is None:
+            subscription = _Subscription(
+                observer=observer,
+                max_queue_size=max_queue_size or self._default_queue_size,
+                overflow_policy=overflow_policy or self._default_overflow_policy,
+            )
+            self._subscriptions[observer] = subscription
+        else:
+            if max_queue_size is not None:
+                subscription.max_queue_size = max_queue_size
+            if overflow_policy is not None:
+                subscription.overflow_policy = overflow_policy
+        self._rebuild_dispatch_table()
+
     def unsubscribe(self, observer: IEventObserver) -> None:
         """
         Unsubscribe an observer from all events.
@@ -253,34 +446,114 @@ class EventBus(IEventPublisher):
         for observers in self._observers.values():
             observers.discard(observer)
 
+        subscription = self._subscriptions.pop(observer, None)
+        if subscription is not None and subscription.worker is not None:
+            subscription.worker.cancel()
+        self._rebuild_dispatch_table()
+
     async def publish_event(self, event: Event) -> None:
         """
         Publish an event to all relevant subscribers.
 
         Distributes the event to observers subscribed to the specific event type
         and to observers subscribed to all events, executing notifications concurrently.
+        In QUEUED mode the event is only enqueued for each observer.
 
         :param event: The event object to publish to subscribers
         :return: None
         """
-        observers_to_notify: Set[IEventObserver] = set()
+        subscriptions = self._dispatch_table.get(event.event_type)
+        if subscriptions is None:
+            subscriptions = self._dispatch_table.get(None, ())
 
-        self.logger.info(f"Publishing event: {event.event_type} from {event.source_id}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                f"Publishing event: {event.event_type} from {event.source_id}"
+            )
 
-        # Add observers subscribed to this specific event type
-        if event.event_type in self._observers:
-            observers_to_notify.update(self._observers[event.event_type])
+        if not subscriptions:
+            return
 
-        # Add observers subscribed to all events
-        observers_to_notify.update(self._all_observers)
+        if self._dispatch_mode == DispatchMode.QUEUED:
+            for subscription in subscriptions:
+                subscription.ensure_worker(self.logger)
+                await subscription.put(event)
+            return
 
         # Notify all observers concurrently
-        if observers_to_notify:
-            tasks = [observer.on_event(event) for observer in observers_to_notify]
-            try:
-                await asyncio.gather(*tasks, return_exceptions=True)
-            except Exception as e:
-                self.logger.error(f"Error notifying observers: {e}")
+        tasks = [
+            subscription.observer.on_event(event) for subscription in subscriptions
+        ]
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except Exception as e:
+            self.logger.error(f"Error notifying observers: {e}")
+
+    async def drain(self) -> None:
+        """
+        Wait until every queued observer has handled its pending events.
+
+        No-op in INLINE mode.
+
+        :return: None
+        """
+        for subscription in list(self._subscriptions.values()):
+            if subscription.worker is not None and not subscription.worker.done():
+                await subscription.idle.wait()
+
+    async def shutdown(self) -> None:
+        """
+        Drain the queues and stop all observer workers.
+
+        :return: None
+        """
+        await self.drain()
+        workers = [
+            subscription.worker
+            for subscription in self._subscriptions.values()
+            if subscription.worker is not None
+        ]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for subscription in self._subscriptions.values():
+            subscription.worker = None
+
+    def get_observer_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-observer queue statistics.
+
+        :return: Dictionary keyed by observer repr with lag, depth and counters
+        """
+        stats = {}
+        for observer, subscription in self._subscriptions.items():
+            stats[repr(observer)] = {
+                "overflow_policy": subscription.overflow_policy.value,
+                "max_queue_size": subscription.max_queue_size,
+                "queue_depth": len(subscription.queue),
+                "lag_seconds": subscription.lag_seconds(),
+                **subscription.stats.__dict__,
+            }
+        return stats
+
+    def _rebuild_dispatch_table(self) -> None:
+        """Precompute the deduplicated subscriptions for every event type."""
+        all_subscriptions = [
+            self._subscriptions[observer]
+            for observer in self._all_observers
+            if observer in self._subscriptions
+        ]
+        table: Dict[Optional[EventType], Tuple[_Subscription, ...]] = {
+            None: tuple(all_subscriptions)
+        }
+        for event_type, observers in self._observers.items():
+            subscriptions = list(all_subscriptions)
+            for observer in observers:
+                subscription = self._subscriptions.get(observer)
+                if subscription is not None and observer not in self._all_observers:
+                    subscriptions.append(subscription)
+            table[event_type] = tuple(subscriptions)
+        self._dispatch_table = table
 
 
 # Global event bus instance
@@ -82,6 +82,13 @@ Examples:
         help="Launch Web UI interface on http://localhost:8000",
     )
 
+    parser.add_argument(
+        "--webui-stream",
+        dest="webui_stream",
+        action="store_true",
+        help="Stream coalesced event frames and constellation deltas to the Web UI",
+    )
+
     # Session configuration
     parser.add_argument(
         "--session-name", dest="session_name", help="Custom name for the Galaxy session"
@@ -226,6 +233,10 @@ async def main():
 
         # WebUI mode
         if args.webui:
+            if args.webui_stream:
+                from galaxy.webui.server import set_websocket_streaming
+
+                set_websocket_streaming(True)
             await run_webui_mode(client)
 
         # Demo mode
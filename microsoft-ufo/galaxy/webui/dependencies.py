@@ -45,6 +45,10 @@ class AppState:
         # Counter for generating unique task names in Web UI mode
         self._request_counter: int = 0
 
+        # Streaming options for the WebSocket observer created at startup
+        self.websocket_streaming: bool = False
+        self.websocket_frame_interval_ms: int = 50
+
     @property
     def websocket_observer(self) -> Optional[WebSocketObserver]:
         """
@@ -30,6 +30,58 @@ export interface GalaxyEvent {
   task_name?: string;
 }
 
+// Streaming mode: constellations arrive as a snapshot followed by JSON-patch deltas
+interface PatchOperation {
+  op: 'add' | 'replace' | 'remove';
+  path: string;
+  value?: any;
+}
+
+interface ConstellationPatch {
+  constellation_id: string;
+  base_version: number;
+  version: number;
+  ops: PatchOperation[];
+}
+
+interface ConstellationSnapshot {
+  type: 'constellation_snapshot';
+  constellation_id: string;
+  version: number;
+  constellation: any;
+}
+
+interface EventFrame {
+  type: 'event_frame';
+  seq: number;
+  snapshots: ConstellationSnapshot[];
+  patches: ConstellationPatch[];
+  events: GalaxyEvent[];
+}
+
+const applyPatchOperation = (document: any, operation: PatchOperation) => {
+  const segments = operation.path
+    .split('/')
+    .slice(1)
+    .map((segment) => segment.replace(/~1/g, '/').replace(/~0/g, '~'));
+  const key = segments.pop();
+  if (key === undefined) {
+    return;
+  }
+  let target = document;
+  for (const segment of segments) {
+    if (target[segment] === undefined) {
+      target[segment] = {};
+    }
+    target = target[segment];
+  }
+  if (operation.op === 'remove') {
+    delete target[key];
+  } else {
+    target[key] = operation.value;
+  }
+};
+
 export type EventCallback = (event: GalaxyEvent) => void;
 export type StatusCallback = (status: 'connecting' | 'connected' | 'disconnected' | 'reconnecting') => void;
 
@@ -42,6 +94,8 @@ export class WebSocketClient {
   private eventCallbacks: Set<EventCallback> = new Set();
   private isIntentionalClose = false;
   private statusCallbacks: Set<StatusCallback> = new Set();
+  private constellations: Map<string, { version: number; document: any }> = new Map();
+  private resyncing: Set<string> = new Set();
 
   constructor(url?: string) {
     // Auto-detect WebSocket URL based on current location
@@ -63,6 +117,9 @@ export class WebSocketClient {
 
         this.ws.onopen = () => {
           console.log('🌌 Connected to Galaxy WebSocket');
+          // The server sends fresh snapshots to every new connection
+          this.constellations.clear();
+          this.resyncing.clear();
           this.reconnectAttempts = 0;
            this.notifyStatus('connected');
           resolve();
@@ -71,10 +128,18 @@ export class WebSocketClient {
         this.ws.onmessage = (event) => {
           try {
             console.log('📨 Raw WebSocket message received:', event.data);
-            const data: GalaxyEvent = JSON.parse(event.data);
+            const data = JSON.parse(event.data);
+            if (data.type === 'constellation_snapshot') {
+              this.applySnapshot(data as ConstellationSnapshot);
+              return;
+            }
+            if (data.type === 'event_frame') {
+              this.handleFrame(data as EventFrame);
+              return;
+            }
             console.log('📦 Parsed event data:', data);
             console.log('🔔 Notifying', this.eventCallbacks.size, 'callbacks');
-            this.notifyCallbacks(data);
+            this.notifyCallbacks(data as GalaxyEvent);
           } catch (error) {
             console.error('Failed to parse WebSocket message:', error);
           }
@@ -171,6 +236,74 @@ export class WebSocketClient {
     };
   }
 
+  private applySnapshot(snapshot: ConstellationSnapshot) {
+    this.resyncing.delete(snapshot.constellation_id);
+    this.constellations.set(snapshot.constellation_id, {
+      version: snapshot.version,
+      document: snapshot.constellation,
+    });
+  }
+
+  private applyPatch(patch: ConstellationPatch) {
+    const entry = this.constellations.get(patch.constellation_id);
+    if (!entry) {
+      console.warn(`No snapshot for constellation ${patch.constellation_id}, dropping patch`);
+      return;
+    }
+    if (entry.version >= patch.version) {
+      // Already contained in a snapshot received after joining
+      return;
+    }
+    if (entry.version !== patch.base_version) {
+      console.warn(
+        `Constellation ${patch.constellation_id} is at version ${entry.version}, patch expects ${patch.base_version}; requesting snapshot`,
+      );
+      this.requestSnapshot(patch.constellation_id);
+      return;
+    }
+    patch.ops.forEach((operation) => applyPatchOperation(entry.document, operation));
+    entry.version = patch.version;
+  }
+
+  private requestSnapshot(constellationId: string) {
+    // Drop the diverged copy; later patches are ignored until the snapshot arrives
+    this.constellations.delete(constellationId);
+    if (this.resyncing.has(constellationId)) {
+      return;
+    }
+    this.resyncing.add(constellationId);
+    this.send({
+      type: 'request_snapshot',
+      constellation_id: constellationId,
+      timestamp: Date.now(),
+    });
+  }
+
+  private resolveConstellationRefs(value: any): any {
+    if (Array.isArray(value)) {
+      return value.map((item) => this.resolveConstellationRefs(item));
+    }
+    if (value && typeof value === 'object') {
+      const ref = value['$constellation_ref'];
+      if (typeof ref === 'string') {
+        const entry = this.constellations.get(ref);
+        return entry ? structuredClone(entry.document) : { constellation_id: ref };
+      }
+      const resolved: Record<string, any> = {};
+      Object.entries(value).forEach(([key, item]) => {
+        resolved[key] = this.resolveConstellationRefs(item);
+      });
+      return resolved;
+    }
+    return value;
+  }
+
+  private handleFrame(frame: EventFrame) {
+    frame.snapshots.forEach((snapshot) => this.applySnapshot(snapshot));
+    frame.patches.forEach((patch) => this.applyPatch(patch));
+    frame.events.forEach((event) => this.notifyCallbacks(this.resolveConstellationRefs(event)));
+  }
+
   private notifyCallbacks(event: GalaxyEvent) {
     console.log('🎯 notifyCallbacks called with event:', event.event_type);
     console.log('📋 Number of registered callbacks:', this.eventCallbacks.size);
@@ -60,6 +60,8 @@ class WebSocketMessageHandler:
             await self._handle_next_session(websocket, data)
         elif message_type == WebSocketMessageType.STOP_TASK:
             await self._handle_stop_task(websocket, data)
+        elif message_type == WebSocketMessageType.REQUEST_SNAPSHOT:
+            await self._handle_request_snapshot(websocket, data)
         else:
             await self._handle_unknown(websocket, message_type)
 
@@ -265,6 +267,22 @@ class WebSocketMessageHandler:
                 }
             )
 
+    async def _handle_request_snapshot(self, websocket: WebSocket, data: dict) -> None:
+        """
+        Handle a streaming client's request to resynchronize a constellation.
+
+        Sent when a patch does not apply to the client's copy; the observer
+        answers with a fresh constellation snapshot.
+
+        :param websocket: The WebSocket connection
+        :param data: The message data, optionally with a constellation_id
+        """
+        websocket_observer = self.app_state.websocket_observer
+        if websocket_observer:
+            await websocket_observer.request_snapshot(
+                websocket, data.get("constellation_id")
+            )
+
     async def _handle_unknown(self, websocket: WebSocket, message_type: str) -> None:
         """
         Handle unknown message types.
@@ -24,6 +24,7 @@ class WebSocketMessageType(str, Enum):
     RESET = "reset"
     NEXT_SESSION = "next_session"
     STOP_TASK = "stop_task"
+    REQUEST_SNAPSHOT = "request_snapshot"
 
     # Server -> Client messages
     PONG = "pong"
@@ -54,7 +54,10 @@ async def lifespan(app: FastAPI):
     app_state = get_app_state()
 
     # Create and register WebSocket observer with event bus
-    websocket_observer = WebSocketObserver()
+    websocket_observer = WebSocketObserver(
+        streaming=app_state.websocket_streaming,
+        frame_interval_ms=app_state.websocket_frame_interval_ms,
+    )
     app_state.websocket_observer = websocket_observer
 
     event_bus = get_event_bus()
@@ -72,6 +75,8 @@ async def lifespan(app: FastAPI):
     logger.info("👋 Shutting down Galaxy Web UI Server")
     print("👋 Shutting down Galaxy Web UI Server")
     event_bus.unsubscribe(websocket_observer)
+    if websocket_observer.streaming:
+        await websocket_observer.flush()
 
 
 # Create FastAPI app with lifespan management
@@ -173,6 +178,22 @@ def set_galaxy_client(client: "GalaxyClient") -> None:
     app_state.galaxy_client = client
 
 
+def set_websocket_streaming(enabled: bool = True, frame_interval_ms: int = 50) -> None:
+    """
+    Configure streaming mode for the WebSocket observer.
+
+    In streaming mode events are coalesced into frames sent at most every
+    ``frame_interval_ms`` and constellations are sent as one snapshot
+    followed by JSON-patch deltas. Must be called before the server starts.
+
+    :param enabled: Whether to enable streaming mode
+    :param frame_interval_ms: Minimum interval between two frames
+    """
+    app_state = get_app_state()
+    app_state.websocket_streaming = enabled
+    app_state.websocket_frame_interval_ms = frame_interval_ms
+
+
 def start_server(host: str = "0.0.0.0", port: int = 8000) -> None:
     """
     Start the Galaxy Web UI server.
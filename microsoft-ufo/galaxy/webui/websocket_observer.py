@@ -6,11 +6,24 @@ WebSocket Observer for Galaxy Web UI.
 
 This observer subscribes to all Galaxy events and pushes them to connected WebSocket clients.
 Provides efficient event serialization and broadcasting capabilities.
+
+Two delivery modes are supported:
+- Per-event (default): every event is sent as one JSON message, with any
+  constellation payload serialized in full.
+- Streaming: events are coalesced into frames sent at most every
+  ``frame_interval_ms``; each constellation is sent once as a snapshot and
+  afterwards as JSON-patch (RFC 6902) deltas, while events only carry a
+  ``{"$constellation_ref": id}`` reference to it.
 """
 
+import asyncio
+import copy
+import json
 import logging
+import time
 from dataclasses import asdict, is_dataclass
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Any, Callable, Dict, List, Optional, Set, Type
 
 from fastapi import WebSocket
@@ -20,9 +33,11 @@ from galaxy.core.events import (
     ConstellationEvent,
     DeviceEvent,
     Event,
+    EventType,
     IEventObserver,
     TaskEvent,
 )
+from galaxy.visualization.change_detector import VisualizationChangeDetector
 
 
 class EventSerializer:
@@ -364,21 +379,370 @@ class EventSerializer:
         return dt.isoformat() if dt is not None else None
 
 
+def _json_pointer(*parts: str) -> str:
+    """
+    Build an RFC 6901 JSON pointer from path segments.
+
+    :param parts: Unescaped path segments
+    :return: JSON pointer string
+    """
+    return "".join(
+        "/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts
+    )
+
+
+def _shallow_snapshot(obj: Any) -> Any:
+    """
+    Copy an object together with its first-level containers.
+
+    Attribute reassignment on the live object is then invisible to the copy,
+    and so is in-place mutation of its lists, dicts and sets.
+
+    :param obj: Object to copy
+    :return: Detached shallow copy
+    """
+    snapshot = copy.copy(obj)
+    for attr, value in vars(snapshot).items():
+        if isinstance(value, (dict, list, set)):
+            setattr(snapshot, attr, copy.copy(value))
+    return snapshot
+
+
+class StreamingEventSerializer(EventSerializer):
+    """
+    Event serializer used by the streaming mode of the WebSocket observer.
+
+    Live constellations are not serialized into the event; they are replaced
+    by a ``{"$constellation_ref": id}`` marker and reported through a
+    callback so that the observer can stream them as snapshot + deltas.
+    Values stored under historical keys (e.g. ``old_constellation``) are
+    point-in-time copies and are still serialized in full.
+    """
+
+    HISTORICAL_KEYS = frozenset({"old_constellation"})
+
+    def __init__(self, on_constellation: Callable[[Any], None]) -> None:
+        """
+        Initialize the streaming serializer.
+
+        :param on_constellation: Called with every live constellation referenced by an event
+        """
+        self._on_constellation = on_constellation
+        super().__init__()
+
+    def _register_handlers(self) -> None:
+        """Register handlers, routing live constellations to references."""
+        super()._register_handlers()
+        task_constellation_type = self._cached_types.get("TaskConstellation")
+        if task_constellation_type:
+            self._type_handlers[task_constellation_type] = self._reference_constellation
+
+    def serialize_value(self, value: Any) -> Any:
+        """
+        Serialize a value, keeping historical constellations in full.
+
+        :param value: The value to serialize
+        :return: JSON-serializable value
+        """
+        if isinstance(value, dict) and not self.HISTORICAL_KEYS.isdisjoint(value):
+            return {
+                k: (
+                    self.serialize_full(v)
+                    if k in self.HISTORICAL_KEYS
+                    else self.serialize_value(v)
+                )
+                for k, v in value.items()
+            }
+        return super().serialize_value(value)
+
+    def serialize_full(self, value: Any) -> Any:
+        """
+        Serialize a value without replacing constellations by references.
+
+        :param value: The value to serialize
+        :return: JSON-serializable value
+        """
+        task_constellation_type = self._cached_types.get("TaskConstellation")
+        if task_constellation_type and isinstance(value, task_constellation_type):
+            return self._serialize_constellation(value)
+        return self.serialize_value(value)
+
+    def _reference_constellation(self, value: Any) -> Dict[str, Any]:
+        """
+        Replace a live constellation by a stream reference.
+
+        :param value: TaskConstellation instance
+        :return: Reference marker resolved by the client
+        """
+        self._on_constellation(value)
+        return {"$constellation_ref": value.constellation_id}
+
+
+class ConstellationStream:
+    """
+    Snapshot and JSON-patch state of one constellation in streaming mode.
+
+    The stream keeps the document last sent to clients together with a
+    detached shadow copy of the constellation. On each frame the shadow is
+    compared to the live constellation with VisualizationChangeDetector and
+    only added or modified tasks are serialized again.
+    """
+
+    def __init__(self, serializer: EventSerializer, constellation: Any) -> None:
+        """
+        Initialize the stream from a first snapshot of the constellation.
+
+        :param serializer: Serializer used for full snapshots and single tasks
+        :param constellation: Live TaskConstellation instance
+        """
+        self._serializer = serializer
+        self.constellation_id: str = constellation.constellation_id
+        self.constellation: Any = constellation
+        self.version: int = 1
+        document = serializer._serialize_constellation(constellation)
+        if not isinstance(document, dict):
+            raise ValueError(f"Cannot snapshot constellation {self.constellation_id}")
+        self.document: Dict[str, Any] = document
+        self._snapshot_text: Optional[str] = None
+        self._task_sources: Dict[str, Any] = {}
+        self._shadow = SimpleNamespace(tasks={}, dependencies={})
+        self._take_shadow(constellation.tasks, constellation.dependencies)
+
+    def _take_shadow(self, tasks: Dict[str, Any], dependencies: Dict[str, Any]) -> None:
+        """
+        Copy the given tasks and dependencies into the shadow constellation.
+
+        :param tasks: Tasks to (re)copy, keyed by task ID
+        :param dependencies: Dependencies to (re)copy, keyed by line ID
+        """
+        for task_id, task in tasks.items():
+            self._shadow.tasks[task_id] = _shallow_snapshot(task)
+            self._task_sources[task_id] = task
+        for line_id, dependency in dependencies.items():
+            self._shadow.dependencies[line_id] = _shallow_snapshot(dependency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the snapshot message for the current version.
+
+        :return: Snapshot message
+        """
+        return {
+            "type": "constellation_snapshot",
+            "constellation_id": self.constellation_id,
+            "version": self.version,
+            "constellation": self.document,
+        }
+
+    def snapshot_message(self) -> str:
+        """
+        Get the encoded snapshot message for the current version.
+
+        :return: JSON text, cached until the next change
+        """
+        if self._snapshot_text is None:
+            self._snapshot_text = _dump_json(self.snapshot())
+        return self._snapshot_text
+
+    def compute_patch(self) -> Optional[Dict[str, Any]]:
+        """
+        Diff the live constellation against the last sent document.
+
+        :return: Patch entry with base/new version and operations, or None if unchanged
+        """
+        live = self.constellation
+        changes = VisualizationChangeDetector.calculate_constellation_changes(
+            self._shadow, live
+        )
+        live_tasks = live.tasks
+
+        # Replaced task objects carry no detectable property change
+        changed_tasks = set(changes["added_tasks"]) | set(changes["modified_tasks"])
+        for task_id, task in live_tasks.items():
+            if self._task_sources.get(task_id, task) is not task:
+                changed_tasks.add(task_id)
+
+        ops: List[Dict[str, Any]] = []
+        doc_tasks = self.document.setdefault("tasks", {})
+        for task_id in changes["removed_tasks"]:
+            self._shadow.tasks.pop(task_id, None)
+            self._task_sources.pop(task_id, None)
+            if doc_tasks.pop(task_id, None) is not None:
+                ops.append({"op": "remove", "path": _json_pointer("tasks", task_id)})
+
+        if changed_tasks:
+            serialized = self._serializer._serialize_constellation_tasks(
+                {task_id: live_tasks[task_id] for task_id in changed_tasks}
+            )
+            for task_id, value in serialized.items():
+                previous = doc_tasks.get(task_id)
+                if previous == value:
+                    continue
+                ops.append(
+                    {
+                        "op": "add" if previous is None else "replace",
+                        "path": _json_pointer("tasks", task_id),
+                        "value": value,
+                    }
+                )
+                doc_tasks[task_id] = value
+
+        dependency_changes = (
+            changes["added_dependencies"]
+            or changes["removed_dependencies"]
+            or changes["modified_dependencies"]
+            or len(self._shadow.dependencies) != len(live.dependencies)
+        )
+        if dependency_changes:
+            ops.extend(self._diff_dependencies(live.dependencies))
+            self._shadow.dependencies = {}
+            self._take_shadow({}, live.dependencies)
+
+        if changed_tasks:
+            self._take_shadow(
+                {task_id: live_tasks[task_id] for task_id in changed_tasks}, {}
+            )
+
+        ops.extend(self._diff_fields(live))
+
+        if not ops:
+            return None
+
+        base_version = self.version
+        self.version += 1
+        self._snapshot_text = None
+        return {
+            "constellation_id": self.constellation_id,
+            "base_version": base_version,
+            "version": self.version,
+            "ops": ops,
+        }
+
+    def _diff_dependencies(self, dependencies: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Patch the child -> parents mapping of the document.
+
+        :param dependencies: Live dependencies keyed by line ID
+        :return: Patch operations
+        """
+        ops: List[Dict[str, Any]] = []
+        current = self._serializer._serialize_dependencies(dependencies)
+        doc_deps = self.document.setdefault("dependencies", {})
+        for child_id in list(doc_deps):
+            if child_id not in current:
+                del doc_deps[child_id]
+                ops.append(
+                    {"op": "remove", "path": _json_pointer("dependencies", child_id)}
+                )
+        for child_id, parents in current.items():
+            previous = doc_deps.get(child_id)
+            if previous == parents:
+                continue
+            ops.append(
+                {
+                    "op": "add" if previous is None else "replace",
+                    "path": _json_pointer("dependencies", child_id),
+                    "value": parents,
+                }
+            )
+            doc_deps[child_id] = parents
+        return ops
+
+    def _diff_fields(self, live: Any) -> List[Dict[str, Any]]:
+        """
+        Patch the top-level constellation fields that are cheap to recompute.
+
+        :param live: Live TaskConstellation instance
+        :return: Patch operations
+        """
+        serializer = self._serializer
+        fields = {
+            "name": live.name,
+            "state": serializer._extract_enum_value(live.state),
+            "metadata": serializer.serialize_value(getattr(live, "metadata", {})),
+        }
+        if "statistics" in self.document:
+            try:
+                fields["statistics"] = live.get_statistics()
+            except Exception as e:
+                serializer.logger.warning(f"Failed to get constellation statistics: {e}")
+
+        ops: List[Dict[str, Any]] = []
+        for key, value in fields.items():
+            if self.document.get(key) != value:
+                ops.append(
+                    {
+                        "op": "add" if key not in self.document else "replace",
+                        "path": _json_pointer(key),
+                        "value": value,
+                    }
+                )
+                self.document[key] = value
+        return ops
+
+
+def _dump_json(data: Any) -> str:
+    """
+    Encode a message the way Starlette's ``send_json`` does.
+
+    :param data: JSON-serializable message
+    :return: Compact JSON text
+    """
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
 class WebSocketObserver(IEventObserver):
     """
     Observer that forwards all Galaxy events to WebSocket clients.
 
     This observer maintains a set of active WebSocket connections and
-    broadcasts events to all connected clients in real-time.
+    broadcasts events to all connected clients in real-time. Each message is
+    encoded once and the same text is sent to every connection.
+
+    In streaming mode, events are coalesced into ``event_frame`` messages sent
+    at most every ``frame_interval_ms`` milliseconds, and constellations are
+    sent as one snapshot followed by JSON-patch deltas. A constellation stops
+    being tracked once it completes or fails, and all streams are dropped when
+    the last client disconnects; a later event re-sends a fresh snapshot.
     """
 
-    def __init__(self) -> None:
-        """Initialize the WebSocket observer."""
+    FINISHED_EVENTS = frozenset(
+        {EventType.CONSTELLATION_COMPLETED, EventType.CONSTELLATION_FAILED}
+    )
+
+    def __init__(self, streaming: bool = False, frame_interval_ms: int = 50) -> None:
+        """
+        Initialize the WebSocket observer.
+
+        :param streaming: Enable coalesced frames with snapshot + delta constellations
+        :param frame_interval_ms: Minimum interval between two frames in streaming mode
+        """
         self.logger: logging.Logger = logging.getLogger(__name__)
         self._connections: Set[WebSocket] = set()
         self._event_count: int = 0
         self._serializer: EventSerializer = EventSerializer()
 
+        self._streaming: bool = streaming
+        self._frame_interval: float = max(frame_interval_ms, 0) / 1000.0
+        self._stream_serializer: StreamingEventSerializer = StreamingEventSerializer(
+            self._track_constellation
+        )
+        self._streams: Dict[str, ConstellationStream] = {}
+        self._new_constellations: Dict[str, Any] = {}
+        self._dirty_streams: Set[str] = set()
+        self._finished_streams: Set[str] = set()
+        self._pending_events: List[Dict[str, Any]] = []
+        self._needs_snapshot: Set[WebSocket] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._last_flush: float = 0.0
+        self._frame_seq: int = 0
+
+    @property
+    def streaming(self) -> bool:
+        """Whether the observer streams coalesced frames and constellation deltas."""
+        return self._streaming
+
     async def on_event(self, event: Event) -> None:
         """
         Handle an event by broadcasting to all WebSocket clients.
@@ -388,6 +752,18 @@ class WebSocketObserver(IEventObserver):
         try:
             self._event_count += 1
 
+            if self._streaming:
+                self._pending_events.append(
+                    self._stream_serializer.serialize_event(event)
+                )
+                if (
+                    isinstance(event, ConstellationEvent)
+                    and event.event_type in self.FINISHED_EVENTS
+                ):
+                    self._finished_streams.add(event.constellation_id)
+                self._schedule_flush()
+                return
+
             # Convert event to JSON-serializable format using the serializer
             event_data: Dict[str, Any] = self._serializer.serialize_event(event)
 
@@ -395,23 +771,159 @@ class WebSocketObserver(IEventObserver):
                 f"Broadcasting event #{self._event_count}: {event.event_type.value} to {len(self._connections)} clients"
             )
 
-            # Broadcast to all connected clients
-            disconnected: Set[WebSocket] = set()
-            for connection in self._connections:
+            await self._broadcast(_dump_json(event_data), list(self._connections))
+
+        except Exception as e:
+            self.logger.error(f"Error broadcasting event: {e}")
+
+    async def _broadcast(self, message: str, connections: List[WebSocket]) -> None:
+        """
+        Send already encoded text to the given connections concurrently.
+
+        :param message: JSON text to send
+        :param connections: Target WebSocket connections
+        """
+        if not connections:
+            return
+
+        results = await asyncio.gather(
+            *(connection.send_text(message) for connection in connections),
+            return_exceptions=True,
+        )
+
+        # Remove disconnected clients
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.logger.warning(
+                    f"Failed to send event to client: {result}, marking for removal"
+                )
+                self._connections.discard(connection)
+                self._needs_snapshot.discard(connection)
+
+        if not self._connections:
+            self._drop_streams()
+
+    def _track_constellation(self, constellation: Any) -> None:
+        """
+        Register a live constellation referenced by an event.
+
+        New constellations are snapshotted when the frame is flushed, so that
+        the snapshot already reflects every event coalesced into that frame.
+
+        :param constellation: TaskConstellation instance
+        """
+        constellation_id = constellation.constellation_id
+        stream = self._streams.get(constellation_id)
+        if stream is None:
+            self._new_constellations[constellation_id] = constellation
+            return
+
+        # A reloaded constellation keeps its ID; diff against the new object
+        stream.constellation = constellation
+        self._dirty_streams.add(constellation_id)
+
+    def _schedule_flush(self) -> None:
+        """Schedule the next frame, honoring the minimum frame interval."""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        delay = max(0.0, self._last_flush + self._frame_interval - time.monotonic())
+        self._flush_task = loop.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float) -> None:
+        """
+        Wait for the frame interval to elapse, then flush.
+
+        :param delay: Seconds to wait
+        """
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Send pending snapshots, constellation deltas and events as one frame.
+
+        Called automatically in streaming mode; may be awaited directly to
+        push out the current frame immediately.
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            self._last_flush = time.monotonic()
+
+            # Everything below up to the first await runs atomically
+            new_streams = []
+            for constellation in self._new_constellations.values():
+                try:
+                    stream = ConstellationStream(self._serializer, constellation)
+                except Exception as e:
+                    self.logger.warning(f"Failed to snapshot constellation: {e}")
+                    continue
+                self._streams[stream.constellation_id] = stream
+                new_streams.append(stream)
+            self._new_constellations.clear()
+
+            patches = []
+            for constellation_id in self._dirty_streams:
+                stream = self._streams.get(constellation_id)
+                if stream is None:
+                    continue
                 try:
-                    await connection.send_json(event_data)
-                    self.logger.debug(f"Successfully sent event to client")
+                    patch = stream.compute_patch()
                 except Exception as e:
                     self.logger.warning(
-                        f"Failed to send event to client: {e}, marking for removal"
+                        f"Failed to diff constellation {constellation_id}: {e}"
                     )
-                    disconnected.add(connection)
-
-            # Remove disconnected clients
-            self._connections -= disconnected
-
-        except Exception as e:
-            self.logger.error(f"Error broadcasting event: {e}")
+                    patch = None
+                if patch:
+                    patches.append(patch)
+            self._dirty_streams.clear()
+
+            events, self._pending_events = self._pending_events, []
+
+            late_joiners = [c for c in self._needs_snapshot if c in self._connections]
+            self._needs_snapshot.clear()
+            snapshot_messages = [
+                stream.snapshot_message()
+                for stream in self._streams.values()
+                if stream not in new_streams
+            ]
+
+            # Finished constellations get their final patch in this frame
+            for constellation_id in self._finished_streams:
+                self._streams.pop(constellation_id, None)
+            self._finished_streams.clear()
+
+            frame_text: Optional[str] = None
+            if new_streams or patches or events:
+                self._frame_seq += 1
+                frame_text = _dump_json(
+                    {
+                        "type": "event_frame",
+                        "seq": self._frame_seq,
+                        "snapshots": [stream.snapshot() for stream in new_streams],
+                        "patches": patches,
+                        "events": events,
+                    }
+                )
+
+            # Late joiners get the current documents; the frame's patches
+            # are then already applied and the client skips them by version
+            for message in snapshot_messages:
+                await self._broadcast(message, late_joiners)
+
+            if frame_text is not None:
+                self.logger.debug(
+                    f"Broadcasting frame #{self._frame_seq} ({len(events)} events, {len(patches)} patches) to {len(self._connections)} clients"
+                )
+                await self._broadcast(frame_text, list(self._connections))
 
     def add_connection(self, websocket: WebSocket) -> None:
         """
@@ -420,6 +932,10 @@ class WebSocketObserver(IEventObserver):
         :param websocket: The WebSocket connection to add
         """
         self._connections.add(websocket)
+        if self._streaming:
+            self._needs_snapshot.add(websocket)
+            if self._streams or self._new_constellations:
+                self._schedule_flush()
         self.logger.info(
             f"WebSocket client connected. Total connections: {len(self._connections)}"
         )
@@ -431,10 +947,54 @@ class WebSocketObserver(IEventObserver):
         :param websocket: The WebSocket connection to remove
         """
         self._connections.discard(websocket)
+        self._needs_snapshot.discard(websocket)
+        if not self._connections:
+            self._drop_streams()
         self.logger.info(
             f"WebSocket client disconnected. Total connections: {len(self._connections)}"
         )
 
+    async def request_snapshot(
+        self, websocket: WebSocket, constellation_id: Optional[str] = None
+    ) -> None:
+        """
+        Re-send constellation snapshots to a client that lost track of a stream.
+
+        Sent under the flush lock, so the snapshot version is exactly the base
+        of the next patch the client receives.
+
+        :param websocket: The WebSocket connection that asked for a resync
+        :param constellation_id: Constellation to resend, or None for all
+        """
+        if not self._streaming or websocket not in self._connections:
+            return
+
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if constellation_id is None:
+                streams = list(self._streams.values())
+            elif constellation_id in self._streams:
+                streams = [self._streams[constellation_id]]
+            else:
+                # Finished and pruned; the next event referencing it snapshots it again
+                streams = []
+            for stream in streams:
+                await self._broadcast(stream.snapshot_message(), [websocket])
+
+    def _drop_streams(self) -> None:
+        """Forget all constellation streams; the next event re-snapshots them."""
+        self._streams.clear()
+        self._new_constellations.clear()
+        self._dirty_streams.clear()
+        self._finished_streams.clear()
+
+    @property
+    def stream_count(self) -> int:
+        """Get the number of constellations currently streamed as deltas."""
+        return len(self._streams)
+
     @property
     def connection_count(self) -> int:
         """Get the number of active connections."""
@@ -444,3 +1004,8 @@ class WebSocketObserver(IEventObserver):
     def total_events_sent(self) -> int:
         """Get the total number of events sent."""
         return self._event_count
+
+    @property
+    def frames_sent(self) -> int:
+        """Get the number of coalesced frames sent in streaming mode."""
+        return self._frame_seq
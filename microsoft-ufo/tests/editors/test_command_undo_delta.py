@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Tests for delta-based undo/redo of constellation editor commands.
+
+Fine-grained commands record a minimal inverse delta instead of a full
+to_dict() snapshot; undo must bring the constellation back to exactly the
+state it had before the command, including the live TaskStar objects.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from galaxy.constellation.editor import ConstellationEditor
+from galaxy.constellation.editor.commands import (
+    AddDependencyCommand,
+    AddTaskCommand,
+    ClearConstellationCommand,
+    RemoveDependencyCommand,
+    RemoveTaskCommand,
+    UpdateDependencyCommand,
+    UpdateTaskCommand,
+)
+from galaxy.constellation.enums import DependencyType, TaskPriority
+from galaxy.constellation.task_constellation import TaskConstellation
+from galaxy.constellation.task_star import TaskStar
+from galaxy.constellation.task_star_line import TaskStarLine
+
+
+def build_constellation(num_tasks: int = 6) -> TaskConstellation:
+    constellation = TaskConstellation(name="delta")
+    for i in range(num_tasks):
+        constellation.add_task(TaskStar(task_id=f"t{i}", description=f"task {i}"))
+    for i in range(1, num_tasks):
+        constellation.add_dependency(
+            TaskStarLine(f"t{i - 1}", f"t{i}", line_id=f"l{i}")
+        )
+    constellation.add_dependency(TaskStarLine("t0", f"t{num_tasks - 1}", line_id="skip"))
+    return constellation
+
+
+def fingerprint(constellation: TaskConstellation):
+    """Everything undo must restore, independent of dict ordering."""
+    tasks = {
+        task_id: (
+            task.description,
+            task.priority,
+            task.status,
+            frozenset(task._dependencies),
+            frozenset(task._dependents),
+        )
+        for task_id, task in constellation.tasks.items()
+    }
+    dependencies = {
+        line_id: (dep.from_task_id, dep.to_task_id, dep.dependency_type)
+        for line_id, dep in constellation.dependencies.items()
+    }
+    ready = {task.task_id for task in constellation.get_ready_tasks()}
+    return tasks, dependencies, constellation.state, ready
+
+
+@pytest.mark.parametrize(
+    "make_command",
+    [
+        lambda c: AddTaskCommand(c, TaskStar(task_id="new").to_dict()),
+        lambda c: RemoveTaskCommand(c, "t2"),
+        lambda c: RemoveTaskCommand(c, "t0"),
+        lambda c: UpdateTaskCommand(
+            c, "t3", {"description": "changed", "priority": TaskPriority.HIGH}
+        ),
+        lambda c: AddDependencyCommand(
+            c, TaskStarLine("t1", "t4", line_id="extra").to_dict()
+        ),
+        lambda c: RemoveDependencyCommand(c, "l3"),
+        lambda c: UpdateDependencyCommand(
+            c, "l2", {"dependency_type": DependencyType.SUCCESS_ONLY}
+        ),
+    ],
+)
+def test_undo_restores_previous_state(make_command):
+    constellation = build_constellation()
+    before = fingerprint(constellation)
+    objects = dict(constellation.tasks)
+
+    command = make_command(constellation)
+    command.execute()
+    assert fingerprint(constellation) != before
+
+    command.undo()
+    assert fingerprint(constellation) == before
+    # Delta undo re-inserts the original objects
+    assert all(constellation.tasks[tid] is task for tid, task in objects.items())
+
+
+def test_fine_grained_commands_keep_no_snapshot():
+    constellation = build_constellation()
+    command = RemoveTaskCommand(constellation, "t2")
+    command.execute()
+
+    assert command._backup_data is None
+    assert command._inverse_delta["task"] is command._removed_task
+    assert len(command._inverse_delta["dependencies"]) == 2
+
+
+def test_bulk_commands_keep_snapshot():
+    constellation = build_constellation()
+    command = ClearConstellationCommand(constellation)
+    command.execute()
+
+    assert command._backup_data is not None
+    assert len(command._backup_data["tasks"]) == 6
+
+    command.undo()
+    assert set(constellation.tasks) == {f"t{i}" for i in range(6)}
+    assert len(constellation.dependencies) == 6
+
+
+def test_undo_after_task_completion_keeps_dependents_ready():
+    constellation = build_constellation(3)
+    constellation.mark_task_completed("t0", True, "ok")
+    before = fingerprint(constellation)
+
+    command = RemoveDependencyCommand(constellation, "l2")
+    command.execute()
+    command.undo()
+
+    assert fingerprint(constellation) == before
+    assert [t.task_id for t in constellation.get_ready_tasks()] == ["t1"]
+
+
+def test_random_command_sequence_undo_redo():
+    rng = random.Random(7)
+    editor = ConstellationEditor(build_constellation(8))
+    snapshots = [fingerprint(editor.constellation)]
+
+    for step in range(40):
+        task_ids = list(editor.constellation.tasks)
+        dep_ids = list(editor.constellation.dependencies)
+        op = rng.random()
+        try:
+            if op < 0.3 or len(task_ids) < 3:
+                editor.add_task(TaskStar(task_id=f"n{step}"))
+            elif op < 0.5:
+                editor.remove_task(rng.choice(task_ids))
+            elif op < 0.75:
+                source, target = rng.sample(task_ids, 2)
+                editor.add_dependency(TaskStarLine(source, target))
+            elif op < 0.9 and dep_ids:
+                editor.remove_dependency(rng.choice(dep_ids))
+            else:
+                editor.update_task(
+                    rng.choice(task_ids), description=f"step {step}"
+                )
+        except Exception:
+            # Rejected commands (e.g. cycles) must leave the state unchanged
+            assert fingerprint(editor.constellation) == snapshots[-1]
+            continue
+        snapshots.append(fingerprint(editor.constellation))
+
+    for expected in reversed(snapshots[:-1]):
+        assert editor.undo()
+        assert fingerprint(editor.constellation) == expected
+
+    for expected in snapshots[1:]:
+        assert editor.redo()
+        assert fingerprint(editor.constellation) == expected
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Scaling benchmark for TaskConstellation.get_ready_tasks.
+
+Builds a layered DAG (each task depends on up to two tasks of the previous
+layer), then drains it the way the orchestrator does: fetch the ready set,
+complete every ready task, repeat. The indexed ready set is compared with
+the original full scan over all tasks and dependencies.
+
+Usage:
+    python tests/galaxy/constellation/benchmark_ready_set.py [--sizes 100 1000 10000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+UFO_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(UFO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from galaxy.constellation import TaskConstellation, TaskStar, TaskStarLine
+from galaxy.constellation.enums import TaskPriority
+
+from test_ready_set import scan_ready_tasks
+
+
+def build_layered(n: int, width: int = 50, seed: int = 0) -> TaskConstellation:
+    """
+    Build a layered DAG with n tasks and roughly 2n dependencies.
+
+    Loaded through from_dict so that setup is O(V + E) and does not dominate
+    the run at 10k tasks.
+    """
+    rng = random.Random(seed)
+    priorities = list(TaskPriority)
+    tasks = {}
+    dependencies = {}
+    previous = []
+    layer = []
+    for i in range(n):
+        task_id = f"t{i}"
+        task = TaskStar(task_id=task_id, priority=rng.choice(priorities))
+        tasks[task_id] = task.to_dict()
+        for parent in rng.sample(previous, min(2, len(previous))):
+            line = TaskStarLine(parent, task_id)
+            dependencies[line.line_id] = line.to_dict()
+        layer.append(task_id)
+        if len(layer) == width:
+            previous, layer = layer, []
+    return TaskConstellation.from_dict(
+        {"name": f"bench-{n}", "tasks": tasks, "dependencies": dependencies}
+    )
+
+
+def drain(constellation: TaskConstellation, get_ready):
+    """
+    Complete the whole DAG.
+
+    :return: Tuple of (seconds spent in get_ready, number of rounds)
+    """
+    spent = 0.0
+    rounds = 0
+    while True:
+        start = time.perf_counter()
+        ready = get_ready(constellation)
+        spent += time.perf_counter() - start
+        if not ready:
+            return spent, rounds
+        rounds += 1
+        for task_id in ready:
+            constellation.mark_task_completed(task_id, True, "ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ready-set scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--scan-max",
+        type=int,
+        default=1000,
+        help="Largest size for which the O(V*E) full scan is also timed",
+    )
+    args = parser.parse_args()
+
+    print("=" * 64)
+    print(f"{'tasks':>8}{'deps':>8}{'rounds':>8}{'scan (ms)':>18}{'indexed (ms)':>18}")
+    print("-" * 64)
+    for n in args.sizes:
+        indexed = build_layered(n)
+        deps = indexed.dependency_count
+        indexed_s, rounds = drain(
+            indexed, lambda c: [t.task_id for t in c.get_ready_tasks()]
+        )
+        indexed_ms = indexed_s * 1000
+
+        scan_col = "skipped"
+        if n <= args.scan_max:
+            scanned = build_layered(n)
+            scan_ms = drain(scanned, scan_ready_tasks)[0] * 1000
+            scan_col = f"{scan_ms:.1f}"
+
+        print(f"{n:>8}{deps:>8}{rounds:>8}{scan_col:>18}{indexed_ms:>18.1f}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the versioned DAG analytics cache of TaskConstellation.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+UFO_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(UFO_ROOT))
+
+from galaxy.constellation import TaskConstellation, TaskStar, TaskStarLine
+from galaxy.constellation.editor.commands import (
+    AddDependencyCommand,
+    RemoveTaskCommand,
+)
+from galaxy.constellation.enums import TaskStatus
+
+
+@pytest.fixture
+def diamond():
+    """a -> (b, c) -> d"""
+    constellation = TaskConstellation(name="diamond")
+    for task_id in ("a", "b", "c", "d"):
+        constellation.add_task(TaskStar(task_id=task_id, description=task_id))
+    for source, target in (("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")):
+        constellation.add_dependency(
+            TaskStarLine(source, target, line_id=f"{source}->{target}")
+        )
+    return constellation
+
+
+def count_calls(constellation, method_name):
+    """Wrap a _compute_* method and return the list recording its calls."""
+    calls = []
+    original = getattr(constellation, method_name)
+
+    def wrapper():
+        calls.append(1)
+        return original()
+
+    setattr(constellation, method_name, wrapper)
+    return calls
+
+
+def test_structural_metrics_computed_once_per_version(diamond):
+    longest = count_calls(diamond, "_compute_longest_path")
+    width = count_calls(diamond, "_compute_max_width")
+
+    for _ in range(5):
+        diamond.get_statistics()
+        diamond.to_dict()
+
+    assert diamond.get_longest_path() == (3, ["a", "b", "d"])
+    assert diamond.get_max_width() == 2
+    assert len(longest) == 1
+    assert len(width) == 1
+
+
+def test_cached_results_are_copies(diamond):
+    _, path = diamond.get_longest_path()
+    path.append("x")
+    diamond.get_topological_order().clear()
+
+    assert diamond.get_longest_path() == (3, ["a", "b", "d"])
+    assert diamond.get_topological_order() == ["a", "b", "c", "d"]
+
+
+def test_structural_edit_bumps_version(diamond):
+    version = diamond.structure_version
+    assert diamond.get_max_width() == 2
+
+    diamond.add_task(TaskStar(task_id="e"))
+    diamond.add_task(TaskStar(task_id="f"))
+    assert diamond.structure_version > version
+    assert diamond.get_max_width() == 3
+
+    diamond.add_dependency(TaskStarLine("d", "e"))
+    assert diamond.get_longest_path() == (4, ["a", "b", "d", "e"])
+
+
+def test_editor_commands_and_undo_invalidate_cache(diamond):
+    assert diamond.get_longest_path()[0] == 3
+
+    command = RemoveTaskCommand(diamond, "b")
+    command.execute()
+    assert diamond.get_longest_path() == (3, ["a", "c", "d"])
+    assert diamond.get_max_width() == 1
+
+    command.undo()
+    assert diamond.get_max_width() == 2
+
+    AddDependencyCommand(
+        diamond, TaskStarLine("b", "c", line_id="b->c").to_dict()
+    ).execute()
+    assert diamond.get_longest_path() == (4, ["a", "b", "c", "d"])
+
+
+def test_status_changes_only_invalidate_time_weighted_metrics(diamond):
+    longest = count_calls(diamond, "_compute_longest_path")
+    work = count_calls(diamond, "_compute_total_work")
+
+    assert diamond.get_parallelism_metrics()["calculation_mode"] == "node_count"
+    diamond.get_total_work()
+    structure_version = diamond.structure_version
+
+    for task_id in diamond.get_topological_order():
+        diamond.mark_task_completed(task_id, True, "ok")
+
+    assert diamond.structure_version == structure_version
+    metrics = diamond.get_parallelism_metrics()
+    assert metrics["calculation_mode"] == "actual_time"
+    assert diamond.get_total_work() == metrics["total_work"]
+    assert len(work) == 2
+    assert len(longest) == 1
+
+
+def test_direct_status_merge_invalidates_after_update_state(diamond):
+    assert diamond.get_parallelism_metrics()["calculation_mode"] == "node_count"
+
+    # Status merged directly onto the tasks, as the sync observer does
+    for task in diamond.tasks.values():
+        task._status = TaskStatus.COMPLETED
+    diamond.update_state()
+
+    assert diamond.get_parallelism_metrics()["calculation_mode"] == "actual_time"
+
+
+def test_cycle_error_is_not_cached():
+    constellation = TaskConstellation(name="cycle")
+    constellation.add_task(TaskStar(task_id="a"))
+    constellation.add_task(TaskStar(task_id="b"))
+    constellation.add_dependency(TaskStarLine("a", "b", line_id="a->b"))
+    # Bypass add_dependency's cycle check
+    constellation._dependencies["b->a"] = TaskStarLine("b", "a", line_id="b->a")
+
+    with pytest.raises(ValueError):
+        constellation.get_topological_order()
+
+    del constellation._dependencies["b->a"]
+    assert constellation.get_topological_order() == ["a", "b"]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Unit tests for the incremental ready-set index of TaskConstellation.
+
+get_ready_tasks is checked against the original full scan (every task,
+every dependency) after each mutation of a randomized DAG.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+UFO_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(UFO_ROOT))
+
+from galaxy.constellation import TaskConstellation, TaskStar, TaskStarLine
+from galaxy.constellation.enums import DependencyType, TaskPriority, TaskStatus
+
+
+def scan_ready_tasks(constellation: TaskConstellation):
+    """Reference implementation: scan all tasks and all dependencies."""
+    ready = []
+    for task in constellation.tasks.values():
+        if not task.is_ready_to_execute:
+            continue
+        satisfied = True
+        for dependency in constellation.dependencies.values():
+            if dependency.to_task_id != task.task_id:
+                continue
+            prerequisite = constellation.tasks.get(dependency.from_task_id)
+            if not prerequisite or not prerequisite.is_terminal:
+                satisfied = False
+                break
+            if not dependency.is_satisfied:
+                result = (
+                    prerequisite.result
+                    if prerequisite.status == TaskStatus.COMPLETED
+                    else prerequisite.error
+                )
+                if not dependency.evaluate_condition(result):
+                    satisfied = False
+                    break
+        if satisfied:
+            ready.append(task)
+    ready.sort(key=lambda t: t.priority.value, reverse=True)
+    return [t.task_id for t in ready]
+
+
+def ready_ids(constellation: TaskConstellation):
+    return [t.task_id for t in constellation.get_ready_tasks()]
+
+
+def build_chain(n: int) -> TaskConstellation:
+    constellation = TaskConstellation(name="chain")
+    for i in range(n):
+        constellation.add_task(TaskStar(task_id=f"t{i}", description=f"task {i}"))
+    for i in range(1, n):
+        constellation.add_dependency(TaskStarLine(f"t{i - 1}", f"t{i}"))
+    return constellation
+
+
+def test_chain_releases_one_task_at_a_time():
+    constellation = build_chain(5)
+    assert ready_ids(constellation) == ["t0"]
+
+    for i in range(4):
+        newly_ready = constellation.mark_task_completed(f"t{i}", True, "ok")
+        assert [t.task_id for t in newly_ready] == [f"t{i + 1}"]
+        assert ready_ids(constellation) == [f"t{i + 1}"]
+
+
+def test_priority_order_and_insertion_tiebreak():
+    constellation = TaskConstellation(name="priority")
+    constellation.add_task(TaskStar(task_id="a", priority=TaskPriority.LOW))
+    constellation.add_task(TaskStar(task_id="b", priority=TaskPriority.HIGH))
+    constellation.add_task(TaskStar(task_id="c", priority=TaskPriority.LOW))
+    constellation.add_task(TaskStar(task_id="d", priority=TaskPriority.CRITICAL))
+
+    assert ready_ids(constellation) == ["d", "b", "a", "c"]
+    assert ready_ids(constellation) == scan_ready_tasks(constellation)
+
+
+def test_add_and_remove_dependency_update_ready_set():
+    constellation = TaskConstellation(name="edit")
+    for task_id in ("a", "b", "c"):
+        constellation.add_task(TaskStar(task_id=task_id))
+
+    line = TaskStarLine("a", "b", line_id="a->b")
+    constellation.add_dependency(line)
+    assert ready_ids(constellation) == ["a", "c"]
+
+    constellation.remove_dependency("a->b")
+    assert ready_ids(constellation) == ["a", "b", "c"]
+
+    constellation.add_dependency(TaskStarLine("c", "a", line_id="c->a"))
+    constellation.remove_task("c")
+    assert ready_ids(constellation) == ["a", "b"]
+
+
+def test_failed_success_only_dependency_keeps_dependent_blocked():
+    constellation = TaskConstellation(name="failure")
+    constellation.add_task(TaskStar(task_id="a"))
+    constellation.add_task(TaskStar(task_id="b"))
+    constellation.add_dependency(
+        TaskStarLine("a", "b", dependency_type=DependencyType.SUCCESS_ONLY)
+    )
+
+    constellation.mark_task_completed("a", False, error=None)
+    assert ready_ids(constellation) == []
+    assert scan_ready_tasks(constellation) == []
+
+
+def test_from_dict_and_direct_status_changes():
+    constellation = build_chain(3)
+    restored = TaskConstellation.from_dict(constellation.to_dict())
+    assert ready_ids(restored) == scan_ready_tasks(restored) == ["t0"]
+
+    # Status merged directly onto the task, as the sync observer does
+    restored.tasks["t0"]._status = TaskStatus.COMPLETED
+    restored.tasks["t0"]._result = "ok"
+    restored.update_state()
+    assert ready_ids(restored) == scan_ready_tasks(restored) == ["t1"]
+
+    # Resetting the prerequisite blocks its dependent again
+    restored.tasks["t0"]._status = TaskStatus.PENDING
+    restored.update_state()
+    assert ready_ids(restored) == scan_ready_tasks(restored) == ["t0"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_randomized_against_full_scan(seed):
+    rng = random.Random(seed)
+    constellation = TaskConstellation(name=f"random-{seed}")
+    dependency_types = list(DependencyType)
+    priorities = list(TaskPriority)
+    next_id = 0
+
+    for _ in range(300):
+        task_ids = list(constellation.tasks.keys())
+        op = rng.random()
+
+        if op < 0.25 or len(task_ids) < 2:
+            constellation.add_task(
+                TaskStar(
+                    task_id=f"t{next_id}",
+                    priority=rng.choice(priorities),
+                    retry_count=3,
+                )
+            )
+            next_id += 1
+        elif op < 0.5:
+            source, target = rng.sample(task_ids, 2)
+            try:
+                constellation.add_dependency(
+                    TaskStarLine(
+                        source,
+                        target,
+                        dependency_type=rng.choice(dependency_types),
+                        condition_evaluator=lambda r: r == "ok",
+                    )
+                )
+            except ValueError:
+                pass
+        elif op < 0.6 and constellation.dependencies:
+            constellation.remove_dependency(rng.choice(list(constellation.dependencies)))
+        elif op < 0.65:
+            constellation.remove_task(rng.choice(task_ids))
+        elif op < 0.9:
+            ready = constellation.get_ready_tasks()
+            if ready:
+                task = rng.choice(ready)
+                success = rng.random() < 0.7
+                constellation.mark_task_completed(
+                    task.task_id,
+                    success,
+                    result=rng.choice(["ok", None]) if success else None,
+                    error=None if success else RuntimeError("boom"),
+                )
+        else:
+            retryable = [t for t in constellation.tasks.values() if t.should_retry()]
+            if retryable:
+                rng.choice(retryable).retry()
+                constellation.update_state()
+
+        assert ready_ids(constellation) == scan_ready_tasks(constellation)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Tests for the streaming mode of the WebUI WebSocketObserver.
+
+Clients reconstruct every constellation from one snapshot plus JSON-patch
+deltas; the reconstructed document must always equal a full serialization.
+"""
+
+import asyncio
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+UFO_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(UFO_ROOT))
+
+from galaxy.constellation import TaskConstellation, TaskStar, TaskStarLine
+from galaxy.core.events import ConstellationEvent, EventType, TaskEvent
+from galaxy.webui.websocket_observer import EventSerializer, WebSocketObserver
+
+
+class FakeWebSocket:
+    """Records sent text; optionally fails like a closed socket."""
+
+    def __init__(self, broken: bool = False):
+        self.broken = broken
+        self.messages = []
+
+    async def send_text(self, text: str) -> None:
+        if self.broken:
+            raise RuntimeError("socket closed")
+        self.messages.append(text)
+
+
+class StreamClient:
+    """Python port of the frontend's frame handling."""
+
+    def __init__(self):
+        self.documents = {}
+        self.versions = {}
+        self.events = []
+
+    def _apply_op(self, document, op):
+        keys = [
+            part.replace("~1", "/").replace("~0", "~")
+            for part in op["path"].split("/")[1:]
+        ]
+        target = document
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        if op["op"] == "remove":
+            del target[keys[-1]]
+        else:
+            target[keys[-1]] = op["value"]
+
+    def _snapshot(self, message):
+        self.documents[message["constellation_id"]] = copy.deepcopy(
+            message["constellation"]
+        )
+        self.versions[message["constellation_id"]] = message["version"]
+
+    def _resolve(self, value):
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        if isinstance(value, dict):
+            if "$constellation_ref" in value:
+                return copy.deepcopy(self.documents[value["$constellation_ref"]])
+            return {k: self._resolve(v) for k, v in value.items()}
+        return value
+
+    def receive(self, socket: FakeWebSocket):
+        for text in socket.messages:
+            message = json.loads(text)
+            if message["type"] == "constellation_snapshot":
+                self._snapshot(message)
+                continue
+            for snapshot in message["snapshots"]:
+                self._snapshot(snapshot)
+            for patch in message["patches"]:
+                constellation_id = patch["constellation_id"]
+                if self.versions[constellation_id] >= patch["version"]:
+                    continue
+                assert self.versions[constellation_id] == patch["base_version"]
+                for op in patch["ops"]:
+                    self._apply_op(self.documents[constellation_id], op)
+                self.versions[constellation_id] = patch["version"]
+            self.events.extend(self._resolve(e) for e in message["events"])
+        socket.messages.clear()
+
+
+def full_document(constellation):
+    return json.loads(
+        json.dumps(EventSerializer()._serialize_constellation(constellation), default=str)
+    )
+
+
+def build_constellation(num_tasks: int = 5) -> TaskConstellation:
+    constellation = TaskConstellation(constellation_id="c/1", name="stream")
+    for i in range(num_tasks):
+        constellation.add_task(TaskStar(task_id=f"t{i}", description=f"task {i}"))
+    for i in range(1, num_tasks):
+        constellation.add_dependency(TaskStarLine(f"t{i - 1}", f"t{i}"))
+    return constellation
+
+
+def constellation_event(constellation, event_type=EventType.CONSTELLATION_MODIFIED):
+    return ConstellationEvent(
+        event_type=event_type,
+        source_id="test",
+        timestamp=time.time(),
+        data={"constellation": constellation},
+        constellation_id=constellation.constellation_id,
+        constellation_state=constellation.state.value,
+    )
+
+
+def task_event(constellation, task_id):
+    return TaskEvent(
+        event_type=EventType.TASK_COMPLETED,
+        source_id="test",
+        timestamp=time.time(),
+        data={"constellation": constellation},
+        task_id=task_id,
+        status="completed",
+        result="ok",
+    )
+
+
+@pytest.mark.asyncio
+async def test_per_event_mode_sends_identical_text_and_drops_dead_clients():
+    observer = WebSocketObserver()
+    alive = [FakeWebSocket(), FakeWebSocket()]
+    dead = FakeWebSocket(broken=True)
+    for socket in alive + [dead]:
+        observer.add_connection(socket)
+
+    constellation = build_constellation()
+    await observer.on_event(constellation_event(constellation))
+
+    assert alive[0].messages == alive[1].messages
+    message = json.loads(alive[0].messages[0])
+    assert set(message["data"]["constellation"]["tasks"]) == set(constellation.tasks)
+    assert observer.connection_count == 2
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_into_one_frame():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=20)
+    socket = FakeWebSocket()
+    observer.add_connection(socket)
+    constellation = build_constellation()
+
+    for _ in range(25):
+        await observer.on_event(constellation_event(constellation))
+    await asyncio.sleep(0.1)
+
+    assert observer.frames_sent == 1
+    assert len(socket.messages) == 1
+    client = StreamClient()
+    client.receive(socket)
+    assert len(client.events) == 25
+    assert client.documents["c/1"] == full_document(constellation)
+    assert client.events[-1]["data"]["constellation"] == full_document(constellation)
+
+
+@pytest.mark.asyncio
+async def test_deltas_reconstruct_full_document():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    socket = FakeWebSocket()
+    observer.add_connection(socket)
+    constellation = build_constellation()
+    client = StreamClient()
+
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+    client.receive(socket)
+
+    steps = [
+        lambda: constellation.mark_task_completed("t0", True, "ok"),
+        lambda: constellation.add_task(TaskStar(task_id="x/~y", description="new")),
+        lambda: constellation.add_dependency(TaskStarLine("t1", "x/~y")),
+        lambda: constellation.remove_task("t4"),
+        lambda: setattr(constellation.tasks["t2"], "description", "changed"),
+    ]
+    for step in steps:
+        step()
+        await observer.on_event(task_event(constellation, "t0"))
+        await observer.flush()
+
+        frame = json.loads(socket.messages[-1])
+        (patch,) = frame["patches"]
+        # Only what changed is shipped, never the whole task table
+        assert all(op["path"] != "/tasks" for op in patch["ops"])
+
+        client.receive(socket)
+        assert client.documents["c/1"] == full_document(constellation)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_constellation_sends_no_patch():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    socket = FakeWebSocket()
+    observer.add_connection(socket)
+    constellation = build_constellation()
+
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+
+    frame = json.loads(socket.messages[-1])
+    assert frame["patches"] == []
+    assert frame["events"][0]["data"]["constellation"] == {"$constellation_ref": "c/1"}
+
+
+@pytest.mark.asyncio
+async def test_late_joiner_gets_current_snapshot():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    early = FakeWebSocket()
+    observer.add_connection(early)
+    constellation = build_constellation()
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+
+    constellation.mark_task_completed("t0", True, "ok")
+    late = FakeWebSocket()
+    observer.add_connection(late)
+    await observer.on_event(task_event(constellation, "t0"))
+    await observer.flush()
+
+    assert json.loads(late.messages[0])["type"] == "constellation_snapshot"
+    for socket in (early, late):
+        client = StreamClient()
+        client.receive(socket)
+        assert client.documents["c/1"] == full_document(constellation)
+        assert len(client.events) == (2 if socket is early else 1)
+
+
+@pytest.mark.asyncio
+async def test_historical_constellation_is_serialized_in_full():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    socket = FakeWebSocket()
+    observer.add_connection(socket)
+    before = build_constellation(2)
+    after = build_constellation(3)
+
+    await observer.on_event(
+        ConstellationEvent(
+            event_type=EventType.CONSTELLATION_MODIFIED,
+            source_id="test",
+            timestamp=time.time(),
+            data={"old_constellation": before, "new_constellation": after},
+            constellation_id="c/1",
+            constellation_state="created",
+        )
+    )
+    await observer.flush()
+
+    data = json.loads(socket.messages[-1])["events"][0]["data"]
+    assert set(data["old_constellation"]["tasks"]) == {"t0", "t1"}
+    assert data["new_constellation"] == {"$constellation_ref": "c/1"}
+
+
+@pytest.mark.asyncio
+async def test_finished_constellation_is_pruned_after_final_frame():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    socket = FakeWebSocket()
+    observer.add_connection(socket)
+    constellation = build_constellation()
+    client = StreamClient()
+
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+    client.receive(socket)
+    assert observer.stream_count == 1
+
+    constellation.mark_task_completed("t0", True, "ok")
+    await observer.on_event(
+        constellation_event(constellation, EventType.CONSTELLATION_COMPLETED)
+    )
+    await observer.flush()
+
+    # The final patch still reaches the client before the stream is forgotten
+    client.receive(socket)
+    assert client.documents["c/1"] == full_document(constellation)
+    assert observer.stream_count == 0
+
+    # A later event about the same constellation starts a fresh stream
+    await observer.on_event(task_event(constellation, "t1"))
+    await observer.flush()
+    frame = json.loads(socket.messages[-1])
+    assert [s["constellation_id"] for s in frame["snapshots"]] == ["c/1"]
+    assert observer.stream_count == 1
+
+
+@pytest.mark.asyncio
+async def test_last_disconnect_drops_streams():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    socket = FakeWebSocket()
+    observer.add_connection(socket)
+    constellation = build_constellation()
+
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+    assert observer.stream_count == 1
+
+    observer.remove_connection(socket)
+    assert observer.stream_count == 0
+
+    # A dead socket noticed during broadcast has the same effect
+    dead = FakeWebSocket(broken=True)
+    observer.add_connection(dead)
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+    assert observer.connection_count == 0
+    assert observer.stream_count == 0
+
+
+@pytest.mark.asyncio
+async def test_snapshot_request_resyncs_diverged_client():
+    observer = WebSocketObserver(streaming=True, frame_interval_ms=0)
+    socket = FakeWebSocket()
+    other = FakeWebSocket()
+    observer.add_connection(socket)
+    observer.add_connection(other)
+    constellation = build_constellation()
+
+    await observer.on_event(constellation_event(constellation))
+    await observer.flush()
+    socket.messages.clear()
+    other.messages.clear()
+
+    # The client lost a frame, so its next patch would not apply
+    constellation.mark_task_completed("t0", True, "ok")
+    await observer.on_event(task_event(constellation, "t0"))
+    await observer.flush()
+    socket.messages.clear()
+
+    await observer.request_snapshot(socket, "c/1")
+    assert other.messages[-1] != socket.messages[-1]
+    (message,) = [json.loads(text) for text in socket.messages]
+    assert message["type"] == "constellation_snapshot"
+
+    client = StreamClient()
+    client.receive(socket)
+    constellation.mark_task_completed("t1", True, "ok")
+    await observer.on_event(task_event(constellation, "t1"))
+    await observer.flush()
+    client.receive(socket)
+    assert client.documents["c/1"] == full_document(constellation)
+
+    # Unknown or pruned constellations have nothing to resend
+    await observer.request_snapshot(socket, "missing")
+    assert socket.messages == []
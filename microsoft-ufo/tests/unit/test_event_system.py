@@ -25,8 +25,10 @@ import time
 from unittest.mock import Mock, AsyncMock, patch
 
 from galaxy.core.events import (
+    DispatchMode,
     EventBus,
     Event,
+    OverflowPolicy,
     TaskEvent,
     ConstellationEvent,
     EventType,
@@ -428,5 +430,202 @@ class TestEventSystemIntegration:
         assert observer.on_event.call_count == 10
 
 
+def _constellation_event(constellation_id: str, state: str) -> ConstellationEvent:
+    return ConstellationEvent(
+        event_type=EventType.CONSTELLATION_MODIFIED,
+        source_id="test",
+        timestamp=time.time(),
+        data={},
+        constellation_id=constellation_id,
+        constellation_state=state,
+    )
+
+
+class SlowObserver(IEventObserver):
+    """Observer that blocks until released, recording what it saw."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.seen = []
+
+    async def on_event(self, event):
+        await self.release.wait()
+        self.seen.append(event.constellation_state)
+
+
+class TestQueuedEventBus:
+    """Test cases for QUEUED dispatch mode."""
+
+    @pytest.mark.asyncio
+    async def test_slow_observer_does_not_block_publisher(self):
+        """A slow observer must not delay publish_event or other observers."""
+        bus = EventBus(dispatch_mode=DispatchMode.QUEUED)
+        slow = SlowObserver()
+        fast = Mock()
+        fast.on_event = AsyncMock()
+
+        bus.subscribe(slow)
+        bus.subscribe(fast, {EventType.CONSTELLATION_MODIFIED})
+
+        await asyncio.wait_for(
+            bus.publish_event(_constellation_event("c1", "s1")), timeout=1
+        )
+        await asyncio.sleep(0)
+        assert fast.on_event.call_count == 1
+        assert slow.seen == []
+
+        slow.release.set()
+        await bus.drain()
+        assert slow.seen == ["s1"]
+        await bus.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_policy(self):
+        bus = EventBus(dispatch_mode=DispatchMode.QUEUED)
+        slow = SlowObserver()
+        bus.subscribe(
+            slow, max_queue_size=2, overflow_policy=OverflowPolicy.DROP_OLDEST
+        )
+
+        for i in range(5):
+            await bus.publish_event(_constellation_event(f"c{i}", f"s{i}"))
+            await asyncio.sleep(0)
+
+        stats = next(iter(bus.get_observer_stats().values()))
+        assert stats["queue_depth"] == 2
+        assert stats["dropped"] == 2  # one event is already in the worker
+
+        slow.release.set()
+        await bus.drain()
+        assert slow.seen == ["s0", "s3", "s4"]
+        await bus.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_coalesce_policy_keeps_latest_per_constellation(self):
+        bus = EventBus(dispatch_mode=DispatchMode.QUEUED)
+        slow = SlowObserver()
+        bus.subscribe(slow, max_queue_size=2, overflow_policy=OverflowPolicy.COALESCE)
+
+        await bus.publish_event(_constellation_event("a", "a0"))
+        await asyncio.sleep(0)
+        for state in ("a1", "a2", "a3"):
+            await bus.publish_event(_constellation_event("a", state))
+        await bus.publish_event(_constellation_event("b", "b1"))
+
+        stats = next(iter(bus.get_observer_stats().values()))
+        assert stats["coalesced"] == 1  # a3 supersedes a1
+        assert stats["dropped"] == 1  # nothing pending for b, so a2 goes
+        assert stats["lag_seconds"] >= 0
+
+        slow.release.set()
+        await bus.drain()
+        assert slow.seen == ["a0", "a3", "b1"]
+        await bus.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_coalesce_policy_keeps_every_task_transition(self):
+        """Below the bound nothing is coalesced; at the bound only the same task is."""
+        release = asyncio.Event()
+        seen = []
+
+        class TaskObserver(IEventObserver):
+            async def on_event(self, event):
+                await release.wait()
+                seen.append((event.task_id, event.status))
+
+        def completed(task_id: str, status: str = "completed") -> TaskEvent:
+            return TaskEvent(
+                event_type=EventType.TASK_COMPLETED,
+                source_id="orchestrator",
+                timestamp=time.time(),
+                data={"constellation_id": "c1"},
+                task_id=task_id,
+                status=status,
+            )
+
+        # Completions of different tasks in one constellation, queue far from full
+        bus = EventBus(dispatch_mode=DispatchMode.QUEUED)
+        bus.subscribe(
+            TaskObserver(), max_queue_size=100, overflow_policy=OverflowPolicy.COALESCE
+        )
+        for task_id in ("a", "b", "c", "d"):
+            await bus.publish_event(completed(task_id))
+
+        stats = next(iter(bus.get_observer_stats().values()))
+        assert (stats["coalesced"], stats["dropped"]) == (0, 0)
+        release.set()
+        await bus.drain()
+        assert [task_id for task_id, _ in seen] == ["a", "b", "c", "d"]
+        await bus.shutdown()
+
+        # Full queue ("a" is in the worker): an update for "c" supersedes the
+        # pending "c", while a new task displaces the oldest pending event
+        release.clear()
+        seen.clear()
+        bus = EventBus(dispatch_mode=DispatchMode.QUEUED)
+        bus.subscribe(
+            TaskObserver(), max_queue_size=3, overflow_policy=OverflowPolicy.COALESCE
+        )
+        await bus.publish_event(completed("a"))
+        await asyncio.sleep(0)
+        for task_id in ("b", "c", "d"):
+            await bus.publish_event(completed(task_id))
+        await bus.publish_event(completed("c", "retried"))
+        await bus.publish_event(completed("e"))
+
+        stats = next(iter(bus.get_observer_stats().values()))
+        assert (stats["coalesced"], stats["dropped"]) == (1, 1)
+        release.set()
+        await bus.drain()
+        assert seen == [
+            ("a", "completed"),
+            ("d", "completed"),
+            ("c", "retried"),
+            ("e", "completed"),
+        ]
+        await bus.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_block_policy_applies_back_pressure(self):
+        bus = EventBus(dispatch_mode=DispatchMode.QUEUED)
+        slow = SlowObserver()
+        bus.subscribe(slow, max_queue_size=1, overflow_policy=OverflowPolicy.BLOCK)
+
+        await bus.publish_event(_constellation_event("c", "s0"))
+        await asyncio.sleep(0)
+        await bus.publish_event(_constellation_event("c", "s1"))
+
+        blocked = asyncio.ensure_future(
+            bus.publish_event(_constellation_event("c", "s2"))
+        )
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        slow.release.set()
+        await asyncio.wait_for(blocked, timeout=1)
+        await bus.drain()
+        assert slow.seen == ["s0", "s1", "s2"]
+        assert next(iter(bus.get_observer_stats().values()))["dropped"] == 0
+        await bus.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_observer_subscribed_twice_is_notified_once(self):
+        for mode in DispatchMode:
+            bus = EventBus(dispatch_mode=mode)
+            observer = Mock()
+            observer.on_event = AsyncMock()
+            bus.subscribe(observer)
+            bus.subscribe(observer, {EventType.CONSTELLATION_MODIFIED})
+
+            await bus.publish_event(_constellation_event("c", "s"))
+            await bus.drain()
+            assert observer.on_event.call_count == 1
+
+            bus.unsubscribe(observer)
+            await bus.publish_event(_constellation_event("c", "s"))
+            await bus.drain()
+            assert observer.on_event.call_count == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -9,7 +9,7 @@ Node_100_MemorySystem - 记忆和学习系统
 5. 知识提取
 
 技术栈：
-- SQLite（持久化存储）
+- SQLite（持久化存储，WAL 模式 + FTS5 全文索引）
 - 向量嵌入（经验检索）
 - 聚类算法（模式识别）
 
@@ -22,6 +22,8 @@ import os
 import json
 import sqlite3
 import hashlib
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
@@ -110,127 +112,275 @@ class ExtractPatternsRequest(BaseModel):
 # ============================================================================
 
 class MemoryDatabase:
-    """记忆数据库"""
+    """
+    记忆数据库
+    
+    - 单个共享连接（WAL 模式，由锁串行化访问），不再每次调用都重新打开
+    - experiences_fts: FTS5 全文索引（trigram 分词，支持中文子串），由触发器与经验表同步
+    - command_stats: 每条命令的出现次数、成功次数、总耗时和最近的示例，由触发器在插入时增量更新，
+      模式提取和统计不再扫描全部历史
+    """
+    
+    # 命令统计中保留的最近示例数
+    MAX_PATTERN_EXAMPLES = 5
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.fts_enabled = False
         self.init_database()
     
+    @contextmanager
+    def _transaction(self):
+        """获取共享连接上的游标；正常结束时提交，异常时回滚"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                yield cursor
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    
     def init_database(self):
         """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 创建经验表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS experiences (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                command TEXT NOT NULL,
-                context TEXT NOT NULL,
-                actions TEXT NOT NULL,
-                result TEXT NOT NULL,
-                success INTEGER NOT NULL,
-                duration REAL NOT NULL,
-                session_id TEXT NOT NULL
-            )
-        """)
+        with self._transaction() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=5000")
+            
+            # 创建经验表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS experiences (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    context TEXT NOT NULL,
+                    actions TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    success INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    session_id TEXT NOT NULL
+                )
+            """)
+            
+            # 创建模式表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patterns (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    frequency INTEGER NOT NULL,
+                    examples TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            
+            # 创建知识表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge (
+                    id TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            
+            # 创建索引
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_command ON experiences(command)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_command_timestamp ON experiences(command, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_session ON experiences(session_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON experiences(timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_topic ON knowledge(topic)")
+            
+            self._init_command_stats(cursor)
+            self._init_fts(cursor)
+    
+    def _table_exists(self, cursor, name: str) -> bool:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+        return cursor.fetchone() is not None
+    
+    def _init_command_stats(self, cursor):
+        """命令统计表及其触发器（已有数据时回填一次）"""
+        backfill = not self._table_exists(cursor, "command_stats")
         
-        # 创建模式表
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS patterns (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT NOT NULL,
+            CREATE TABLE IF NOT EXISTS command_stats (
+                command TEXT PRIMARY KEY,
                 frequency INTEGER NOT NULL,
+                success_count INTEGER NOT NULL,
+                total_duration REAL NOT NULL,
                 examples TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                last_seen TEXT NOT NULL
             )
         """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_command_frequency ON command_stats(frequency)")
+        
+        # examples 按时间从旧到新保存最近的若干个经验 ID
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS experiences_stats_insert AFTER INSERT ON experiences BEGIN
+                INSERT INTO command_stats (command, frequency, success_count, total_duration, examples, last_seen)
+                VALUES (new.command, 1, new.success, new.duration, json_array(new.id), new.timestamp)
+                ON CONFLICT(command) DO UPDATE SET
+                    frequency = frequency + 1,
+                    success_count = success_count + excluded.success_count,
+                    total_duration = total_duration + excluded.total_duration,
+                    examples = CASE
+                        WHEN json_array_length(examples) >= {self.MAX_PATTERN_EXAMPLES}
+                        THEN json_remove(json_insert(examples, '$[#]', new.id), '$[0]')
+                        ELSE json_insert(examples, '$[#]', new.id)
+                    END,
+                    last_seen = max(last_seen, excluded.last_seen);
+            END
+        """)
+        # 被删除的经验在示例中时，按时间重新取该命令最近的示例补足
+        cursor.execute("DROP TRIGGER IF EXISTS experiences_stats_delete")
+        cursor.execute(f"""
+            CREATE TRIGGER experiences_stats_delete AFTER DELETE ON experiences BEGIN
+                UPDATE command_stats SET
+                    frequency = frequency - 1,
+                    success_count = success_count - old.success,
+                    total_duration = total_duration - old.duration,
+                    examples = CASE
+                        WHEN EXISTS (SELECT 1 FROM json_each(examples) WHERE value = old.id)
+                        THEN (
+                            SELECT json_group_array(id) FROM (
+                                SELECT id, timestamp FROM (
+                                    SELECT id, timestamp FROM experiences
+                                    WHERE command = old.command
+                                    ORDER BY timestamp DESC LIMIT {self.MAX_PATTERN_EXAMPLES}
+                                ) ORDER BY timestamp
+                            )
+                        )
+                        ELSE examples
+                    END
+                WHERE command = old.command;
+                DELETE FROM command_stats WHERE command = old.command AND frequency <= 0;
+            END
+        """)
+        
+        if backfill:
+            cursor.execute(f"""
+                INSERT INTO command_stats (command, frequency, success_count, total_duration, examples, last_seen)
+                SELECT
+                    e.command, COUNT(*), SUM(e.success), SUM(e.duration),
+                    (
+                        SELECT json_group_array(id) FROM (
+                            SELECT id, timestamp FROM (
+                                SELECT id, timestamp FROM experiences
+                                WHERE command = e.command
+                                ORDER BY timestamp DESC LIMIT {self.MAX_PATTERN_EXAMPLES}
+                            ) ORDER BY timestamp
+                        )
+                    ),
+                    MAX(e.timestamp)
+                FROM experiences e
+                GROUP BY e.command
+            """)
+    
+    def _init_fts(self, cursor):
+        """FTS5 全文索引及其触发器（已有数据时回填一次）；SQLite 不支持时退化为 LIKE"""
+        backfill = not self._table_exists(cursor, "experiences_fts")
+        
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS experiences_fts
+                USING fts5(exp_id UNINDEXED, command, tokenize = 'trigram')
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 trigram tokenizer unavailable ({e}), falling back to LIKE")
+            return
         
-        # 创建知识表
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS knowledge (
-                id TEXT PRIMARY KEY,
-                topic TEXT NOT NULL,
-                content TEXT NOT NULL,
-                source TEXT NOT NULL,
-                confidence REAL NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
+            CREATE TRIGGER IF NOT EXISTS experiences_fts_insert AFTER INSERT ON experiences BEGIN
+                INSERT INTO experiences_fts (exp_id, command) VALUES (new.id, new.command);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS experiences_fts_delete AFTER DELETE ON experiences BEGIN
+                DELETE FROM experiences_fts WHERE exp_id = old.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS experiences_fts_update AFTER UPDATE OF command ON experiences BEGIN
+                UPDATE experiences_fts SET command = new.command WHERE exp_id = old.id;
+            END
         """)
         
-        # 创建索引
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_command ON experiences(command)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_session ON experiences(session_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_topic ON knowledge(topic)")
+        if backfill:
+            cursor.execute("INSERT INTO experiences_fts (exp_id, command) SELECT id, command FROM experiences")
         
-        conn.commit()
-        conn.close()
+        self.fts_enabled = True
+    
+    @staticmethod
+    def _row_to_experience(row) -> Experience:
+        return Experience(
+            id=row[0],
+            timestamp=row[1],
+            command=row[2],
+            context=json.loads(row[3]),
+            actions=json.loads(row[4]),
+            result=json.loads(row[5]),
+            success=bool(row[6]),
+            duration=row[7],
+            session_id=row[8]
+        )
     
     def store_experience(self, experience: Experience) -> bool:
-        """存储经验"""
+        """存储经验（全文索引和命令统计由触发器在同一事务内更新）"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO experiences 
-                (id, timestamp, command, context, actions, result, success, duration, session_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                experience.id,
-                experience.timestamp,
-                experience.command,
-                json.dumps(experience.context),
-                json.dumps(experience.actions),
-                json.dumps(experience.result),
-                1 if experience.success else 0,
-                experience.duration,
-                experience.session_id
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._transaction() as cursor:
+                cursor.execute("""
+                    INSERT INTO experiences 
+                    (id, timestamp, command, context, actions, result, success, duration, session_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    experience.id,
+                    experience.timestamp,
+                    experience.command,
+                    json.dumps(experience.context),
+                    json.dumps(experience.actions),
+                    json.dumps(experience.result),
+                    1 if experience.success else 0,
+                    experience.duration,
+                    experience.session_id
+                ))
             return True
         except Exception as e:
             print(f"Error storing experience: {e}")
             return False
     
     def retrieve_experiences(self, query: str, limit: int = 10) -> List[Experience]:
-        """检索经验"""
+        """检索经验（命令中包含 query 的经验，按时间倒序）"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._transaction() as cursor:
+                # trigram 索引要求查询至少 3 个字符，更短的查询退化为 LIKE
+                if self.fts_enabled and len(query) >= 3:
+                    cursor.execute("""
+                        SELECT e.* FROM experiences_fts f
+                        JOIN experiences e ON e.id = f.exp_id
+                        WHERE experiences_fts MATCH ?
+                        ORDER BY e.timestamp DESC
+                        LIMIT ?
+                    """, ('"' + query.replace('"', '""') + '"', limit))
+                else:
+                    cursor.execute("""
+                        SELECT * FROM experiences 
+                        WHERE command LIKE ?
+                        ORDER BY timestamp DESC
+                        LIMIT ?
+                    """, (f"%{query}%", limit))
+                
+                rows = cursor.fetchall()
             
-            # 简单的关键词匹配
-            cursor.execute("""
-                SELECT * FROM experiences 
-                WHERE command LIKE ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (f"%{query}%", limit))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            experiences = []
-            for row in rows:
-                experiences.append(Experience(
-                    id=row[0],
-                    timestamp=row[1],
-                    command=row[2],
-                    context=json.loads(row[3]),
-                    actions=json.loads(row[4]),
-                    result=json.loads(row[5]),
-                    success=bool(row[6]),
-                    duration=row[7],
-                    session_id=row[8]
-                ))
-            
-            return experiences
+            return [self._row_to_experience(row) for row in rows]
         except Exception as e:
             print(f"Error retrieving experiences: {e}")
             return []
@@ -238,54 +388,74 @@ class MemoryDatabase:
     def get_all_experiences(self) -> List[Experience]:
         """获取所有经验"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM experiences ORDER BY timestamp DESC")
-            rows = cursor.fetchall()
-            conn.close()
+            with self._transaction() as cursor:
+                cursor.execute("SELECT * FROM experiences ORDER BY timestamp DESC")
+                rows = cursor.fetchall()
             
-            experiences = []
-            for row in rows:
-                experiences.append(Experience(
-                    id=row[0],
-                    timestamp=row[1],
-                    command=row[2],
-                    context=json.loads(row[3]),
-                    actions=json.loads(row[4]),
-                    result=json.loads(row[5]),
-                    success=bool(row[6]),
-                    duration=row[7],
-                    session_id=row[8]
-                ))
-            
-            return experiences
+            return [self._row_to_experience(row) for row in rows]
         except Exception as e:
             print(f"Error getting all experiences: {e}")
             return []
     
-    def store_pattern(self, pattern: Pattern) -> bool:
-        """存储模式"""
+    def get_command_stats(self, min_frequency: int = 1) -> List[Dict[str, Any]]:
+        """获取出现次数不少于 min_frequency 的命令统计（按次数降序）"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._transaction() as cursor:
+                cursor.execute("""
+                    SELECT command, frequency, success_count, total_duration, examples, last_seen
+                    FROM command_stats
+                    WHERE frequency >= ?
+                    ORDER BY frequency DESC
+                """, (min_frequency,))
+                rows = cursor.fetchall()
             
-            cursor.execute("""
-                INSERT OR REPLACE INTO patterns 
-                (id, name, description, frequency, examples, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                pattern.id,
-                pattern.name,
-                pattern.description,
-                pattern.frequency,
-                json.dumps(pattern.examples),
-                pattern.created_at,
-                pattern.updated_at
-            ))
+            return [
+                {
+                    "command": row[0],
+                    "frequency": row[1],
+                    "success_count": row[2],
+                    "total_duration": row[3],
+                    "examples": list(reversed(json.loads(row[4]))),  # 最新的在前
+                    "last_seen": row[5]
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"Error getting command stats: {e}")
+            return []
+    
+    def get_experience_summary(self) -> Dict[str, Any]:
+        """经验总数、成功数和总耗时（由命令统计汇总，不扫描经验表）"""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("""
+                    SELECT COALESCE(SUM(frequency), 0), COALESCE(SUM(success_count), 0), COALESCE(SUM(total_duration), 0.0)
+                    FROM command_stats
+                """)
+                total, success, duration = cursor.fetchone()
             
-            conn.commit()
-            conn.close()
+            return {"total_count": total, "success_count": success, "total_duration": duration}
+        except Exception as e:
+            print(f"Error getting experience summary: {e}")
+            return {"total_count": 0, "success_count": 0, "total_duration": 0.0}
+    
+    def store_pattern(self, pattern: Pattern) -> bool:
+        """存储模式"""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO patterns 
+                    (id, name, description, frequency, examples, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    pattern.id,
+                    pattern.name,
+                    pattern.description,
+                    pattern.frequency,
+                    json.dumps(pattern.examples),
+                    pattern.created_at,
+                    pattern.updated_at
+                ))
             return True
         except Exception as e:
             print(f"Error storing pattern: {e}")
@@ -294,12 +464,9 @@ class MemoryDatabase:
     def get_patterns(self) -> List[Pattern]:
         """获取所有模式"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM patterns ORDER BY frequency DESC")
-            rows = cursor.fetchall()
-            conn.close()
+            with self._transaction() as cursor:
+                cursor.execute("SELECT * FROM patterns ORDER BY frequency DESC")
+                rows = cursor.fetchall()
             
             patterns = []
             for row in rows:
@@ -321,25 +488,20 @@ class MemoryDatabase:
     def store_knowledge(self, knowledge: Knowledge) -> bool:
         """存储知识"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO knowledge 
-                (id, topic, content, source, confidence, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                knowledge.id,
-                knowledge.topic,
-                knowledge.content,
-                knowledge.source,
-                knowledge.confidence,
-                knowledge.created_at,
-                knowledge.updated_at
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._transaction() as cursor:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO knowledge 
+                    (id, topic, content, source, confidence, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    knowledge.id,
+                    knowledge.topic,
+                    knowledge.content,
+                    knowledge.source,
+                    knowledge.confidence,
+                    knowledge.created_at,
+                    knowledge.updated_at
+                ))
             return True
         except Exception as e:
             print(f"Error storing knowledge: {e}")
@@ -348,17 +510,13 @@ class MemoryDatabase:
     def get_knowledge(self, topic: str) -> List[Knowledge]:
         """获取知识"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM knowledge 
-                WHERE topic LIKE ?
-                ORDER BY confidence DESC
-            """, (f"%{topic}%",))
-            
-            rows = cursor.fetchall()
-            conn.close()
+            with self._transaction() as cursor:
+                cursor.execute("""
+                    SELECT * FROM knowledge 
+                    WHERE topic LIKE ?
+                    ORDER BY confidence DESC
+                """, (f"%{topic}%",))
+                rows = cursor.fetchall()
             
             knowledge_list = []
             for row in rows:
@@ -430,22 +588,29 @@ class PatternRecognizer:
                 command_examples[exp.command].append(exp.id)
         
         # 创建模式
-        patterns = []
-        for command, freq in command_freq.items():
-            if freq >= min_frequency:
-                pattern_id = hashlib.md5(command.encode()).hexdigest()
-                pattern = Pattern(
-                    id=pattern_id,
-                    name=f"Pattern: {command}",
-                    description=f"用户经常执行命令: {command}",
-                    frequency=freq,
-                    examples=command_examples[command],
-                    created_at=datetime.now().isoformat(),
-                    updated_at=datetime.now().isoformat()
-                )
-                patterns.append(pattern)
-        
-        return patterns
+        return [
+            self._make_pattern(command, freq, command_examples[command])
+            for command, freq in command_freq.items()
+            if freq >= min_frequency
+        ]
+    
+    def patterns_from_stats(self, command_stats: List[Dict[str, Any]]) -> List[Pattern]:
+        """由增量维护的命令统计（MemoryDatabase.get_command_stats）创建模式"""
+        return [
+            self._make_pattern(stat["command"], stat["frequency"], stat["examples"])
+            for stat in command_stats
+        ]
+    
+    def _make_pattern(self, command: str, frequency: int, examples: List[str]) -> Pattern:
+        return Pattern(
+            id=hashlib.md5(command.encode()).hexdigest(),
+            name=f"Pattern: {command}",
+            description=f"用户经常执行命令: {command}",
+            frequency=frequency,
+            examples=examples,
+            created_at=datetime.now().isoformat(),
+            updated_at=datetime.now().isoformat()
+        )
 
 # 初始化模式识别器
 pattern_recognizer = PatternRecognizer()
@@ -459,11 +624,19 @@ class KnowledgeExtractor:
     
     def extract_knowledge(self, experiences: List[Experience]) -> List[Knowledge]:
         """从经验中提取知识"""
+        return self.extract_from_summary({
+            "total_count": len(experiences),
+            "success_count": sum(1 for exp in experiences if exp.success),
+            "total_duration": sum(exp.duration for exp in experiences)
+        })
+    
+    def extract_from_summary(self, summary: Dict[str, Any]) -> List[Knowledge]:
+        """从经验汇总（MemoryDatabase.get_experience_summary）中提取知识"""
         knowledge_list = []
         
         # 提取成功率
-        success_count = sum(1 for exp in experiences if exp.success)
-        total_count = len(experiences)
+        success_count = summary["success_count"]
+        total_count = summary["total_count"]
         
         if total_count > 0:
             success_rate = success_count / total_count
@@ -480,7 +653,7 @@ class KnowledgeExtractor:
         
         # 提取平均执行时间
         if total_count > 0:
-            avg_duration = sum(exp.duration for exp in experiences) / total_count
+            avg_duration = summary["total_duration"] / total_count
             knowledge = Knowledge(
                 id=hashlib.md5("avg_duration".encode()).hexdigest(),
                 topic="avg_duration",
@@ -571,11 +744,11 @@ async def get_short_term_memory(session_id: str, limit: int = 10) -> Dict[str, A
 @app.post("/extract_patterns")
 async def extract_patterns(request: ExtractPatternsRequest) -> Dict[str, Any]:
     """提取模式"""
-    # 获取所有经验
-    experiences = db.get_all_experiences()
+    # 命令统计在存储经验时增量更新，无需加载全部经验
+    command_stats = db.get_command_stats(request.min_frequency)
     
     # 提取模式
-    patterns = pattern_recognizer.extract_patterns(experiences, request.min_frequency)
+    patterns = pattern_recognizer.patterns_from_stats(command_stats)
     
     # 存储模式
     for pattern in patterns:
@@ -601,11 +774,11 @@ async def get_patterns() -> Dict[str, Any]:
 @app.post("/extract_knowledge")
 async def extract_knowledge() -> Dict[str, Any]:
     """提取知识"""
-    # 获取所有经验
-    experiences = db.get_all_experiences()
+    # 获取经验汇总
+    summary = db.get_experience_summary()
     
     # 提取知识
-    knowledge_list = knowledge_extractor.extract_knowledge(experiences)
+    knowledge_list = knowledge_extractor.extract_from_summary(summary)
     
     # 存储知识
     for knowledge in knowledge_list:
@@ -632,17 +805,18 @@ async def get_knowledge(topic: str) -> Dict[str, Any]:
 @app.get("/stats")
 async def stats() -> Dict[str, Any]:
     """统计信息"""
-    experiences = db.get_all_experiences()
+    summary = db.get_experience_summary()
     patterns = db.get_patterns()
     
-    success_count = sum(1 for exp in experiences if exp.success)
-    total_count = len(experiences)
+    success_count = summary["success_count"]
+    total_count = summary["total_count"]
     
     return {
         "success": True,
         "total_experiences": total_count,
         "success_rate": success_count / total_count if total_count > 0 else 0,
         "total_patterns": len(patterns),
+        "full_text_search": db.fts_enabled,
         "database_path": DB_PATH,
         "database_size_mb": os.path.getsize(DB_PATH) / 1024 / 1024 if os.path.exists(DB_PATH) else 0
     }
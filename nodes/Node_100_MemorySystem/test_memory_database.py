@@ -0,0 +1,237 @@
+"""
+Node_100 记忆数据库单元测试（内存 SQLite）
+
+测试内容：
+1. 检索：FTS5 短语匹配与 LIKE 子串语义一致（含中文、引号、短查询），按时间倒序
+2. 删除触发器：全文索引同步删除；命令统计回退，示例中删除的 ID 被移除并按时间补足
+3. 统计：次数、成功数、耗时与示例上限，旧库首次升级时的回填
+
+用法:
+    python -m pytest nodes/Node_100_MemorySystem/test_memory_database.py -q
+
+作者: Manus AI
+日期: 2026-01-22
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+os.environ.setdefault("MEMORY_DB_PATH", ":memory:")
+
+from main import Experience, MemoryDatabase
+
+COMMANDS = [
+    "打开浏览器搜索天气",
+    "open browser and search weather",
+    "关闭浏览器",
+    'say "hello" to Alice',
+    "截图并保存到桌面",
+    "open the terminal",
+]
+
+
+def make_experience(index: int, command: str, success: bool = True, duration: float = 1.0) -> Experience:
+    return Experience(
+        id=f"exp{index:03d}",
+        timestamp=f"2026-01-22T10:{index // 60:02d}:{index % 60:02d}",
+        command=command,
+        context={},
+        actions=[],
+        result={"ok": success},
+        success=success,
+        duration=duration,
+        session_id="s1"
+    )
+
+
+class MemoryDatabaseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.db = MemoryDatabase(":memory:")
+        self.experiences = {}
+
+    def tearDown(self):
+        self.db.conn.close()
+
+    def store(self, index: int, command: str, **kwargs) -> Experience:
+        experience = make_experience(index, command, **kwargs)
+        self.assertTrue(self.db.store_experience(experience))
+        self.experiences[experience.id] = experience
+        return experience
+
+    def delete(self, *ids: str):
+        with self.db._transaction() as cursor:
+            cursor.executemany("DELETE FROM experiences WHERE id = ?", [(id_,) for id_ in ids])
+        for id_ in ids:
+            del self.experiences[id_]
+
+    def expected_stats(self) -> dict:
+        """由剩余经验直接计算的命令统计"""
+        stats = {}
+        for experience in sorted(self.experiences.values(), key=lambda e: e.timestamp):
+            stat = stats.setdefault(experience.command, {
+                "command": experience.command,
+                "frequency": 0,
+                "success_count": 0,
+                "total_duration": 0.0,
+                "examples": [],
+                "last_seen": ""
+            })
+            stat["frequency"] += 1
+            stat["success_count"] += int(experience.success)
+            stat["total_duration"] += experience.duration
+            stat["examples"].insert(0, experience.id)
+            stat["last_seen"] = max(stat["last_seen"], experience.timestamp)
+        for stat in stats.values():
+            stat["examples"] = stat["examples"][:MemoryDatabase.MAX_PATTERN_EXAMPLES]
+        return stats
+
+    def assert_stats_consistent(self):
+        actual = {stat["command"]: stat for stat in self.db.get_command_stats()}
+        expected = self.expected_stats()
+        self.assertEqual(set(actual), set(expected))
+        for command, stat in expected.items():
+            self.assertEqual(actual[command]["frequency"], stat["frequency"], command)
+            self.assertEqual(actual[command]["success_count"], stat["success_count"], command)
+            self.assertAlmostEqual(actual[command]["total_duration"], stat["total_duration"], places=6)
+            self.assertEqual(actual[command]["examples"], stat["examples"], command)
+
+
+class TestRetrieve(MemoryDatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(self.db.fts_enabled)
+        for index in range(60):
+            self.store(index, COMMANDS[index % len(COMMANDS)])
+
+    def like_ids(self, query: str, limit: int) -> list:
+        matches = [e for e in self.experiences.values() if query.lower() in e.command.lower()]
+        matches.sort(key=lambda e: e.timestamp, reverse=True)
+        return [e.id for e in matches[:limit]]
+
+    def test_match_equals_substring_scan(self):
+        for query in ("浏览器", "browser", "search wea", '"hello"', "OPEN", "截图并", "missing", "天气", "浏"):
+            results = self.db.retrieve_experiences(query, limit=7)
+            self.assertEqual([e.id for e in results], self.like_ids(query, 7), query)
+
+    def test_round_trips_experience(self):
+        experience = self.db.retrieve_experiences("terminal", limit=1)[0]
+        self.assertEqual(experience, self.experiences[experience.id])
+
+    def test_deleted_rows_leave_the_index(self):
+        ids = self.like_ids("浏览器", 100)
+        self.delete(*ids[:3])
+        results = self.db.retrieve_experiences("浏览器", limit=100)
+        self.assertEqual([e.id for e in results], ids[3:])
+
+        with self.db._transaction() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM experiences_fts")
+            self.assertEqual(cursor.fetchone()[0], len(self.experiences))
+
+    def test_duplicate_id_is_rejected(self):
+        self.assertFalse(self.db.store_experience(make_experience(0, "anything")))
+        self.assertEqual(len(self.db.retrieve_experiences("anything")), 0)
+        self.assert_stats_consistent()
+
+
+class TestCommandStats(MemoryDatabaseTestCase):
+
+    def test_counts_and_examples_cap(self):
+        for index in range(12):
+            self.store(index, "open browser", success=index % 3 != 0, duration=0.5 * index)
+        self.store(12, "close browser", success=False, duration=2.0)
+
+        stats = {stat["command"]: stat for stat in self.db.get_command_stats()}
+        self.assertEqual(stats["open browser"]["frequency"], 12)
+        self.assertEqual(stats["open browser"]["success_count"], 8)
+        self.assertEqual(stats["open browser"]["examples"], ["exp011", "exp010", "exp009", "exp008", "exp007"])
+        self.assertEqual(stats["open browser"]["last_seen"], make_experience(11, "").timestamp)
+        self.assert_stats_consistent()
+
+        self.assertEqual([s["command"] for s in self.db.get_command_stats(min_frequency=2)], ["open browser"])
+        self.assertEqual(self.db.get_experience_summary(), {"total_count": 13, "success_count": 8, "total_duration": 35.0})
+
+    def test_delete_example_refills_from_remaining(self):
+        for index in range(8):
+            self.store(index, "open browser")
+        self.store(8, "close browser")
+
+        # 删除示例中最新的和中间的一个，空位由更早的经验补上
+        self.delete("exp007", "exp005")
+        examples = {s["command"]: s["examples"] for s in self.db.get_command_stats()}["open browser"]
+        self.assertEqual(examples, ["exp006", "exp004", "exp003", "exp002", "exp001"])
+        self.assert_stats_consistent()
+
+        # 删除不在示例中的经验时示例不变
+        self.delete("exp000")
+        self.assert_stats_consistent()
+
+        self.delete("exp001", "exp002", "exp003", "exp004")
+        self.assertEqual({s["command"]: s["examples"] for s in self.db.get_command_stats()}["open browser"], ["exp006"])
+        self.delete("exp006", "exp008")
+        self.assertEqual(self.db.get_command_stats(), [])
+        self.assertEqual(self.db.get_experience_summary(), {"total_count": 0, "success_count": 0, "total_duration": 0.0})
+
+    def test_random_churn(self):
+        rng = random.Random(3)
+        next_index = 0
+        for _ in range(300):
+            if self.experiences and rng.random() < 0.35:
+                self.delete(rng.choice(sorted(self.experiences)))
+            else:
+                self.store(next_index, rng.choice(COMMANDS[:3]), success=rng.random() < 0.7, duration=rng.uniform(0, 3))
+                next_index += 1
+        self.assert_stats_consistent()
+
+
+class TestBackfill(unittest.TestCase):
+
+    def test_existing_database_is_backfilled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "memory.db")
+            # 升级前的库：只有经验表
+            conn = sqlite3.connect(path)
+            conn.execute("""
+                CREATE TABLE experiences (
+                    id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, command TEXT NOT NULL,
+                    context TEXT NOT NULL, actions TEXT NOT NULL, result TEXT NOT NULL,
+                    success INTEGER NOT NULL, duration REAL NOT NULL, session_id TEXT NOT NULL
+                )
+            """)
+            for index in range(7):
+                e = make_experience(index, "打开浏览器搜索天气", success=index % 2 == 0)
+                conn.execute(
+                    "INSERT INTO experiences VALUES (?, ?, ?, '{}', '[]', '{}', ?, ?, ?)",
+                    (e.id, e.timestamp, e.command, int(e.success), e.duration, e.session_id)
+                )
+            conn.commit()
+            conn.close()
+
+            db = MemoryDatabase(path)
+            try:
+                stats = db.get_command_stats()
+                self.assertEqual(len(stats), 1)
+                self.assertEqual(stats[0]["frequency"], 7)
+                self.assertEqual(stats[0]["success_count"], 4)
+                self.assertEqual(stats[0]["examples"], ["exp006", "exp005", "exp004", "exp003", "exp002"])
+                self.assertEqual(len(db.retrieve_experiences("浏览器搜索")), 7)
+            finally:
+                db.conn.close()
+
+            # 再次打开不会重复回填
+            db = MemoryDatabase(path)
+            try:
+                self.assertEqual(db.get_command_stats()[0]["frequency"], 7)
+            finally:
+                db.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,18 +8,23 @@ Node 105: Unified Knowledge Base
 2. 增强 RAG（多种 Embedding 模型和向量数据库）
 3. 代码知识库（代码问答和语义搜索）
 4. 混合搜索（关键词 + 向量）
+5. 倒排索引 + BM25 排序（中日韩文字按字与二元组切分）
 
 作者：Manus AI
 日期：2026-01-22
 """
 
 import os
+import re
 import json
+import math
 import time
+import heapq
 import hashlib
 import asyncio
 import httpx
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -65,6 +70,105 @@ class AskRequest(BaseModel):
     question: str
     top_k: int = 3
 
+# ============================================================================
+# 分词与倒排索引
+# ============================================================================
+
+# 中日韩文字（汉字、假名、谚文）没有空格分词，按单字与相邻二元组切分
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+TOKEN_PATTERN = re.compile(f"([{CJK_RANGES}]+)|([^\\W{CJK_RANGES}]+)")
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词
+    
+    - 拉丁字母/数字：按单词切分并转小写，带下划线的标识符同时保留各部分
+    - 中日韩文字：每个字及相邻两字组成的二元组
+    """
+    tokens = []
+    for cjk, word in TOKEN_PATTERN.findall(text.lower()):
+        if cjk:
+            tokens.extend(cjk)
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        else:
+            tokens.append(word)
+            if "_" in word:
+                tokens.extend(part for part in word.split("_") if part)
+    return tokens
+
+class InvertedIndex:
+    """
+    增量维护的倒排索引（BM25 排序）
+    
+    postings: 词 -> {条目 ID: 词频}；添加/删除一个条目的代价只与该条目的长度有关。
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}  # 删除条目时需要知道它出现在哪些倒排表中
+        self.total_length = 0
+    
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+    
+    def add(self, doc_id: str, text: str):
+        """索引一个条目（已存在则先删除）"""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        
+        tokens = tokenize(text)
+        term_counts = Counter(tokens)
+        for term, count in term_counts.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+        
+        self.doc_terms[doc_id] = list(term_counts)
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+    
+    def remove(self, doc_id: str):
+        """从索引中删除一个条目"""
+        for term in self.doc_terms.pop(doc_id, []):
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+    
+    def clear(self):
+        self.postings.clear()
+        self.doc_lengths.clear()
+        self.doc_terms.clear()
+        self.total_length = 0
+    
+    def search(self, query: str) -> Dict[str, float]:
+        """
+        BM25 打分
+        
+        Returns:
+            条目 ID -> 得分（只包含至少命中一个查询词的条目）
+        """
+        doc_count = len(self.doc_lengths)
+        if not doc_count:
+            return {}
+        
+        avg_length = self.total_length / doc_count or 1.0
+        k1, b = self.k1, self.b
+        scores: Dict[str, float] = {}
+        
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        
+        return scores
+
 # ============================================================================
 # 统一知识库系统
 # ============================================================================
@@ -74,7 +178,9 @@ class UnifiedKnowledgeBase:
     
     def __init__(self, persist_dir: str = "./unified_kb"):
         self.persist_dir = persist_dir
+        self.segment_file = os.path.join(persist_dir, "knowledge.jsonl")
         self.knowledge_entries: Dict[str, KnowledgeEntry] = {}
+        self.index = InvertedIndex()
         self.use_mock = True  # Mock 模式（无需安装向量数据库）
         
         os.makedirs(persist_dir, exist_ok=True)
@@ -85,29 +191,110 @@ class UnifiedKnowledgeBase:
         print(f"✅ 统一知识库已初始化 (Mock 模式: {self.use_mock})")
     
     def _load_knowledge(self):
-        """加载已有知识"""
-        kb_file = os.path.join(self.persist_dir, "knowledge.json")
-        if os.path.exists(kb_file):
+        """
+        加载已有知识
+        
+        知识保存在追加写的段文件 knowledge.jsonl 中，每行一条记录
+        {"op": "add", "entry": {...}}，同一 ID 以最后一条为准。
+        旧版的 knowledge.json 会在首次加载时迁移到段文件。
+        """
+        legacy_file = os.path.join(self.persist_dir, "knowledge.json")
+        
+        if os.path.exists(self.segment_file):
+            corrupted = False
             try:
-                with open(kb_file, 'r', encoding='utf-8') as f:
+                with open(self.segment_file, 'r', encoding='utf-8') as f:
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            # 写入中断留下的半行
+                            print(f"⚠️ 跳过损坏的记录: 第 {line_number} 行")
+                            corrupted = True
+                            continue
+                        
+                        if record.get("op") == "add":
+                            entry = KnowledgeEntry(**record["entry"])
+                            self.knowledge_entries[entry.id] = entry
+                if corrupted:
+                    # 重写段文件，避免后续追加的记录接在半行之后
+                    self._save_knowledge()
+                print(f"✅ 已加载 {len(self.knowledge_entries)} 条知识")
+            except Exception as e:
+                print(f"⚠️ 加载知识失败: {e}")
+        
+        elif os.path.exists(legacy_file):
+            try:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     for entry_dict in data:
                         entry = KnowledgeEntry(**entry_dict)
                         self.knowledge_entries[entry.id] = entry
-                print(f"✅ 已加载 {len(self.knowledge_entries)} 条知识")
+                self._save_knowledge()
+                os.replace(legacy_file, legacy_file + ".migrated")
+                print(f"✅ 已迁移 {len(self.knowledge_entries)} 条知识到 {self.segment_file}")
             except Exception as e:
                 print(f"⚠️ 加载知识失败: {e}")
+        
+        for entry in self.knowledge_entries.values():
+            self.index.add(entry.id, entry.content)
     
     def _save_knowledge(self):
-        """保存知识到磁盘"""
-        kb_file = os.path.join(self.persist_dir, "knowledge.json")
+        """重写整个段文件（压缩；仅在迁移和清空时使用）"""
+        tmp_file = self.segment_file + ".tmp"
         try:
-            data = [asdict(entry) for entry in self.knowledge_entries.values()]
-            with open(kb_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for entry in self.knowledge_entries.values():
+                    f.write(json.dumps({"op": "add", "entry": asdict(entry)}, ensure_ascii=False) + "\n")
+            os.replace(tmp_file, self.segment_file)
         except Exception as e:
             print(f"⚠️ 保存知识失败: {e}")
     
+    def _append_records(self, records: Iterable[Dict[str, Any]]):
+        """
+        追加记录到段文件（代价只与新记录的大小有关）
+        
+        写入失败时把文件截断回写入前的长度，不留下半行；
+        若文件末尾仍是不完整的行（上次截断也失败），先补一个换行。
+        """
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+        try:
+            fd = os.open(self.segment_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        except Exception as e:
+            print(f"⚠️ 保存知识失败: {e}")
+            return
+        
+        try:
+            good_size = os.lseek(fd, 0, os.SEEK_END)
+            if good_size and os.pread(fd, 1, good_size - 1) != b"\n":
+                data = b"\n" + data
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            except Exception as e:
+                os.ftruncate(fd, good_size)
+                print(f"⚠️ 保存知识失败，已回滚未写完的记录: {e}")
+        except Exception as e:
+            print(f"⚠️ 保存知识失败: {e}")
+        finally:
+            os.close(fd)
+    
+    def add_entries(self, entries: List[KnowledgeEntry]):
+        """添加知识条目：更新内存、索引并追加到段文件"""
+        for entry in entries:
+            self.knowledge_entries[entry.id] = entry
+            self.index.add(entry.id, entry.content)
+        self._append_records({"op": "add", "entry": asdict(entry)} for entry in entries)
+    
+    def clear(self):
+        """清空知识库"""
+        self.knowledge_entries.clear()
+        self.index.clear()
+        self._save_knowledge()
+    
     def _generate_id(self, content: str, source: str) -> str:
         """生成唯一 ID"""
         unique_str = f"{content[:100]}{source}{time.time()}"
@@ -136,8 +323,7 @@ class UnifiedKnowledgeBase:
             timestamp=time.time()
         )
         
-        self.knowledge_entries[entry_id] = entry
-        self._save_knowledge()
+        self.add_entries([entry])
         
         return entry_id
     
@@ -163,8 +349,7 @@ class UnifiedKnowledgeBase:
             timestamp=time.time()
         )
         
-        self.knowledge_entries[entry_id] = entry
-        self._save_knowledge()
+        self.add_entries([entry])
         
         return entry_id
     
@@ -199,7 +384,7 @@ class UnifiedKnowledgeBase:
                     code_files.append(file_path)
         
         # 为每个代码文件创建知识条目
-        entry_ids = []
+        entries = []
         for file_path in code_files[:100]:  # 限制前 100 个文件
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
@@ -216,14 +401,13 @@ class UnifiedKnowledgeBase:
                     timestamp=time.time()
                 )
                 
-                self.knowledge_entries[entry_id] = entry
-                entry_ids.append(entry_id)
+                entries.append(entry)
             except Exception as e:
                 print(f"⚠️ 读取文件失败 {file_path}: {e}")
         
-        self._save_knowledge()
+        self.add_entries(entries)
         
-        return f"已添加 {len(entry_ids)} 个代码文件"
+        return f"已添加 {len(entries)} 个代码文件"
     
     async def add_from_memos(self, memos_url: str, tag: str = None, metadata: Dict[str, Any] = None) -> str:
         """从 Memos 添加知识"""
@@ -242,7 +426,7 @@ class UnifiedKnowledgeBase:
             raise ValueError(f"获取 Memos 失败: {e}")
         
         # 为每个笔记创建知识条目
-        entry_ids = []
+        entries = []
         for memo in memos:
             content = memo.get('content', '')
             memo_id = memo.get('id', '')
@@ -257,26 +441,35 @@ class UnifiedKnowledgeBase:
                 timestamp=time.time()
             )
             
-            self.knowledge_entries[entry_id] = entry
-            entry_ids.append(entry_id)
+            entries.append(entry)
         
-        self._save_knowledge()
+        self.add_entries(entries)
         
-        return f"已添加 {len(entry_ids)} 条 Memos 笔记"
+        return f"已添加 {len(entries)} 条 Memos 笔记"
     
     def search_keyword(self, query: str, top_k: int = 5) -> List[KnowledgeEntry]:
-        """关键词搜索"""
-        query_lower = query.lower()
-        results = []
-        
-        for entry in self.knowledge_entries.values():
-            if query_lower in entry.content.lower():
-                results.append(entry)
-        
-        # 按时间戳排序
-        results.sort(key=lambda x: x.timestamp, reverse=True)
-        
-        return results[:top_k]
+        """关键词搜索（BM25 排序，得分相同时较新的条目优先）"""
+        return [entry for entry, _ in self.search_keyword_scored(query, top_k)]
+    
+    def search_keyword_scored(self, query: str, top_k: int = 5) -> List[Tuple[KnowledgeEntry, float]]:
+        """关键词搜索，同时返回 BM25 得分"""
+        if not tokenize(query):
+            # 查询中没有可索引的词（如纯符号），退化为子串匹配
+            query_lower = query.lower()
+            results = [
+                entry for entry in self.knowledge_entries.values()
+                if query_lower and query_lower in entry.content.lower()
+            ]
+            results.sort(key=lambda x: x.timestamp, reverse=True)
+            return [(entry, 0.0) for entry in results[:top_k]]
+        
+        scores = self.index.search(query)
+        best = heapq.nlargest(
+            top_k,
+            scores.items(),
+            key=lambda item: (item[1], self.knowledge_entries[item[0]].timestamp)
+        )
+        return [(self.knowledge_entries[entry_id], score) for entry_id, score in best]
     
     def search_vector(self, query: str, top_k: int = 5) -> List[KnowledgeEntry]:
         """向量搜索（Mock 模式：退化为关键词搜索）"""
@@ -320,8 +513,13 @@ class UnifiedKnowledgeBase:
     
     def search_hybrid(self, query: str, top_k: int = 5) -> List[KnowledgeEntry]:
         """混合搜索"""
-        # 简单实现：合并关键词和向量搜索结果
         keyword_results = self.search_keyword(query, top_k)
+        
+        # Mock 模式下向量搜索就是关键词搜索，不必再查一次
+        if self.use_mock:
+            return keyword_results
+        
+        # 简单实现：合并关键词和向量搜索结果
         vector_results = self.search_vector(query, top_k)
         
         # 去重
@@ -397,6 +595,7 @@ async def health():
         "node_id": "105",
         "name": "Unified Knowledge Base",
         "knowledge_count": len(kb.knowledge_entries),
+        "indexed_terms": len(kb.index.postings),
         "mock_mode": kb.use_mock
     }
 
@@ -435,8 +634,7 @@ async def add_knowledge(request: AddKnowledgeRequest, background_tasks: Backgrou
                 metadata=request.metadata or {},
                 timestamp=time.time()
             )
-            kb.knowledge_entries[entry_id] = entry
-            kb._save_knowledge()
+            kb.add_entries([entry])
             
             return {"success": True, "entry_id": entry_id}
         
@@ -498,14 +696,18 @@ async def stats():
         "total_entries": len(kb.knowledge_entries),
         "source_types": source_types,
         "persist_dir": kb.persist_dir,
+        "index": {
+            "terms": len(kb.index.postings),
+            "documents": len(kb.index),
+            "avg_doc_length": round(kb.index.total_length / len(kb.index), 1) if len(kb.index) else 0
+        },
         "mock_mode": kb.use_mock
     }
 
 @app.delete("/clear")
 async def clear():
     """清空知识库"""
-    kb.knowledge_entries.clear()
-    kb._save_knowledge()
+    kb.clear()
     return {"success": True, "message": "知识库已清空"}
 
 # ============================================================================
@@ -0,0 +1,259 @@
+"""
+Node_105 倒排索引与段文件单元测试
+
+测试内容：
+1. 分词：拉丁单词、snake_case 标识符、中日韩单字与二元组
+2. BM25：得分与公式逐项计算一致，稀有词/短文档/高词频排在前面
+3. 删除：删除或覆盖条目后倒排表、文档长度与得分同步更新
+4. 段文件：新实例从 knowledge.jsonl 重建出相同的索引；
+   末尾半行被跳过并压缩；追加失败时回滚，不留下半行
+
+用法:
+    python -m pytest nodes/Node_105_UnifiedKnowledgeBase/test_knowledge_index.py -q
+
+作者: Manus AI
+日期: 2026-01-22
+"""
+
+import json
+import math
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+NODE_DIR = Path(__file__).parent
+sys.path.insert(0, str(NODE_DIR))
+
+# main 在导入时会在当前目录创建 ./unified_kb，导入期间切到临时目录
+_import_dir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_import_dir.name)
+try:
+    with redirect_stdout(StringIO()):
+        import main
+finally:
+    os.chdir(_cwd)
+
+from main import InvertedIndex, KnowledgeEntry, UnifiedKnowledgeBase, tokenize
+
+
+def make_entry(entry_id: str, content: str, timestamp: float = 0.0) -> KnowledgeEntry:
+    return KnowledgeEntry(
+        id=entry_id,
+        content=content,
+        source_type="text",
+        source="direct_input",
+        metadata={},
+        timestamp=timestamp
+    )
+
+
+def bm25(index: InvertedIndex, query: str, doc_id: str, doc_tokens: list) -> float:
+    """按公式逐项计算单个文档的 BM25 得分"""
+    doc_count = len(index.doc_lengths)
+    avg_length = index.total_length / doc_count
+    score = 0.0
+    for term in set(tokenize(query)):
+        df = len(index.postings.get(term, {}))
+        tf = doc_tokens.count(term)
+        if not tf:
+            continue
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        score += idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(doc_tokens) / avg_length))
+    return score
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_latin_and_identifiers(self):
+        self.assertEqual(tokenize("Hello, World 42"), ["hello", "world", "42"])
+        self.assertEqual(tokenize("load_node_specs()"), ["load_node_specs", "load", "node", "specs"])
+
+    def test_cjk_unigrams_and_bigrams(self):
+        self.assertEqual(tokenize("知识库"), ["知", "识", "库", "知识", "识库"])
+        self.assertEqual(tokenize("节点Node_1"), ["节", "点", "节点", "node_1", "node", "1"])
+
+    def test_symbols_only(self):
+        self.assertEqual(tokenize("?!-- ..."), [])
+
+
+class TestBM25(unittest.TestCase):
+
+    DOCS = {
+        "a": "python asyncio event loop python",
+        "b": "python packaging guide",
+        "c": "rust ownership and borrowing guide for python developers who know asyncio",
+        "d": "向量数据库 与 知识库 检索",
+        "e": "知识图谱",
+    }
+
+    def setUp(self):
+        self.index = InvertedIndex()
+        for doc_id, text in self.DOCS.items():
+            self.index.add(doc_id, text)
+
+    def test_scores_match_formula(self):
+        for query in ("python asyncio", "guide", "知识库 检索", "python rust ownership"):
+            scores = self.index.search(query)
+            for doc_id, text in self.DOCS.items():
+                expected = bm25(self.index, query, doc_id, tokenize(text))
+                if expected == 0:
+                    self.assertNotIn(doc_id, scores, query)
+                else:
+                    self.assertAlmostEqual(scores[doc_id], expected, places=9, msg=(query, doc_id))
+
+    def test_ranking(self):
+        # 词频更高、文档更短的条目排在前面
+        scores = self.index.search("python")
+        self.assertEqual(sorted(scores, key=scores.get, reverse=True), ["a", "b", "c"])
+        # 稀有词的权重高于常见词
+        scores = self.index.search("ownership python")
+        self.assertEqual(max(scores, key=scores.get), "c")
+        # 中文按二元组匹配：「知识库」只命中 d 的「知识」「识库」，e 只命中「知识」
+        scores = self.index.search("知识库")
+        self.assertGreater(scores["d"], scores["e"])
+
+    def test_no_match(self):
+        self.assertEqual(self.index.search("golang"), {})
+        self.assertEqual(InvertedIndex().search("python"), {})
+
+
+class TestIndexDeletes(unittest.TestCase):
+
+    def test_remove_updates_postings_and_lengths(self):
+        index = InvertedIndex()
+        index.add("a", "alpha beta")
+        index.add("b", "beta gamma gamma")
+        index.remove("a")
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.total_length, 3)
+        self.assertNotIn("alpha", index.postings)
+        self.assertEqual(index.postings["beta"], {"b": 1})
+        self.assertEqual(set(index.search("alpha beta")), {"b"})
+
+        index.remove("a")  # 重复删除无副作用
+        index.remove("b")
+        self.assertEqual((len(index), index.total_length, index.postings), (0, 0, {}))
+
+    def test_re_add_replaces_previous_text(self):
+        index = InvertedIndex()
+        index.add("a", "old words here")
+        index.add("b", "other words")
+        index.add("a", "new")
+
+        self.assertEqual(index.total_length, 3)
+        self.assertNotIn("old", index.postings)
+        self.assertEqual(index.postings["words"], {"b": 1})
+        self.assertEqual(set(index.search("new old")), {"a"})
+
+        fresh = InvertedIndex()
+        fresh.add("b", "other words")
+        fresh.add("a", "new")
+        self.assertEqual(index.search("new words other"), fresh.search("new words other"))
+
+
+class TestSegmentFile(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.persist_dir = self._tmp.name
+        self._stdout = redirect_stdout(StringIO())
+        self._stdout.__enter__()
+
+    def tearDown(self):
+        self._stdout.__exit__(None, None, None)
+        self._tmp.cleanup()
+
+    def open_kb(self) -> UnifiedKnowledgeBase:
+        return UnifiedKnowledgeBase(self.persist_dir)
+
+    def read_lines(self, kb: UnifiedKnowledgeBase) -> list:
+        with open(kb.segment_file, "rb") as f:
+            return f.read().split(b"\n")
+
+    def assert_same_index(self, a: UnifiedKnowledgeBase, b: UnifiedKnowledgeBase):
+        self.assertEqual(a.index.postings, b.index.postings)
+        self.assertEqual(a.index.doc_lengths, b.index.doc_lengths)
+        self.assertEqual(a.index.total_length, b.index.total_length)
+
+    def test_rebuild_from_segment(self):
+        kb = self.open_kb()
+        kb.add_entries([make_entry("a", "python asyncio", 1.0), make_entry("b", "知识库检索", 2.0)])
+        kb.add_entries([make_entry("c", "python guide", 3.0)])
+        kb.add_entries([make_entry("a", "rust ownership", 4.0)])  # 同一 ID 以最后一条为准
+
+        reloaded = self.open_kb()
+        self.assertEqual(set(reloaded.knowledge_entries), {"a", "b", "c"})
+        self.assertEqual(reloaded.knowledge_entries["a"].content, "rust ownership")
+        self.assert_same_index(kb, reloaded)
+        self.assertEqual(
+            [e.id for e in reloaded.search_keyword("python ownership 知识", 5)],
+            [e.id for e in kb.search_keyword("python ownership 知识", 5)]
+        )
+
+        # 清空后重写段文件
+        kb.clear()
+        self.assertEqual(len(self.open_kb().knowledge_entries), 0)
+
+    def test_torn_trailing_record_is_skipped_and_compacted(self):
+        kb = self.open_kb()
+        kb.add_entries([make_entry("a", "alpha"), make_entry("b", "beta")])
+        with open(kb.segment_file, "ab") as f:
+            f.write(b'{"op": "add", "entry": {"id": "c", "cont')
+
+        reloaded = self.open_kb()
+        self.assertEqual(set(reloaded.knowledge_entries), {"a", "b"})
+        self.assertEqual(self.read_lines(reloaded)[-1], b"")
+
+        reloaded.add_entries([make_entry("d", "delta")])
+        self.assertEqual(set(self.open_kb().knowledge_entries), {"a", "b", "d"})
+
+    def test_failed_append_is_rolled_back(self):
+        kb = self.open_kb()
+        kb.add_entries([make_entry("a", "alpha")])
+        size = os.path.getsize(kb.segment_file)
+        real_write = os.write
+
+        def partial_write(fd, data):
+            real_write(fd, bytes(data[:len(data) // 2]))
+            raise OSError(28, "No space left on device")
+
+        with mock.patch.object(main.os, "write", side_effect=partial_write):
+            kb.add_entries([make_entry("b", "beta " * 50)])
+        self.assertEqual(os.path.getsize(kb.segment_file), size)
+
+        kb.add_entries([make_entry("c", "gamma")])
+        lines = [json.loads(line) for line in self.read_lines(kb) if line]
+        self.assertEqual([record["entry"]["id"] for record in lines], ["a", "c"])
+        self.assertEqual(set(self.open_kb().knowledge_entries), {"a", "c"})
+
+    def test_append_after_unterminated_line_starts_new_line(self):
+        kb = self.open_kb()
+        kb.add_entries([make_entry("a", "alpha")])
+        with open(kb.segment_file, "ab") as f:
+            f.write(b'{"op": "add"')
+
+        kb.add_entries([make_entry("b", "beta")])
+        reloaded = self.open_kb()
+        self.assertEqual(set(reloaded.knowledge_entries), {"a", "b"})
+
+    def test_legacy_json_is_migrated(self):
+        legacy = os.path.join(self.persist_dir, "knowledge.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([vars(make_entry("a", "legacy python entry"))], f)
+
+        kb = self.open_kb()
+        self.assertTrue(os.path.exists(kb.segment_file))
+        self.assertTrue(os.path.exists(legacy + ".migrated"))
+        self.assertEqual([e.id for e in kb.search_keyword("python")], ["a"])
+        self.assertEqual(set(self.open_kb().knowledge_entries), {"a"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,22 @@
 """
 Node 20: Qdrant - 向量数据库
+
+Qdrant 服务不可达时使用本地向量存储：每个集合一个连续的 float32（或 int8 量化）矩阵，
+余弦距离的行预先归一化，查询批量做一次矩阵乘法并用 argpartition 取 top-k，
+集合定期在后台线程中落盘为 .npy 文件，启动时以内存映射方式加载。
+本地已有集合时固定使用本地存储，不会因为 Qdrant 恢复可达而切换过去、使本地数据不可见。
 """
-import os, uuid
+import os, json, time, uuid, asyncio, logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import quote, unquote
+import numpy as np
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-app = FastAPI(title="Node 20 - Qdrant", version="2.0.0")
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+logger = logging.getLogger("Node_20")
 
 qdrant = None
 try:
@@ -20,14 +27,372 @@ except ImportError:
     pass
 
 QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QDRANT_RETRY_INTERVAL = float(os.getenv("QDRANT_RETRY_INTERVAL", "30"))  # 秒，服务不可达时多久再探测一次
+DATA_DIR = os.getenv("QDRANT_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+DEFAULT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "") or None  # "int8" 或留空
+FLUSH_INTERVAL = float(os.getenv("QDRANT_FLUSH_INTERVAL", "30"))  # 秒，0 表示只在关闭时落盘
+SEARCH_BLOCK_ROWS = 16384  # int8 集合按块反量化，限制临时内存
 client = None
+_client_checked_at = 0.0
+_local_pinned_logged = False
+
+# =============================================================================
+# 本地向量存储
+# =============================================================================
+
+class VectorCollection:
+    """
+    单个集合的本地存储
+
+    向量按行存放在预分配的连续矩阵中（容量按倍数增长），ids / payloads 与行号一一对应。
+    删除时用最后一行填补空位，保持矩阵紧凑；同一 id 重复写入时原地覆盖。
+
+    - cosine: 行预先归一化，得分即点积
+    - euclid: 额外保存每行的平方范数，距离 = sqrt(|q|² - 2q·x + |x|²)，越小越近
+    - int8 量化: 每行按最大绝对值对称量化，另存每行的缩放系数，内存约为 float32 的 1/4
+    """
+
+    DISTANCES = ("cosine", "euclid")
+    QUANTIZATIONS = (None, "int8")
+
+    def __init__(self, name: str, vector_size: int, distance: str = "cosine", quantization: Optional[str] = None):
+        distance = distance.lower()
+        if distance not in self.DISTANCES:
+            raise ValueError(f"Unsupported distance: {distance}")
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        if vector_size <= 0:
+            raise ValueError("vector_size must be positive")
+
+        self.name = name
+        self.vector_size = vector_size
+        self.distance = distance
+        self.quantization = quantization
+        self.ids: List[str] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.empty((0, vector_size), dtype=np.int8 if quantization else np.float32)
+        self._scales = np.empty(0, dtype=np.float32)    # int8 每行的缩放系数
+        self._sq_norms = np.empty(0, dtype=np.float32)  # euclid 每行的平方范数
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "vector_size": self.vector_size,
+            "distance": self.distance,
+            "quantization": self.quantization,
+            "points": len(self),
+            "memory_bytes": int(len(self) * self._vectors.itemsize * self.vector_size + self._scales.nbytes + self._sq_norms.nbytes),
+        }
+
+    def _as_matrix(self, vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.vector_size:
+            raise ValueError(f"Expected vectors of size {self.vector_size}, got shape {matrix.shape}")
+        if not np.isfinite(matrix).all():
+            raise ValueError("Vectors must not contain NaN or infinity")
+        return matrix
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        if self.distance != "cosine":
+            return matrix
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _reserve(self, rows: int):
+        """保证矩阵至少能容纳 rows 行"""
+        capacity = self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 64)
+        count = len(self)
+
+        vectors = np.empty((capacity, self.vector_size), dtype=self._vectors.dtype)
+        vectors[:count] = self._vectors[:count]
+        self._vectors = vectors
+        if self.quantization:
+            scales = np.empty(capacity, dtype=np.float32)
+            scales[:count] = self._scales[:count]
+            self._scales = scales
+        if self.distance == "euclid":
+            sq_norms = np.empty(capacity, dtype=np.float32)
+            sq_norms[:count] = self._sq_norms[:count]
+            self._sq_norms = sq_norms
+
+    def _store(self, rows: np.ndarray, matrix: np.ndarray):
+        """把（已归一化的）向量写入指定行"""
+        if self.quantization:
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.rint(matrix / scales[:, None]).clip(-127, 127).astype(np.int8)
+            self._vectors[rows] = quantized
+            self._scales[rows] = scales
+            matrix = quantized.astype(np.float32) * scales[:, None]
+        else:
+            self._vectors[rows] = matrix
+        if self.distance == "euclid":
+            self._sq_norms[rows] = np.einsum("ij,ij->i", matrix, matrix)
+
+    def upsert(self, ids: List[str], vectors, payloads: List[Dict[str, Any]]) -> int:
+        """写入向量；已存在的 id 原地覆盖"""
+        matrix = self._normalize(self._as_matrix(vectors))
+        if not (len(ids) == len(matrix) == len(payloads)):
+            raise ValueError("ids, vectors and payloads must have the same length")
+
+        # 同一批次内重复的 id 以最后一次为准
+        latest = {id_: index for index, id_ in enumerate(ids)}
+        order = np.fromiter(latest.values(), dtype=np.intp, count=len(latest))
+
+        self._reserve(len(self) + len(latest))
+        rows = np.empty(len(latest), dtype=np.intp)
+        for position, (id_, index) in enumerate(latest.items()):
+            row = self._rows.get(id_)
+            if row is None:
+                row = len(self.ids)
+                self._rows[id_] = row
+                self.ids.append(id_)
+                self.payloads.append(payloads[index])
+            else:
+                self.payloads[row] = payloads[index]
+            rows[position] = row
+
+        self._store(rows, matrix[order])
+        self.dirty = True
+        return len(latest)
+
+    def delete(self, ids: List[str]) -> int:
+        """删除向量，用最后一行填补空位"""
+        deleted = 0
+        for id_ in ids:
+            row = self._rows.pop(id_, None)
+            if row is None:
+                continue
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.payloads[row] = self.payloads[last]
+                self._rows[moved] = row
+                self._vectors[row] = self._vectors[last]
+                if self.quantization:
+                    self._scales[row] = self._scales[last]
+                if self.distance == "euclid":
+                    self._sq_norms[row] = self._sq_norms[last]
+            self.ids.pop()
+            self.payloads.pop()
+            deleted += 1
+
+        if deleted:
+            self.dirty = True
+        return deleted
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """所有查询对所有行的得分矩阵（越大越相似）"""
+        count = len(self)
+        vectors = self._vectors[:count]
+
+        if self.quantization:
+            dots = np.empty((len(queries), count), dtype=np.float32)
+            for start in range(0, count, SEARCH_BLOCK_ROWS):
+                end = min(start + SEARCH_BLOCK_ROWS, count)
+                np.matmul(queries, vectors[start:end].T.astype(np.float32), out=dots[:, start:end])
+            dots *= self._scales[:count]
+        else:
+            dots = queries @ vectors.T
+
+        if self.distance == "cosine":
+            return dots
+        # 负的平方距离，开方留到取出 top-k 之后
+        dots *= 2.0
+        dots -= np.einsum("ij,ij->i", queries, queries)[:, None]
+        dots -= self._sq_norms[:count]
+        return dots
+
+    def search(self, vectors, limit: int = 10) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """批量查询，每个查询返回按相似度排序的 (id, score, payload)"""
+        queries = self._normalize(self._as_matrix(vectors))
+        count = len(self)
+        k = min(max(limit, 0), count)
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = self._scores(queries)
+        if k < count:
+            top = np.argpartition(scores, count - k, axis=1)[:, count - k:]
+        else:
+            top = np.broadcast_to(np.arange(count), (len(queries), count))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        if self.distance == "euclid":
+            top_scores = np.sqrt(np.maximum(-top_scores, 0.0))
+
+        return [
+            [(self.ids[row], float(score), self.payloads[row]) for row, score in zip(rows.tolist(), row_scores.tolist())]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+
+    # -------------------------------------------------------------------------
+    # 持久化：<name>.json 保存元数据、ids 与 payloads，矩阵存为 .npy 以便内存映射
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _paths(directory: str, name: str) -> Dict[str, str]:
+        stem = os.path.join(directory, quote(name, safe=""))
+        return {
+            "meta": f"{stem}.json",
+            "vectors": f"{stem}.vectors.npy",
+            "scales": f"{stem}.scales.npy",
+            "sq_norms": f"{stem}.sq_norms.npy",
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """复制当前内容并清除 dirty 标记，之后可在其他线程中用 write_snapshot 落盘"""
+        count = len(self)
+        arrays = {"vectors": self._vectors[:count].copy()}
+        if self.quantization:
+            arrays["scales"] = self._scales[:count].copy()
+        if self.distance == "euclid":
+            arrays["sq_norms"] = self._sq_norms[:count].copy()
+        meta = {
+            "name": self.name,
+            "vector_size": self.vector_size,
+            "distance": self.distance,
+            "quantization": self.quantization,
+            "ids": list(self.ids),
+            "payloads": list(self.payloads),
+        }
+        self.dirty = False
+        return {"arrays": arrays, "meta": meta}
+
+    @classmethod
+    def write_snapshot(cls, directory: str, snapshot: Dict[str, Any]):
+        """原子地写入磁盘（先写临时文件再替换），元数据最后写入"""
+        os.makedirs(directory, exist_ok=True)
+        paths = cls._paths(directory, snapshot["meta"]["name"])
+        for key, array in snapshot["arrays"].items():
+            tmp = paths[key] + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, paths[key])
+
+        tmp = paths["meta"] + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot["meta"], f, ensure_ascii=False)
+        os.replace(tmp, paths["meta"])
+
+    def save(self, directory: str):
+        """同步落盘"""
+        snapshot = self.snapshot()
+        try:
+            self.write_snapshot(directory, snapshot)
+        except Exception:
+            self.dirty = True
+            raise
+
+    @classmethod
+    def load(cls, directory: str, name: str) -> "VectorCollection":
+        """以写时复制的内存映射加载（修改只发生在进程内存中，直到下次 save）"""
+        paths = cls._paths(directory, name)
+        with open(paths["meta"], encoding="utf-8") as f:
+            meta = json.load(f)
+
+        collection = cls(meta["name"], meta["vector_size"], meta["distance"], meta["quantization"])
+        collection.ids = meta["ids"]
+        collection.payloads = meta["payloads"]
+        collection._rows = {id_: row for row, id_ in enumerate(collection.ids)}
+        collection._vectors = np.load(paths["vectors"], mmap_mode="c")
+        if collection.quantization:
+            collection._scales = np.load(paths["scales"], mmap_mode="c")
+        if collection.distance == "euclid":
+            collection._sq_norms = np.load(paths["sq_norms"], mmap_mode="c")
+
+        if collection._vectors.shape != (len(collection.ids), collection.vector_size):
+            raise ValueError(f"Vector file does not match metadata for collection {name}")
+        collection.dirty = False
+        return collection
+
+    @classmethod
+    def remove_files(cls, directory: str, name: str):
+        for path in cls._paths(directory, name).values():
+            if os.path.exists(path):
+                os.remove(path)
+
+collections: Dict[str, VectorCollection] = {}
+
+def load_collections():
+    if not os.path.isdir(DATA_DIR):
+        return
+    for filename in sorted(os.listdir(DATA_DIR)):
+        if not filename.endswith(".json"):
+            continue
+        name = unquote(filename[:-len(".json")])
+        try:
+            collections[name] = VectorCollection.load(DATA_DIR, name)
+            logger.info(f"Loaded collection {name} ({len(collections[name])} points)")
+        except Exception as e:
+            logger.error(f"Failed to load collection {name}: {e}")
+
+_flush_lock: Optional[asyncio.Lock] = None
+
+async def flush_collections() -> int:
+    """
+    落盘所有修改过的集合
+
+    快照在事件循环中复制（与写入互斥），文件写入放到线程池，
+    请求处理不会被磁盘 I/O 阻塞；写入期间的新修改留到下一次落盘。
+    """
+    global _flush_lock
+    if _flush_lock is None:
+        _flush_lock = asyncio.Lock()
+
+    async with _flush_lock:
+        flushed = 0
+        for collection in list(collections.values()):
+            if not collection.dirty:
+                continue
+            snapshot = collection.snapshot()
+            try:
+                await asyncio.to_thread(VectorCollection.write_snapshot, DATA_DIR, snapshot)
+                flushed += 1
+            except Exception as e:
+                collection.dirty = True
+                logger.error(f"Failed to save collection {collection.name}: {e}")
+                continue
+            # 写入期间集合被删除时，不留下刚写出的文件
+            if collections.get(collection.name) is not collection:
+                VectorCollection.remove_files(DATA_DIR, collection.name)
+        return flushed
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        await flush_collections()
 
-collections = {}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_collections()
+    flush_task = asyncio.create_task(_flush_loop()) if FLUSH_INTERVAL > 0 else None
+    yield
+    if flush_task:
+        flush_task.cancel()
+    await flush_collections()
+
+app = FastAPI(title="Node 20 - Qdrant", version="2.1.0", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
 class CreateCollectionRequest(BaseModel):
     name: str
     vector_size: int = 384
     distance: str = "cosine"
+    quantization: Optional[str] = DEFAULT_QUANTIZATION
 
 class UpsertRequest(BaseModel):
     collection: str
@@ -40,22 +405,59 @@ class SearchRequest(BaseModel):
     vector: List[float]
     limit: int = 10
 
-def get_client():
-    global client
-    if qdrant and client is None:
+class BatchSearchRequest(BaseModel):
+    collection: str
+    vectors: List[List[float]]
+    limit: int = 10
+
+class DeleteRequest(BaseModel):
+    collection: str
+    ids: List[str]
+
+def _probe_qdrant():
+    """连接 Qdrant 并确认服务可达（同步网络 I/O，在线程池中运行）"""
+    candidate = QdrantClient(url=QDRANT_URL, timeout=3)
+    candidate.get_collections()
+    return candidate
+
+async def get_client():
+    """
+    Qdrant 客户端；服务不可达时返回 None（每 QDRANT_RETRY_INTERVAL 秒重新探测）
+
+    探测放到线程池，Qdrant 不可达时不会阻塞事件循环；探测期间的其他请求直接使用本地存储。
+    本地存储中已有集合时不再探测：切换到 Qdrant 会让这些数据对调用方不可见。
+    需要迁移到 Qdrant 时，先导出本地集合并清空 QDRANT_DATA_DIR。
+    """
+    global client, _client_checked_at, _local_pinned_logged
+    if client is None and collections:
+        if qdrant and not _local_pinned_logged:
+            logger.warning(f"Local vector store holds {len(collections)} collection(s); staying in local mode")
+            _local_pinned_logged = True
+        return None
+    if qdrant and client is None and time.time() - _client_checked_at >= QDRANT_RETRY_INTERVAL:
+        _client_checked_at = time.time()
         try:
-            client = QdrantClient(url=QDRANT_URL)
-        except:
-            pass
+            candidate = await asyncio.to_thread(_probe_qdrant)
+        except Exception as e:
+            logger.warning(f"Qdrant not reachable at {QDRANT_URL} ({e}), using local vector store")
+        else:
+            # 探测期间已写入本地存储时保持本地模式
+            if not collections:
+                client = candidate
     return client
 
+def get_collection(name: str) -> VectorCollection:
+    if name not in collections:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return collections[name]
+
 @app.get("/health")
 async def health():
-    return {"status": "healthy" if qdrant else "degraded", "node_id": "20", "name": "Qdrant", "qdrant_available": qdrant is not None, "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy" if qdrant else "degraded", "node_id": "20", "name": "Qdrant", "qdrant_available": qdrant is not None, "mode": "qdrant" if client else "in-memory", "local_pinned": client is None and bool(collections), "local_collections": len(collections), "local_points": sum(len(col) for col in collections.values()), "timestamp": datetime.now().isoformat()}
 
 @app.post("/collections")
 async def create_collection(request: CreateCollectionRequest):
-    c = get_client()
+    c = await get_client()
     if c:
         try:
             from qdrant_client.models import Distance, VectorParams
@@ -65,12 +467,15 @@ async def create_collection(request: CreateCollectionRequest):
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    collections[request.name] = {"vectors": [], "payloads": [], "ids": [], "vector_size": request.vector_size}
+    try:
+        collections[request.name] = VectorCollection(request.name, request.vector_size, request.distance, request.quantization)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"success": True, "collection": request.name, "mode": "in-memory"}
 
 @app.get("/collections")
 async def list_collections():
-    c = get_client()
+    c = await get_client()
     if c:
         try:
             cols = c.get_collections()
@@ -79,9 +484,28 @@ async def list_collections():
             pass
     return {"success": True, "collections": list(collections.keys()), "mode": "in-memory"}
 
+@app.get("/collections/{name:path}")
+async def collection_info(name: str):
+    return {"success": True, **get_collection(name).info(), "mode": "in-memory"}
+
+@app.delete("/collections/{name:path}")
+async def delete_collection(name: str):
+    c = await get_client()
+    if c:
+        try:
+            c.delete_collection(collection_name=name)
+            return {"success": True, "collection": name}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    get_collection(name)
+    del collections[name]
+    VectorCollection.remove_files(DATA_DIR, name)
+    return {"success": True, "collection": name, "mode": "in-memory"}
+
 @app.post("/upsert")
 async def upsert(request: UpsertRequest):
-    c = get_client()
+    c = await get_client()
     ids = request.ids or [str(uuid.uuid4()) for _ in request.vectors]
     payloads = request.payloads or [{} for _ in request.vectors]
     
@@ -94,20 +518,36 @@ async def upsert(request: UpsertRequest):
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    if request.collection not in collections:
-        collections[request.collection] = {"vectors": [], "payloads": [], "ids": [], "vector_size": len(request.vectors[0])}
+    if not request.vectors:
+        return {"success": True, "upserted": 0, "mode": "in-memory"}
     
-    col = collections[request.collection]
-    for i, (v, p, id_) in enumerate(zip(request.vectors, payloads, ids)):
-        col["vectors"].append(v)
-        col["payloads"].append(p)
-        col["ids"].append(id_)
+    try:
+        if request.collection not in collections:
+            collections[request.collection] = VectorCollection(request.collection, len(request.vectors[0]), quantization=DEFAULT_QUANTIZATION)
+        upserted = collections[request.collection].upsert(ids, request.vectors, payloads)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {"success": True, "upserted": len(request.vectors), "mode": "in-memory"}
+    return {"success": True, "upserted": upserted, "mode": "in-memory"}
+
+@app.post("/delete")
+async def delete(request: DeleteRequest):
+    c = await get_client()
+    
+    if c:
+        try:
+            from qdrant_client.models import PointIdsList
+            c.delete(collection_name=request.collection, points_selector=PointIdsList(points=request.ids))
+            return {"success": True, "deleted": len(request.ids)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    deleted = get_collection(request.collection).delete(request.ids)
+    return {"success": True, "deleted": deleted, "mode": "in-memory"}
 
 @app.post("/search")
 async def search(request: SearchRequest):
-    c = get_client()
+    c = await get_client()
     
     if c:
         try:
@@ -116,23 +556,41 @@ async def search(request: SearchRequest):
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    if request.collection not in collections:
-        raise HTTPException(status_code=404, detail="Collection not found")
+    try:
+        hits = get_collection(request.collection).search([request.vector], request.limit)[0]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    col = collections[request.collection]
+    results = [{"id": id_, "score": score, "payload": payload} for id_, score, payload in hits]
+    return {"success": True, "results": results, "mode": "in-memory"}
+
+@app.post("/search/batch")
+async def search_batch(request: BatchSearchRequest):
+    c = await get_client()
     
-    def cosine_sim(a, b):
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = sum(x ** 2 for x in a) ** 0.5
-        norm_b = sum(x ** 2 for x in b) ** 0.5
-        return dot / (norm_a * norm_b) if norm_a and norm_b else 0
+    if c:
+        try:
+            from qdrant_client.models import SearchRequest as QdrantSearchRequest
+            batches = c.search_batch(collection_name=request.collection, requests=[QdrantSearchRequest(vector=v, limit=request.limit, with_payload=True) for v in request.vectors])
+            return {"success": True, "results": [[{"id": r.id, "score": r.score, "payload": r.payload} for r in results] for results in batches]}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
     
-    scores = [(i, cosine_sim(request.vector, v)) for i, v in enumerate(col["vectors"])]
-    scores.sort(key=lambda x: -x[1])
+    collection = get_collection(request.collection)
+    if not request.vectors:
+        return {"success": True, "results": [], "mode": "in-memory"}
+    try:
+        batches = collection.search(request.vectors, request.limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    results = [{"id": col["ids"][i], "score": s, "payload": col["payloads"][i]} for i, s in scores[:request.limit]]
+    results = [[{"id": id_, "score": score, "payload": payload} for id_, score, payload in hits] for hits in batches]
     return {"success": True, "results": results, "mode": "in-memory"}
 
+@app.post("/persist")
+async def persist():
+    return {"success": True, "flushed": await flush_collections(), "data_dir": DATA_DIR}
+
 @app.post("/mcp/call")
 async def mcp_call(request: dict):
     tool = request.get("tool", "")
@@ -141,6 +599,8 @@ async def mcp_call(request: dict):
     elif tool == "list_collections": return await list_collections()
     elif tool == "upsert": return await upsert(UpsertRequest(**params))
     elif tool == "search": return await search(SearchRequest(**params))
+    elif tool == "search_batch": return await search_batch(BatchSearchRequest(**params))
+    elif tool == "delete": return await delete(DeleteRequest(**params))
     raise HTTPException(status_code=400, detail=f"Unknown tool: {tool}")
 
 if __name__ == "__main__":
@@ -0,0 +1,296 @@
+"""
+Node_20 本地向量存储单元测试
+
+测试内容：
+1. 搜索：cosine / euclid 结果与暴力计算一致，int8 量化的 top-k 与 float32 基本一致
+2. 写入与删除：同一 id 覆盖，删除后用最后一行填补，剩余向量仍可正确检索
+3. 持久化：save / load 往返后搜索结果不变，内存映射加载后仍可修改；
+   后台落盘期间的修改留到下一次落盘
+4. 模式：本地已有集合时不切换到 Qdrant；Qdrant 探测在线程池中进行，不阻塞事件循环
+
+用法:
+    python -m pytest nodes/Node_20_Qdrant/test_vector_collection.py -q
+
+作者: Manus AI
+日期: 2026-01-24
+"""
+
+import asyncio
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import VectorCollection
+
+
+def brute_force(vectors: np.ndarray, query: np.ndarray, distance: str, limit: int):
+    """逐行计算得分并全量排序"""
+    if distance == "cosine":
+        normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = normed @ (query / np.linalg.norm(query))
+        order = np.argsort(-scores, kind="stable")
+    else:
+        scores = np.linalg.norm(vectors - query, axis=1)
+        order = np.argsort(scores, kind="stable")
+    return [(int(row), float(scores[row])) for row in order[:limit]]
+
+
+class VectorCollectionTestCase(unittest.TestCase):
+
+    SIZE = 16
+    COUNT = 200
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.vectors = self.rng.standard_normal((self.COUNT, self.SIZE)).astype(np.float32)
+        self.ids = [f"p{i}" for i in range(self.COUNT)]
+        self.payloads = [{"i": i} for i in range(self.COUNT)]
+
+    def make(self, distance: str = "cosine", quantization=None) -> VectorCollection:
+        collection = VectorCollection("test", self.SIZE, distance, quantization)
+        collection.upsert(self.ids, self.vectors, self.payloads)
+        return collection
+
+
+class TestSearch(VectorCollectionTestCase):
+
+    def assert_matches_brute_force(self, collection: VectorCollection, vectors: np.ndarray, ids: list):
+        queries = self.rng.standard_normal((5, self.SIZE)).astype(np.float32)
+        results = collection.search(queries, limit=10)
+        for query, hits in zip(queries, results):
+            expected = brute_force(vectors, query, collection.distance, 10)
+            self.assertEqual([hit[0] for hit in hits], [ids[row] for row, _ in expected])
+            for (_, score, payload), (row, expected_score) in zip(hits, expected):
+                self.assertAlmostEqual(score, expected_score, places=4)
+                self.assertEqual(payload, {"i": int(ids[row][1:])})
+
+    def test_cosine(self):
+        self.assert_matches_brute_force(self.make("cosine"), self.vectors, self.ids)
+
+    def test_euclid(self):
+        self.assert_matches_brute_force(self.make("euclid"), self.vectors, self.ids)
+
+    def test_int8_close_to_float(self):
+        exact = self.make("cosine")
+        quantized = self.make("cosine", "int8")
+        queries = self.rng.standard_normal((10, self.SIZE)).astype(np.float32)
+        for exact_hits, hits in zip(exact.search(queries, 10), quantized.search(queries, 10)):
+            overlap = {hit[0] for hit in exact_hits} & {hit[0] for hit in hits}
+            self.assertGreaterEqual(len(overlap), 8)
+            self.assertAlmostEqual(hits[0][1], exact_hits[0][1], delta=0.02)
+
+    def test_limit_larger_than_collection(self):
+        collection = VectorCollection("small", self.SIZE)
+        self.assertEqual(collection.search(self.vectors[:2], limit=5), [[], []])
+        collection.upsert(self.ids[:3], self.vectors[:3], self.payloads[:3])
+        hits = collection.search(self.vectors[:1], limit=5)[0]
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(hits[0][0], "p0")
+
+    def test_rejects_wrong_size(self):
+        collection = VectorCollection("test", self.SIZE)
+        with self.assertRaises(ValueError):
+            collection.upsert(["a"], np.zeros((1, self.SIZE + 1)), [{}])
+        with self.assertRaises(ValueError):
+            collection.search(np.zeros((1, self.SIZE - 1)))
+
+
+class TestUpsertAndDelete(VectorCollectionTestCase):
+
+    def test_upsert_overwrites_existing_id(self):
+        collection = self.make("euclid")
+        replacement = self.rng.standard_normal((1, self.SIZE)).astype(np.float32)
+        self.assertEqual(collection.upsert(["p5", "p5"], np.vstack([self.vectors[0:1], replacement]), [{}, {"new": True}]), 1)
+
+        self.assertEqual(len(collection), self.COUNT)
+        hit = collection.search(replacement, limit=1)[0][0]
+        self.assertEqual(hit[0], "p5")
+        self.assertAlmostEqual(hit[1], 0.0, delta=0.01)
+        self.assertEqual(hit[2], {"new": True})
+
+    def test_delete_fills_gap_with_last_row(self):
+        for distance, quantization in (("cosine", None), ("euclid", None), ("euclid", "int8")):
+            collection = self.make(distance, quantization)
+            deleted = ["p0", "p17", f"p{self.COUNT - 1}", "p100"]
+            self.assertEqual(collection.delete(deleted + ["missing"]), 4)
+            self.assertEqual(collection.delete(["p0"]), 0)
+
+            remaining = [i for i in range(self.COUNT) if f"p{i}" not in deleted]
+            self.assertEqual(len(collection), len(remaining))
+            self.assertEqual(sorted(collection.ids), sorted(f"p{i}" for i in remaining))
+            for row, id_ in enumerate(collection.ids):
+                self.assertEqual(collection._rows[id_], row)
+                self.assertEqual(collection.payloads[row], {"i": int(id_[1:])})
+
+            # 每个剩余向量查询自身都应排第一
+            hits = collection.search(self.vectors[remaining], limit=1)
+            self.assertEqual([h[0][0] for h in hits], [f"p{i}" for i in remaining])
+
+    def test_delete_everything(self):
+        collection = self.make()
+        collection.delete(self.ids)
+        self.assertEqual(len(collection), 0)
+        self.assertEqual(collection.search(self.vectors[:1]), [[]])
+        collection.upsert(["x"], self.vectors[:1], [{}])
+        self.assertEqual(collection.search(self.vectors[:1], 1)[0][0][0], "x")
+
+
+class TestPersistence(VectorCollectionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        queries = self.rng.standard_normal((4, self.SIZE)).astype(np.float32)
+        for distance, quantization in (("cosine", None), ("euclid", None), ("cosine", "int8"), ("euclid", "int8")):
+            collection = self.make(distance, quantization)
+            collection.delete(["p3", "p50"])
+            collection.save(self.directory)
+            self.assertFalse(collection.dirty)
+
+            loaded = VectorCollection.load(self.directory, "test")
+            self.assertFalse(loaded.dirty)
+            self.assertEqual(len(loaded), len(collection))
+            self.assertEqual(loaded.ids, collection.ids)
+            self.assertEqual(loaded.search(queries, 10), collection.search(queries, 10))
+
+    def test_modify_after_mmap_load(self):
+        self.make("euclid").save(self.directory)
+        loaded = VectorCollection.load(self.directory, "test")
+        loaded.delete(["p0"])
+        loaded.upsert(["new"], self.vectors[:1], [{"new": True}])
+        self.assertTrue(loaded.dirty)
+        self.assertEqual(loaded.search(self.vectors[:1], 1)[0][0][0], "new")
+
+        # 写时复制：未落盘前磁盘上的内容不变
+        reloaded = VectorCollection.load(self.directory, "test")
+        self.assertEqual(reloaded.search(self.vectors[:1], 1)[0][0][0], "p0")
+
+        loaded.save(self.directory)
+        reloaded = VectorCollection.load(self.directory, "test")
+        self.assertEqual(reloaded.search(self.vectors[:1], 1)[0][0][0], "new")
+        self.assertNotIn("p0", reloaded.ids)
+
+    def test_special_characters_in_name(self):
+        collection = VectorCollection("a/b c", self.SIZE)
+        collection.upsert(self.ids[:2], self.vectors[:2], self.payloads[:2])
+        collection.save(self.directory)
+        self.assertEqual(VectorCollection.load(self.directory, "a/b c").ids, ["p0", "p1"])
+        VectorCollection.remove_files(self.directory, "a/b c")
+        with self.assertRaises(FileNotFoundError):
+            VectorCollection.load(self.directory, "a/b c")
+
+    def test_background_flush(self):
+        collection = self.make()
+        original_write = VectorCollection.write_snapshot
+
+        def slow_write(directory, snapshot):
+            # 写入在线程中进行时，事件循环上的修改不影响正在写的快照
+            collection.delete(["p0"])
+            original_write(directory, snapshot)
+
+        async def run():
+            with mock.patch.object(VectorCollection, "write_snapshot", side_effect=slow_write):
+                first = await main.flush_collections()
+            second = await main.flush_collections()
+            third = await main.flush_collections()
+            return first, second, third
+
+        with mock.patch.object(main, "DATA_DIR", self.directory), \
+                mock.patch.dict(main.collections, {"test": collection}, clear=True):
+            self.assertEqual(asyncio.run(run()), (1, 1, 0))
+
+        loaded = VectorCollection.load(self.directory, "test")
+        self.assertEqual(len(loaded), self.COUNT - 1)
+        self.assertNotIn("p0", loaded.ids)
+
+    def test_failed_flush_keeps_dirty(self):
+        collection = self.make()
+        with mock.patch.object(main, "DATA_DIR", self.directory), \
+                mock.patch.dict(main.collections, {"test": collection}, clear=True), \
+                mock.patch.object(VectorCollection, "write_snapshot", side_effect=OSError("disk full")):
+            self.assertEqual(asyncio.run(main.flush_collections()), 0)
+        self.assertTrue(collection.dirty)
+
+
+class TestModePinning(unittest.TestCase):
+
+    def test_local_data_pins_local_mode(self):
+        with mock.patch.object(main, "qdrant", True), \
+                mock.patch.object(main, "client", None), \
+                mock.patch.object(main, "_client_checked_at", 0.0), \
+                mock.patch.dict(main.collections, {"test": VectorCollection("test", 4)}, clear=True), \
+                mock.patch.object(main, "QdrantClient", create=True) as qdrant_client:
+            self.assertIsNone(asyncio.run(main.get_client()))
+            qdrant_client.assert_not_called()
+
+    def probe_patches(self, probe):
+        return [
+            mock.patch.object(main, "qdrant", True),
+            mock.patch.object(main, "client", None),
+            mock.patch.object(main, "_client_checked_at", 0.0),
+            mock.patch.dict(main.collections, {}, clear=True),
+            mock.patch.object(main, "_probe_qdrant", side_effect=probe),
+        ]
+
+    def run_with_patches(self, patches, coro_fn):
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return asyncio.run(coro_fn())
+
+    def test_unreachable_qdrant_does_not_block_event_loop(self):
+        started = threading.Event()
+        release = threading.Event()
+        probe_threads = []
+
+        def slow_unreachable_probe():
+            probe_threads.append(threading.get_ident())
+            started.set()
+            release.wait(5)
+            raise ConnectionError("timed out")
+
+        async def scenario():
+            probe = asyncio.create_task(main.get_client())
+            await asyncio.to_thread(started.wait, 5)
+            # 探测进行中，事件循环仍能处理其他请求，且不会重复探测
+            self.assertFalse(probe.done())
+            self.assertIsNone(await main.get_client())
+            release.set()
+            return threading.get_ident(), await probe
+
+        loop_thread, result = self.run_with_patches(self.probe_patches(slow_unreachable_probe), scenario)
+        self.assertIsNone(result)
+        self.assertEqual(len(probe_threads), 1)
+        self.assertNotEqual(probe_threads[0], loop_thread)
+        self.assertIsNone(main.client)
+
+    def test_reachable_qdrant_is_adopted(self):
+        qdrant_client = object()
+        self.assertIs(self.run_with_patches(self.probe_patches(lambda: qdrant_client), main.get_client), qdrant_client)
+
+    def test_local_data_written_during_probe_keeps_local_mode(self):
+        def probe():
+            # 探测期间有请求在本地创建了集合
+            main.collections["late"] = VectorCollection("late", 4)
+            return object()
+
+        self.assertIsNone(self.run_with_patches(self.probe_patches(probe), main.get_client))
+        self.assertIsNone(main.client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Node 58: ComplexityJudge Microbenchmark
+
+Compares, across prompt lengths:
+1. Sequential scans (one substring scan per keyword, one regex per pattern)
+2. ComplexityJudge.judge (Aho-Corasick automaton + combined code regex)
+3. ComplexityJudge.judge_batch (templated prompts, repeats scored once)
+
+Both implementations must produce identical results for every prompt.
+
+Usage:
+    python nodes/Node_58_ModelRouter/benchmark_complexity.py [--iterations 200]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import ComplexityJudge, ModelTier
+
+PROSE = (
+    "Please explain how to optimize the following service. "
+    "What is the difference between a thread pool and an event loop? "
+    "请分析这个架构并总结优化方案。 "
+    "Compare and contrast the two designs, then write the code for a scalable cache. "
+)
+
+CODE = (
+    "```python\n"
+    "import asyncio\n"
+    "class Worker:\n"
+    "    def run(self, items):\n"
+    "        return [x * 2 for x in items if x % 3 == 0]\n"
+    "```\n"
+)
+
+
+def sequential_judge(judge: ComplexityJudge, prompt: str) -> dict:
+    """The original scoring loop: every keyword and regex scanned separately."""
+    prompt_lower = prompt.lower()
+    analysis = {
+        "length": len(prompt),
+        "word_count": len(prompt.split()),
+        "sentence_count": len(re.split(r'[.!?]+', prompt)),
+        "factors": []
+    }
+
+    length_score = min(len(prompt) / 200, 1.0)
+    analysis["length_score"] = round(length_score, 3)
+    analysis["factors"].append(f"length: {len(prompt)} chars")
+
+    keyword_score = 0.0
+    simple_matches = sum(1 for kw in judge.SIMPLE_KEYWORDS if kw in prompt_lower)
+    if simple_matches > 0:
+        keyword_score = 0.1
+        analysis["factors"].append(f"simple_keywords: {simple_matches}")
+    medium_matches = sum(1 for kw in judge.MEDIUM_KEYWORDS if kw in prompt_lower)
+    if medium_matches > 0:
+        keyword_score = max(keyword_score, 0.3 + medium_matches * 0.1)
+        analysis["factors"].append(f"medium_keywords: {medium_matches}")
+    complex_matches = sum(1 for kw in judge.COMPLEX_KEYWORDS if kw in prompt_lower)
+    if complex_matches > 0:
+        keyword_score = max(keyword_score, 0.6 + complex_matches * 0.1)
+        analysis["factors"].append(f"complex_keywords: {complex_matches}")
+    keyword_score = min(keyword_score, 1.0)
+    if keyword_score == 0.0:
+        keyword_score = 0.3
+    analysis["keyword_score"] = round(keyword_score, 3)
+
+    pattern_score = 0.0
+    for regex in judge.complex_patterns:
+        if regex.search(prompt_lower):
+            pattern_score += 0.15
+    pattern_score = min(pattern_score, 0.6)
+    code_detected = False
+    for regex in judge.code_regex:
+        if regex.search(prompt):
+            code_detected = True
+            pattern_score = max(pattern_score, 0.5)
+            analysis["factors"].append("code_detected")
+            break
+    analysis["pattern_score"] = round(pattern_score, 3)
+    analysis["has_code"] = code_detected
+
+    structure_score = 0.3
+    sentence_count = analysis["sentence_count"]
+    if sentence_count > 3:
+        structure_score = 0.5
+        analysis["factors"].append(f"multi_sentence: {sentence_count}")
+    if prompt.count("?") > 2:
+        structure_score = max(structure_score, 0.6)
+        analysis["factors"].append("multiple_questions")
+    if "\n" in prompt and len(prompt.split("\n")) > 5:
+        structure_score = max(structure_score, 0.7)
+        analysis["factors"].append("multi_line")
+    analysis["structure_score"] = round(structure_score, 3)
+
+    special_chars = sum(1 for char in prompt if char in '{}[]()<>;=+-*/%^&|~`')
+    special_score = min(special_chars * 0.03, 0.5)
+    analysis["special_score"] = round(special_score, 3)
+    analysis["special_char_count"] = special_chars
+
+    complexity_score = (
+        length_score * 0.20 +
+        keyword_score * 0.40 +
+        pattern_score * 0.25 +
+        structure_score * 0.10 +
+        special_score * 0.05
+    )
+
+    if complexity_score < 0.20:
+        recommended_tier, complexity_level = ModelTier.LOCAL, "very_low"
+    elif complexity_score < 0.35:
+        recommended_tier, complexity_level = ModelTier.LOCAL, "low"
+    elif complexity_score < 0.50:
+        recommended_tier, complexity_level = ModelTier.CLOUD_CHEAP, "medium"
+    elif complexity_score < 0.65:
+        recommended_tier, complexity_level = ModelTier.CLOUD_SMART, "high"
+    else:
+        recommended_tier, complexity_level = ModelTier.CLOUD_PREMIUM, "very_high"
+
+    analysis["complexity_level"] = complexity_level
+    analysis["is_simple_query"] = complexity_score < 0.3 or len(prompt) < 50
+
+    return {
+        "complexity_score": round(complexity_score, 3),
+        "analysis": analysis,
+        "recommended_tier": recommended_tier,
+        "estimated_tokens": len(prompt.split()) * 2
+    }
+
+
+def build_prompt(length: int, rng: random.Random) -> str:
+    """Mix prose and code up to the requested length."""
+    parts = []
+    size = 0
+    while size < length:
+        part = PROSE if rng.random() < 0.6 else CODE
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)[:length]
+
+
+def time_per_op(func, items, iterations: int) -> float:
+    """Average time per prompt in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(items)
+    return (time.perf_counter() - start) / (iterations * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ComplexityJudge microbenchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[20, 200, 2000, 20000])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    judge = ComplexityJudge()
+
+    print("=" * 78)
+    print(f"{'length':>8}{'sequential (us)':>20}{'judge (us)':>16}{'judge_batch (us)':>20}{'speedup':>12}")
+    print("-" * 78)
+
+    for length in args.lengths:
+        # Templated traffic: 8 distinct prompts, each repeated 4 times
+        distinct = [build_prompt(length, rng) for _ in range(8)]
+        prompts = distinct * 4
+        iterations = max(args.iterations * 200 // max(length, 200), 1)
+
+        expected = [sequential_judge(judge, p) for p in prompts]
+        assert [judge.judge(p) for p in prompts] == expected
+        assert judge.judge_batch(prompts) == expected
+
+        sequential = time_per_op(
+            lambda items: [sequential_judge(judge, p) for p in items], prompts, iterations
+        )
+        single = time_per_op(
+            lambda items: [judge.judge(p) for p in items], prompts, iterations
+        )
+        batch = time_per_op(judge.judge_batch, prompts, iterations)
+
+        print(
+            f"{length:>8}{sequential:>20.1f}{single:>16.1f}{batch:>20.1f}"
+            f"{sequential / single:>11.1f}x"
+        )
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
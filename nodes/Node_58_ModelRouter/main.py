@@ -8,6 +8,7 @@ Intelligent routing of AI requests based on:
 - Model availability
 - Failover handling
 - Session persistence (SQLite)
+- Response caching (exact LRU + optional embedding similarity)
 """
 
 import os
@@ -17,7 +18,11 @@ import logging
 import re
 import sqlite3
 import hashlib
-from typing import Dict, Optional, List, Any
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, List, Any, Tuple
 from datetime import datetime
 from contextlib import asynccontextmanager
 from enum import Enum
@@ -42,6 +47,15 @@ ONEAPI_URL = os.getenv("ONEAPI_URL", "http://localhost:3000")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(os.path.dirname(__file__), "data", "router.db"))
 
+# Response cache
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+
 # API Keys from environment
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
@@ -120,7 +134,27 @@ class DatabaseManager:
             )
         """)
         
+        # Response cache table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                cache_key TEXT PRIMARY KEY,
+                namespace TEXT,
+                scope TEXT,
+                prompt_preview TEXT,
+                response TEXT,
+                embedding TEXT,
+                latency_ms REAL,
+                cost_usd REAL,
+                created_at REAL,
+                expires_at REAL
+            )
+        """)
+        
         # Create indexes
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_response_cache_expiry 
+            ON response_cache(expires_at)
+        """)
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_routing_session 
             ON routing_decisions(session_id, created_at)
@@ -265,6 +299,83 @@ class DatabaseManager:
             logger.error(f"Failed to get routing stats: {e}")
             return {}
     
+    def save_cache_entry(self, entry: "CacheEntry"):
+        """Insert or replace a response cache entry."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO response_cache
+                (cache_key, namespace, scope, prompt_preview, response, embedding,
+                 latency_ms, cost_usd, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                entry.key, entry.namespace, entry.scope, entry.prompt_preview,
+                json.dumps(entry.response),
+                json.dumps(entry.embedding) if entry.embedding else None,
+                entry.latency_ms, entry.cost_usd, entry.created_at, entry.expires_at
+            ))
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to save cache entry: {e}")
+    
+    def delete_cache_entries(self, keys: List[str]):
+        """Delete response cache entries by key."""
+        if not keys:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.executemany(
+                "DELETE FROM response_cache WHERE cache_key = ?",
+                [(key,) for key in keys]
+            )
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to delete cache entries: {e}")
+    
+    def clear_cache_entries(self):
+        """Delete all response cache entries."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("DELETE FROM response_cache")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to clear cache entries: {e}")
+    
+    def load_cache_entries(self, now: float, limit: int) -> List[Dict]:
+        """Purge expired and excess cache entries, then load the rest (oldest first)."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            cursor.execute("""
+                DELETE FROM response_cache WHERE cache_key NOT IN (
+                    SELECT cache_key FROM response_cache
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                )
+            """, (limit,))
+            cursor.execute("SELECT * FROM response_cache ORDER BY created_at ASC")
+            
+            rows = cursor.fetchall()
+            conn.commit()
+            conn.close()
+            
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to load cache entries: {e}")
+            return []
+    
     def get_recent_decisions(self, limit: int = 10) -> List[Dict]:
         """Get recent routing decisions."""
         try:
@@ -307,6 +418,7 @@ class RouteRequest(BaseModel):
     require_vision: bool = Field(default=False, description="Requires vision capability")
     require_code: bool = Field(default=False, description="Requires code capability")
     include_history: bool = Field(default=True, description="Include session history")
+    use_cache: bool = Field(default=True, description="Reuse cached routing decisions")
 
 class RouteResponse(BaseModel):
     selected_model: str
@@ -318,6 +430,7 @@ class RouteResponse(BaseModel):
     estimated_tokens: int
     fallback_model: Optional[str] = None
     session_context: Dict[str, Any] = {}
+    cached: bool = False
 
 class ChatRequest(BaseModel):
     prompt: str
@@ -326,6 +439,10 @@ class ChatRequest(BaseModel):
     context: Dict[str, Any] = Field(default={})
     max_tokens: int = Field(default=2048)
     temperature: float = Field(default=0.7)
+    use_cache: bool = Field(default=True, description="Reuse cached responses")
+
+class AnalyzeBatchRequest(BaseModel):
+    prompts: List[str] = Field(..., description="Prompts to analyze")
 
 class ChatResponse(BaseModel):
     response: str
@@ -334,6 +451,8 @@ class ChatResponse(BaseModel):
     cost_usd: float
     latency_ms: float
     routed_by: str = "Node 58"
+    cached: bool = False
+    cache_tier: Optional[str] = None
 
 # =============================================================================
 # Model Configuration
@@ -494,9 +613,109 @@ class ComplexityJudge:
         r"public\s+class",
     ]
     
+    # After str.lower(), IGNORECASE matching equals exact matching unless the
+    # prompt has one of these: dotless i and long s (folded onto i/s by re),
+    # or the combining dot left over from lowering a dotted capital I
+    CASEFOLD_SPECIALS = ("\u0131", "\u017f", "\u0307")
+    
+    SPECIAL_CHARS = '{}[]()<>;=+-*/%^&|~`'
+    
     def __init__(self):
         self.code_regex = [re.compile(p, re.IGNORECASE) for p in self.CODE_PATTERNS]
         self.complex_patterns = [re.compile(p, re.IGNORECASE) for p in self.HIGH_COMPLEXITY_PATTERNS]
+        
+        # One alternation for all code indicators (any match means code), run
+        # on the lowercased prompt; IGNORECASE and capture groups would
+        # disable the regex engine's literal prefix scan
+        self.code_pattern = re.compile("|".join(f"(?:{p})" for p in self.CODE_PATTERNS))
+        self.sentence_split = re.compile(r'[.!?]+')
+        
+        # Keyword table: (keyword, category), non-ASCII keywords last so
+        # ASCII-only prompts can stop early
+        self._keyword_table: List[Tuple[str, str]] = sorted(
+            (
+                (keyword, category)
+                for category, keywords in (
+                    ("simple", self.SIMPLE_KEYWORDS),
+                    ("medium", self.MEDIUM_KEYWORDS),
+                    ("complex", self.COMPLEX_KEYWORDS)
+                )
+                for keyword in keywords
+            ),
+            key=lambda item: (not item[0].isascii(), item[0], item[1])
+        )
+        self._ascii_keywords = sum(1 for keyword, _ in self._keyword_table if keyword.isascii())
+        
+        # "a.*b.*c" patterns become literal chains matched with str.find;
+        # anything else keeps its regex
+        self._literal_chains: List[Tuple[str, ...]] = []
+        self._regex_patterns: List[re.Pattern] = []
+        for pattern in self.HIGH_COMPLEXITY_PATTERNS:
+            parts = tuple(pattern.split(".*"))
+            if all(part and re.escape(part) == part for part in parts):
+                self._literal_chains.append(parts)
+            else:
+                self._regex_patterns.append(re.compile(pattern, re.IGNORECASE))
+    
+    def _match_keywords(self, prompt_lower: str) -> Dict[str, int]:
+        """Number of distinct keywords per category found in the prompt."""
+        counts = {"simple": 0, "medium": 0, "complex": 0}
+        table = self._keyword_table
+        
+        # Non-ASCII keywords cannot occur in an ASCII-only prompt
+        if prompt_lower.isascii():
+            table = table[:self._ascii_keywords]
+        
+        for keyword, category in table:
+            if keyword in prompt_lower:
+                counts[category] += 1
+        
+        return counts
+    
+    @staticmethod
+    def _chain_matches(text: str, chain: Tuple[str, ...]) -> bool:
+        """
+        Equivalent of re.search("a.*b.*c", text) for literal pieces.
+        
+        '.' does not match a newline, so the pieces must occur in order on
+        one line; taking the earliest occurrence of each piece is optimal,
+        so a line either matches greedily or not at all.
+        """
+        first, rest = chain[0], chain[1:]
+        position = 0
+        
+        while True:
+            start = text.find(first, position)
+            if start < 0:
+                return False
+            
+            line_end = text.find("\n", start)
+            if line_end < 0:
+                line_end = len(text)
+            
+            end = start + len(first)
+            for piece in rest:
+                found = text.find(piece, end, line_end)
+                if found < 0:
+                    break
+                end = found + len(piece)
+            else:
+                return True
+            
+            position = line_end + 1
+    
+    def _count_patterns(self, prompt_lower: str, casefold_specials: bool) -> int:
+        """Number of HIGH_COMPLEXITY_PATTERNS that match the prompt."""
+        if casefold_specials:
+            return sum(1 for regex in self.complex_patterns if regex.search(prompt_lower))
+        
+        return (
+            sum(
+                1 for chain in self._literal_chains
+                if chain[0] in prompt_lower and self._chain_matches(prompt_lower, chain)
+            ) +
+            sum(1 for regex in self._regex_patterns if regex.search(prompt_lower))
+        )
     
     def judge(self, prompt: str, context: Dict = None) -> Dict:
         """
@@ -506,12 +725,18 @@ class ComplexityJudge:
             Dict with complexity_score (0-1), detailed analysis, and recommended_tier
         """
         prompt_lower = prompt.lower()
+        word_count = len(prompt.split())
         analysis = {
             "length": len(prompt),
-            "word_count": len(prompt.split()),
-            "sentence_count": len(re.split(r'[.!?]+', prompt)),
+            "word_count": word_count,
+            "sentence_count": len(self.sentence_split.split(prompt)),
             "factors": []
         }
+        keyword_counts = self._match_keywords(prompt_lower)
+        casefold_specials = (
+            not prompt_lower.isascii() and
+            any(char in prompt_lower for char in self.CASEFOLD_SPECIALS)
+        )
         
         # Dimension 1: Length score (25%)
         # More aggressive scaling for longer prompts
@@ -523,19 +748,19 @@ class ComplexityJudge:
         keyword_score = 0.0
         
         # Check simple keywords (reduce score)
-        simple_matches = sum(1 for kw in self.SIMPLE_KEYWORDS if kw in prompt_lower)
+        simple_matches = keyword_counts["simple"]
         if simple_matches > 0:
             keyword_score = 0.1
             analysis["factors"].append(f"simple_keywords: {simple_matches}")
         
         # Check medium keywords
-        medium_matches = sum(1 for kw in self.MEDIUM_KEYWORDS if kw in prompt_lower)
+        medium_matches = keyword_counts["medium"]
         if medium_matches > 0:
             keyword_score = max(keyword_score, 0.3 + medium_matches * 0.1)
             analysis["factors"].append(f"medium_keywords: {medium_matches}")
         
         # Check complex keywords
-        complex_matches = sum(1 for kw in self.COMPLEX_KEYWORDS if kw in prompt_lower)
+        complex_matches = keyword_counts["complex"]
         if complex_matches > 0:
             keyword_score = max(keyword_score, 0.6 + complex_matches * 0.1)
             analysis["factors"].append(f"complex_keywords: {complex_matches}")
@@ -547,19 +772,18 @@ class ComplexityJudge:
         
         # Dimension 3: Pattern score (20%)
         pattern_score = 0.0
-        for regex in self.complex_patterns:
-            if regex.search(prompt_lower):
-                pattern_score += 0.15
+        for _ in range(self._count_patterns(prompt_lower, casefold_specials)):
+            pattern_score += 0.15
         pattern_score = min(pattern_score, 0.6)
         
         # Code detection
-        code_detected = False
-        for regex in self.code_regex:
-            if regex.search(prompt):
-                code_detected = True
-                pattern_score = max(pattern_score, 0.5)
-                analysis["factors"].append("code_detected")
-                break
+        if casefold_specials:
+            code_detected = any(regex.search(prompt) for regex in self.code_regex)
+        else:
+            code_detected = self.code_pattern.search(prompt_lower) is not None
+        if code_detected:
+            pattern_score = max(pattern_score, 0.5)
+            analysis["factors"].append("code_detected")
         
         analysis["pattern_score"] = round(pattern_score, 3)
         analysis["has_code"] = code_detected
@@ -573,13 +797,13 @@ class ComplexityJudge:
         if prompt.count("?") > 2:
             structure_score = max(structure_score, 0.6)
             analysis["factors"].append("multiple_questions")
-        if "\n" in prompt and len(prompt.split("\n")) > 5:
+        if prompt.count("\n") > 4:
             structure_score = max(structure_score, 0.7)
             analysis["factors"].append("multi_line")
         analysis["structure_score"] = round(structure_score, 3)
         
         # Dimension 5: Special character score (10%)
-        special_chars = sum(1 for char in prompt if char in '{}[]()<>;=+-*/%^&|~`')
+        special_chars = sum(map(prompt.count, self.SPECIAL_CHARS))
         special_score = min(special_chars * 0.03, 0.5)
         analysis["special_score"] = round(special_score, 3)
         analysis["special_char_count"] = special_chars
@@ -619,8 +843,31 @@ class ComplexityJudge:
             "complexity_score": round(complexity_score, 3),
             "analysis": analysis,
             "recommended_tier": recommended_tier,
-            "estimated_tokens": len(prompt.split()) * 2  # Rough estimate
+            "estimated_tokens": word_count * 2  # Rough estimate
         }
+    
+    def judge_batch(self, prompts: List[str], context: Dict = None) -> List[Dict]:
+        """
+        Judge many prompts; repeated prompts (e.g. templates) are scored once.
+        
+        Returns:
+            One judge() result per prompt, in order
+        """
+        judged: Dict[str, Dict] = {}
+        results = []
+        
+        for prompt in prompts:
+            result = judged.get(prompt)
+            if result is None:
+                result = judged[prompt] = self.judge(prompt, context)
+                results.append(result)
+                continue
+            
+            # Independent copies so callers may mutate each result
+            analysis = dict(result["analysis"], factors=list(result["analysis"]["factors"]))
+            results.append(dict(result, analysis=analysis))
+        
+        return results
 
 # =============================================================================
 # Cost Estimator
@@ -668,6 +915,313 @@ class CostEstimator:
             "estimated_time_ms": int(total_tokens * (10 if model_config["speed"] == "fast" else 20))
         }
 
+# =============================================================================
+# Response Cache (Exact LRU + Embedding Similarity)
+# =============================================================================
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt for cache keys (case and whitespace insensitive)."""
+    return _WHITESPACE_RE.sub(" ", prompt).strip().casefold()
+
+def _unit_vector(vector: List[float]) -> Optional[List[float]]:
+    """Scale a vector to unit length so similarity is a plain dot product."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return None
+    return [x / norm for x in vector]
+
+@dataclass
+class CacheEntry:
+    """A cached model response."""
+    key: str
+    namespace: str
+    scope: str
+    prompt_preview: str
+    response: Dict[str, Any]
+    latency_ms: float
+    cost_usd: float
+    created_at: float
+    expires_at: float
+    embedding: Optional[List[float]] = None
+    hits: int = 0
+
+@dataclass
+class CacheLookup:
+    """Result of a cache lookup; pass it back to ResponseCache.put on a miss."""
+    namespace: str
+    key: str
+    scope: str
+    prompt: str
+    entry: Optional[CacheEntry] = None
+    tier: Optional[str] = None
+    similarity: Optional[float] = None
+    embedding: Optional[List[float]] = None
+    started_at: float = field(default_factory=time.perf_counter)
+
+class ResponseCache:
+    """
+    Two-tier response cache.
+    
+    Tier 1 is an exact-match LRU keyed by the normalized prompt, the model
+    and the request parameters. Tier 2 (optional) compares prompt embeddings
+    by cosine similarity, restricted to entries with the same model and
+    parameters. Both tiers share the TTL; the exact tier bounds the total
+    number of entries and the semantic tier bounds how many are indexed by
+    embedding. Entries are persisted to SQLite and reloaded on startup.
+    """
+    
+    def __init__(
+        self,
+        db: Optional[DatabaseManager] = None,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL,
+        embed_fn: Optional[Callable[[str], Awaitable[Optional[List[float]]]]] = None,
+        semantic_threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        semantic_max_entries: int = SEMANTIC_CACHE_SIZE
+    ):
+        self.db = db
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed_fn = embed_fn
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_entries = semantic_max_entries
+        
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._semantic: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        
+        self.counters = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "latency_saved_ms": 0.0,
+            "cost_saved_usd": 0.0
+        }
+        
+        if self.db:
+            self._load()
+    
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.embed_fn is not None and self.semantic_max_entries > 0
+    
+    @staticmethod
+    def make_key(namespace: str, prompt: str, params: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Build the cache key and scope for a request.
+        
+        Returns:
+            (key, scope) - key identifies the exact request, scope the
+            model/parameter combination the semantic tier may match within
+        """
+        scope = hashlib.sha256(
+            json.dumps([namespace, params], sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+        key = hashlib.sha256(
+            f"{scope}\n{normalize_prompt(prompt)}".encode()
+        ).hexdigest()[:32]
+        return key, scope
+    
+    async def get(
+        self,
+        namespace: str,
+        prompt: str,
+        params: Dict[str, Any],
+        semantic: bool = True
+    ) -> CacheLookup:
+        """
+        Look a request up in the exact tier, then the semantic tier.
+        
+        Args:
+            namespace: Kind of response ("chat", "route")
+            prompt: The raw prompt
+            params: Model and parameters the response depends on
+            semantic: Whether the similarity tier may answer this request
+        
+        Returns:
+            CacheLookup with entry set on a hit
+        """
+        key, scope = self.make_key(namespace, prompt, params)
+        lookup = CacheLookup(namespace=namespace, key=key, scope=scope, prompt=prompt)
+        now = time.time()
+        
+        # Tier 1: exact match
+        entry = self._entries.get(key)
+        if entry and entry.expires_at <= now:
+            self._remove(key, expired=True)
+            entry = None
+        if entry:
+            self._entries.move_to_end(key)
+            return self._hit(lookup, entry, "exact")
+        
+        # Tier 2: embedding similarity
+        if semantic and self.semantic_enabled:
+            embedding = await self.embed_fn(normalize_prompt(prompt))
+            lookup.embedding = _unit_vector(embedding) if embedding else None
+            
+            if lookup.embedding:
+                best, best_score = self._nearest(scope, lookup.embedding, now)
+                if best and best_score >= self.semantic_threshold:
+                    lookup.similarity = round(best_score, 4)
+                    self._entries.move_to_end(best.key)
+                    return self._hit(lookup, best, "semantic")
+        
+        self.counters["misses"] += 1
+        return lookup
+    
+    def put(
+        self,
+        lookup: CacheLookup,
+        response: Dict[str, Any],
+        latency_ms: float,
+        cost_usd: float = 0.0
+    ) -> CacheEntry:
+        """
+        Store the response for a missed lookup.
+        
+        Args:
+            lookup: The CacheLookup returned by get()
+            response: JSON-serializable response
+            latency_ms: What producing the response cost (credited on later hits)
+            cost_usd: Model cost of producing the response
+        """
+        now = time.time()
+        entry = CacheEntry(
+            key=lookup.key,
+            namespace=lookup.namespace,
+            scope=lookup.scope,
+            prompt_preview=lookup.prompt[:200],
+            response=response,
+            latency_ms=latency_ms,
+            cost_usd=cost_usd,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            embedding=lookup.embedding
+        )
+        
+        self._remove(entry.key)
+        self._insert(entry)
+        
+        if self.db:
+            self.db.save_cache_entry(entry)
+        
+        return entry
+    
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        self._entries.clear()
+        self._semantic.clear()
+        if self.db:
+            self.db.clear_cache_entries()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and estimated savings."""
+        hits = self.counters["exact_hits"] + self.counters["semantic_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "latency_saved_ms": round(self.counters["latency_saved_ms"], 1),
+            "cost_saved_usd": round(self.counters["cost_saved_usd"], 6),
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "semantic_entries": len(self._semantic),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "semantic_enabled": self.semantic_enabled,
+            "semantic_threshold": self.semantic_threshold
+        }
+    
+    def _hit(self, lookup: CacheLookup, entry: CacheEntry, tier: str) -> CacheLookup:
+        """Record a hit and credit the latency and cost it saved."""
+        lookup.entry = entry
+        lookup.tier = tier
+        entry.hits += 1
+        
+        elapsed_ms = (time.perf_counter() - lookup.started_at) * 1000
+        self.counters[f"{tier}_hits"] += 1
+        self.counters["latency_saved_ms"] += max(entry.latency_ms - elapsed_ms, 0.0)
+        self.counters["cost_saved_usd"] += entry.cost_usd
+        return lookup
+    
+    def _nearest(self, scope: str, embedding: List[float], now: float) -> Tuple[Optional[CacheEntry], float]:
+        """Most similar live entry in the same scope."""
+        best, best_score = None, -1.0
+        expired = []
+        
+        for key, entry in self._semantic.items():
+            if entry.scope != scope:
+                continue
+            if entry.expires_at <= now:
+                expired.append(key)
+                continue
+            score = sum(a * b for a, b in zip(embedding, entry.embedding))
+            if score > best_score:
+                best, best_score = entry, score
+        
+        for key in expired:
+            self._remove(key, expired=True)
+        
+        return best, best_score
+    
+    def _insert(self, entry: CacheEntry):
+        """Add an entry to the tiers, evicting the least recently used ones."""
+        self._entries[entry.key] = entry
+        
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._semantic.pop(key, None)
+            evicted.append(key)
+        
+        if entry.embedding and self.semantic_enabled:
+            self._semantic[entry.key] = entry
+            while len(self._semantic) > self.semantic_max_entries:
+                # Still answerable by the exact tier
+                self._semantic.popitem(last=False)
+        
+        if evicted:
+            self.counters["evictions"] += len(evicted)
+            if self.db:
+                self.db.delete_cache_entries(evicted)
+    
+    def _remove(self, key: str, expired: bool = False):
+        """Remove an entry from both tiers."""
+        if self._entries.pop(key, None) is None:
+            return
+        self._semantic.pop(key, None)
+        
+        if expired:
+            self.counters["expirations"] += 1
+            if self.db:
+                self.db.delete_cache_entries([key])
+    
+    def _load(self):
+        """Reload live entries persisted by a previous run."""
+        for row in self.db.load_cache_entries(time.time(), self.max_entries):
+            try:
+                embedding = json.loads(row["embedding"]) if row["embedding"] else None
+                self._insert(CacheEntry(
+                    key=row["cache_key"],
+                    namespace=row["namespace"],
+                    scope=row["scope"],
+                    prompt_preview=row["prompt_preview"],
+                    response=json.loads(row["response"]),
+                    latency_ms=row["latency_ms"] or 0.0,
+                    cost_usd=row["cost_usd"] or 0.0,
+                    created_at=row["created_at"],
+                    expires_at=row["expires_at"],
+                    embedding=embedding
+                ))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping unreadable cache entry: {e}")
+        
+        if self._entries:
+            logger.info(f"Loaded {len(self._entries)} cached responses")
+
 # =============================================================================
 # Model Router
 # =============================================================================
@@ -686,13 +1240,23 @@ class ModelRouter:
         # Track model availability
         self.model_health: Dict[str, bool] = {}
         
+        # Response cache (semantic tier embeds prompts via Ollama)
+        self.cache: Optional[ResponseCache] = None
+        self._embedding_retry_at = 0.0
+        if RESPONSE_CACHE_ENABLED:
+            self.cache = ResponseCache(
+                db=db,
+                embed_fn=self._embed if SEMANTIC_CACHE_ENABLED else None
+            )
+        
         # In-memory usage statistics
         self.usage_stats = {
             "total_requests": 0,
             "local_requests": 0,
             "cloud_requests": 0,
             "total_cost_usd": 0.0,
-            "total_tokens": 0
+            "total_tokens": 0,
+            "cached_requests": 0
         }
     
     async def route(
@@ -701,9 +1265,56 @@ class ModelRouter:
         background_tasks: BackgroundTasks = None
     ) -> RouteResponse:
         """Route a request to the appropriate model."""
-        import time
         start_time = time.time()
         
+        # The decision depends only on the prompt and the routing flags
+        lookup = None
+        if self.cache and request.use_cache:
+            lookup = await self.cache.get("route", request.prompt, {
+                "prefer_local": request.prefer_local,
+                "max_cost_usd": request.max_cost_usd,
+                "require_vision": request.require_vision,
+                "require_code": request.require_code
+            }, semantic=False)
+        
+        if lookup and lookup.entry:
+            decision = lookup.entry.response
+        else:
+            decision = self._decide(request)
+            if lookup:
+                self.cache.put(lookup, decision, latency_ms=(time.time() - start_time) * 1000)
+        
+        # Get session history if requested
+        session_context = {"session_id": request.session_id, "history_length": 0}
+        if request.include_history:
+            history = self.db.get_session_history(request.session_id, limit=5)
+            session_context["history_length"] = len(history)
+        
+        response_time_ms = int((time.time() - start_time) * 1000)
+        
+        # Save to database in background
+        if background_tasks:
+            background_tasks.add_task(
+                self.db.save_routing_decision,
+                request.session_id,
+                request.prompt,
+                decision["complexity_score"],
+                decision["selected_model"],
+                decision["model_tier"],
+                decision["reason"],
+                decision["estimated_cost_usd"],
+                decision["estimated_tokens"],
+                response_time_ms
+            )
+        
+        return RouteResponse(
+            **decision,
+            session_context=session_context,
+            cached=bool(lookup and lookup.entry)
+        )
+    
+    def _decide(self, request: RouteRequest) -> Dict[str, Any]:
+        """Judge complexity and select a model (JSON-serializable, cacheable)."""
         # Judge complexity
         judgment = self.judge.judge(request.prompt, request.context)
         complexity_score = judgment["complexity_score"]
@@ -732,12 +1343,6 @@ class ModelRouter:
         # Determine fallback
         fallback_model = self._get_fallback(selected_model)
         
-        # Get session history if requested
-        session_context = {"session_id": request.session_id, "history_length": 0}
-        if request.include_history:
-            history = self.db.get_session_history(request.session_id, limit=5)
-            session_context["history_length"] = len(history)
-        
         # Build reason
         reason_parts = [
             f"Complexity: {complexity_score:.2f} ({judgment['analysis']['complexity_level']})",
@@ -748,34 +1353,16 @@ class ModelRouter:
         if request.prefer_local:
             reason_parts.append("(prefer_local override)")
         
-        response_time_ms = int((time.time() - start_time) * 1000)
-        
-        # Save to database in background
-        if background_tasks:
-            background_tasks.add_task(
-                self.db.save_routing_decision,
-                request.session_id,
-                request.prompt,
-                complexity_score,
-                selected_model,
-                model_config["tier"].value,
-                " | ".join(reason_parts),
-                cost_estimate["total_cost_usd"],
-                estimated_tokens,
-                response_time_ms
-            )
-        
-        return RouteResponse(
-            selected_model=selected_model,
-            model_tier=model_config["tier"],
-            reason=" | ".join(reason_parts),
-            complexity_score=complexity_score,
-            complexity_analysis=judgment["analysis"],
-            estimated_cost_usd=cost_estimate["total_cost_usd"],
-            estimated_tokens=estimated_tokens,
-            fallback_model=fallback_model,
-            session_context=session_context
-        )
+        return {
+            "selected_model": selected_model,
+            "model_tier": model_config["tier"].value,
+            "reason": " | ".join(reason_parts),
+            "complexity_score": complexity_score,
+            "complexity_analysis": judgment["analysis"],
+            "estimated_cost_usd": cost_estimate["total_cost_usd"],
+            "estimated_tokens": estimated_tokens,
+            "fallback_model": fallback_model
+        }
     
     def _select_model(
         self,
@@ -827,6 +1414,28 @@ class ModelRouter:
         """Execute a chat request with automatic routing."""
         start_time = datetime.now()
         
+        # Automatic routing is deterministic, so "auto" is a stable cache scope
+        lookup = None
+        if self.cache and request.use_cache:
+            lookup = await self.cache.get("chat", request.prompt, {
+                "model": request.model or "auto",
+                "max_tokens": request.max_tokens,
+                "temperature": request.temperature
+            })
+        
+        if lookup and lookup.entry:
+            cached = lookup.entry.response
+            self.usage_stats["cached_requests"] += 1
+            return ChatResponse(
+                response=cached["response"],
+                model_used=cached["model_used"],
+                tokens_used=cached["tokens_used"],
+                cost_usd=0.0,
+                latency_ms=(datetime.now() - start_time).total_seconds() * 1000,
+                cached=True,
+                cache_tier=lookup.tier
+            )
+        
         if not request.model:
             route_result = await self.route(RouteRequest(
                 prompt=request.prompt,
@@ -841,9 +1450,9 @@ class ModelRouter:
         
         try:
             if model_config["provider"] == "ollama":
-                response, tokens = await self._call_ollama(model, request)
+                response, tokens, from_model = await self._call_ollama(model, request)
             else:
-                response, tokens = await self._call_cloud(model, model_config, request)
+                response, tokens, from_model = await self._call_cloud(model, model_config, request)
             
             cost = (tokens / 1000) * model_config["cost_per_1k_tokens"]
             
@@ -857,6 +1466,14 @@ class ModelRouter:
             
             latency = (datetime.now() - start_time).total_seconds() * 1000
             
+            # Never cache mock fallbacks; they would outlive the outage
+            if lookup and from_model:
+                self.cache.put(lookup, {
+                    "response": response,
+                    "model_used": model,
+                    "tokens_used": tokens
+                }, latency_ms=latency, cost_usd=cost)
+            
             return ChatResponse(
                 response=response,
                 model_used=model,
@@ -870,7 +1487,7 @@ class ModelRouter:
             raise HTTPException(status_code=500, detail=str(e))
     
     async def _call_ollama(self, model: str, request: ChatRequest) -> tuple:
-        """Call Ollama API."""
+        """Call Ollama API. Returns (content, tokens, from_model)."""
         try:
             response = await self.http_client.post(
                 f"{self.ollama_url}/api/chat",
@@ -887,17 +1504,38 @@ class ModelRouter:
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get("message", {}).get("content", ""), data.get("eval_count", 100)
+                return data.get("message", {}).get("content", ""), data.get("eval_count", 100), True
             else:
                 raise Exception(f"Ollama error: {response.status_code}")
         except Exception as e:
             logger.warning(f"Ollama call failed: {e}, returning mock response")
-            return f"[Mock Response] Processed by {model}", 50
+            return f"[Mock Response] Processed by {model}", 50, False
     
     async def _call_cloud(self, model: str, config: Dict, request: ChatRequest) -> tuple:
-        """Call cloud API (OpenAI/Anthropic)."""
+        """Call cloud API (OpenAI/Anthropic). Returns (content, tokens, from_model)."""
         logger.info(f"Would call cloud model {model} (mock mode)")
-        return f"[Mock Cloud Response] Processed by {model}", 100
+        return f"[Mock Cloud Response] Processed by {model}", 100, False
+    
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed a prompt with Ollama for the semantic cache tier."""
+        if time.time() < self._embedding_retry_at:
+            return None
+        
+        try:
+            response = await self.http_client.post(
+                f"{self.ollama_url}/api/embeddings",
+                json={"model": EMBEDDING_MODEL, "prompt": text},
+                timeout=5.0
+            )
+            
+            if response.status_code == 200:
+                return response.json().get("embedding") or None
+            raise Exception(f"Ollama error: {response.status_code}")
+        except Exception as e:
+            # Back off so a missing embedding model does not slow every miss
+            logger.warning(f"Embedding failed: {e}, semantic cache paused for 60s")
+            self._embedding_retry_at = time.time() + 60
+            return None
 
 # =============================================================================
 # FastAPI Application
@@ -954,7 +1592,7 @@ async def health_check():
         "node_id": NODE_ID,
         "node_name": NODE_NAME,
         "database": "connected" if db_manager else "disconnected",
-        "features": ["sqlite_persistence", "cost_estimation", "multi_dimensional_scoring"]
+        "features": ["sqlite_persistence", "cost_estimation", "multi_dimensional_scoring", "response_cache"]
     }
 
 @app.post("/route", response_model=RouteResponse)
@@ -983,6 +1621,16 @@ async def analyze_prompt(prompt: str):
         }
     }
 
+@app.post("/analyze/batch")
+async def analyze_batch(request: AnalyzeBatchRequest):
+    """Analyze the complexity of many prompts at once."""
+    judgments = router.judge.judge_batch(request.prompts)
+    
+    return {
+        "count": len(judgments),
+        "results": judgments
+    }
+
 @app.get("/stats")
 async def get_stats():
     """Get routing statistics."""
@@ -991,10 +1639,19 @@ async def get_stats():
     
     return {
         "memory_stats": router.usage_stats if router else {},
+        "cache_stats": router.cache.stats() if router and router.cache else {"enabled": False},
         "database_stats": db_stats,
         "recent_decisions": recent
     }
 
+@app.post("/cache/clear")
+async def clear_cache():
+    """Drop all cached responses and routing decisions."""
+    if not router or not router.cache:
+        return {"cleared": False, "reason": "cache disabled"}
+    router.cache.clear()
+    return {"cleared": True}
+
 @app.get("/session/{session_id}")
 async def get_session(session_id: str):
     """Get session information."""
@@ -1036,7 +1693,8 @@ async def root():
             "SQLite session persistence",
             "Cost estimation",
             "Automatic model routing",
-            "Failover support"
+            "Failover support",
+            "Exact and semantic response cache"
         ]
     }
 
@@ -0,0 +1,254 @@
+"""
+Node 58: ResponseCache unit tests
+
+Covers the exact-match LRU (eviction order, counters, persisted deletes),
+TTL expiry in both tiers and across a reload, and the semantic tier's
+similarity threshold and scope isolation. Embeddings come from a fixed
+table so cosine similarities are known exactly.
+
+Usage:
+    python -m pytest nodes/Node_58_ModelRouter/test_response_cache.py -q
+"""
+
+import asyncio
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import DatabaseManager, ResponseCache, normalize_prompt
+
+PARAMS = {"model": "qwen2.5:7b", "temperature": 0.7}
+
+
+def angle_vector(degrees: float) -> list:
+    """2-D vector whose cosine similarity to [1, 0] is cos(degrees)."""
+    radians = math.radians(degrees)
+    return [math.cos(radians) * 3.0, math.sin(radians) * 3.0]
+
+
+class FakeClock:
+    """Stands in for time.time so TTLs can be stepped over deterministically."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, cache: ResponseCache, prompt: str, params=None, namespace: str = "chat", semantic: bool = True):
+        return asyncio.run(cache.get(namespace, prompt, params or PARAMS, semantic=semantic))
+
+    def store(self, cache: ResponseCache, prompt: str, answer: str, params=None, latency_ms: float = 800.0, cost_usd: float = 0.01):
+        lookup = self.get(cache, prompt, params)
+        self.assertIsNone(lookup.entry, prompt)
+        return cache.put(lookup, {"content": answer}, latency_ms, cost_usd)
+
+
+class TestExactTier(CacheTestCase):
+
+    def test_hit_is_normalized_and_scoped(self):
+        cache = ResponseCache(max_entries=8, ttl_seconds=60)
+        self.store(cache, "What is  the capital of France?", "Paris", cost_usd=0.02)
+
+        lookup = self.get(cache, "  what is the CAPITAL of france? ")
+        self.assertEqual(lookup.tier, "exact")
+        self.assertEqual(lookup.entry.response, {"content": "Paris"})
+        self.assertEqual(normalize_prompt("  A\n\tB "), "a b")
+
+        self.assertIsNone(self.get(cache, "What is the capital of France?", params={**PARAMS, "temperature": 0.1}).entry)
+        self.assertIsNone(self.get(cache, "What is the capital of France?", namespace="route").entry)
+
+        stats = cache.stats()
+        self.assertEqual((stats["exact_hits"], stats["misses"], stats["hits"]), (1, 3, 1))
+        self.assertEqual(stats["hit_rate"], 0.25)
+        self.assertEqual(stats["cost_saved_usd"], 0.02)
+        self.assertGreater(stats["latency_saved_ms"], 0.0)
+        self.assertLessEqual(stats["latency_saved_ms"], 800.0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=3, ttl_seconds=60)
+        for i in range(3):
+            self.store(cache, f"prompt {i}", f"answer {i}")
+
+        # Reading the oldest entry makes prompt 1 the least recently used
+        self.assertEqual(self.get(cache, "prompt 0").tier, "exact")
+        self.store(cache, "prompt 3", "answer 3")
+
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["entries"], 3)
+        self.assertIsNone(self.get(cache, "prompt 1").entry)
+        for i in (0, 2, 3):
+            self.assertEqual(self.get(cache, f"prompt {i}").entry.response, {"content": f"answer {i}"})
+
+        # Overwriting an existing key refreshes it instead of evicting another entry
+        cache.put(self.get(cache, "prompt 0"), {"content": "answer 0b"}, 10.0)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(self.get(cache, "prompt 0").entry.response, {"content": "answer 0b"})
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(max_entries=8, ttl_seconds=60)
+        self.store(cache, "prompt", "answer")
+
+        self.clock.now += 59.9
+        self.assertEqual(self.get(cache, "prompt").tier, "exact")
+
+        self.clock.now += 0.1
+        self.assertIsNone(self.get(cache, "prompt").entry)
+        stats = cache.stats()
+        self.assertEqual((stats["expirations"], stats["entries"]), (1, 0))
+
+
+class TestSemanticTier(CacheTestCase):
+
+    EMBEDDINGS = {
+        "explain recursion": angle_vector(0),
+        "what is recursion?": angle_vector(20),      # cos = 0.9397
+        "describe recursion briefly": angle_vector(25),  # cos = 0.9063
+        "bake a cake": angle_vector(90),
+        "zero": [0.0, 0.0],
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.embeddings = dict(self.EMBEDDINGS)
+        self.embedded = []
+
+    async def embed(self, text: str):
+        self.embedded.append(text)
+        return self.embeddings.get(text)
+
+    def make_cache(self, **kwargs) -> ResponseCache:
+        options = {"max_entries": 8, "ttl_seconds": 60, "embed_fn": self.embed, "semantic_threshold": 0.92}
+        options.update(kwargs)
+        return ResponseCache(**options)
+
+    def test_threshold(self):
+        cache = self.make_cache()
+        self.store(cache, "Explain recursion", "A function calling itself")
+
+        lookup = self.get(cache, "What is recursion?")
+        self.assertEqual(lookup.tier, "semantic")
+        self.assertAlmostEqual(lookup.similarity, math.cos(math.radians(20)), places=4)
+        self.assertEqual(lookup.entry.response, {"content": "A function calling itself"})
+
+        self.assertIsNone(self.get(cache, "Describe recursion briefly").entry)
+        self.assertIsNone(self.get(cache, "Bake a cake").entry)
+
+        # Lowering the threshold below cos(25 degrees) admits the weaker match
+        cache.semantic_threshold = 0.90
+        self.assertEqual(self.get(cache, "Describe recursion briefly").tier, "semantic")
+
+        stats = cache.stats()
+        self.assertEqual((stats["semantic_hits"], stats["semantic_entries"]), (2, 1))
+
+    def test_threshold_is_inclusive(self):
+        cache = self.make_cache(semantic_threshold=1.0)
+        self.store(cache, "Explain recursion", "answer")
+        # Different exact key, identical embedding: similarity 1.0 still meets the threshold
+        self.embeddings["explain recursion please"] = angle_vector(0)
+        self.assertEqual(self.get(cache, "Explain recursion please").tier, "semantic")
+
+    def test_scope_and_opt_out(self):
+        cache = self.make_cache()
+        self.store(cache, "Explain recursion", "answer")
+
+        self.assertIsNone(self.get(cache, "What is recursion?", params={**PARAMS, "model": "gpt-4o"}).entry)
+        self.assertIsNone(self.get(cache, "What is recursion?", semantic=False).entry)
+
+        # Exact hits never consult the embedding model
+        self.embedded.clear()
+        self.assertEqual(self.get(cache, "explain recursion").tier, "exact")
+        self.assertEqual(self.embedded, [])
+
+    def test_unusable_embeddings_miss(self):
+        cache = self.make_cache()
+        self.store(cache, "Explain recursion", "answer")
+        self.assertIsNone(self.get(cache, "unknown prompt").entry)
+        self.assertIsNone(self.get(cache, "zero").entry)
+
+    def test_semantic_entries_expire(self):
+        cache = self.make_cache()
+        self.store(cache, "Explain recursion", "answer")
+        self.clock.now += 61
+        self.assertIsNone(self.get(cache, "What is recursion?").entry)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["semantic_entries"], 0)
+
+    def test_semantic_index_bound(self):
+        cache = self.make_cache(semantic_max_entries=1)
+        self.store(cache, "Explain recursion", "recursion")
+        self.store(cache, "Bake a cake", "cake")
+
+        self.assertEqual(cache.stats()["semantic_entries"], 1)
+        self.assertIsNone(self.get(cache, "What is recursion?").entry)
+        # Dropped from the semantic index only; the exact tier still answers
+        self.assertEqual(self.get(cache, "Explain recursion").tier, "exact")
+
+
+class TestPersistence(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = DatabaseManager(os.path.join(tmp.name, "router.db"))
+
+    def persisted_keys(self) -> set:
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            return {row[0] for row in conn.execute("SELECT cache_key FROM response_cache")}
+        finally:
+            conn.close()
+
+    def test_reload_drops_expired_and_evicted(self):
+        cache = ResponseCache(db=self.db, max_entries=3, ttl_seconds=60)
+        entries = [self.store(cache, f"prompt {i}", f"answer {i}") for i in range(4)]
+        self.assertEqual(self.persisted_keys(), {e.key for e in entries[1:]})
+
+        self.clock.now += 30
+        late = self.store(cache, "prompt late", "late")
+        self.clock.now += 31
+
+        reloaded = ResponseCache(db=self.db, max_entries=3, ttl_seconds=60)
+        self.assertEqual(reloaded.stats()["entries"], 1)
+        self.assertEqual(self.get(reloaded, "prompt late").entry.response, {"content": "late"})
+        self.assertIsNone(self.get(reloaded, "prompt 3").entry)
+        self.assertEqual(self.persisted_keys(), {late.key})
+
+    def test_reload_respects_smaller_capacity(self):
+        cache = ResponseCache(db=self.db, max_entries=8, ttl_seconds=60)
+        for i in range(5):
+            self.store(cache, f"prompt {i}", f"answer {i}")
+            self.clock.now += 1
+
+        reloaded = ResponseCache(db=self.db, max_entries=2, ttl_seconds=60)
+        self.assertEqual(self.get(reloaded, "prompt 4").tier, "exact")
+        self.assertEqual(self.get(reloaded, "prompt 3").tier, "exact")
+        self.assertIsNone(self.get(reloaded, "prompt 2").entry)
+
+    def test_clear(self):
+        cache = ResponseCache(db=self.db, max_entries=8, ttl_seconds=60)
+        self.store(cache, "prompt", "answer")
+        cache.clear()
+        self.assertEqual(self.persisted_keys(), set())
+        self.assertIsNone(self.get(cache, "prompt").entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
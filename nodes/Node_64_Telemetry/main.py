@@ -10,16 +10,16 @@ import json
 import asyncio
 import logging
 import time
-import statistics
-from typing import Dict, Optional, List, Any, Tuple
+from typing import Dict, Optional, List, Any, Tuple, Union
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 from enum import Enum
 from dataclasses import dataclass, field
-from collections import deque
 import math
 import random
 
+import numpy as np
+
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
@@ -123,37 +123,110 @@ class TelemetryStats(BaseModel):
 # Time Series Storage
 # =============================================================================
 
-class CircularBuffer:
-    """Efficient circular buffer for time series data."""
+class RingBuffer:
+    """
+    Columnar ring buffer of (timestamp, value) samples.
+    
+    Both columns are preallocated float64 arrays of twice the capacity and
+    every sample is written at slot i and i + capacity. Any window of the
+    most recent samples is then one contiguous slice, so reads are
+    zero-copy views no matter where the head has wrapped to.
+    """
     
-    def __init__(self, max_size: int = 1000):
-        self.buffer = deque(maxlen=max_size)
-        self.max_size = max_size
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.values = np.zeros(2 * capacity, dtype=np.float64)
+        self.head = 0   # Next write slot in [0, capacity)
+        self.count = 0
     
-    def append(self, item: Any):
-        self.buffer.append(item)
+    def append(self, timestamp: float, value: float):
+        head = self.head
+        self.timestamps[head] = self.timestamps[head + self.capacity] = timestamp
+        self.values[head] = self.values[head + self.capacity] = value
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
     
-    def get_recent(self, n: int) -> List[Any]:
-        return list(self.buffer)[-n:]
+    def window(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read-only views of the last n timestamps and values (oldest first).
+        
+        Follows list slicing with [-n:]: n = 0 returns the whole series and
+        a negative n drops the oldest -n samples.
+        """
+        if n <= 0:
+            n += self.count
+        n = max(min(n, self.count), 0)
+        end = self.head + self.capacity if self.count == self.capacity else self.head
+        timestamps = self.timestamps[end - n:end]
+        values = self.values[end - n:end]
+        timestamps.flags.writeable = False
+        values.flags.writeable = False
+        return timestamps, values
     
-    def get_all(self) -> List[Any]:
-        return list(self.buffer)
+    def mean_recent(self, n: int) -> Optional[float]:
+        """Mean of the last n values, or None when the buffer is empty."""
+        _, values = self.window(n)
+        return float(values.mean()) if len(values) else None
     
     def __len__(self) -> int:
-        return len(self.buffer)
+        return self.count
+
+@dataclass
+class SeriesView:
+    """
+    Zero-copy window over one series.
+    
+    The arrays alias the ring buffer, so a view is only valid until the
+    next sample is stored for the series; call points() or copy the arrays
+    to keep the data around.
+    """
+    node_id: str
+    metric_type: MetricType
+    timestamps: np.ndarray
+    values: np.ndarray
+    
+    @classmethod
+    def from_points(cls, points: List[MetricPoint]) -> "SeriesView":
+        return cls(
+            node_id=points[0].node_id if points else "",
+            metric_type=points[0].metric_type if points else MetricType.CPU,
+            timestamps=np.array([p.timestamp for p in points], dtype=np.float64),
+            values=np.array([p.value for p in points], dtype=np.float64)
+        )
+    
+    def points(self) -> List[MetricPoint]:
+        return [
+            MetricPoint(timestamp=t, value=v, node_id=self.node_id, metric_type=self.metric_type)
+            for t, v in zip(self.timestamps.tolist(), self.values.tolist())
+        ]
+    
+    def __len__(self) -> int:
+        return len(self.values)
+
+def linear_slope(values: np.ndarray) -> Tuple[float, float]:
+    """Least-squares slope per sample and mean of a window of values."""
+    n = len(values)
+    y_mean = float(values.mean())
+    x = np.arange(n, dtype=np.float64) - (n - 1) / 2
+    denominator = float(x @ x)
+    if denominator == 0:
+        return 0.0, y_mean
+    return float(x @ (values - y_mean)) / denominator, y_mean
 
 class TimeSeriesStore:
     """Multi-resolution time series storage."""
     
     def __init__(self):
         # High-frequency (1s) - last 10 minutes
-        self.high_freq: Dict[str, CircularBuffer] = {}
+        self.high_freq: Dict[str, RingBuffer] = {}
         
         # Medium-frequency (10s) - last 1 hour
-        self.medium_freq: Dict[str, CircularBuffer] = {}
+        self.medium_freq: Dict[str, RingBuffer] = {}
         
         # Low-frequency (60s) - last 24 hours
-        self.low_freq: Dict[str, CircularBuffer] = {}
+        self.low_freq: Dict[str, RingBuffer] = {}
         
         # Aggregation timestamps
         self.last_medium_agg: Dict[str, float] = {}
@@ -164,46 +237,35 @@ class TimeSeriesStore:
     
     def store(self, point: MetricPoint):
         """Store a metric point with automatic downsampling."""
-        key = self._get_key(point.node_id, point.metric_type)
+        self.append(point.node_id, point.metric_type, point.timestamp, point.value)
+    
+    def append(self, node_id: str, metric_type: MetricType, timestamp: float, value: float):
+        """Store one sample with automatic downsampling."""
+        key = self._get_key(node_id, metric_type)
         
         # Initialize buffers if needed
-        if key not in self.high_freq:
-            self.high_freq[key] = CircularBuffer(600)   # 10 min at 1s
-            self.medium_freq[key] = CircularBuffer(360)  # 1 hour at 10s
-            self.low_freq[key] = CircularBuffer(1440)    # 24 hours at 60s
+        high = self.high_freq.get(key)
+        if high is None:
+            high = self.high_freq[key] = RingBuffer(600)   # 10 min at 1s
+            self.medium_freq[key] = RingBuffer(360)        # 1 hour at 10s
+            self.low_freq[key] = RingBuffer(1440)          # 24 hours at 60s
             self.last_medium_agg[key] = 0
             self.last_low_agg[key] = 0
         
         # Store in high-freq
-        self.high_freq[key].append(point)
+        high.append(timestamp, value)
         
         # Downsample to medium-freq
-        if point.timestamp - self.last_medium_agg.get(key, 0) >= SAMPLE_INTERVAL_MEDIUM:
-            recent = self.high_freq[key].get_recent(SAMPLE_INTERVAL_MEDIUM)
-            if recent:
-                avg_value = statistics.mean(p.value for p in recent)
-                agg_point = MetricPoint(
-                    timestamp=point.timestamp,
-                    value=avg_value,
-                    node_id=point.node_id,
-                    metric_type=point.metric_type
-                )
-                self.medium_freq[key].append(agg_point)
-                self.last_medium_agg[key] = point.timestamp
+        if timestamp - self.last_medium_agg[key] >= SAMPLE_INTERVAL_MEDIUM:
+            self.medium_freq[key].append(timestamp, high.mean_recent(SAMPLE_INTERVAL_MEDIUM))
+            self.last_medium_agg[key] = timestamp
         
         # Downsample to low-freq
-        if point.timestamp - self.last_low_agg.get(key, 0) >= SAMPLE_INTERVAL_LOW:
-            recent = self.medium_freq[key].get_recent(6)  # Last 6 medium samples
-            if recent:
-                avg_value = statistics.mean(p.value for p in recent)
-                agg_point = MetricPoint(
-                    timestamp=point.timestamp,
-                    value=avg_value,
-                    node_id=point.node_id,
-                    metric_type=point.metric_type
-                )
-                self.low_freq[key].append(agg_point)
-                self.last_low_agg[key] = point.timestamp
+        if timestamp - self.last_low_agg[key] >= SAMPLE_INTERVAL_LOW:
+            avg_value = self.medium_freq[key].mean_recent(6)  # Last 6 medium samples
+            if avg_value is not None:
+                self.low_freq[key].append(timestamp, avg_value)
+                self.last_low_agg[key] = timestamp
     
     def get_series(
         self,
@@ -211,8 +273,8 @@ class TimeSeriesStore:
         metric_type: MetricType,
         resolution: str = "high",
         limit: int = 100
-    ) -> List[MetricPoint]:
-        """Get time series data at specified resolution."""
+    ) -> SeriesView:
+        """Get time series data at specified resolution (zero-copy view)."""
         key = self._get_key(node_id, metric_type)
         
         if resolution == "high":
@@ -222,10 +284,12 @@ class TimeSeriesStore:
         else:
             buffer = self.low_freq.get(key)
         
-        if not buffer:
-            return []
+        if buffer:
+            timestamps, values = buffer.window(limit)
+        else:
+            timestamps = values = np.empty(0, dtype=np.float64)
         
-        return buffer.get_recent(limit)
+        return SeriesView(node_id=node_id, metric_type=metric_type, timestamps=timestamps, values=values)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get storage statistics."""
@@ -256,21 +320,24 @@ class AnomalyDetector:
             MetricType.LOCK_CONTENTION: (0, 50),
         }
     
-    def detect(self, points: List[MetricPoint]) -> List[Anomaly]:
+    def detect(self, series: Union[SeriesView, List[MetricPoint]]) -> List[Anomaly]:
         """Detect anomalies using ensemble of methods."""
-        if len(points) < 10:
+        if not isinstance(series, SeriesView):
+            series = SeriesView.from_points(series)
+        
+        if len(series) < 10:
             return []
         
         anomalies = []
         
         # Method 1: Statistical (Z-score)
-        stat_anomalies = self._statistical_detection(points)
+        stat_anomalies = self._statistical_detection(series)
         
         # Method 2: Rule-based (thresholds)
-        rule_anomalies = self._rule_based_detection(points)
+        rule_anomalies = self._rule_based_detection(series)
         
         # Method 3: Pattern-based (simple trend)
-        pattern_anomalies = self._pattern_detection(points)
+        pattern_anomalies = self._pattern_detection(series)
         
         # Ensemble voting
         all_anomalies = stat_anomalies + rule_anomalies + pattern_anomalies
@@ -280,96 +347,84 @@ class AnomalyDetector:
         
         return anomalies
     
-    def _statistical_detection(self, points: List[MetricPoint]) -> List[Anomaly]:
+    def _statistical_detection(self, series: SeriesView) -> List[Anomaly]:
         """Z-score based anomaly detection."""
         anomalies = []
         
-        values = [p.value for p in points]
+        values = series.values
         if len(values) < 3:
             return []
         
-        mean = statistics.mean(values)
-        stdev = statistics.stdev(values) if len(values) > 1 else 0
+        mean = float(values.mean())
+        stdev = float(values.std(ddof=1))
         
         if stdev == 0:
             return []
         
-        for point in points[-5:]:  # Check recent points
-            z_score = abs(point.value - mean) / stdev
-            
-            if z_score > 3:  # 3 sigma rule
-                anomalies.append(Anomaly(
-                    timestamp=point.timestamp,
-                    metric_type=point.metric_type,
-                    node_id=point.node_id,
-                    anomaly_type=AnomalyType.SPIKE if point.value > mean else AnomalyType.DROP,
-                    severity=AlertSeverity.WARNING if z_score < 4 else AlertSeverity.CRITICAL,
-                    value=point.value,
-                    expected_range=(mean - 2*stdev, mean + 2*stdev),
-                    description=f"Z-score {z_score:.2f} exceeds threshold",
-                    confidence=min(z_score / 5, 1.0)
-                ))
+        # Check recent points
+        z_scores = np.abs(values[-5:] - mean) / stdev
+        for i in np.flatnonzero(z_scores > 3):  # 3 sigma rule
+            z_score = float(z_scores[i])
+            value = float(values[-5:][i])
+            anomalies.append(Anomaly(
+                timestamp=float(series.timestamps[-5:][i]),
+                metric_type=series.metric_type,
+                node_id=series.node_id,
+                anomaly_type=AnomalyType.SPIKE if value > mean else AnomalyType.DROP,
+                severity=AlertSeverity.WARNING if z_score < 4 else AlertSeverity.CRITICAL,
+                value=value,
+                expected_range=(mean - 2*stdev, mean + 2*stdev),
+                description=f"Z-score {z_score:.2f} exceeds threshold",
+                confidence=min(z_score / 5, 1.0)
+            ))
         
         return anomalies
     
-    def _rule_based_detection(self, points: List[MetricPoint]) -> List[Anomaly]:
+    def _rule_based_detection(self, series: SeriesView) -> List[Anomaly]:
         """Threshold-based anomaly detection."""
         anomalies = []
         
-        if not points:
+        if not len(series):
             return []
         
-        metric_type = points[0].metric_type
-        thresholds = self.thresholds.get(metric_type, (0, 100))
-        
-        for point in points[-5:]:
-            if point.value < thresholds[0] or point.value > thresholds[1]:
-                anomalies.append(Anomaly(
-                    timestamp=point.timestamp,
-                    metric_type=point.metric_type,
-                    node_id=point.node_id,
-                    anomaly_type=AnomalyType.THRESHOLD,
-                    severity=AlertSeverity.CRITICAL if point.value > thresholds[1] * 1.2 else AlertSeverity.WARNING,
-                    value=point.value,
-                    expected_range=thresholds,
-                    description=f"Value {point.value:.2f} outside threshold [{thresholds[0]}, {thresholds[1]}]",
-                    confidence=0.9
-                ))
+        thresholds = self.thresholds.get(series.metric_type, (0, 100))
+        
+        recent = series.values[-5:]
+        for i in np.flatnonzero((recent < thresholds[0]) | (recent > thresholds[1])):
+            value = float(recent[i])
+            anomalies.append(Anomaly(
+                timestamp=float(series.timestamps[-5:][i]),
+                metric_type=series.metric_type,
+                node_id=series.node_id,
+                anomaly_type=AnomalyType.THRESHOLD,
+                severity=AlertSeverity.CRITICAL if value > thresholds[1] * 1.2 else AlertSeverity.WARNING,
+                value=value,
+                expected_range=thresholds,
+                description=f"Value {value:.2f} outside threshold [{thresholds[0]}, {thresholds[1]}]",
+                confidence=0.9
+            ))
         
         return anomalies
     
-    def _pattern_detection(self, points: List[MetricPoint]) -> List[Anomaly]:
+    def _pattern_detection(self, series: SeriesView) -> List[Anomaly]:
         """Simple trend detection."""
         anomalies = []
         
-        if len(points) < 10:
-            return []
-        
-        # Check for consistent upward/downward trend
-        recent = [p.value for p in points[-10:]]
-        
-        # Simple linear regression
-        n = len(recent)
-        x_mean = (n - 1) / 2
-        y_mean = statistics.mean(recent)
-        
-        numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(recent))
-        denominator = sum((i - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
+        if len(series) < 10:
             return []
         
-        slope = numerator / denominator
+        # Check for consistent upward/downward trend (simple linear regression)
+        slope, y_mean = linear_slope(series.values[-10:])
         
         # Significant trend
         if abs(slope) > y_mean * 0.1:  # 10% change per sample
             anomalies.append(Anomaly(
-                timestamp=points[-1].timestamp,
-                metric_type=points[-1].metric_type,
-                node_id=points[-1].node_id,
+                timestamp=float(series.timestamps[-1]),
+                metric_type=series.metric_type,
+                node_id=series.node_id,
                 anomaly_type=AnomalyType.TREND,
                 severity=AlertSeverity.WARNING,
-                value=points[-1].value,
+                value=float(series.values[-1]),
                 expected_range=(y_mean * 0.9, y_mean * 1.1),
                 description=f"{'Increasing' if slope > 0 else 'Decreasing'} trend detected (slope: {slope:.2f})",
                 confidence=min(abs(slope) / (y_mean * 0.2), 1.0)
@@ -429,10 +484,8 @@ class PredictiveAnalyzer:
         if len(series) < 20:
             return []
         
-        values = [p.value for p in series]
-        
         # Predict resource exhaustion
-        exhaustion_alert = self._predict_exhaustion(node_id, metric_type, values)
+        exhaustion_alert = self._predict_exhaustion(node_id, metric_type, series.values)
         if exhaustion_alert:
             alerts.append(exhaustion_alert)
         
@@ -446,26 +499,14 @@ class PredictiveAnalyzer:
         self,
         node_id: str,
         metric_type: MetricType,
-        values: List[float]
+        values: np.ndarray
     ) -> Optional[PredictiveAlert]:
         """Predict when a resource will be exhausted."""
         if len(values) < 10:
             return None
         
         # Simple linear extrapolation
-        recent = values[-10:]
-        n = len(recent)
-        
-        x_mean = (n - 1) / 2
-        y_mean = statistics.mean(recent)
-        
-        numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(recent))
-        denominator = sum((i - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
-            return None
-        
-        slope = numerator / denominator
+        slope, _ = linear_slope(values[-10:])
         
         # Only predict if increasing
         if slope <= 0:
@@ -479,7 +520,7 @@ class PredictiveAnalyzer:
         }
         
         threshold = thresholds.get(metric_type, 100)
-        current = values[-1]
+        current = float(values[-1])
         
         if current >= threshold:
             return None  # Already exhausted
@@ -525,9 +566,8 @@ class PredictiveAnalyzer:
         for (metric_a, metric_b), description in correlations.items():
             if metric_type == metric_a:
                 series_b = store.get_series(node_id, metric_b, "medium", 20)
-                if series_b:
-                    recent_b = [p.value for p in series_b[-5:]]
-                    if recent_b and statistics.mean(recent_b) > 70:  # High value
+                if len(series_b):
+                    if series_b.values[-5:].mean() > 70:  # High value
                         alerts.append(PredictiveAlert(
                             timestamp=time.time(),
                             metric_type=metric_type,
@@ -587,14 +627,7 @@ class TelemetryService:
             except ValueError:
                 continue
             
-            point = MetricPoint(
-                timestamp=timestamp,
-                value=value,
-                node_id=report.node_id,
-                metric_type=metric_type
-            )
-            
-            self.store.store(point)
+            self.store.append(report.node_id, metric_type, timestamp, value)
         
         # Run anomaly detection periodically
         await self._check_anomalies(report.node_id)
@@ -604,7 +637,7 @@ class TelemetryService:
         for metric_type in MetricType:
             series = self.store.get_series(node_id, metric_type, "high", 100)
             
-            if series:
+            if len(series):
                 anomalies = self.detector.detect(series)
                 self.anomalies.extend(anomalies)
                 
@@ -639,12 +672,12 @@ class TelemetryService:
         series = self.store.get_series(node_id, metric_type, resolution, limit)
         return [
             {
-                "timestamp": p.timestamp,
-                "value": p.value,
-                "node_id": p.node_id,
-                "metric_type": p.metric_type.value
+                "timestamp": timestamp,
+                "value": value,
+                "node_id": node_id,
+                "metric_type": metric_type.value
             }
-            for p in series
+            for timestamp, value in zip(series.timestamps.tolist(), series.values.tolist())
         ]
     
     def get_anomalies(self, node_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
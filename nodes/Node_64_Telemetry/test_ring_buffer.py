@@ -0,0 +1,113 @@
+"""
+Node 64: RingBuffer unit tests
+
+Every window is compared against the previous deque-based implementation,
+list(deque(maxlen=capacity))[-n:], across wraparound and for zero and
+negative n.
+
+Usage:
+    python -m pytest nodes/Node_64_Telemetry/test_ring_buffer.py -q
+"""
+
+import random
+import sys
+import unittest
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import MetricType, RingBuffer, TimeSeriesStore
+
+
+class TestRingBufferWindow(unittest.TestCase):
+
+    CAPACITY = 7
+
+    def assert_window_matches(self, buffer: RingBuffer, reference: deque, n: int):
+        expected = list(reference)[-n:]
+        timestamps, values = buffer.window(n)
+        self.assertEqual(timestamps.tolist(), [t for t, _ in expected], f"n={n}")
+        self.assertEqual(values.tolist(), [v for _, v in expected], f"n={n}")
+
+    def test_matches_deque_through_wraparound(self):
+        buffer = RingBuffer(self.CAPACITY)
+        reference = deque(maxlen=self.CAPACITY)
+        for i in range(4 * self.CAPACITY + 3):
+            for n in range(-self.CAPACITY - 2, self.CAPACITY + 3):
+                self.assert_window_matches(buffer, reference, n)
+            buffer.append(float(i), i * 1.5)
+            reference.append((float(i), i * 1.5))
+            self.assertEqual(len(buffer), len(reference))
+
+    def test_zero_returns_whole_series(self):
+        buffer = RingBuffer(self.CAPACITY)
+        self.assertEqual(len(buffer.window(0)[1]), 0)
+        for i in range(3):
+            buffer.append(float(i), float(i))
+        self.assertEqual(buffer.window(0)[1].tolist(), [0.0, 1.0, 2.0])
+        for i in range(3, 20):
+            buffer.append(float(i), float(i))
+        self.assertEqual(buffer.window(0)[1].tolist(), [float(i) for i in range(13, 20)])
+
+    def test_window_is_read_only_view(self):
+        buffer = RingBuffer(self.CAPACITY)
+        for i in range(self.CAPACITY + 2):
+            buffer.append(float(i), float(i))
+        timestamps, values = buffer.window(3)
+
+        self.assertFalse(values.flags.writeable)
+        self.assertFalse(timestamps.flags.writeable)
+        with self.assertRaises(ValueError):
+            values[0] = 0.0
+        self.assertTrue(np.shares_memory(values, buffer.values))
+        self.assertTrue(values.flags.c_contiguous)
+
+    def test_mean_recent(self):
+        buffer = RingBuffer(self.CAPACITY)
+        self.assertIsNone(buffer.mean_recent(5))
+        rng = random.Random(1)
+        reference = deque(maxlen=self.CAPACITY)
+        for i in range(3 * self.CAPACITY):
+            value = rng.uniform(0, 100)
+            buffer.append(float(i), value)
+            reference.append(value)
+            for n in (1, 3, self.CAPACITY, self.CAPACITY + 5):
+                expected = list(reference)[-n:]
+                self.assertAlmostEqual(buffer.mean_recent(n), sum(expected) / len(expected), places=9)
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+
+    def test_get_series_limits(self):
+        store = TimeSeriesStore()
+        for i in range(700):
+            store.append("n1", MetricType.CPU, 1000.0 + i, float(i))
+
+        series = store.get_series("n1", MetricType.CPU, "high", 0)
+        self.assertEqual(len(series), 600)
+        self.assertEqual(series.values[0], 100.0)
+        self.assertEqual(series.values[-1], 699.0)
+
+        series = store.get_series("n1", MetricType.CPU, "high", 5)
+        self.assertEqual(series.values.tolist(), [695.0, 696.0, 697.0, 698.0, 699.0])
+        self.assertEqual([p.timestamp for p in series.points()], [1695.0, 1696.0, 1697.0, 1698.0, 1699.0])
+
+        self.assertEqual(len(store.get_series("missing", MetricType.CPU, "high", 0)), 0)
+
+    def test_downsampled_tiers(self):
+        store = TimeSeriesStore()
+        for i in range(120):
+            store.append("n1", MetricType.CPU, 1000.0 + i, float(i))
+
+        medium = store.get_series("n1", MetricType.CPU, "medium", 0)
+        self.assertEqual(len(medium), 12)
+        self.assertEqual(medium.timestamps[1], 1010.0)
+        self.assertEqual(medium.values[1], float(np.mean(range(1, 11))))
+        self.assertEqual(len(store.get_series("n1", MetricType.CPU, "low", 0)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,11 +9,13 @@ import os
 import json
 import asyncio
 import logging
+import queue
 import time
 import hashlib
 import hmac
 import gzip
-from typing import Dict, Optional, List, Any
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, List, Any, Tuple
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 from enum import Enum
@@ -42,6 +44,7 @@ HMAC_SECRET = os.getenv("HMAC_SECRET", "ufo-galaxy-audit-secret-key")
 MAX_MEMORY_LOGS = 10000
 COMPRESSION_THRESHOLD = 1000  # Compress after this many logs
 RETENTION_DAYS = 30
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "2000"))  # Max logs per transaction
 
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
@@ -117,6 +120,9 @@ class LogEntry(BaseModel):
     level: LogLevel = LogLevel.INFO
     category: LogCategory = LogCategory.SYSTEM
 
+class LogBatch(BaseModel):
+    entries: List[LogEntry]
+
 class LogQuery(BaseModel):
     node_id: Optional[str] = None
     action: Optional[str] = None
@@ -129,130 +135,455 @@ class LogQuery(BaseModel):
     offset: int = 0
 
 # =============================================================================
-# Merkle Tree for Tamper Detection
+# Merkle Accumulator for Tamper Detection
 # =============================================================================
 
-class MerkleTree:
-    """Simple Merkle tree for tamper detection."""
+def hash_leaf(data: bytes) -> bytes:
+    """Leaf hash with RFC 6962 domain separation."""
+    return hashlib.sha256(b"\x00" + data).digest()
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    """Interior node hash with RFC 6962 domain separation."""
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def _split_point(n: int) -> int:
+    """Largest power of two strictly less than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle tree (RFC 6962 shape) kept as a frontier of perfect
+    subtree roots.
+
+    Appending is O(log n) and returns the nodes it completed, so the caller
+    can persist them; inclusion proofs are then built from O(log n) stored
+    nodes. Node (level, index) covers leaves [index * 2^level, (index + 1) * 2^level).
+    """
     
     def __init__(self):
-        self.leaves: List[str] = []
-        self.root: Optional[str] = None
-    
-    def add_leaf(self, data: str) -> str:
-        """Add a leaf and return its hash."""
-        leaf_hash = hashlib.sha256(data.encode()).hexdigest()
-        self.leaves.append(leaf_hash)
-        self._update_root()
-        return leaf_hash
-    
-    def _update_root(self):
-        """Recalculate Merkle root."""
-        if not self.leaves:
-            self.root = None
-            return
-        
-        current_level = self.leaves.copy()
-        
-        while len(current_level) > 1:
-            next_level = []
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1] if i + 1 < len(current_level) else left
-                combined = hashlib.sha256((left + right).encode()).hexdigest()
-                next_level.append(combined)
-            current_level = next_level
-        
-        self.root = current_level[0] if current_level else None
-    
-    def verify(self, data: str, leaf_hash: str) -> bool:
-        """Verify that data matches its leaf hash."""
-        expected = hashlib.sha256(data.encode()).hexdigest()
-        return expected == leaf_hash
-    
-    def get_root(self) -> Optional[str]:
-        """Get current Merkle root."""
-        return self.root
+        self.size = 0
+        self.frontier: List[bytes] = []  # Peaks, largest (leftmost) first
+    
+    def append(self, leaf_hash: bytes) -> List[Tuple[int, int, bytes]]:
+        """Add a leaf; return the (level, index, hash) nodes completed by it."""
+        index = self.size
+        node, level = leaf_hash, 0
+        completed = [(0, index, node)]
+        
+        # A right child merges with the peak to its left
+        while index & 1:
+            node = hash_node(self.frontier.pop(), node)
+            level += 1
+            index >>= 1
+            completed.append((level, index, node))
+        
+        self.frontier.append(node)
+        self.size += 1
+        return completed
+    
+    def get_root(self) -> Optional[bytes]:
+        """Current root: the peaks folded from the right."""
+        if not self.frontier:
+            return None
+        root = self.frontier[-1]
+        for peak in reversed(self.frontier[:-1]):
+            root = hash_node(peak, root)
+        return root
+    
+    def snapshot(self) -> Tuple[int, List[bytes]]:
+        return self.size, list(self.frontier)
+    
+    def restore(self, snapshot: Tuple[int, List[bytes]]):
+        self.size, self.frontier = snapshot[0], list(snapshot[1])
+    
+    @staticmethod
+    def peak_positions(size: int) -> List[Tuple[int, int]]:
+        """(level, index) of the frontier peaks for a tree of the given size."""
+        positions = []
+        start = 0
+        for level in range(size.bit_length() - 1, -1, -1):
+            if size & (1 << level):
+                positions.append((level, start >> level))
+                start += 1 << level
+        return positions
+    
+    @classmethod
+    def subtree_hash(cls, start: int, end: int, get_node: Callable[[int, int], bytes]) -> bytes:
+        """Hash of leaves [start, end), where start is aligned to the subtree split."""
+        n = end - start
+        if n & (n - 1) == 0:
+            level = n.bit_length() - 1
+            return get_node(level, start >> level)
+        k = _split_point(n)
+        return hash_node(get_node((k.bit_length() - 1), start // k), cls.subtree_hash(start + k, end, get_node))
+    
+    @classmethod
+    def inclusion_proof(cls, index: int, size: int, get_node: Callable[[int, int], bytes]) -> List[bytes]:
+        """Audit path for leaf index in the tree of the given size (RFC 6962 PATH)."""
+        if not 0 <= index < size:
+            raise ValueError("Leaf index out of range")
+        
+        proof = []
+        start, end = 0, size
+        while end - start > 1:
+            k = _split_point(end - start)
+            if index < start + k:
+                proof.append(cls.subtree_hash(start + k, end, get_node))
+                end = start + k
+            else:
+                proof.append(cls.subtree_hash(start, start + k, get_node))
+                start += k
+        proof.reverse()
+        return proof
+    
+    @classmethod
+    def consistency_proof(cls, old_size: int, size: int, get_node: Callable[[int, int], bytes]) -> List[bytes]:
+        """Proof that the tree of old_size is a prefix of the tree of size (RFC 6962 PROOF)."""
+        if not 0 < old_size <= size:
+            raise ValueError("Tree sizes out of range")
+        
+        proof = []
+        start, end, m, complete = 0, size, old_size, True
+        while end - start != m:
+            k = _split_point(end - start)
+            if m <= k:
+                proof.append(cls.subtree_hash(start + k, end, get_node))
+                end = start + k
+            else:
+                proof.append(cls.subtree_hash(start, start + k, get_node))
+                start += k
+                m -= k
+                complete = False
+        if not complete:
+            proof.append(cls.subtree_hash(start, end, get_node))
+        proof.reverse()
+        return proof
+    
+    @staticmethod
+    def verify_consistency(old_size: int, size: int, proof: List[bytes], old_root: bytes, root: bytes) -> bool:
+        """Verify a consistency proof between two roots (RFC 9162, section 2.1.4.2)."""
+        if old_size == size:
+            return not proof and old_root == root
+        if not 0 < old_size < size or not proof:
+            return False
+        
+        if old_size & (old_size - 1) == 0:
+            proof = [old_root] + list(proof)
+        fn, sn = old_size - 1, size - 1
+        while fn & 1:
+            fn >>= 1
+            sn >>= 1
+        
+        fr = sr = proof[0]
+        for node in proof[1:]:
+            if sn == 0:
+                return False
+            if fn & 1 or fn == sn:
+                fr = hash_node(node, fr)
+                sr = hash_node(node, sr)
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+            else:
+                sr = hash_node(sr, node)
+            fn >>= 1
+            sn >>= 1
+        return sn == 0 and fr == old_root and sr == root
+    
+    @staticmethod
+    def verify_inclusion(leaf_hash: bytes, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+        """Verify an audit path against a root (RFC 9162, section 2.1.3.2)."""
+        if not 0 <= index < size:
+            return False
+        
+        fn, sn, node = index, size - 1, leaf_hash
+        for sibling in proof:
+            if sn == 0:
+                return False
+            if fn & 1 or fn == sn:
+                node = hash_node(sibling, node)
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+            else:
+                node = hash_node(node, sibling)
+            fn >>= 1
+            sn >>= 1
+        return sn == 0 and node == root
 
 # =============================================================================
 # Log Storage
 # =============================================================================
 
 class LogStorage:
-    """Persistent log storage with SQLite."""
+    """
+    Persistent log storage with SQLite.
+    
+    All writes go through a single group-commit writer thread: entries queued
+    while a transaction is in flight are written together in the next one, so
+    the commit cost is shared by the whole batch. The same transaction stores
+    the Merkle nodes each entry completes.
+    """
     
     def __init__(self, data_dir: str):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
         self.db_path = self.data_dir / "audit_logs.db"
-        self.merkle_tree = MerkleTree()
+        self.merkle_tree = MerkleAccumulator()
         
+        self._lock = threading.Lock()  # Guards the accumulator
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self._init_db()
-        self._lock = threading.Lock()
+        self._load_merkle_tree()
+        
+        # Row ids are assigned by the single writer, so a batch is one executemany
+        self._next_id = (self._conn.execute("SELECT MAX(id) FROM logs").fetchone()[0] or 0) + 1
+        
+        self.batches_written = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[AuditLog], Future]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+        self._writer.start()
     
     def _init_db(self):
         """Initialize SQLite database."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    node_id TEXT NOT NULL,
-                    session_id TEXT,
-                    action TEXT NOT NULL,
-                    resource TEXT,
-                    caller TEXT,
-                    parameters TEXT,
-                    result TEXT,
-                    latency_ms REAL,
-                    trace_id TEXT,
-                    level TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    signature TEXT NOT NULL,
-                    created_at REAL DEFAULT (strftime('%s', 'now'))
-                )
-            """)
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                session_id TEXT,
+                action TEXT NOT NULL,
+                resource TEXT,
+                caller TEXT,
+                parameters TEXT,
+                result TEXT,
+                latency_ms REAL,
+                trace_id TEXT,
+                level TEXT NOT NULL,
+                category TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                created_at REAL DEFAULT (strftime('%s', 'now'))
+            )
+        """)
+        
+        # Leaf position in the Merkle tree (added after the first release)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(logs)")}
+        if "merkle_index" not in columns:
+            conn.execute("ALTER TABLE logs ADD COLUMN merkle_index INTEGER")
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS merkle_nodes (
+                level INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                hash BLOB NOT NULL,
+                PRIMARY KEY (level, idx)
+            ) WITHOUT ROWID
+        """)
+        
+        # Create indexes
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON logs(timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_node_id ON logs(node_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_action ON logs(action)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_level ON logs(level)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_trace_id ON logs(trace_id)")
+        
+        conn.commit()
+    
+    def _load_merkle_tree(self):
+        """Restore the frontier from stored peaks and add logs that predate the tree."""
+        conn = self._conn
+        size = conn.execute("SELECT COUNT(*) FROM merkle_nodes WHERE level = 0").fetchone()[0]
+        
+        get_node = self._node_reader(conn)
+        self.merkle_tree.size = size
+        self.merkle_tree.frontier = [
+            get_node(level, index) for level, index in MerkleAccumulator.peak_positions(size)
+        ]
+        
+        pending = conn.execute("SELECT COUNT(*) FROM logs WHERE merkle_index IS NULL").fetchone()[0]
+        if pending:
+            logger.info(f"Adding {pending} existing logs to the Merkle tree")
+            while True:
+                rows = conn.execute("""
+                    SELECT id, signature FROM logs WHERE merkle_index IS NULL
+                    ORDER BY id LIMIT ?
+                """, (GROUP_COMMIT_MAX_BATCH,)).fetchall()
+                if not rows:
+                    break
+                nodes, indexes = [], []
+                for log_id, signature in rows:
+                    indexes.append((self.merkle_tree.size, log_id))
+                    nodes.extend(self.merkle_tree.append(hash_leaf(signature.encode())))
+                conn.executemany("INSERT INTO merkle_nodes (level, idx, hash) VALUES (?, ?, ?)", nodes)
+                conn.executemany("UPDATE logs SET merkle_index = ? WHERE id = ?", indexes)
+                conn.commit()
+    
+    @staticmethod
+    def _node_reader(conn: sqlite3.Connection) -> Callable[[int, int], bytes]:
+        """Lookup function for completed Merkle nodes."""
+        def get_node(level: int, index: int) -> bytes:
+            row = conn.execute(
+                "SELECT hash FROM merkle_nodes WHERE level = ? AND idx = ?", (level, index)
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"Merkle node ({level}, {index}) missing")
+            return row[0]
+        return get_node
+    
+    def submit(self, logs: List[AuditLog]) -> Future:
+        """Queue log entries; the future resolves to their row ids once committed."""
+        future: Future = Future()
+        self._queue.put((logs, future))
+        return future
+    
+    def store(self, log: AuditLog) -> int:
+        """Store a log entry and wait for its commit."""
+        return self.submit([log]).result()[0]
+    
+    def close(self):
+        """Flush queued entries and stop the writer."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._conn.close()
+    
+    def _writer_loop(self):
+        """Group commit: write everything queued so far in one transaction."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
             
-            # Create indexes
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON logs(timestamp)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_node_id ON logs(node_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_action ON logs(action)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_level ON logs(level)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_trace_id ON logs(trace_id)")
+            batch = [item]
+            count = len(item[0])
+            while count < GROUP_COMMIT_MAX_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                count += len(item[0])
             
-            conn.commit()
+            self._write_batch(batch)
     
-    def store(self, log: AuditLog) -> int:
-        """Store a log entry."""
+    def _write_batch(self, batch: List[Tuple[List[AuditLog], Future]]):
+        """Insert a batch and its Merkle nodes in a single transaction."""
+        logs = [log for request_logs, _ in batch for log in request_logs]
+        
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    INSERT INTO logs (
-                        timestamp, node_id, session_id, action, resource, caller,
-                        parameters, result, latency_ms, trace_id, level, category, signature
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    log.timestamp,
-                    log.node_id,
-                    log.session_id,
-                    log.action,
-                    log.resource,
-                    log.caller,
-                    json.dumps(log.parameters),
-                    json.dumps(log.result),
-                    log.latency_ms,
-                    log.trace_id,
-                    log.level.value,
-                    log.category.value,
-                    log.signature
-                ))
-                conn.commit()
-                
-                # Add to Merkle tree
-                self.merkle_tree.add_leaf(log.signature)
+            snapshot = self.merkle_tree.snapshot()
+            ids = range(self._next_id, self._next_id + len(logs))
+            try:
+                rows, nodes = [], []
+                for log_id, log in zip(ids, logs):
+                    rows.append((
+                        log_id,
+                        log.timestamp,
+                        log.node_id,
+                        log.session_id,
+                        log.action,
+                        log.resource,
+                        log.caller,
+                        json.dumps(log.parameters),
+                        json.dumps(log.result),
+                        log.latency_ms,
+                        log.trace_id,
+                        log.level.value,
+                        log.category.value,
+                        log.signature,
+                        self.merkle_tree.size
+                    ))
+                    
+                    # Add to Merkle tree
+                    nodes.extend(self.merkle_tree.append(hash_leaf(log.signature.encode())))
                 
-                return cursor.lastrowid
+                self._conn.executemany("""
+                    INSERT INTO logs (
+                        id, timestamp, node_id, session_id, action, resource, caller,
+                        parameters, result, latency_ms, trace_id, level, category, signature,
+                        merkle_index
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                self._conn.executemany("INSERT INTO merkle_nodes (level, idx, hash) VALUES (?, ?, ?)", nodes)
+                self._conn.commit()
+                self._next_id += len(logs)
+                self.batches_written += 1
+            except Exception as e:
+                self._conn.rollback()
+                self.merkle_tree.restore(snapshot)
+                logger.error(f"Failed to write {len(logs)} logs: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+        
+        start = 0
+        for request_logs, future in batch:
+            future.set_result(list(ids[start:start + len(request_logs)]))
+            start += len(request_logs)
+    
+    def inclusion_proof(self, log_id: int) -> Dict[str, Any]:
+        """Merkle audit path for a log entry against the current root."""
+        with self._lock:
+            size = self.merkle_tree.size
+            root = self.merkle_tree.get_root()
+        
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT signature, merkle_index FROM logs WHERE id = ?", (log_id,)
+            ).fetchone()
+            
+            if not row or row[1] is None or row[1] >= size:
+                return {"valid": False, "error": "Log not found"}
+            
+            signature, index = row
+            leaf = hash_leaf(signature.encode())
+            proof = MerkleAccumulator.inclusion_proof(index, size, self._node_reader(conn))
+        
+        return {
+            "valid": MerkleAccumulator.verify_inclusion(leaf, index, size, proof, root),
+            "log_id": log_id,
+            "leaf_index": index,
+            "tree_size": size,
+            "leaf_hash": leaf.hex(),
+            "proof": [node.hex() for node in proof],
+            "merkle_root": root.hex()
+        }
+    
+    def consistency_proof(self, old_size: int, size: Optional[int] = None) -> Dict[str, Any]:
+        """Proof that the log of old_size entries is a prefix of the log of size entries (default: now)."""
+        with self._lock:
+            current = self.merkle_tree.size
+        size = current if size is None else size
+        if not 0 < old_size <= size <= current:
+            return {"valid": False, "error": f"Tree sizes must satisfy 0 < old_size <= tree_size <= {current}"}
+        
+        with sqlite3.connect(self.db_path) as conn:
+            get_node = self._node_reader(conn)
+            old_root = MerkleAccumulator.subtree_hash(0, old_size, get_node)
+            root = MerkleAccumulator.subtree_hash(0, size, get_node)
+            proof = MerkleAccumulator.consistency_proof(old_size, size, get_node)
+        
+        return {
+            "valid": MerkleAccumulator.verify_consistency(old_size, size, proof, old_root, root),
+            "old_size": old_size,
+            "tree_size": size,
+            "old_root": old_root.hex(),
+            "merkle_root": root.hex(),
+            "proof": [node.hex() for node in proof]
+        }
+    
+    def get_merkle_root(self) -> Optional[str]:
+        with self._lock:
+            root = self.merkle_tree.get_root()
+        return root.hex() if root else None
     
     def query(self, query: LogQuery) -> List[Dict[str, Any]]:
         """Query logs with filters."""
@@ -342,7 +673,10 @@ class LogStorage:
                 "by_level": by_level,
                 "by_category": by_category,
                 "by_node": by_node,
-                "merkle_root": self.merkle_tree.get_root(),
+                "merkle_root": self.get_merkle_root(),
+                "merkle_leaves": self.merkle_tree.size,
+                "pending_writes": self._queue.qsize(),
+                "batches_written": self.batches_written,
                 "db_size_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0
             }
     
@@ -389,15 +723,14 @@ class LoggerService:
         self.storage = LogStorage(data_dir)
         self.memory_buffer: List[AuditLog] = []
         self.session_counter = 0
+        self._hmac = hmac.new(HMAC_SECRET.encode(), digestmod=hashlib.sha256)
     
     def _generate_signature(self, log_data: Dict[str, Any]) -> str:
         """Generate HMAC signature for log entry."""
         data = json.dumps(log_data, sort_keys=True)
-        return hmac.new(
-            HMAC_SECRET.encode(),
-            data.encode(),
-            hashlib.sha256
-        ).hexdigest()
+        signer = self._hmac.copy()
+        signer.update(data.encode())
+        return signer.hexdigest()
     
     def _generate_trace_id(self) -> str:
         """Generate unique trace ID."""
@@ -410,7 +743,18 @@ class LoggerService:
         return f"sess_{self.session_counter:08d}"
     
     def log(self, entry: LogEntry) -> AuditLog:
-        """Create and store a log entry."""
+        """Create and store a log entry (waits for the commit)."""
+        audit_log = self.create(entry)
+        self.storage.store(audit_log)
+        return audit_log
+    
+    def submit(self, entries: List[LogEntry]) -> Tuple[List[AuditLog], Future]:
+        """Create log entries and queue them for the next group commit."""
+        audit_logs = [self.create(entry) for entry in entries]
+        return audit_logs, self.storage.submit(audit_logs)
+    
+    def create(self, entry: LogEntry) -> AuditLog:
+        """Create a signed log entry and keep it in the memory buffer."""
         timestamp = datetime.utcnow().isoformat() + "Z"
         trace_id = entry.trace_id or self._generate_trace_id()
         session_id = entry.session_id or self._generate_session_id()
@@ -441,9 +785,6 @@ class LoggerService:
             signature=signature
         )
         
-        # Store in database
-        self.storage.store(audit_log)
-        
         # Keep in memory buffer
         self.memory_buffer.append(audit_log)
         if len(self.memory_buffer) > MAX_MEMORY_LOGS:
@@ -471,6 +812,14 @@ class LoggerService:
         """Verify integrity of a log entry."""
         return self.storage.verify_integrity(log_id)
     
+    def get_proof(self, log_id: int) -> Dict[str, Any]:
+        """Merkle inclusion proof for a log entry."""
+        return self.storage.inclusion_proof(log_id)
+    
+    def get_consistency_proof(self, old_size: int, size: Optional[int] = None) -> Dict[str, Any]:
+        """Merkle consistency proof between two tree sizes."""
+        return self.storage.consistency_proof(old_size, size)
+    
     def export_logs(
         self,
         query: LogQuery,
@@ -504,6 +853,7 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info(f"Shutting down Node {NODE_ID}")
+    service.storage.close()
 
 app = FastAPI(
     title=f"UFO Galaxy Node {NODE_ID}: {NODE_NAME}",
@@ -538,13 +888,27 @@ async def health_check():
 @app.post("/log")
 async def create_log(entry: LogEntry):
     """Create a new log entry."""
-    audit_log = service.log(entry)
+    (audit_log,), future = service.submit([entry])
+    (log_id,) = await asyncio.wrap_future(future)
     return {
         "status": "logged",
+        "log_id": log_id,
         "trace_id": audit_log.trace_id,
         "signature": audit_log.signature[:16] + "..."
     }
 
+@app.post("/log/batch")
+async def create_logs(batch: LogBatch):
+    """Create several log entries; they are committed together."""
+    audit_logs, future = service.submit(batch.entries)
+    log_ids = await asyncio.wrap_future(future)
+    return {
+        "status": "logged",
+        "count": len(audit_logs),
+        "log_ids": log_ids,
+        "trace_ids": [audit_log.trace_id for audit_log in audit_logs]
+    }
+
 @app.post("/query")
 async def query_logs(query: LogQuery):
     """Query logs with filters."""
@@ -577,10 +941,20 @@ async def verify_log(log_id: int):
 async def get_merkle_root():
     """Get current Merkle root for audit verification."""
     return {
-        "merkle_root": service.storage.merkle_tree.get_root(),
-        "leaf_count": len(service.storage.merkle_tree.leaves)
+        "merkle_root": service.storage.get_merkle_root(),
+        "leaf_count": service.storage.merkle_tree.size
     }
 
+@app.get("/proof/{log_id}")
+async def get_proof(log_id: int):
+    """Get the Merkle inclusion proof of a log entry."""
+    return service.get_proof(log_id)
+
+@app.get("/consistency")
+async def get_consistency(old_size: int, tree_size: Optional[int] = None):
+    """Get the Merkle consistency proof between an earlier tree size and a later one (default: current)."""
+    return service.get_consistency_proof(old_size, tree_size)
+
 @app.post("/export")
 async def export_logs(query: LogQuery, format: str = "json"):
     """Export logs in specified format."""
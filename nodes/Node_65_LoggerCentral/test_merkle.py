@@ -0,0 +1,351 @@
+"""
+Node 65: Merkle accumulator and group-commit storage unit tests
+
+- Roots, inclusion proofs and consistency proofs against the RFC 6962 test
+  vectors (certificate-transparency reference data), and against a
+  recursive MTH / PATH / PROOF reference for every size up to 40.
+- LogStorage reloads its frontier from disk, backfills logs written before
+  the tree existed, and commits queued entries in submission order.
+
+Usage:
+    python -m pytest nodes/Node_65_LoggerCentral/test_merkle.py -q
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    AuditLog, LogCategory, LogLevel, LogStorage, MerkleAccumulator,
+    _split_point, hash_leaf, hash_node
+)
+
+# RFC 6962 reference leaves and roots of the trees made of the first 1..8 leaves
+LEAVES = [bytes.fromhex(h) for h in (
+    "", "00", "10", "2021", "3031", "40414243",
+    "5051525354555657", "606162636465666768696a6b6c6d6e6f",
+)]
+ROOTS = [bytes.fromhex(h) for h in (
+    "6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d",
+    "fac54203e7cc696cf0dfcb42c92a1d9dbaf70ad9e621f4bd8d98662f00e3c125",
+    "aeb6bcfe274b70a14fb067a5e5578264db0fa9b51af5e0ba159158f329e06e77",
+    "d37ee418976dd95753c1c73862b9398fa2a2cf9b4ff0fdfe8b30cd95209614b7",
+    "4e3bbb1f7b478dcfe71fb631631519a3bca12c9aefca1612bfce4c13a86264d4",
+    "76e67dadbcdf1e10e1b74ddc608abd2f98dfb16fbce75277b5232a127f2087ef",
+    "ddb89be403809e325750d3d263cd78929c2942b7942a34b77e122c9594a74c8c",
+    "5dc9da79a70659a9ad559cb701ded9a2ab9d823aad2f4960cfe370eff4604328",
+)]
+# (leaf index, tree size, audit path)
+INCLUSION_PROOFS = [
+    (0, 1, []),
+    (0, 8, [
+        "96a296d224f285c67bee93c30f8a309157f0daa35dc5b87e410b78630a09cfc7",
+        "5f083f0a1a33ca076a95279832580db3e0ef4584bdff1f54c8a360f50de3031e",
+        "6b47aaf29ee3c2af9af889bc1fb9254dabd31177f16232dd6aab035ca39bf6e4",
+    ]),
+    (5, 8, [
+        "bc1a0643b12e4d2d7c77918f44e0f4f79a838b6cf9ec5b5c283e1f4d88599e6b",
+        "ca854ea128ed050b41b35ffc1b87b8eb2bde461e9e3b5596ece6b9d5975a0ae0",
+        "d37ee418976dd95753c1c73862b9398fa2a2cf9b4ff0fdfe8b30cd95209614b7",
+    ]),
+    (2, 3, [
+        "fac54203e7cc696cf0dfcb42c92a1d9dbaf70ad9e621f4bd8d98662f00e3c125",
+    ]),
+    (1, 5, [
+        "6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d",
+        "5f083f0a1a33ca076a95279832580db3e0ef4584bdff1f54c8a360f50de3031e",
+        "bc1a0643b12e4d2d7c77918f44e0f4f79a838b6cf9ec5b5c283e1f4d88599e6b",
+    ]),
+]
+# (old size, new size, proof)
+CONSISTENCY_PROOFS = [
+    (1, 1, []),
+    (1, 8, [
+        "96a296d224f285c67bee93c30f8a309157f0daa35dc5b87e410b78630a09cfc7",
+        "5f083f0a1a33ca076a95279832580db3e0ef4584bdff1f54c8a360f50de3031e",
+        "6b47aaf29ee3c2af9af889bc1fb9254dabd31177f16232dd6aab035ca39bf6e4",
+    ]),
+    (6, 8, [
+        "0ebc5d3437fbe2db158b9f126a1d118e308181031d0a949f8dededebc558ef6a",
+        "ca854ea128ed050b41b35ffc1b87b8eb2bde461e9e3b5596ece6b9d5975a0ae0",
+        "d37ee418976dd95753c1c73862b9398fa2a2cf9b4ff0fdfe8b30cd95209614b7",
+    ]),
+    (2, 5, [
+        "5f083f0a1a33ca076a95279832580db3e0ef4584bdff1f54c8a360f50de3031e",
+        "bc1a0643b12e4d2d7c77918f44e0f4f79a838b6cf9ec5b5c283e1f4d88599e6b",
+    ]),
+]
+
+
+def mth(leaves):
+    """RFC 6962 Merkle Tree Hash, computed recursively."""
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split_point(len(leaves))
+    return hash_node(mth(leaves[:k]), mth(leaves[k:]))
+
+
+def path(index, leaves):
+    """RFC 6962 PATH(m, D[n])."""
+    if len(leaves) == 1:
+        return []
+    k = _split_point(len(leaves))
+    if index < k:
+        return path(index, leaves[:k]) + [mth(leaves[k:])]
+    return path(index - k, leaves[k:]) + [mth(leaves[:k])]
+
+
+def subproof(m, leaves, complete):
+    """RFC 6962 SUBPROOF(m, D[n], b)."""
+    if m == len(leaves):
+        return [] if complete else [mth(leaves)]
+    k = _split_point(len(leaves))
+    if m <= k:
+        return subproof(m, leaves[:k], complete) + [mth(leaves[k:])]
+    return subproof(m - k, leaves[k:], False) + [mth(leaves[:k])]
+
+
+class MemoryTree:
+    """Accumulator plus an in-memory node table."""
+
+    def __init__(self, leaf_hashes):
+        self.tree = MerkleAccumulator()
+        self.nodes = {}
+        for leaf_hash in leaf_hashes:
+            for level, index, node in self.tree.append(leaf_hash):
+                self.nodes[(level, index)] = node
+
+    def get_node(self, level, index):
+        return self.nodes[(level, index)]
+
+
+def make_log(i: int) -> AuditLog:
+    return AuditLog(
+        timestamp=f"2026-01-01T00:00:{i % 60:02d}Z",
+        node_id="test",
+        session_id="sess",
+        action=f"action_{i}",
+        resource=None,
+        caller=None,
+        parameters={"i": i},
+        result={},
+        latency_ms=0.0,
+        trace_id=f"trace_{i}",
+        level=LogLevel.INFO,
+        category=LogCategory.SYSTEM,
+        signature=f"sig{i:06d}"
+    )
+
+
+class TestRFC6962Vectors(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = MemoryTree(hash_leaf(leaf) for leaf in LEAVES)
+
+    def test_roots(self):
+        tree = MerkleAccumulator()
+        self.assertIsNone(tree.get_root())
+        for leaf, root in zip(LEAVES, ROOTS):
+            tree.append(hash_leaf(leaf))
+            self.assertEqual(tree.get_root(), root, f"size {tree.size}")
+            self.assertEqual(MerkleAccumulator.subtree_hash(0, tree.size, self.tree.get_node), root)
+
+    def test_inclusion_proofs(self):
+        for index, size, expected in INCLUSION_PROOFS:
+            expected = [bytes.fromhex(h) for h in expected]
+            proof = MerkleAccumulator.inclusion_proof(index, size, self.tree.get_node)
+            self.assertEqual(proof, expected, (index, size))
+
+            leaf = hash_leaf(LEAVES[index])
+            root = ROOTS[size - 1]
+            self.assertTrue(MerkleAccumulator.verify_inclusion(leaf, index, size, proof, root))
+            self.assertFalse(MerkleAccumulator.verify_inclusion(hash_leaf(b"x"), index, size, proof, root))
+            if proof:
+                self.assertFalse(MerkleAccumulator.verify_inclusion(leaf, index, size, proof[:-1], root))
+
+    def test_consistency_proofs(self):
+        for old_size, size, expected in CONSISTENCY_PROOFS:
+            expected = [bytes.fromhex(h) for h in expected]
+            proof = MerkleAccumulator.consistency_proof(old_size, size, self.tree.get_node)
+            self.assertEqual(proof, expected, (old_size, size))
+
+            old_root, root = ROOTS[old_size - 1], ROOTS[size - 1]
+            self.assertTrue(MerkleAccumulator.verify_consistency(old_size, size, proof, old_root, root))
+            if old_size != size:
+                self.assertFalse(MerkleAccumulator.verify_consistency(old_size, size, proof, root, root))
+                self.assertFalse(MerkleAccumulator.verify_consistency(old_size, size, proof[1:], old_root, root))
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            MerkleAccumulator.inclusion_proof(8, 8, self.tree.get_node)
+        with self.assertRaises(ValueError):
+            MerkleAccumulator.consistency_proof(0, 8, self.tree.get_node)
+        with self.assertRaises(ValueError):
+            MerkleAccumulator.consistency_proof(5, 4, self.tree.get_node)
+
+
+class TestAgainstReference(unittest.TestCase):
+
+    SIZE = 40
+
+    def test_every_size(self):
+        leaves = [hash_leaf(f"leaf {i}".encode()) for i in range(self.SIZE)]
+        tree = MemoryTree(leaves)
+        roots = [mth(leaves[:n]) for n in range(1, self.SIZE + 1)]
+        self.assertEqual(tree.tree.get_root(), roots[-1])
+        self.assertEqual(len(tree.tree.frontier), bin(self.SIZE).count("1"))
+
+        for size in range(1, self.SIZE + 1):
+            for index in range(size):
+                proof = MerkleAccumulator.inclusion_proof(index, size, tree.get_node)
+                self.assertEqual(proof, path(index, leaves[:size]), (index, size))
+                self.assertTrue(MerkleAccumulator.verify_inclusion(leaves[index], index, size, proof, roots[size - 1]))
+            for old_size in range(1, size + 1):
+                proof = MerkleAccumulator.consistency_proof(old_size, size, tree.get_node)
+                self.assertEqual(proof, subproof(old_size, leaves[:size], True), (old_size, size))
+                self.assertTrue(MerkleAccumulator.verify_consistency(
+                    old_size, size, proof, roots[old_size - 1], roots[size - 1]
+                ))
+
+    def test_peak_positions(self):
+        tree = MemoryTree(hash_leaf(bytes([i])) for i in range(self.SIZE))
+        for size in (1, 2, 5, 8, 13, self.SIZE):
+            positions = MerkleAccumulator.peak_positions(size)
+            self.assertEqual(sum(1 << level for level, _ in positions), size)
+        restored = [tree.get_node(level, index) for level, index in MerkleAccumulator.peak_positions(self.SIZE)]
+        self.assertEqual(restored, tree.tree.frontier)
+
+
+class StorageTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+        self.storages = []
+
+    def tearDown(self):
+        for storage in self.storages:
+            storage.close()
+        self._tmp.cleanup()
+
+    def open_storage(self) -> LogStorage:
+        storage = LogStorage(self.data_dir)
+        self.storages.append(storage)
+        return storage
+
+    def close(self, storage: LogStorage):
+        storage.close()
+        self.storages.remove(storage)
+
+    def expected_root(self, count: int) -> bytes:
+        return mth([hash_leaf(make_log(i).signature.encode()) for i in range(count)])
+
+
+class TestStorageReload(StorageTestCase):
+
+    def test_reload_restores_frontier(self):
+        storage = self.open_storage()
+        for start, end in ((0, 5), (5, 11), (11, 13)):
+            storage.submit([make_log(i) for i in range(start, end)]).result()
+        self.assertEqual(storage.merkle_tree.size, 13)
+        root = storage.get_merkle_root()
+        self.assertEqual(bytes.fromhex(root), self.expected_root(13))
+        self.close(storage)
+
+        storage = self.open_storage()
+        self.assertEqual(storage.merkle_tree.size, 13)
+        self.assertEqual(storage.get_merkle_root(), root)
+
+        # Appending after the reload continues the same tree
+        storage.submit([make_log(i) for i in range(13, 21)]).result()
+        self.assertEqual(bytes.fromhex(storage.get_merkle_root()), self.expected_root(21))
+        for log_id in (1, 13, 14, 21):
+            proof = storage.inclusion_proof(log_id)
+            self.assertTrue(proof["valid"], log_id)
+            self.assertEqual(proof["leaf_index"], log_id - 1)
+
+        consistency = storage.consistency_proof(13)
+        self.assertTrue(consistency["valid"])
+        self.assertEqual(consistency["old_root"], root)
+        self.assertTrue(storage.consistency_proof(5, 13)["valid"])
+        self.assertFalse(storage.consistency_proof(0)["valid"])
+        self.assertFalse(storage.consistency_proof(5, 22)["valid"])
+        self.assertFalse(storage.inclusion_proof(99)["valid"])
+
+    def test_legacy_logs_are_backfilled(self):
+        storage = self.open_storage()
+        storage.submit([make_log(i) for i in range(3)]).result()
+        self.close(storage)
+
+        # Rows written before the tree existed have no merkle_index and no nodes
+        with sqlite3.connect(Path(self.data_dir) / "audit_logs.db") as conn:
+            conn.execute("DELETE FROM merkle_nodes")
+            conn.execute("UPDATE logs SET merkle_index = NULL")
+        conn.close()
+
+        with mock.patch.object(main, "GROUP_COMMIT_MAX_BATCH", 2):
+            storage = self.open_storage()
+        self.assertEqual(storage.merkle_tree.size, 3)
+        self.assertEqual(bytes.fromhex(storage.get_merkle_root()), self.expected_root(3))
+        self.assertTrue(all(storage.inclusion_proof(log_id)["valid"] for log_id in (1, 2, 3)))
+
+
+class TestGroupCommit(StorageTestCase):
+
+    def test_queued_entries_commit_in_submission_order(self):
+        storage = self.open_storage()
+        storage.submit([make_log(0)]).result()
+
+        # Hold the accumulator lock so the writer stalls and the rest queue up
+        with storage._lock:
+            futures = [storage.submit([make_log(i), make_log(i + 1)]) for i in range(1, 41, 2)]
+            while storage._queue.qsize() > len(futures) - 1:
+                threading.Event().wait(0.001)
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, [[i + 1, i + 2] for i in range(1, 41, 2)])
+        self.assertLessEqual(storage.batches_written, 3)
+
+        with sqlite3.connect(storage.db_path) as conn:
+            rows = conn.execute("SELECT id, merkle_index, signature FROM logs ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual([(row[0], row[1]) for row in rows], [(i + 1, i) for i in range(41)])
+        self.assertEqual([row[2] for row in rows], [make_log(i).signature for i in range(41)])
+        self.assertEqual(bytes.fromhex(storage.get_merkle_root()), self.expected_root(41))
+
+    def test_close_flushes_queue(self):
+        storage = self.open_storage()
+        futures = [storage.submit([make_log(i)]) for i in range(50)]
+        self.close(storage)
+        self.assertEqual([future.result(timeout=0) for future in futures], [[i + 1] for i in range(50)])
+
+        storage = self.open_storage()
+        self.assertEqual(storage.merkle_tree.size, 50)
+        self.assertEqual(bytes.fromhex(storage.get_merkle_root()), self.expected_root(50))
+
+    def test_failed_batch_rolls_back_tree(self):
+        storage = self.open_storage()
+        storage.submit([make_log(0), make_log(1)]).result()
+        root = storage.get_merkle_root()
+
+        # A primary-key conflict fails the whole transaction
+        storage._next_id = 2
+        with self.assertRaises(sqlite3.IntegrityError):
+            storage.submit([make_log(2)]).result(timeout=5)
+        self.assertEqual(storage.merkle_tree.size, 2)
+        self.assertEqual(storage.get_merkle_root(), root)
+
+        storage._next_id = 3
+        self.assertEqual(storage.submit([make_log(2)]).result(timeout=5), [3])
+        self.assertEqual(bytes.fromhex(storage.get_merkle_root()), self.expected_root(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,7 @@ Node 81: Orchestrator - 统一编排器
 """
 
 import os
+import sys
 import json
 import asyncio
 import logging
@@ -36,6 +37,13 @@ from pydantic import BaseModel, Field
 import uvicorn
 import httpx
 
+# 在仓库内运行时使用共享的节点间 RPC 连接池
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+try:
+    from shared.node_rpc import close_node_rpc_client, get_node_rpc_client
+except ImportError:
+    close_node_rpc_client = get_node_rpc_client = None
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -135,7 +143,9 @@ class OrchestratorService:
     """编排器服务"""
     
     def __init__(self):
-        self.http_client = httpx.AsyncClient(timeout=60)
+        # 共享连接池（按节点限流并统计延迟）；单独部署时退回独立客户端
+        self.rpc = get_node_rpc_client() if get_node_rpc_client else None
+        self.http_client = None if self.rpc else httpx.AsyncClient(timeout=60)
         self.workflows: Dict[str, WorkflowResult] = {}
         self.running_tasks: Dict[str, asyncio.Task] = {}
     
@@ -150,13 +160,11 @@ class OrchestratorService:
         for attempt in range(call.retry):
             try:
                 if call.method == "GET":
-                    response = await self.http_client.get(url, params=call.data, timeout=call.timeout)
-                elif call.method == "POST":
-                    response = await self.http_client.post(url, json=call.data, timeout=call.timeout)
-                elif call.method == "PUT":
-                    response = await self.http_client.put(url, json=call.data, timeout=call.timeout)
+                    response = await self.request("GET", url, call.node_id, params=call.data, timeout=call.timeout)
+                elif call.method in ("POST", "PUT"):
+                    response = await self.request(call.method, url, call.node_id, json=call.data, timeout=call.timeout)
                 elif call.method == "DELETE":
-                    response = await self.http_client.delete(url, timeout=call.timeout)
+                    response = await self.request("DELETE", url, call.node_id, timeout=call.timeout)
                 else:
                     raise ValueError(f"Unsupported method: {call.method}")
                 
@@ -173,6 +181,12 @@ class OrchestratorService:
         
         return None
     
+    async def request(self, method: str, url: str, node_id: str, **kwargs) -> httpx.Response:
+        """发送节点请求（优先走共享连接池）"""
+        if self.rpc:
+            return await self.rpc.request(method, url, node=f"node_{node_id}", **kwargs)
+        return await self.http_client.request(method, url, **kwargs)
+    
     async def execute_simple_task(self, task: Task) -> TaskResult:
         """执行简单任务（单节点）"""
         start_time = datetime.now()
@@ -382,8 +396,10 @@ class OrchestratorService:
             # 保存到记忆系统
             if request.save_to_memory:
                 try:
-                    await self.http_client.post(
+                    await self.request(
+                        "POST",
                         f"{NODE_SERVICES['80']}/memory",
+                        "80",
                         json={
                             "content": f"Workflow: {request.description}",
                             "memory_type": "long_term",
@@ -416,8 +432,10 @@ class OrchestratorService:
     async def decompose_task(self, description: str) -> List[Task]:
         """使用 LLM 分解任务"""
         try:
-            response = await self.http_client.post(
+            response = await self.request(
+                "POST",
                 f"{NODE_SERVICES['79']}/generate",
+                "79",
                 json={
                     "prompt": f"""分解以下任务为具体的执行步骤，返回 JSON 格式：
 
@@ -464,9 +482,16 @@ class OrchestratorService:
             logger.error(f"Task decomposition failed: {e}")
             raise HTTPException(status_code=500, detail=f"Task decomposition failed: {e}")
     
+    def get_rpc_stats(self) -> Dict[str, Any]:
+        """节点调用的延迟统计"""
+        if self.rpc:
+            return self.rpc.get_stats()
+        return {"shared_pool": False}
+    
     async def close(self):
-        """关闭客户端"""
-        await self.http_client.aclose()
+        """关闭自建的客户端（共享连接池在进程退出时统一关闭）"""
+        if self.http_client:
+            await self.http_client.aclose()
 
 # =============================================================================
 # FastAPI Application
@@ -480,6 +505,8 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Node 81: Orchestrator")
     yield
     await orchestrator.close()
+    if close_node_rpc_client:
+        await close_node_rpc_client()
     logger.info("Node 81 shutdown complete")
 
 app = FastAPI(
@@ -524,6 +551,11 @@ async def health():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/rpc/stats")
+async def rpc_stats():
+    """节点调用延迟直方图"""
+    return orchestrator.get_rpc_stats()
+
 @app.post("/workflow")
 async def execute_workflow(request: WorkflowRequest, background_tasks: BackgroundTasks):
     """执行工作流"""
@@ -8,6 +8,7 @@ Node 90: MultimodalVision - 多模态视觉理解
 4. 集成模板匹配
 5. 集成多模态 LLM 分析
 6. 提供高级视觉理解能力
+7. 结果缓存：按截图的感知哈希缓存 OCR 与 VLM 结果，画面未变化时直接返回
 
 版本：1.0.0
 日期：2026-01-22
@@ -17,17 +18,38 @@ Node 90: MultimodalVision - 多模态视觉理解
 import os
 import sys
 import base64
+import binascii
+import hashlib
 import io
+import json
+import time
 import asyncio
 import httpx
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import numpy as np
 from PIL import Image
 
-app = FastAPI(title="Node 90 - MultimodalVision", version="1.0.0")
+# 在仓库内运行时使用共享的节点间 RPC 连接池
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+try:
+    from shared.node_rpc import close_node_rpc_client, get_node_rpc_client
+except ImportError:
+    close_node_rpc_client = get_node_rpc_client = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if close_node_rpc_client:
+        await close_node_rpc_client()
+
+app = FastAPI(title="Node 90 - MultimodalVision", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -45,6 +67,12 @@ NODE_15_OCR_URL = os.getenv("NODE_15_OCR_URL", "http://localhost:8015")
 NODE_45_DESKTOP_URL = os.getenv("NODE_45_DESKTOP_URL", "http://localhost:8045")
 NODE_95_WEBRTC_URL = os.getenv("NODE_95_WEBRTC_URL", "http://localhost:8095")
 
+# 结果缓存：最多缓存的结果数，以及近似匹配时每个分块允许不同的哈希位数（-1 表示只做精确匹配）
+VISION_CACHE_SIZE = int(os.getenv("VISION_CACHE_SIZE", "256"))
+VISION_CACHE_TILE_DISTANCE = int(os.getenv("VISION_CACHE_TILE_DISTANCE", "2"))
+# OCR 默认只做精确匹配：感知哈希分辨不出小字的改动，近似命中会返回过期的文字
+VISION_CACHE_NEAR_OCR = os.getenv("VISION_CACHE_NEAR_OCR", "false").lower() in ("1", "true", "yes")
+
 # 多模态 LLM
 llm_client = None
 try:
@@ -87,6 +115,7 @@ class OCRRequest(BaseModel):
     image_base64: Optional[str] = None
     language: str = "eng+chi_sim"
     engine: str = "auto"
+    use_cache: bool = True
 
 class FindElementRequest(BaseModel):
     """查找元素"""
@@ -95,6 +124,7 @@ class FindElementRequest(BaseModel):
     image_base64: Optional[str] = None
     method: str = "auto"  # auto, ocr, template, llm
     confidence: float = 0.8
+    use_cache: bool = True
 
 class AnalyzeScreenRequest(BaseModel):
     """分析屏幕"""
@@ -104,12 +134,14 @@ class AnalyzeScreenRequest(BaseModel):
     provider: str = "auto"  # auto, gemini, qwen
     platform: str = "windows"  # windows, android
     device_id: Optional[str] = None  # 设备 ID（Android 必须）
+    use_cache: bool = True
 
 class FindTextRequest(BaseModel):
     """查找文本"""
     text: str
     image_path: Optional[str] = None
     image_base64: Optional[str] = None
+    use_cache: bool = True
 
 class FindTemplateRequest(BaseModel):
     """查找模板"""
@@ -150,6 +182,249 @@ async def call_node(url: str, endpoint: str, data: dict) -> dict:
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def read_image_bytes(image_path: Optional[str] = None, image_base64: Optional[str] = None) -> Optional[bytes]:
+    """读取图片原始字节（不解码），无法读取时返回 None"""
+    try:
+        if image_path:
+            with open(image_path, "rb") as f:
+                return f.read()
+        if image_base64:
+            return base64.b64decode(image_base64)
+    except (OSError, binascii.Error, ValueError):
+        pass
+    return None
+
+# ============================================================================
+# 结果缓存（感知哈希）
+# ============================================================================
+
+# 差分哈希网格：64×64 位，切成 8×8 个分块，每块 8×8 = 64 位
+HASH_GRID = 64
+HASH_TILES = 8
+HASH_TILE_CELLS = HASH_GRID // HASH_TILES
+
+def perceptual_hash(image_data: bytes) -> Tuple[int, ...]:
+    """
+    计算截图的分块差分哈希（dHash）
+    
+    缩放为 65×64 灰度图后比较水平相邻像素，每个分块得到一个 64 位整数。
+    按分块比较可以让局部变化（弹窗、页面切换）只影响所在分块，
+    不会被全图的平均淹没。
+    
+    解码和缩放仍需几到几十毫秒，事件循环中应通过 asyncio.to_thread 调用。
+    
+    Args:
+        image_data: 图片文件字节
+    
+    Returns:
+        64 个分块哈希
+    """
+    image = Image.open(io.BytesIO(image_data)).convert("L")
+    pixels = np.asarray(image.resize((HASH_GRID + 1, HASH_GRID), Image.BOX), dtype=np.uint8)
+    
+    bits = pixels[:, :-1] < pixels[:, 1:]
+    # (块行, 块内行, 块列, 块内列) -> (分块, 块内位)，块内位 = 块内行 × 8 + 块内列
+    bits = bits.reshape(HASH_TILES, HASH_TILE_CELLS, HASH_TILES, HASH_TILE_CELLS).transpose(0, 2, 1, 3)
+    packed = np.packbits(bits.reshape(HASH_TILES * HASH_TILES, -1), axis=1, bitorder="little")
+    return tuple(packed.view("<u8").ravel().tolist())
+
+def tile_distance(a: Tuple[int, ...], b: Tuple[int, ...]) -> Tuple[int, int]:
+    """返回 (最大分块汉明距离, 总汉明距离)"""
+    distances = [bin(x ^ y).count("1") for x, y in zip(a, b)]
+    return max(distances), sum(distances)
+
+@dataclass
+class ScreenCacheEntry:
+    """缓存的识别结果"""
+    key: str
+    scope: str
+    tiles: Optional[Tuple[int, ...]]
+    result: Dict[str, Any]
+    latency_ms: float
+    created_at: float
+    hits: int = 0
+
+@dataclass
+class ScreenLookup:
+    """一次缓存查询；未命中时交回 ScreenCache.put 保存结果"""
+    namespace: str
+    scope: str
+    key: str
+    tiles: Optional[Tuple[int, ...]] = None
+    entry: Optional[ScreenCacheEntry] = None
+    tier: Optional[str] = None  # "exact" 或 "near"
+    distance: int = 0
+
+class ScreenCache:
+    """
+    截图内容寻址的结果缓存（LRU）
+    
+    先按图片字节的摘要做精确匹配（无需解码）；未命中时计算分块感知哈希，
+    在同一操作和参数下查找每个分块距离都不超过阈值的最近条目，
+    从而让只有压缩噪声差异的画面（例如连续的视频帧）也能命中。
+    
+    感知哈希对小字号文字的改动不敏感，近似命中只适合语义层面的结果
+    （VLM 回答），逐字的 OCR 结果默认只走精确匹配。
+    """
+    
+    def __init__(self, max_entries: int = VISION_CACHE_SIZE, max_tile_distance: int = VISION_CACHE_TILE_DISTANCE):
+        self.max_entries = max_entries
+        self.max_tile_distance = max_tile_distance
+        self._entries: "OrderedDict[str, ScreenCacheEntry]" = OrderedDict()
+        self.counters = {
+            "exact_hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "latency_saved_ms": 0.0,
+            "lookup_ms": 0.0
+        }
+    
+    @staticmethod
+    def make_scope(namespace: str, params: Dict[str, Any]) -> str:
+        """操作和参数决定结果能否复用"""
+        return hashlib.sha256(
+            json.dumps([namespace, params], sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+    
+    async def get(self, namespace: str, params: Dict[str, Any], image_data: bytes, near: bool = True) -> ScreenLookup:
+        """
+        查询缓存（感知哈希在线程池中计算，不阻塞事件循环）
+        
+        Args:
+            namespace: 操作类型（"ocr"、"find_element"、"analyze_screen"）
+            params: 结果依赖的参数（语言、查询语句、模型等）
+            image_data: 截图文件字节
+            near: 是否允许感知哈希近似命中
+        
+        Returns:
+            ScreenLookup，命中时 entry 不为空
+        """
+        started = time.perf_counter()
+        scope = self.make_scope(namespace, params)
+        digest = hashlib.blake2b(image_data, digest_size=16).hexdigest()
+        lookup = ScreenLookup(namespace=namespace, scope=scope, key=f"{scope}:{digest}")
+        
+        try:
+            # 精确匹配：同一张图片
+            entry = self._entries.get(lookup.key)
+            if entry:
+                return self._hit(lookup, entry, "exact", 0)
+            
+            # 近似匹配：感知哈希足够接近的画面
+            if near and self.max_tile_distance >= 0:
+                try:
+                    lookup.tiles = await asyncio.to_thread(perceptual_hash, image_data)
+                except Exception:
+                    lookup.tiles = None
+                
+                if lookup.tiles:
+                    best, best_distance = self._nearest(scope, lookup.tiles)
+                    if best:
+                        return self._hit(lookup, best, "near", best_distance)
+            
+            self.counters["misses"] += 1
+            return lookup
+        finally:
+            self.counters["lookup_ms"] += (time.perf_counter() - started) * 1000
+    
+    def put(self, lookup: ScreenLookup, result: Dict[str, Any], latency_ms: float) -> ScreenCacheEntry:
+        """
+        保存未命中查询的结果
+        
+        Args:
+            lookup: get() 返回的查询
+            result: 识别结果
+            latency_ms: 得到该结果的耗时（之后每次命中计入节省的时间）
+        """
+        entry = ScreenCacheEntry(
+            key=lookup.key,
+            scope=lookup.scope,
+            tiles=lookup.tiles,
+            result=result,
+            latency_ms=latency_ms,
+            created_at=time.time()
+        )
+        self._entries.pop(entry.key, None)
+        self._entries[entry.key] = entry
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+        
+        return entry
+    
+    def _nearest(self, scope: str, tiles: Tuple[int, ...]) -> Tuple[Optional[ScreenCacheEntry], int]:
+        best, best_distance = None, None
+        for entry in reversed(self._entries.values()):
+            if entry.scope != scope or entry.tiles is None:
+                continue
+            max_distance, total = tile_distance(tiles, entry.tiles)
+            if max_distance <= self.max_tile_distance and (best is None or total < best_distance):
+                best, best_distance = entry, total
+                if total == 0:
+                    break
+        return best, best_distance
+    
+    def _hit(self, lookup: ScreenLookup, entry: ScreenCacheEntry, tier: str, distance: int) -> ScreenLookup:
+        self._entries.move_to_end(entry.key)
+        entry.hits += 1
+        lookup.entry = entry
+        lookup.tier = tier
+        lookup.distance = distance
+        self.counters[f"{tier}_hits"] += 1
+        self.counters["latency_saved_ms"] += entry.latency_ms
+        return lookup
+    
+    def clear(self):
+        """清空缓存（保留计数）"""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """命中率和节省的时间"""
+        hits = self.counters["exact_hits"] + self.counters["near_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "latency_saved_ms": round(self.counters["latency_saved_ms"], 1),
+            "lookup_ms": round(self.counters["lookup_ms"], 1),
+            "avg_lookup_ms": round(self.counters["lookup_ms"] / lookups, 2) if lookups else 0.0,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_tile_distance": self.max_tile_distance
+        }
+
+screen_cache = ScreenCache()
+
+async def lookup_screen_cache(
+    namespace: str,
+    params: Dict[str, Any],
+    use_cache: bool,
+    image_path: Optional[str] = None,
+    image_base64: Optional[str] = None,
+    near: bool = True
+) -> Optional[ScreenLookup]:
+    """按请求的图片查询缓存；禁用缓存或读不到图片时返回 None"""
+    if not use_cache:
+        return None
+    image_data = read_image_bytes(image_path, image_base64)
+    if not image_data:
+        return None
+    return await screen_cache.get(namespace, params, image_data, near=near)
+
+def cached_response(lookup: ScreenLookup) -> Dict[str, Any]:
+    """命中时返回的结果，附带缓存信息"""
+    return {
+        **lookup.entry.result,
+        "cache": {
+            "hit": lookup.tier,
+            "distance": lookup.distance,
+            "saved_ms": round(lookup.entry.latency_ms, 1)
+        }
+    }
+
 # ============================================================================
 # 屏幕截图
 # ============================================================================
@@ -167,26 +442,32 @@ async def capture_screen(request: CaptureScreenRequest) -> Dict[str, Any]:
             return {"success": False, "error": "device_id is required for Android"}
         
         try:
-            result = await call_node(
-                NODE_95_WEBRTC_URL,
-                "/get_latest_frame",
-                {
-                    "device_id": request.device_id,
-                    "format": "jpeg"
-                }
-            )
+            # 原始字节端点直接返回 JPEG，省去 base64 JSON 的体积和解析开销；
+            # 连续截图复用共享连接池中到 Node_95 的长连接
+            url = f"{NODE_95_WEBRTC_URL}/frame/{request.device_id}/raw"
+            params = {"format": "jpeg"}
+            if get_node_rpc_client:
+                response = await get_node_rpc_client().get(
+                    url, node="Node_95", params=params, timeout=30.0
+                )
+            else:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.get(url, params=params)
             
-            if result.get("success"):
+            if response.status_code == 200:
                 # 返回画面
                 return {
                     "success": True,
-                    "image_base64": result.get("frame_data"),
-                    "timestamp": result.get("timestamp"),
-                    "frame_size": result.get("frame_size"),
+                    "image_base64": base64.b64encode(response.content).decode(),
+                    "timestamp": response.headers.get("X-Frame-Timestamp"),
+                    "frame_size": {
+                        "width": int(response.headers.get("X-Frame-Width", 0)),
+                        "height": int(response.headers.get("X-Frame-Height", 0))
+                    },
                     "source": "webrtc"
                 }
             else:
-                return {"success": False, "error": result.get("error", "Unknown error")}
+                return {"success": False, "error": response.json().get("error", "Unknown error")}
         
         except Exception as e:
             return {"success": False, "error": f"Failed to get Android frame: {str(e)}"}
@@ -199,14 +480,29 @@ async def capture_screen(request: CaptureScreenRequest) -> Dict[str, Any]:
 
 @app.post("/ocr")
 async def ocr_recognize(request: OCRRequest) -> Dict[str, Any]:
-    """OCR 识别"""
+    """OCR 识别（同一画面的结果走缓存）"""
+    lookup = await lookup_screen_cache(
+        "ocr",
+        {"language": request.language, "engine": request.engine},
+        request.use_cache,
+        request.image_path,
+        request.image_base64,
+        near=VISION_CACHE_NEAR_OCR
+    )
+    if lookup and lookup.entry:
+        return cached_response(lookup)
+    
     # 调用 Node_15_OCR
+    started = time.perf_counter()
     result = await call_node(NODE_15_OCR_URL, "/recognize", {
         "image_path": request.image_path,
         "image_base64": request.image_base64,
         "language": request.language,
         "engine": request.engine
     })
+    
+    if lookup and result.get("success"):
+        screen_cache.put(lookup, result, (time.perf_counter() - started) * 1000)
     return result
 
 # ============================================================================
@@ -243,7 +539,8 @@ async def find_element(request: FindElementRequest) -> Dict[str, Any]:
             image_path=request.image_path,
             image_base64=request.image_base64,
             language="eng+chi_sim",
-            engine="auto"
+            engine="auto",
+            use_cache=request.use_cache
         ))
         
         if ocr_result.get("success"):
@@ -276,8 +573,17 @@ async def find_element(request: FindElementRequest) -> Dict[str, Any]:
         if not llm_client:
             return {"success": False, "error": "LLM not available"}
         
+        # 同一画面、同一描述的 LLM 结果直接复用
+        lookup = await lookup_screen_cache(
+            "find_element",
+            {"description": request.description, "model": "gemini-2.0-flash-exp"},
+            request.use_cache,
+            request.image_path,
+            request.image_base64
+        )
+        
         # 加载图片
-        image = load_image(request.image_path, request.image_base64)
+        image = None if lookup and lookup.entry else load_image(request.image_path, request.image_base64)
         
         # 构建查询
         query = f"""请分析这个屏幕截图，找到"{request.description}"的位置。
@@ -304,40 +610,50 @@ async def find_element(request: FindElementRequest) -> Dict[str, Any]:
 """
         
         try:
-            # 使用 Gemini 分析
-            response = llm_client.models.generate_content(
-                model="gemini-2.0-flash-exp",
-                contents=[query, image]
-            )
-            
-            # 解析 JSON
-            import json
-            response_text = response.text.strip()
-            
-            # 清理响应
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
+            if lookup and lookup.entry:
+                result = lookup.entry.result
+            else:
+                # 使用 Gemini 分析
+                started = time.perf_counter()
+                response = llm_client.models.generate_content(
+                    model="gemini-2.0-flash-exp",
+                    contents=[query, image]
+                )
+                
+                # 解析 JSON
+                response_text = response.text.strip()
+                
+                # 清理响应
+                if response_text.startswith("```json"):
+                    response_text = response_text[7:]
+                if response_text.startswith("```"):
+                    response_text = response_text[3:]
+                if response_text.endswith("```"):
+                    response_text = response_text[:-3]
+                response_text = response_text.strip()
+                
+                result = json.loads(response_text)
+                
+                if lookup:
+                    screen_cache.put(lookup, result, (time.perf_counter() - started) * 1000)
             
-            result = json.loads(response_text)
+            cache_info = {"cache": cached_response(lookup)["cache"]} if lookup and lookup.entry else {}
             
             if result.get("found") and result.get("confidence", 0) >= request.confidence:
                 return {
                     "success": True,
                     "found": True,
                     "method": "llm",
-                    **result
+                    **result,
+                    **cache_info
                 }
             else:
                 return {
                     "success": True,
                     "found": False,
                     "method": "llm",
-                    "reason": result.get("reason", "Confidence too low")
+                    "reason": result.get("reason", "Confidence too low"),
+                    **cache_info
                 }
         
         except Exception as e:
@@ -382,6 +698,18 @@ async def analyze_screen(request: AnalyzeScreenRequest) -> Dict[str, Any]:
         # 根据返回的字段名获取图片
         request.image_base64 = screenshot_result.get("image_base64") or screenshot_result.get("image")
     
+    # 同一画面、同一问题的分析结果直接复用
+    lookup = await lookup_screen_cache(
+        "analyze_screen",
+        {"provider": provider, "query": request.query},
+        request.use_cache,
+        request.image_path,
+        request.image_base64
+    )
+    if lookup and lookup.entry:
+        return cached_response(lookup)
+    
+    started = time.perf_counter()
     try:
         if provider == "qwen":
             # 使用 Qwen3-VL via OpenRouter
@@ -430,7 +758,7 @@ async def analyze_screen(request: AnalyzeScreenRequest) -> Dict[str, Any]:
                 max_tokens=2048
             )
             
-            return {
+            result = {
                 "success": True,
                 "query": request.query,
                 "analysis": response.choices[0].message.content,
@@ -448,7 +776,7 @@ async def analyze_screen(request: AnalyzeScreenRequest) -> Dict[str, Any]:
                 contents=[request.query, image]
             )
             
-            return {
+            result = {
                 "success": True,
                 "query": request.query,
                 "analysis": response.text,
@@ -460,6 +788,10 @@ async def analyze_screen(request: AnalyzeScreenRequest) -> Dict[str, Any]:
     
     except Exception as e:
         return {"success": False, "error": str(e), "provider": provider}
+    
+    if lookup:
+        screen_cache.put(lookup, result, (time.perf_counter() - started) * 1000)
+    return result
 
 # ============================================================================
 # 查找文本
@@ -473,7 +805,8 @@ async def find_text(request: FindTextRequest) -> Dict[str, Any]:
         image_path=request.image_path,
         image_base64=request.image_base64,
         language="eng+chi_sim",
-        engine="auto"
+        engine="auto",
+        use_cache=request.use_cache
     ))
     
     if not ocr_result.get("success"):
@@ -515,6 +848,21 @@ async def find_template(request: FindTemplateRequest) -> Dict[str, Any]:
     })
     return result
 
+# ============================================================================
+# 缓存统计
+# ============================================================================
+
+@app.get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    """结果缓存的命中率和节省的时间"""
+    return screen_cache.stats()
+
+@app.post("/cache/clear")
+async def cache_clear() -> Dict[str, Any]:
+    """清空结果缓存"""
+    screen_cache.clear()
+    return {"success": True, **screen_cache.stats()}
+
 # ============================================================================
 # 健康检查
 # ============================================================================
@@ -552,6 +900,10 @@ async def health():
             "node_45_desktop": node_45_status,
             "llm": llm_client is not None
         },
+        "cache": {
+            key: value for key, value in screen_cache.stats().items()
+            if key in ("entries", "hit_rate", "latency_saved_ms")
+        },
         "timestamp": datetime.now().isoformat()
     }
 
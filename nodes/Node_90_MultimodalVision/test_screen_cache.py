@@ -0,0 +1,192 @@
+"""
+Node_90 截图结果缓存单元测试
+
+测试内容：
+1. 分块差分哈希：与逐像素实现一致，在线程池中计算
+2. 命中层级：同一 PNG 精确命中，JPEG 重新编码近似命中，弹出对话框未命中
+3. LRU 淘汰与按操作/参数隔离
+
+用法:
+    python -m pytest nodes/Node_90_MultimodalVision/test_screen_cache.py -q
+
+作者: Manus AI
+日期: 2026-01-22
+"""
+
+import asyncio
+import io
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import HASH_GRID, HASH_TILE_CELLS, HASH_TILES, ScreenCache, perceptual_hash, tile_distance
+
+
+def make_screen(popup: bool = False, title: str = "Settings", width: int = 1280, height: int = 720) -> Image.Image:
+    """模拟桌面应用截图：标题栏、侧边菜单和正文，可选在中间弹出对话框"""
+    image = Image.new("RGB", (width, height), (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width, 40], fill=(30, 60, 120))
+    draw.text((12, 12), title, fill=(255, 255, 255))
+    draw.rectangle([0, 40, 220, height], fill=(210, 215, 225))
+    for i in range(12):
+        draw.rectangle([20, 60 + i * 50, 200, 90 + i * 50], fill=(180, 190, 205))
+        draw.text((30, 68 + i * 50), f"Menu item {i}", fill=(20, 20, 20))
+    for row in range(14):
+        draw.text((250, 60 + row * 45), "Lorem ipsum dolor sit amet consectetur " * 2, fill=(40, 40, 40))
+    if popup:
+        draw.rectangle([490, 260, 790, 460], fill=(255, 255, 255), outline=(0, 0, 0), width=3)
+        draw.rectangle([640, 410, 770, 445], fill=(0, 120, 215))
+        draw.text((510, 280), "Are you sure?", fill=(0, 0, 0))
+    return image
+
+
+def encode(image: Image.Image, fmt: str = "PNG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def reference_hash(image_data: bytes):
+    """逐像素的分块差分哈希"""
+    image = Image.open(io.BytesIO(image_data)).convert("L")
+    pixels = image.resize((HASH_GRID + 1, HASH_GRID), Image.BOX).tobytes()
+    tiles = [0] * (HASH_TILES * HASH_TILES)
+    for row in range(HASH_GRID):
+        offset = row * (HASH_GRID + 1)
+        for col in range(HASH_GRID):
+            if pixels[offset + col] < pixels[offset + col + 1]:
+                tile = (row // HASH_TILE_CELLS) * HASH_TILES + col // HASH_TILE_CELLS
+                bit = (row % HASH_TILE_CELLS) * HASH_TILE_CELLS + col % HASH_TILE_CELLS
+                tiles[tile] |= 1 << bit
+    return tuple(tiles)
+
+
+class TestPerceptualHash(unittest.TestCase):
+
+    def test_matches_reference(self):
+        for image in (make_screen(), make_screen(popup=True), make_screen(width=333, height=97)):
+            data = encode(image)
+            self.assertEqual(perceptual_hash(data), reference_hash(data))
+
+    def test_distances(self):
+        png = perceptual_hash(encode(make_screen()))
+        self.assertEqual(tile_distance(png, png), (0, 0))
+
+        max_distance, _ = tile_distance(png, perceptual_hash(encode(make_screen(), "JPEG", quality=90)))
+        self.assertLessEqual(max_distance, main.VISION_CACHE_TILE_DISTANCE)
+
+        max_distance, _ = tile_distance(png, perceptual_hash(encode(make_screen(popup=True))))
+        self.assertGreater(max_distance, main.VISION_CACHE_TILE_DISTANCE)
+
+
+class TestScreenCache(unittest.TestCase):
+
+    PARAMS = {"provider": "gemini", "query": "what is on screen"}
+
+    def setUp(self):
+        self.cache = ScreenCache(max_entries=8, max_tile_distance=2)
+        self.png = encode(make_screen())
+
+    def get(self, image_data: bytes, namespace: str = "analyze_screen", params=None, near: bool = True):
+        return asyncio.run(self.cache.get(namespace, params or self.PARAMS, image_data, near=near))
+
+    def store(self, image_data: bytes, result: dict, namespace: str = "analyze_screen", params=None, latency_ms: float = 100.0):
+        lookup = self.get(image_data, namespace, params)
+        self.assertIsNone(lookup.entry)
+        self.cache.put(lookup, result, latency_ms)
+        return lookup
+
+    def test_png_exact_hit(self):
+        self.store(self.png, {"answer": "settings page"}, latency_ms=1500.0)
+
+        lookup = self.get(encode(make_screen()))
+        self.assertEqual(lookup.tier, "exact")
+        self.assertEqual(lookup.entry.result, {"answer": "settings page"})
+        response = main.cached_response(lookup)
+        self.assertEqual(response["cache"], {"hit": "exact", "distance": 0, "saved_ms": 1500.0})
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["exact_hits"], stats["near_hits"], stats["misses"]), (1, 0, 1))
+        self.assertEqual(stats["latency_saved_ms"], 1500.0)
+
+    def test_jpeg_reencode_near_hit(self):
+        self.store(self.png, {"answer": "settings page"})
+        jpeg = encode(make_screen(), "JPEG", quality=90)
+
+        lookup = self.get(jpeg)
+        self.assertEqual(lookup.tier, "near")
+        self.assertGreater(lookup.distance, 0)
+        self.assertEqual(lookup.entry.result, {"answer": "settings page"})
+
+        # 只允许精确匹配时（OCR 默认）不命中
+        self.assertIsNone(self.get(jpeg, near=False).entry)
+
+    def test_popup_misses(self):
+        self.store(self.png, {"answer": "settings page"})
+        lookup = self.get(encode(make_screen(popup=True)))
+        self.assertIsNone(lookup.entry)
+        self.assertIsNotNone(lookup.tiles)
+
+        # 保存后弹窗画面和原画面各自命中自己的结果
+        self.cache.put(lookup, {"answer": "confirm dialog"}, 100.0)
+        self.assertEqual(self.get(encode(make_screen(popup=True), "JPEG", quality=90)).entry.result, {"answer": "confirm dialog"})
+        self.assertEqual(self.get(encode(make_screen(), "JPEG", quality=90)).entry.result, {"answer": "settings page"})
+
+    def test_scope_isolation(self):
+        self.store(self.png, {"answer": "settings page"})
+        self.assertIsNone(self.get(self.png, params={"provider": "gemini", "query": "other question"}).entry)
+        self.assertIsNone(self.get(self.png, params={"provider": "qwen", "query": "what is on screen"}).entry)
+        self.assertIsNone(self.get(self.png, namespace="find_element").entry)
+        self.assertIsNone(self.get(encode(make_screen(), "JPEG", quality=90), namespace="ocr").entry)
+        self.assertEqual(self.get(self.png).tier, "exact")
+
+    def test_lru_eviction(self):
+        self.cache.max_entries = 3
+        screens = [encode(make_screen(title=f"Window {i}")) for i in range(4)]
+        for i, data in enumerate(screens[:3]):
+            self.cache.put(self.get(data, near=False), {"i": i}, 10.0)
+
+        # 访问最旧的条目后，它变为最近使用
+        self.assertEqual(self.get(screens[0], near=False).entry.result, {"i": 0})
+        self.cache.put(self.get(screens[3], near=False), {"i": 3}, 10.0)
+
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertEqual(self.cache.stats()["entries"], 3)
+        self.assertIsNone(self.get(screens[1], near=False).entry)
+        for i in (0, 2, 3):
+            self.assertEqual(self.get(screens[i], near=False).entry.result, {"i": i})
+
+    def test_hash_runs_off_event_loop(self):
+        threads = []
+
+        def recording_hash(image_data):
+            threads.append(threading.get_ident())
+            return perceptual_hash(image_data)
+
+        async def run():
+            with mock.patch.object(main, "perceptual_hash", side_effect=recording_hash):
+                lookup = await self.cache.get("analyze_screen", self.PARAMS, self.png)
+            return threading.get_ident(), lookup
+
+        loop_thread, lookup = asyncio.run(run())
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+        self.assertIsNotNone(lookup.tiles)
+
+    def test_undecodable_image_still_caches_exactly(self):
+        lookup = self.get(b"not an image")
+        self.assertIsNone(lookup.tiles)
+        self.cache.put(lookup, {"answer": "x"}, 1.0)
+        self.assertEqual(self.get(b"not an image").tier, "exact")
+
+
+if __name__ == "__main__":
+    unittest.main()
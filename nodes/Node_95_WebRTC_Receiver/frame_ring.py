@@ -0,0 +1,298 @@
+"""
+Node_95: 共享内存帧环形缓冲区
+
+每个设备一块预分配的共享内存（multiprocessing.shared_memory），
+保存最近 N 帧解码后的 bgr24 图像。同机的视觉节点按名称挂载后
+直接以 numpy 视图读取帧，不经过 HTTP，也不复制数据。
+
+内存布局（小端）：
+
+    [头部 64 字节]
+        magic(4s) version(H) status(H) slots(I) slot_size(I)
+        write_count(Q) latest_slot(I)
+    [槽位元数据 slots × 32 字节]
+        seq(Q) timestamp(d) width(I) height(I) channels(I) nbytes(I)
+    [数据区 slots × slot_size 字节，按 64 字节对齐]
+
+写入采用 seqlock：先把槽位 seq 清零，再写数据和元数据，最后写入
+非零 seq 并更新头部。读者在读取前后比较槽位 seq，不一致即说明
+读到一半被覆盖。
+
+缓冲区作废时写入方先在头部写入状态再释放：帧尺寸超过槽位大小时
+标记为 retired 并以新名称重建；订阅租约到期或节点退出时标记为
+released。已挂载的读者看到非 live 状态后不再拿到帧，应重新订阅。
+
+作者: Manus AI
+日期: 2026-01-24
+"""
+
+import hashlib
+import itertools
+import os
+import struct
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"UFOR"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHIIQI")
+HEADER_SIZE = 64
+SLOT_META = struct.Struct("<QdIIII")
+SLOT_META_SIZE = 32
+ALIGNMENT = 64
+
+# 头部状态
+STATUS_LIVE = 0
+STATUS_RETIRED = 1    # 已按更大的槽位以新名称重建
+STATUS_RELEASED = 2   # 租约到期或节点退出，不再写入
+
+_STATUS_NAMES = {STATUS_LIVE: "live", STATUS_RETIRED: "retired", STATUS_RELEASED: "released"}
+
+# 进程内递增的缓冲区编号，释放后重建的帧环不会复用旧名称
+_ring_ids = itertools.count(1)
+
+# 本进程创建的缓冲区名称（由 resource_tracker 登记，unlink 时注销）
+_local_rings = set()
+
+
+def _align(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+@dataclass
+class FrameMeta:
+    """槽位元数据"""
+    slot: int
+    seq: int
+    timestamp: float
+    width: int
+    height: int
+    channels: int
+    nbytes: int
+    
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (self.height, self.width, self.channels)
+
+
+class _RingLayout:
+    """读写双方共用的布局计算"""
+    
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.buf = shm.buf
+        magic, version, _, self.slots, self.slot_size, _, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{shm.name} is not a frame ring (v{VERSION})")
+        self.data_offset = _align(HEADER_SIZE + self.slots * SLOT_META_SIZE)
+    
+    @staticmethod
+    def total_size(slots: int, slot_size: int) -> int:
+        return _align(HEADER_SIZE + slots * SLOT_META_SIZE) + slots * slot_size
+    
+    @property
+    def status(self) -> int:
+        return HEADER.unpack_from(self.buf, 0)[2]
+    
+    @property
+    def write_count(self) -> int:
+        return HEADER.unpack_from(self.buf, 0)[5]
+    
+    @property
+    def latest_slot(self) -> int:
+        return HEADER.unpack_from(self.buf, 0)[6]
+    
+    def meta_offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * SLOT_META_SIZE
+    
+    def read_meta(self, slot: int) -> FrameMeta:
+        return FrameMeta(slot, *SLOT_META.unpack_from(self.buf, self.meta_offset(slot)))
+    
+    def slot_seq(self, slot: int) -> int:
+        return struct.unpack_from("<Q", self.buf, self.meta_offset(slot))[0]
+    
+    def view(self, meta: FrameMeta) -> np.ndarray:
+        offset = self.data_offset + meta.slot * self.slot_size
+        return np.ndarray(meta.shape, dtype=np.uint8, buffer=self.buf, offset=offset)
+
+
+class FrameRing:
+    """
+    写入方：单个设备的共享内存环形缓冲区
+    
+    只应在 Node_95 的事件循环线程中写入。
+    """
+    
+    def __init__(self, device_id: str, slots: int, slot_size: int):
+        """
+        创建缓冲区
+        
+        Args:
+            device_id: 设备 ID
+            slots: 保留的最近帧数
+            slot_size: 每个槽位的字节数（至少一帧 height × width × 3）
+        """
+        if slots < 2:
+            raise ValueError("a frame ring needs at least 2 slots")
+        self.device_id = device_id
+        self.slots = slots
+        self.generation = 0
+        self.frames_written = 0
+        self._layout: Optional[_RingLayout] = None
+        self._create(slot_size)
+    
+    def _create(self, slot_size: int):
+        self.generation += 1
+        digest = hashlib.sha1(self.device_id.encode()).hexdigest()[:12]
+        name = f"n95_{digest}_{os.getpid()}_{next(_ring_ids)}"
+        size = _RingLayout.total_size(self.slots, slot_size)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _local_rings.add(shm.name)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, 0, self.slots, slot_size, 0, 0)
+        for slot in range(self.slots):
+            SLOT_META.pack_into(shm.buf, HEADER_SIZE + slot * SLOT_META_SIZE, 0, 0.0, 0, 0, 0, 0)
+        self._layout = _RingLayout(shm)
+    
+    @property
+    def name(self) -> str:
+        return self._layout.shm.name
+    
+    @property
+    def slot_size(self) -> int:
+        return self._layout.slot_size
+    
+    def write(self, frame: np.ndarray, seq: int, timestamp: float):
+        """
+        写入一帧
+        
+        Args:
+            frame: uint8 图像，形状为 (height, width, channels)
+            seq: 帧序号（必须大于 0）
+            timestamp: Unix 时间戳
+        """
+        if frame.nbytes > self.slot_size:
+            self._retire(STATUS_RETIRED)
+            self._create(frame.nbytes)
+        
+        layout = self._layout
+        slot = self.frames_written % self.slots
+        meta_offset = layout.meta_offset(slot)
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        
+        struct.pack_into("<Q", layout.buf, meta_offset, 0)
+        layout.view(FrameMeta(slot, 0, 0.0, width, height, channels, frame.nbytes))[...] = frame.reshape(height, width, channels)
+        SLOT_META.pack_into(layout.buf, meta_offset, seq, timestamp, width, height, channels, frame.nbytes)
+        
+        self.frames_written += 1
+        HEADER.pack_into(
+            layout.buf, 0, MAGIC, VERSION, STATUS_LIVE, self.slots, self.slot_size, self.frames_written, slot
+        )
+    
+    def describe(self) -> dict:
+        """返回读者挂载所需的信息"""
+        return {
+            "name": self.name,
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+            "generation": self.generation,
+            "frames_written": self.frames_written,
+            "dtype": "uint8",
+            "pixel_format": "bgr24"
+        }
+    
+    def _retire(self, status: int):
+        """写入作废状态并释放（已挂载的读者仍可读完手上的视图）"""
+        layout = self._layout
+        struct.pack_into("<H", layout.buf, 6, status)
+        layout.shm.close()
+        layout.shm.unlink()
+        _local_rings.discard(layout.shm.name)
+        self._layout = None
+    
+    @property
+    def closed(self) -> bool:
+        return self._layout is None
+    
+    def close(self):
+        """标记为 released 并释放共享内存"""
+        if self._layout is not None:
+            self._retire(STATUS_RELEASED)
+
+
+class FrameRingReader:
+    """
+    读取方：按名称挂载 Node_95 的帧缓冲区
+    
+    用法::
+        
+        reader = FrameRingReader(info["name"])
+        meta, frame = reader.latest()
+        if meta is None and reader.stale:
+            ...  # 缓冲区已作废（reader.status），重新订阅
+        ...  # 直接使用 frame（共享内存视图，无复制）
+        if not reader.is_valid(meta):
+            ...  # 使用期间槽位已被覆盖，结果作废
+    """
+    
+    def __init__(self, name: str):
+        shm = shared_memory.SharedMemory(name=name)
+        # Python 3.13 之前，挂载方也会被 resource_tracker 登记，
+        # 进程退出时会误删写入方的共享内存（同进程挂载时登记属于写入方，保留）
+        if shm.name not in _local_rings:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        self._layout = _RingLayout(shm)
+    
+    @property
+    def status(self) -> str:
+        """live / retired（已重建）/ released（租约到期或节点退出）"""
+        return _STATUS_NAMES.get(self._layout.status, "released")
+    
+    @property
+    def stale(self) -> bool:
+        """写入方不再更新该缓冲区，需要重新订阅"""
+        return self._layout.status != STATUS_LIVE
+    
+    @property
+    def frames_written(self) -> int:
+        return self._layout.write_count
+    
+    def latest(self, copy: bool = False) -> Tuple[Optional[FrameMeta], Optional[np.ndarray]]:
+        """
+        读取最新一帧
+        
+        Args:
+            copy: True 时返回独立副本并保证一致；False 时返回共享内存视图
+        
+        Returns:
+            (元数据, 图像)，还没有帧或缓冲区已作废（stale）时为 (None, None)
+        """
+        layout = self._layout
+        for _ in range(3):
+            if layout.write_count == 0 or layout.status != STATUS_LIVE:
+                return None, None
+            meta = layout.read_meta(layout.latest_slot)
+            if meta.seq == 0:
+                continue  # 正在写入
+            frame = layout.view(meta)
+            if copy:
+                frame = frame.copy()
+            if layout.slot_seq(meta.slot) == meta.seq:
+                return meta, frame
+        return None, None
+    
+    def is_valid(self, meta: FrameMeta) -> bool:
+        """该帧所在槽位是否仍未被覆盖"""
+        return not self.stale and self._layout.slot_seq(meta.slot) == meta.seq
+    
+    def close(self):
+        """卸载（调用前需释放 latest() 返回的所有视图）"""
+        self._layout.shm.close()
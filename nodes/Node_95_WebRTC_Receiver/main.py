@@ -6,7 +6,9 @@ Node_95: WebRTC 接收器 - 完整实现版本
 2. 完整的 WebRTC 信令处理（Offer/Answer/ICE）
 3. H.264 视频解码
 4. 提供 HTTP API 供 Node_90 (VLM) 调用
-5. 支持实时截图和 MJPEG 流
+5. 支持实时截图和 MJPEG 流（每帧每个画质档位只编码一次，所有观看者共享）
+6. 按需解码：没有消费者时只保存原始帧，读取时才转换为 bgr24
+7. 共享内存帧环（frame_ring.py），同机节点免复制读取；远程消费者使用原始字节端点
 
 依赖：
 - aiortc: WebRTC 实现
@@ -22,11 +24,14 @@ import asyncio
 import logging
 import base64
 import io
+import os
 import time
+from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Optional, Dict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Set, Tuple
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 from PIL import Image
@@ -37,6 +42,8 @@ from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate, Vi
 from aiortc.contrib.media import MediaRecorder
 import av
 
+from frame_ring import FrameRing
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -44,7 +51,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Node_95: WebRTC Receiver", version="2.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：定期回收租约到期的帧环，退出时释放全部共享内存"""
+    reaper = asyncio.create_task(ring_lease_reaper())
+    yield
+    reaper.cancel()
+    state.close_rings()
+
+app = FastAPI(title="Node_95: WebRTC Receiver", version="2.0", lifespan=lifespan)
+
+# ============================================================================
+# 配置
+# ============================================================================
+
+# MJPEG 画质档位: name:max_width:quality（max_width 为 0 表示原始分辨率）
+MJPEG_QUALITY_TIERS = os.getenv("MJPEG_QUALITY_TIERS", "high:0:85,medium:1280:70,low:640:50")
+MJPEG_DEFAULT_TIER = os.getenv("MJPEG_DEFAULT_TIER", "high")
+MJPEG_MAX_FPS = float(os.getenv("MJPEG_MAX_FPS", "30"))
+
+# 共享内存帧环：每设备保留的帧数和单帧槽位大小（帧更大时自动重建）
+FRAME_RING_SLOTS = int(os.getenv("FRAME_RING_SLOTS", "4"))
+FRAME_RING_SLOT_BYTES = int(os.getenv("FRAME_RING_SLOT_BYTES", str(1920 * 1080 * 3)))
+FRAME_RING_LEASE_SECONDS = float(os.getenv("FRAME_RING_LEASE_SECONDS", "30"))
 
 # ============================================================================
 # 全局状态
@@ -57,9 +86,18 @@ class WebRTCState:
         # WebRTC 连接
         self.peer_connections: Dict[str, RTCPeerConnection] = {}
         
-        # 最新帧
+        # 最新帧：latest_raw 保存未解码的 av.VideoFrame，
+        # latest_frames 是已解码的 bgr24 图像，decoded_seq 记录其对应的帧序号
+        self.latest_raw: Dict[str, av.VideoFrame] = {}
         self.latest_frames: Dict[str, np.ndarray] = {}
+        self.decoded_seq: Dict[str, int] = {}
         self.frame_timestamps: Dict[str, datetime] = {}
+        self.frame_seq: Dict[str, int] = {}  # 每个设备的帧序号，每收到一帧加 1
+        self.frame_listeners: Dict[str, Set[asyncio.Event]] = {}
+        
+        # 共享内存帧环及其订阅租约（到期时间，time.monotonic()）
+        self.frame_rings: Dict[str, FrameRing] = {}
+        self.ring_leases: Dict[str, float] = {}
         
         # WebSocket 连接
         self.signaling_connections: Dict[str, WebSocket] = {}
@@ -69,19 +107,144 @@ class WebRTCState:
             "total_connections": 0,
             "active_connections": 0,
             "total_frames_received": 0,
-            "total_bytes_received": 0
+            "total_bytes_received": 0,
+            "total_frames_decoded": 0
         }
     
-    def update_frame(self, device_id: str, frame: np.ndarray):
-        """更新最新帧"""
-        self.latest_frames[device_id] = frame
+    def _advance(self, device_id: str) -> int:
         self.frame_timestamps[device_id] = datetime.now()
+        seq = self.frame_seq[device_id] = self.frame_seq.get(device_id, 0) + 1
         self.stats["total_frames_received"] += 1
+        return seq
     
-    def get_latest_frame(self, device_id: str) -> Optional[np.ndarray]:
-        """获取最新帧"""
+    def update_frame(self, device_id: str, frame: np.ndarray):
+        """更新最新帧（已解码）"""
+        self.latest_raw.pop(device_id, None)
+        seq = self._advance(device_id)
+        self._store_decoded(device_id, frame, seq)
+        self._notify(device_id)
+    
+    def update_video_frame(self, device_id: str, frame: av.VideoFrame):
+        """
+        更新最新帧（未解码）
+        
+        只有帧环有订阅者时才立即解码并写入共享内存；
+        否则保留原始帧，等到有人读取时再解码。
+        """
+        self.latest_raw[device_id] = frame
+        self._advance(device_id)
+        if self.has_ring_subscribers(device_id):
+            self._decode(device_id)
+        self._notify(device_id)
+    
+    def _notify(self, device_id: str):
+        # 唤醒编码任务
+        for event in self.frame_listeners.get(device_id, ()):
+            event.set()
+    
+    def _decode(self, device_id: str) -> Optional[np.ndarray]:
+        """把最新原始帧转换为 bgr24（同一帧只转换一次）"""
+        seq = self.frame_seq.get(device_id, 0)
+        raw = self.latest_raw.get(device_id)
+        if raw is not None and self.decoded_seq.get(device_id, 0) < seq:
+            self._store_decoded(device_id, raw.to_ndarray(format="bgr24"), seq)
+            self.stats["total_frames_decoded"] += 1
         return self.latest_frames.get(device_id)
     
+    def _store_decoded(self, device_id: str, frame: np.ndarray, seq: int):
+        self.latest_frames[device_id] = frame
+        self.decoded_seq[device_id] = seq
+        ring = self.frame_rings.get(device_id)
+        if ring is not None:
+            ring.write(frame, seq, self.frame_timestamps[device_id].timestamp())
+    
+    def get_latest_frame(self, device_id: str) -> Optional[np.ndarray]:
+        """获取最新帧（按需解码）"""
+        return self._decode(device_id)
+    
+    def get_latest_frame_with_seq(self, device_id: str) -> Tuple[Optional[np.ndarray], int]:
+        """获取最新帧及其序号"""
+        frame = self._decode(device_id)
+        return frame, self.decoded_seq.get(device_id, 0)
+    
+    def has_frames(self, device_id: str) -> bool:
+        return device_id in self.frame_seq
+    
+    def subscribe_ring(self, device_id: str, ttl: float) -> FrameRing:
+        """
+        订阅设备的共享内存帧环（续租同样调用本方法）
+        
+        Args:
+            device_id: 设备 ID
+            ttl: 租约时长（秒），到期未续租则停止主动解码
+        
+        Returns:
+            FrameRing
+        """
+        ring = self.frame_rings.get(device_id)
+        if ring is None:
+            frame = self.latest_frames.get(device_id)
+            slot_bytes = max(FRAME_RING_SLOT_BYTES, frame.nbytes if frame is not None else 0)
+            ring = self.frame_rings[device_id] = FrameRing(device_id, FRAME_RING_SLOTS, slot_bytes)
+        self.ring_leases[device_id] = time.monotonic() + ttl
+        
+        # 立即写入当前帧，读者挂载后就能读到
+        frame = self._decode(device_id)
+        if frame is not None and ring.frames_written == 0:
+            ring.write(frame, self.decoded_seq[device_id], self.frame_timestamps[device_id].timestamp())
+        return ring
+    
+    def unsubscribe_ring(self, device_id: str):
+        """取消租约并释放帧环（已挂载的读者看到 released 状态）"""
+        self.ring_leases.pop(device_id, None)
+        self._release_ring(device_id)
+    
+    def has_ring_subscribers(self, device_id: str) -> bool:
+        expires = self.ring_leases.get(device_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            self.unsubscribe_ring(device_id)
+            return False
+        return True
+    
+    def expire_ring_leases(self) -> int:
+        """
+        释放租约已到期的帧环（设备停止推流时不会再经过 has_ring_subscribers）
+        
+        Returns:
+            释放的帧环数
+        """
+        now = time.monotonic()
+        expired = [device_id for device_id, expires in self.ring_leases.items() if expires < now]
+        for device_id in expired:
+            self.unsubscribe_ring(device_id)
+        return len(expired)
+    
+    def _release_ring(self, device_id: str):
+        ring = self.frame_rings.pop(device_id, None)
+        if ring is not None:
+            ring.close()
+            logger.info(f"Released frame ring for {device_id}")
+    
+    def close_rings(self):
+        """释放所有共享内存"""
+        for ring in self.frame_rings.values():
+            ring.close()
+        self.frame_rings.clear()
+        self.ring_leases.clear()
+    
+    def add_frame_listener(self, device_id: str, event: asyncio.Event):
+        """新帧到达时 set() 该事件"""
+        self.frame_listeners.setdefault(device_id, set()).add(event)
+    
+    def remove_frame_listener(self, device_id: str, event: asyncio.Event):
+        listeners = self.frame_listeners.get(device_id)
+        if listeners:
+            listeners.discard(event)
+            if not listeners:
+                del self.frame_listeners[device_id]
+    
     def is_receiving(self, device_id: str) -> bool:
         """是否正在接收"""
         if device_id not in self.frame_timestamps:
@@ -93,6 +256,13 @@ class WebRTCState:
 
 state = WebRTCState()
 
+async def ring_lease_reaper():
+    """后台任务：每半个租约周期回收一次到期的帧环"""
+    interval = max(FRAME_RING_LEASE_SECONDS / 2, 1.0)
+    while True:
+        await asyncio.sleep(interval)
+        state.expire_ring_leases()
+
 # ============================================================================
 # API 模型
 # ============================================================================
@@ -130,11 +300,8 @@ class FrameReceiver:
                 # 接收视频帧
                 frame = await track.recv()
                 
-                # 转换为 numpy 数组
-                img = frame.to_ndarray(format="bgr24")
-                
-                # 更新状态
-                state.update_frame(self.device_id, img)
+                # 更新状态（解码推迟到有消费者时）
+                state.update_video_frame(self.device_id, frame)
                 
                 self.frame_count += 1
                 if self.frame_count % 30 == 0:  # 每 30 帧打印一次
@@ -143,6 +310,180 @@ class FrameReceiver:
         except Exception as e:
             logger.error(f"[{self.device_id}] Error receiving frames: {e}")
 
+# ============================================================================
+# MJPEG 编码与分发
+# ============================================================================
+
+@dataclass
+class QualityTier:
+    """MJPEG 画质档位"""
+    name: str
+    max_width: int  # 0 表示保持原始分辨率
+    quality: int
+
+def parse_quality_tiers(spec: str) -> Dict[str, QualityTier]:
+    """解析画质档位配置，格式: name:max_width:quality,..."""
+    tiers = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            name, max_width, quality = item.split(":")
+            tiers[name] = QualityTier(name=name, max_width=int(max_width), quality=int(quality))
+        except ValueError:
+            logger.warning(f"Ignoring invalid MJPEG quality tier: {item}")
+    return tiers
+
+def encode_jpeg(frame: np.ndarray, tier: QualityTier) -> bytes:
+    """按档位缩放并编码为 JPEG"""
+    img = Image.fromarray(frame)
+    if tier.max_width and img.width > tier.max_width:
+        height = max(1, round(img.height * tier.max_width / img.width))
+        img = img.resize((tier.max_width, height), Image.BILINEAR)
+    buffered = io.BytesIO()
+    img.save(buffered, format="JPEG", quality=tier.quality)
+    return buffered.getvalue()
+
+class FrameChannel:
+    """
+    单个档位的广播通道
+    
+    只保留最新一帧编码结果。观看者按序号等待下一帧，
+    慢客户端醒来时直接拿到最新帧，中间的旧帧被丢弃。
+    """
+    
+    def __init__(self):
+        self.seq = 0
+        self.data = b""
+        self._condition = asyncio.Condition()
+    
+    async def publish(self, seq: int, data: bytes):
+        """发布一帧编码结果"""
+        async with self._condition:
+            self.seq = seq
+            self.data = data
+            self._condition.notify_all()
+    
+    async def wait_next(self, last_seq: int) -> Tuple[int, bytes]:
+        """等待序号大于 last_seq 的帧，返回 (序号, JPEG 数据)"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.seq > last_seq)
+            return self.seq, self.data
+
+class DeviceEncoder:
+    """
+    单设备的 MJPEG 编码任务
+    
+    每个新帧对每个有观看者的档位最多编码一次，编码结果通过
+    FrameChannel 分发给所有观看者。没有观看者时任务退出。
+    """
+    
+    def __init__(self, device_id: str, tiers: Dict[str, QualityTier], max_fps: float):
+        self.device_id = device_id
+        self.tiers = tiers
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.channels: Dict[str, FrameChannel] = {name: FrameChannel() for name in tiers}
+        self.viewers: Dict[str, int] = {name: 0 for name in tiers}
+        self.encoded_seq: Dict[str, int] = {name: 0 for name in tiers}
+        self.frames_encoded = 0
+        self.encode_seconds = 0.0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def total_viewers(self) -> int:
+        return sum(self.viewers.values())
+    
+    def subscribe(self, tier: str) -> FrameChannel:
+        """登记观看者，必要时启动编码任务"""
+        self.viewers[tier] += 1
+        if self._task is None or self._task.done():
+            state.add_frame_listener(self.device_id, self._wake)
+            self._task = asyncio.create_task(self._run())
+        self._wake.set()  # 新档位立即编码当前帧
+        return self.channels[tier]
+    
+    def unsubscribe(self, tier: str):
+        """注销观看者，没有观看者时停止编码任务"""
+        self.viewers[tier] = max(0, self.viewers[tier] - 1)
+        if self.total_viewers == 0 and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            state.remove_frame_listener(self.device_id, self._wake)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            
+            frame, seq = state.get_latest_frame_with_seq(self.device_id)
+            if frame is None:
+                continue
+            
+            started = time.monotonic()
+            for name, tier in self.tiers.items():
+                if self.viewers[name] == 0 or self.encoded_seq[name] >= seq:
+                    continue
+                
+                try:
+                    data = await loop.run_in_executor(None, encode_jpeg, frame, tier)
+                except Exception as e:
+                    logger.error(f"[{self.device_id}] MJPEG encode failed ({name}): {e}")
+                    continue
+                
+                self.encoded_seq[name] = seq
+                self.frames_encoded += 1
+                await self.channels[name].publish(seq, data)
+            
+            elapsed = time.monotonic() - started
+            self.encode_seconds += elapsed
+            
+            # 限制输出帧率，期间到达的帧只保留最新一帧
+            if elapsed < self.min_interval:
+                await asyncio.sleep(self.min_interval - elapsed)
+    
+    def get_stats(self) -> Dict:
+        return {
+            "viewers": {name: n for name, n in self.viewers.items() if n},
+            "frames_encoded": self.frames_encoded,
+            "avg_encode_ms": round(self.encode_seconds / self.frames_encoded * 1000, 2) if self.frames_encoded else 0.0,
+            "encoded_seq": {name: seq for name, seq in self.encoded_seq.items() if seq}
+        }
+
+class MJPEGHub:
+    """所有设备的 MJPEG 编码任务"""
+    
+    def __init__(self, tiers: Dict[str, QualityTier], max_fps: float):
+        self.tiers = tiers
+        self.max_fps = max_fps
+        self.encoders: Dict[str, DeviceEncoder] = {}
+    
+    def subscribe(self, device_id: str, tier: str) -> FrameChannel:
+        encoder = self.encoders.get(device_id)
+        if encoder is None:
+            encoder = self.encoders[device_id] = DeviceEncoder(device_id, self.tiers, self.max_fps)
+        return encoder.subscribe(tier)
+    
+    def unsubscribe(self, device_id: str, tier: str):
+        """注销观看者，设备没有观看者时移除其编码器"""
+        encoder = self.encoders.get(device_id)
+        if encoder:
+            encoder.unsubscribe(tier)
+            if encoder.total_viewers == 0:
+                del self.encoders[device_id]
+    
+    def get_stats(self) -> Dict:
+        return {
+            "tiers": {name: asdict(tier) for name, tier in self.tiers.items()},
+            "max_fps": self.max_fps,
+            "devices": {device_id: encoder.get_stats() for device_id, encoder in self.encoders.items()}
+        }
+
+mjpeg_hub = MJPEGHub(parse_quality_tiers(MJPEG_QUALITY_TIERS), MJPEG_MAX_FPS)
+
 # ============================================================================
 # WebRTC 信令处理
 # ============================================================================
@@ -306,7 +647,7 @@ async def root():
         "version": "2.0",
         "status": "running",
         "stats": state.stats,
-        "active_devices": list(state.latest_frames.keys())
+        "active_devices": list(state.frame_seq.keys())
     }
 
 @app.get("/health")
@@ -318,59 +659,59 @@ async def health_check():
         "total_frames_received": state.stats["total_frames_received"]
     }
 
-@app.post("/get_latest_frame")
-async def get_latest_frame(request: FrameRequest):
-    """
-    获取最新的视频帧
-    供 Node_90 (VLM) 调用
-    """
-    device_id = request.device_id
+def encode_image(frame: np.ndarray, fmt: str) -> Optional[bytes]:
+    """把帧编码为 JPEG / PNG（"base64" 等同 JPEG），不支持的格式返回 None"""
+    if fmt in ("jpeg", "base64"):
+        img_format, options = "JPEG", {"quality": 90}
+    elif fmt == "png":
+        img_format, options = "PNG", {}
+    else:
+        return None
     
-    # 检查是否有帧
-    frame = state.get_latest_frame(device_id)
-    if frame is None:
+    buffered = io.BytesIO()
+    Image.fromarray(frame).save(buffered, format=img_format, **options)
+    return buffered.getvalue()
+
+def check_frame_available(device_id: str) -> Optional[JSONResponse]:
+    """没有帧返回 404，设备已停止推流返回 503，否则返回 None"""
+    if not state.has_frames(device_id):
         return JSONResponse(
             status_code=404,
             content={"error": f"No frame available for device {device_id}"}
         )
     
-    # 检查是否正在接收
     if not state.is_receiving(device_id):
         return JSONResponse(
             status_code=503,
             content={"error": f"Device {device_id} is not streaming"}
         )
+    return None
+
+@app.post("/get_latest_frame")
+async def get_latest_frame(request: FrameRequest):
+    """
+    获取最新的视频帧（base64 JSON）
     
-    # 转换格式
-    if request.format == "jpeg":
-        # 转换为 JPEG
-        img = Image.fromarray(frame)
-        buffered = io.BytesIO()
-        img.save(buffered, format="JPEG", quality=90)
-        img_bytes = buffered.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-    
-    elif request.format == "png":
-        # 转换为 PNG
-        img = Image.fromarray(frame)
-        buffered = io.BytesIO()
-        img.save(buffered, format="PNG")
-        img_bytes = buffered.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-    
-    elif request.format == "base64":
-        # 直接返回 base64
-        img = Image.fromarray(frame)
-        buffered = io.BytesIO()
-        img.save(buffered, format="JPEG", quality=90)
-        img_bytes = buffered.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+    保留以兼容旧调用方；新调用方请使用 GET /frame/{device_id}/raw，
+    省去 base64 的 33% 体积和 JSON 解析开销。
+    """
+    device_id = request.device_id
     
-    else:
+    # 检查是否有帧
+    error = check_frame_available(device_id)
+    if error:
+        return error
+    
+    frame = state.get_latest_frame(device_id)
+    
+    # 转换格式
+    img_bytes = encode_image(frame, request.format)
+    if img_bytes is None:
         return JSONResponse(
             status_code=400,
             content={"error": f"Unsupported format: {request.format}"}
         )
+    img_base64 = base64.b64encode(img_bytes).decode('utf-8')
     
     return {
         "success": True,
@@ -384,45 +725,125 @@ async def get_latest_frame(request: FrameRequest):
         }
     }
 
+@app.get("/frame/{device_id}/raw")
+async def get_raw_frame(device_id: str, format: str = "bgr24"):
+    """
+    获取最新帧的原始字节
+    
+    format=bgr24 时返回 height × width × 3 的像素数据（不编码），
+    format=jpeg/png 时返回图片文件。帧信息放在响应头中：
+    X-Frame-Width / X-Frame-Height / X-Frame-Channels / X-Frame-Seq / X-Frame-Timestamp
+    """
+    error = check_frame_available(device_id)
+    if error:
+        return error
+    
+    frame, seq = state.get_latest_frame_with_seq(device_id)
+    headers = {
+        "X-Frame-Width": str(frame.shape[1]),
+        "X-Frame-Height": str(frame.shape[0]),
+        "X-Frame-Channels": str(frame.shape[2] if frame.ndim == 3 else 1),
+        "X-Frame-Seq": str(seq),
+        "X-Frame-Timestamp": state.frame_timestamps[device_id].isoformat()
+    }
+    
+    if format == "bgr24":
+        return Response(
+            content=frame.tobytes(),
+            media_type="application/octet-stream",
+            headers=headers
+        )
+    
+    if format not in ("jpeg", "png"):
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unsupported format: {format}"}
+        )
+    
+    img_bytes = await asyncio.get_running_loop().run_in_executor(None, encode_image, frame, format)
+    return Response(content=img_bytes, media_type=f"image/{format}", headers=headers)
+
+@app.post("/ring/{device_id}/subscribe")
+async def subscribe_frame_ring(device_id: str, ttl: float = FRAME_RING_LEASE_SECONDS):
+    """
+    订阅共享内存帧环（同机节点使用）
+    
+    订阅期间每收到一帧就解码并写入共享内存，读者用返回的 name
+    通过 frame_ring.FrameRingReader 挂载。租约 ttl 秒后过期并释放
+    共享内存（读者看到 stale），需要持续读取时应定期重新调用本端点续租；
+    释放后再次订阅会返回新的 name。
+    """
+    if not state.has_frames(device_id):
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"No frame available for device {device_id}"}
+        )
+    
+    ring = state.subscribe_ring(device_id, ttl)
+    return {
+        "success": True,
+        "device_id": device_id,
+        "lease_seconds": ttl,
+        **ring.describe()
+    }
+
+@app.delete("/ring/{device_id}/subscribe")
+async def unsubscribe_frame_ring(device_id: str):
+    """取消帧环订阅并释放共享内存，之后恢复按需解码"""
+    state.unsubscribe_ring(device_id)
+    return {"success": True, "device_id": device_id}
+
 @app.get("/stream_mjpeg/{device_id}")
-async def stream_mjpeg(device_id: str):
+async def stream_mjpeg(device_id: str, tier: str = MJPEG_DEFAULT_TIER):
     """
     MJPEG 流端点
     供浏览器或其他客户端实时查看
+    
+    同一设备、同一档位的所有观看者共享一次编码结果；
+    客户端跟不上时跳过旧帧，只发送最新一帧。
     """
+    if tier not in mjpeg_hub.tiers:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unknown quality tier: {tier}", "tiers": list(mjpeg_hub.tiers)}
+        )
+    
     async def generate():
-        while True:
-            frame = state.get_latest_frame(device_id)
-            
-            if frame is not None:
-                # 转换为 JPEG
-                img = Image.fromarray(frame)
-                buffered = io.BytesIO()
-                img.save(buffered, format="JPEG", quality=85)
-                img_bytes = buffered.getvalue()
+        channel = mjpeg_hub.subscribe(device_id, tier)
+        last_seq = 0
+        try:
+            while True:
+                last_seq, img_bytes = await channel.wait_next(last_seq)
                 
                 # 发送 MJPEG 帧
                 yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + img_bytes + b'\r\n')
-            
-            await asyncio.sleep(0.033)  # ~30 FPS
+                       b'Content-Type: image/jpeg\r\n'
+                       b'Content-Length: ' + str(len(img_bytes)).encode() + b'\r\n\r\n' + img_bytes + b'\r\n')
+        finally:
+            mjpeg_hub.unsubscribe(device_id, tier)
     
     return StreamingResponse(
         generate(),
         media_type="multipart/x-mixed-replace; boundary=frame"
     )
 
+@app.get("/stream_stats")
+async def stream_stats():
+    """MJPEG 编码与分发统计"""
+    return mjpeg_hub.get_stats()
+
 @app.get("/devices")
 async def list_devices():
     """列出所有连接的设备"""
     devices = []
     
-    for device_id in state.latest_frames.keys():
+    for device_id in state.frame_seq.keys():
         devices.append({
             "device_id": device_id,
             "is_receiving": state.is_receiving(device_id),
             "last_frame_time": state.frame_timestamps.get(device_id, datetime.now()).isoformat(),
-            "has_peer_connection": device_id in state.peer_connections
+            "has_peer_connection": device_id in state.peer_connections,
+            "frame_ring": device_id in state.frame_rings
         })
     
     return {
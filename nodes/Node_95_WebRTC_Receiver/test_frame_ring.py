@@ -0,0 +1,178 @@
+"""
+Node_95 共享内存帧环单元测试
+
+测试内容：
+1. 槽位回绕：写入超过槽位数的帧后，最新帧和各槽位元数据正确
+2. 覆盖检测：读取期间槽位被覆盖时 is_valid() 返回 False，写到一半的槽位被跳过
+3. 重建与释放：帧尺寸超过槽位时以新名称重建，旧读者看到 retired；
+   close() 后读者看到 released，不再拿到帧
+
+用法:
+    python -m pytest nodes/Node_95_WebRTC_Receiver/test_frame_ring.py -q
+
+作者: Manus AI
+日期: 2026-01-24
+"""
+
+import struct
+import sys
+import unittest
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from frame_ring import FrameRing, FrameRingReader
+
+
+def make_frame(value: int, height: int = 4, width: int = 6) -> np.ndarray:
+    return np.full((height, width, 3), value % 256, dtype=np.uint8)
+
+
+class FrameRingTestCase(unittest.TestCase):
+
+    SLOTS = 4
+
+    def setUp(self):
+        self.ring = FrameRing("test-device", self.SLOTS, make_frame(0).nbytes)
+        self.reader = FrameRingReader(self.ring.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.ring.close()
+
+
+class TestWraparound(FrameRingTestCase):
+
+    def test_empty_ring(self):
+        self.assertEqual(self.reader.latest(), (None, None))
+        self.assertEqual(self.reader.status, "live")
+
+    def test_latest_after_wraparound(self):
+        for seq in range(1, 3 * self.SLOTS + 2):
+            self.ring.write(make_frame(seq), seq, 1000.0 + seq)
+
+            meta, frame = self.reader.latest(copy=True)
+            self.assertEqual(meta.seq, seq)
+            self.assertEqual(meta.slot, (seq - 1) % self.SLOTS)
+            self.assertEqual(meta.timestamp, 1000.0 + seq)
+            self.assertEqual(meta.shape, (4, 6, 3))
+            np.testing.assert_array_equal(frame, make_frame(seq))
+
+        self.assertEqual(self.reader.frames_written, 3 * self.SLOTS + 1)
+
+    def test_slots_hold_most_recent_frames(self):
+        last = 2 * self.SLOTS + 1
+        for seq in range(1, last + 1):
+            self.ring.write(make_frame(seq), seq, float(seq))
+
+        layout = self.reader._layout
+        seqs = sorted(layout.read_meta(slot).seq for slot in range(self.SLOTS))
+        self.assertEqual(seqs, list(range(last - self.SLOTS + 1, last + 1)))
+        for slot in range(self.SLOTS):
+            meta = layout.read_meta(slot)
+            self.assertTrue((layout.view(meta) == meta.seq % 256).all())
+
+    def test_smaller_frame_fits_existing_slot(self):
+        self.ring.write(make_frame(1), 1, 1.0)
+        self.ring.write(make_frame(2, height=2, width=3), 2, 2.0)
+
+        meta, frame = self.reader.latest()
+        self.assertEqual(meta.shape, (2, 3, 3))
+        np.testing.assert_array_equal(frame, make_frame(2, height=2, width=3))
+
+
+class TestOverwriteDetection(FrameRingTestCase):
+
+    def test_view_invalidated_when_slot_is_reused(self):
+        self.ring.write(make_frame(1), 1, 1.0)
+        meta, view = self.reader.latest()
+
+        # 其余槽位写满前，第一帧的槽位不会被覆盖
+        for seq in range(2, self.SLOTS + 1):
+            self.ring.write(make_frame(seq), seq, float(seq))
+            self.assertTrue(self.reader.is_valid(meta))
+
+        self.ring.write(make_frame(99), self.SLOTS + 1, 99.0)
+        self.assertFalse(self.reader.is_valid(meta))
+        # 零复制视图此时已是新帧的内容，必须以 is_valid() 为准
+        self.assertTrue((view == 99).all())
+        del view
+
+    def test_copy_is_stable_after_overwrite(self):
+        self.ring.write(make_frame(7), 1, 1.0)
+        meta, frame = self.reader.latest(copy=True)
+        for seq in range(2, 2 * self.SLOTS):
+            self.ring.write(make_frame(seq), seq, float(seq))
+
+        self.assertFalse(self.reader.is_valid(meta))
+        np.testing.assert_array_equal(frame, make_frame(7))
+
+    def test_slot_being_written_is_skipped(self):
+        self.ring.write(make_frame(1), 1, 1.0)
+        layout = self.reader._layout
+
+        # 模拟写入方正在写最新槽位：seq 已清零，头部尚未更新
+        struct.pack_into("<Q", layout.buf, layout.meta_offset(0), 0)
+        self.assertEqual(self.reader.latest(), (None, None))
+
+        self.ring.write(make_frame(2), 2, 2.0)
+        meta, _ = self.reader.latest()
+        self.assertEqual(meta.seq, 2)
+
+
+class TestRetireAndRelease(FrameRingTestCase):
+
+    def test_oversized_frame_recreates_ring(self):
+        self.ring.write(make_frame(1), 1, 1.0)
+        meta, _ = self.reader.latest(copy=True)
+        old_name = self.ring.name
+
+        big = make_frame(2, height=8, width=8)
+        self.ring.write(big, 2, 2.0)
+
+        self.assertNotEqual(self.ring.name, old_name)
+        self.assertGreaterEqual(self.ring.slot_size, big.nbytes)
+        self.assertEqual(self.reader.status, "retired")
+        self.assertTrue(self.reader.stale)
+        self.assertFalse(self.reader.is_valid(meta))
+        self.assertEqual(self.reader.latest(), (None, None))
+
+        # 旧名称已被 unlink，只能按新名称重新挂载
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=old_name)
+
+        fresh = FrameRingReader(self.ring.describe()["name"])
+        try:
+            meta, frame = fresh.latest()
+            self.assertEqual(meta.seq, 2)
+            np.testing.assert_array_equal(frame, big)
+            del frame
+        finally:
+            fresh.close()
+
+    def test_close_marks_released(self):
+        self.ring.write(make_frame(1), 1, 1.0)
+        name = self.ring.name
+        self.ring.close()
+
+        self.assertTrue(self.ring.closed)
+        self.assertEqual(self.reader.status, "released")
+        self.assertEqual(self.reader.latest(), (None, None))
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_recreated_ring_never_reuses_a_name(self):
+        name = self.ring.name
+        self.ring.close()
+        again = FrameRing("test-device", self.SLOTS, make_frame(0).nbytes)
+        try:
+            self.assertNotEqual(again.name, name)
+        finally:
+            again.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Node_95 MJPEG 编码分发单元测试（进程内，不启动服务）
+
+测试内容：
+1. 一次编码多路分发：同一档位的所有观看者拿到同一份 JPEG，每帧每个档位只编码一次
+2. 没有观看者的档位不编码；慢观看者直接拿到最新帧
+3. 观看者全部离开后编码任务停止，设备的编码器和帧监听被移除；再次订阅时重新创建
+
+用法:
+    python -m pytest nodes/Node_95_WebRTC_Receiver/test_mjpeg_hub.py -q
+
+作者: Manus AI
+日期: 2026-01-24
+"""
+
+import asyncio
+import io
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import MJPEGHub, parse_quality_tiers, state
+
+
+def make_frame(value: int, height: int = 24, width: int = 32) -> np.ndarray:
+    return np.full((height, width, 3), value % 256, dtype=np.uint8)
+
+
+class MJPEGHubTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # 不限帧率，避免测试等待节流
+        self.hub = MJPEGHub(parse_quality_tiers("high:0:85,low:16:50"), max_fps=0)
+        self.device_id = f"mjpeg-test-{self._testMethodName}"
+        self.encoded = []
+
+        real_encode = main.encode_jpeg
+
+        def counting_encode(frame, tier):
+            self.encoded.append((tier.name, int(frame[0, 0, 0])))
+            return real_encode(frame, tier)
+
+        patcher = mock.patch.object(main, "encode_jpeg", side_effect=counting_encode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_async(self, coro, timeout: float = 5.0):
+        return asyncio.run(asyncio.wait_for(coro, timeout))
+
+    async def drain(self):
+        """让出事件循环，使被取消的编码任务结束"""
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+
+class TestFanOut(MJPEGHubTestCase):
+
+    def test_each_frame_encoded_once_per_tier(self):
+        async def scenario():
+            high = [self.hub.subscribe(self.device_id, "high") for _ in range(3)]
+            low = [self.hub.subscribe(self.device_id, "low") for _ in range(2)]
+            channels = high + low
+            last = [0] * len(channels)
+
+            for value in range(1, 4):
+                state.update_frame(self.device_id, make_frame(value * 40))
+                results = await asyncio.gather(*(c.wait_next(s) for c, s in zip(channels, last)))
+                last = [seq for seq, _ in results]
+
+                self.assertEqual(len(set(last)), 1)
+                high_data = [data for _, data in results[:3]]
+                low_data = [data for _, data in results[3:]]
+                # 所有观看者共享同一个 bytes 对象，而不是各自编码
+                self.assertTrue(all(data is high_data[0] for data in high_data))
+                self.assertTrue(all(data is low_data[0] for data in low_data))
+                self.assertEqual(Image.open(io.BytesIO(high_data[0])).size, (32, 24))
+                self.assertEqual(Image.open(io.BytesIO(low_data[0])).size, (16, 12))
+
+            stats = self.hub.get_stats()["devices"][self.device_id]
+            for channel in channels:
+                self.hub.unsubscribe(self.device_id, "high" if channel in high else "low")
+            await self.drain()
+            return stats
+
+        stats = self.run_async(scenario())
+        self.assertEqual(sorted(self.encoded), sorted((tier, value * 40) for value in range(1, 4) for tier in ("high", "low")))
+        self.assertEqual(stats["frames_encoded"], 6)
+        self.assertEqual(stats["viewers"], {"high": 3, "low": 2})
+
+    def test_unwatched_tier_not_encoded(self):
+        async def scenario():
+            channel = self.hub.subscribe(self.device_id, "low")
+            state.update_frame(self.device_id, make_frame(7))
+            await channel.wait_next(0)
+            self.hub.unsubscribe(self.device_id, "low")
+            await self.drain()
+
+        self.run_async(scenario())
+        self.assertEqual(self.encoded, [("low", 7)])
+
+    def test_slow_viewer_gets_latest_frame(self):
+        async def scenario():
+            fast = self.hub.subscribe(self.device_id, "high")
+            slow = self.hub.subscribe(self.device_id, "high")
+            last_seq = 0
+            for value in range(1, 6):
+                state.update_frame(self.device_id, make_frame(value))
+                last_seq, _ = await fast.wait_next(last_seq)
+
+            # 慢观看者从未读取过，只拿到最后一帧
+            seq, data = await slow.wait_next(0)
+            self.hub.unsubscribe(self.device_id, "high")
+            self.hub.unsubscribe(self.device_id, "high")
+            await self.drain()
+            return last_seq, seq, data
+
+        last_seq, seq, data = self.run_async(scenario())
+        self.assertEqual(seq, last_seq)
+        self.assertEqual(seq, state.frame_seq[self.device_id])
+        pixel = np.asarray(Image.open(io.BytesIO(data)))[0, 0, 0]
+        self.assertLessEqual(abs(int(pixel) - 5), 2)
+
+
+class TestEncoderLifecycle(MJPEGHubTestCase):
+
+    def test_encoder_dropped_when_last_viewer_leaves(self):
+        async def scenario():
+            self.hub.subscribe(self.device_id, "high")
+            self.hub.subscribe(self.device_id, "low")
+            encoder = self.hub.encoders[self.device_id]
+            task = encoder._task
+            self.assertIn(self.device_id, state.frame_listeners)
+
+            self.hub.unsubscribe(self.device_id, "high")
+            self.assertIs(self.hub.encoders.get(self.device_id), encoder)
+            self.assertFalse(task.done())
+
+            self.hub.unsubscribe(self.device_id, "low")
+            await self.drain()
+            self.assertNotIn(self.device_id, self.hub.encoders)
+            self.assertNotIn(self.device_id, self.hub.get_stats()["devices"])
+            self.assertNotIn(self.device_id, state.frame_listeners)
+            self.assertTrue(task.cancelled())
+
+            # 注销未知设备或重复注销不报错
+            self.hub.unsubscribe(self.device_id, "low")
+            self.hub.unsubscribe("unknown-device", "high")
+
+            # 再次订阅时创建新的编码器并正常出帧
+            channel = self.hub.subscribe(self.device_id, "high")
+            self.assertIsNot(self.hub.encoders[self.device_id], encoder)
+            state.update_frame(self.device_id, make_frame(99))
+            seq, _ = await channel.wait_next(0)
+            self.hub.unsubscribe(self.device_id, "high")
+            await self.drain()
+            return seq
+
+        seq = self.run_async(scenario())
+        self.assertEqual(seq, state.frame_seq[self.device_id])
+        self.assertEqual(self.hub.encoders, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
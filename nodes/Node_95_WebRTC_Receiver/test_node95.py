@@ -5,7 +5,7 @@ Node_95 测试脚本
 1. HTTP API 端点
 2. WebSocket 信令连接
 3. WebRTC 信令处理（模拟）
-4. 帧存储和检索
+4. 帧存储和检索（原始字节端点、共享内存帧环订阅）
 
 作者: Manus AI
 日期: 2026-01-24
@@ -63,6 +63,36 @@ async def test_http_api():
         assert response.status_code == 404
         print("✅ 获取帧测试通过（正确返回 404）")
 
+        # 测试 MJPEG 分发统计
+        print("\n1.5 测试 MJPEG 统计 GET /stream_stats")
+        response = await client.get(f"{NODE_95_URL}/stream_stats")
+        print(f"Status: {response.status_code}")
+        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        assert response.status_code == 200
+        assert "high" in response.json()["tiers"]
+        print("✅ MJPEG 统计测试通过")
+
+        # 测试未知画质档位
+        print("\n1.6 测试未知画质档位 GET /stream_mjpeg/test_device?tier=unknown (应该返回 400)")
+        response = await client.get(f"{NODE_95_URL}/stream_mjpeg/test_device", params={"tier": "unknown"})
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 400
+        print("✅ 画质档位校验测试通过（正确返回 400）")
+
+        # 测试原始字节端点
+        print("\n1.7 测试原始帧 GET /frame/test_device/raw (应该返回 404)")
+        response = await client.get(f"{NODE_95_URL}/frame/test_device/raw")
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 404
+        print("✅ 原始帧测试通过（正确返回 404）")
+
+        # 测试帧环订阅
+        print("\n1.8 测试帧环订阅 POST /ring/test_device/subscribe (应该返回 404)")
+        response = await client.post(f"{NODE_95_URL}/ring/test_device/subscribe")
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 404
+        print("✅ 帧环订阅测试通过（正确返回 404）")
+
 async def test_websocket_connection():
     """测试 WebSocket 连接"""
     print("\n" + "="*80)
@@ -3,12 +3,13 @@ UFO³ Galaxy - 节点注册和发现机制
 管理所有节点的注册、发现和调用
 """
 
-import httpx
 import os
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
+from shared.node_rpc import NodeRPCClient, get_node_rpc_client
+
 
 class NodeCategory(Enum):
     """节点类别"""
@@ -44,9 +45,9 @@ class NodeRegistry:
     管理所有节点的注册、发现和调用
     """
     
-    def __init__(self):
+    def __init__(self, rpc: Optional[NodeRPCClient] = None):
         self.nodes: Dict[str, NodeInfo] = {}
-        self.client = httpx.AsyncClient(timeout=10.0)
+        self.rpc = rpc or get_node_rpc_client()  # 共享连接池
         self._register_default_nodes()
     
     def _register_default_nodes(self):
@@ -342,14 +343,9 @@ class NodeRegistry:
         if not node:
             return False
         
-        try:
-            response = await self.client.get(f"{node.url}/health", timeout=5.0)
-            is_healthy = response.status_code == 200
-            node.status = "online" if is_healthy else "offline"
-            return is_healthy
-        except:
-            node.status = "offline"
-            return False
+        is_healthy = await self.rpc.check_health(f"{node.url}/health", node=node_id, timeout=5.0)
+        node.status = "online" if is_healthy else "offline"
+        return is_healthy
     
     async def call_node(
         self,
@@ -376,18 +372,34 @@ class NodeRegistry:
             return {"error": f"Method {method} not available in {node_id}"}
         
         try:
-            response = await self.client.post(
+            return await self.rpc.call_json(
                 f"{node.url}/{method}",
-                json=params or {}
+                params,
+                node=node_id,
+                timeout=10.0
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             return {"error": str(e)}
     
+    def get_rpc_stats(self, node_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取节点调用的延迟统计
+        
+        Args:
+            node_id: 只返回某个节点的统计
+        
+        Returns:
+            各节点的延迟直方图
+        """
+        return self.rpc.get_stats(node_id)
+    
     async def close(self):
-        """关闭客户端"""
-        await self.client.aclose()
+        """
+        关闭注册中心
+        
+        连接池为共享或外部传入，不在这里关闭；进程退出时调用
+        shared.node_rpc.close_node_rpc_client()。
+        """
 
 
 # 全局单例
@@ -0,0 +1,302 @@
+"""
+UFO³ Galaxy - 节点间 RPC 共享传输层
+所有节点间的 HTTP 调用共用一个连接池客户端：按主机保持长连接、
+可选 HTTP/2、按节点限制并发，并为每个节点统计延迟直方图
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# 连接池配置（可通过环境变量覆盖）
+NODE_RPC_TIMEOUT = float(os.getenv("NODE_RPC_TIMEOUT", "60"))
+NODE_RPC_MAX_CONNECTIONS = int(os.getenv("NODE_RPC_MAX_CONNECTIONS", "200"))
+NODE_RPC_MAX_KEEPALIVE = int(os.getenv("NODE_RPC_MAX_KEEPALIVE", "100"))
+NODE_RPC_KEEPALIVE_EXPIRY = float(os.getenv("NODE_RPC_KEEPALIVE_EXPIRY", "30"))
+NODE_RPC_PER_NODE_LIMIT = int(os.getenv("NODE_RPC_PER_NODE_LIMIT", "32"))
+NODE_RPC_HTTP2 = os.getenv("NODE_RPC_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# 延迟直方图桶上界（毫秒）
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图"""
+    
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def record(self, latency_ms: float, error: bool = False):
+        """记录一次调用"""
+        self.counts[bisect.bisect_left(self.buckets, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        if error:
+            self.errors += 1
+    
+    def percentile(self, p: float) -> float:
+        """
+        估算分位数（桶内线性插值）
+        
+        Args:
+            p: 0-100 之间的分位
+        
+        Returns:
+            延迟（毫秒），无数据时为 0
+        """
+        if self.count == 0:
+            return 0.0
+        
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max_ms
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{b}": n for b, n in zip(self.buckets, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "buckets": buckets
+        }
+
+
+class NodeRPCClient:
+    """
+    节点间 RPC 共享客户端
+    
+    底层是一个 httpx.AsyncClient，连接按主机复用（keep-alive），
+    因此同一节点的连续调用不再重复建立 TCP 连接。HTTP/2 需要安装 h2，
+    且只对 https 节点生效（通过 ALPN 协商），明文节点仍使用 HTTP/1.1。
+    
+    httpx 客户端绑定在创建它的事件循环上；在新的事件循环中使用时
+    会关闭旧客户端，重建客户端和并发限制。
+    
+    进程内所有组件共用 get_node_rpc_client() 返回的单例，组件关闭时
+    不应关闭它；进程退出前调用一次 close_node_rpc_client()。
+    """
+    
+    def __init__(
+        self,
+        timeout: float = NODE_RPC_TIMEOUT,
+        max_connections: int = NODE_RPC_MAX_CONNECTIONS,
+        max_keepalive_connections: int = NODE_RPC_MAX_KEEPALIVE,
+        keepalive_expiry: float = NODE_RPC_KEEPALIVE_EXPIRY,
+        per_node_limit: int = NODE_RPC_PER_NODE_LIMIT,
+        http2: bool = NODE_RPC_HTTP2
+    ):
+        """
+        初始化客户端
+        
+        Args:
+            timeout: 默认超时（秒），单次调用可覆盖
+            max_connections: 连接池总连接数上限
+            max_keepalive_connections: 保持空闲的长连接数上限
+            keepalive_expiry: 空闲长连接的保留时间（秒）
+            per_node_limit: 每个节点同时进行的请求数上限
+            http2: 是否启用 HTTP/2（需要 h2）
+        """
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.per_node_limit = per_node_limit
+        self.http2 = http2 and self._h2_available()
+        
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limiters: Dict[str, asyncio.Semaphore] = {}
+    
+    @staticmethod
+    def _h2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            return False
+    
+    @staticmethod
+    def node_key(url: str) -> str:
+        """按 host:port 区分节点"""
+        parsed = httpx.URL(url)
+        return f"{parsed.host}:{parsed.port or (443 if parsed.scheme == 'https' else 80)}"
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # 旧事件循环遗留的客户端先关闭，不随重建泄漏连接
+            await self._discard_client()
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2
+            )
+            self._loop = loop
+        return self._client
+    
+    async def _discard_client(self):
+        client = self._client
+        self._client = None
+        self._loop = None
+        self._limiters.clear()
+        
+        if client is None or client.is_closed:
+            return
+        try:
+            await client.aclose()
+        except RuntimeError as e:
+            # 创建它的事件循环已关闭，剩余连接随对象回收
+            logger.debug(f"Closed client from a finished event loop: {e}")
+    
+    def _limiter(self, node: str) -> asyncio.Semaphore:
+        limiter = self._limiters.get(node)
+        if limiter is None:
+            limiter = self._limiters[node] = asyncio.Semaphore(self.per_node_limit)
+        return limiter
+    
+    async def request(
+        self,
+        method: str,
+        url: str,
+        node: Optional[str] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        发送请求（受节点并发限制，并记录延迟）
+        
+        Args:
+            method: HTTP 方法
+            url: 完整 URL
+            node: 统计和限流使用的节点标识，默认为 URL 的 host:port
+            **kwargs: 透传给 httpx（json、params、timeout 等）
+        
+        Returns:
+            httpx.Response
+        """
+        client = await self._get_client()
+        node = node or self.node_key(url)
+        
+        async with self._limiter(node):
+            start = time.perf_counter()
+            error = True
+            try:
+                response = await client.request(method, url, **kwargs)
+                error = response.status_code >= 500
+                return response
+            finally:
+                self._record(node, (time.perf_counter() - start) * 1000, error)
+    
+    async def get(self, url: str, node: Optional[str] = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, node=node, **kwargs)
+    
+    async def post(self, url: str, node: Optional[str] = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, node=node, **kwargs)
+    
+    async def call_json(
+        self,
+        url: str,
+        payload: Optional[Dict[str, Any]] = None,
+        node: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        POST JSON 并返回解析后的 JSON（非 2xx 抛出 httpx.HTTPStatusError）
+        """
+        kwargs = {"json": payload or {}}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        response = await self.post(url, node=node, **kwargs)
+        response.raise_for_status()
+        return response.json()
+    
+    async def check_health(self, url: str, node: Optional[str] = None, timeout: float = 5.0) -> bool:
+        """GET 健康检查地址，200 视为健康"""
+        try:
+            response = await self.get(url, node=node, timeout=timeout)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+    
+    def _record(self, node: str, latency_ms: float, error: bool):
+        histogram = self.histograms.get(node)
+        if histogram is None:
+            histogram = self.histograms[node] = LatencyHistogram()
+        histogram.record(latency_ms, error)
+    
+    def get_stats(self, node: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取延迟统计
+        
+        Args:
+            node: 只返回某个节点的统计
+        
+        Returns:
+            连接池配置和各节点的延迟直方图
+        """
+        nodes = [node] if node else sorted(self.histograms)
+        return {
+            "http2": self.http2,
+            "per_node_limit": self.per_node_limit,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "nodes": {
+                name: self.histograms[name].to_dict()
+                for name in nodes if name in self.histograms
+            }
+        }
+    
+    async def aclose(self):
+        """关闭连接池（统计保留）"""
+        await self._discard_client()
+
+
+# 全局单例
+_node_rpc_client: Optional[NodeRPCClient] = None
+
+
+def get_node_rpc_client() -> NodeRPCClient:
+    """
+    获取全局节点 RPC 客户端单例
+    
+    Returns:
+        NodeRPCClient 实例
+    """
+    global _node_rpc_client
+    if _node_rpc_client is None:
+        _node_rpc_client = NodeRPCClient()
+    return _node_rpc_client
+
+
+async def close_node_rpc_client():
+    """关闭全局客户端（进程退出前调用一次；各组件自身的 close 不关闭它）"""
+    if _node_rpc_client is not None:
+        await _node_rpc_client.aclose()
@@ -0,0 +1,199 @@
+"""
+UFO³ Galaxy - 节点间 RPC 共享传输层单元测试
+
+用本地 HTTP 服务验证连接复用、按节点并发限制、延迟直方图，
+以及共享客户端在事件循环切换和组件关闭时的生命周期。
+
+用法:
+    python -m pytest shared/test_node_rpc.py -q
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from shared import node_rpc
+from shared.node_rpc import LatencyHistogram, NodeRPCClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/ok 返回 JSON，/slow 延迟 0.1 秒，/fail 返回 500"""
+
+    protocol_version = "HTTP/1.1"
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/fail":
+            self._reply(500, {"error": "boom"})
+            return
+        if self.path == "/slow":
+            cls = type(self)
+            with cls.lock:
+                cls.active += 1
+                cls.peak = max(cls.peak, cls.active)
+            time.sleep(0.1)
+            with cls.lock:
+                cls.active -= 1
+        self._reply(200, {"path": self.path, "port": self.client_address[1]})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(200, {"echo": json.loads(self.rfile.read(length) or b"{}")})
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram(buckets=(10, 100))
+        for latency in (1, 5, 50, 500):
+            histogram.record(latency)
+        histogram.record(20, error=True)
+
+        stats = histogram.to_dict()
+        self.assertEqual(stats["count"], 5)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["buckets"], {"le_10": 2, "le_100": 2, "le_inf": 1})
+        self.assertEqual(stats["max_ms"], 500)
+        self.assertLessEqual(histogram.percentile(40), 10)
+        self.assertGreater(histogram.percentile(99), 100)
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().percentile(95), 0.0)
+
+
+class TestNodeRPCClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_node_key(self):
+        self.assertEqual(NodeRPCClient.node_key("http://host:8001/x"), "host:8001")
+        self.assertEqual(NodeRPCClient.node_key("https://host/x"), "host:443")
+
+    def test_keepalive_and_histogram(self):
+        client = NodeRPCClient()
+
+        async def run():
+            ports = set()
+            for _ in range(5):
+                response = await client.get(f"{self.base_url}/ok", node="Node_01")
+                ports.add(response.json()["port"])
+            echo = await client.call_json(f"{self.base_url}/echo", {"a": 1}, node="Node_01")
+            healthy = await client.check_health(f"{self.base_url}/fail", node="Node_02")
+            await client.aclose()
+            return ports, echo, healthy
+
+        ports, echo, healthy = asyncio.run(run())
+
+        # 同一节点的连续调用复用同一条连接
+        self.assertEqual(len(ports), 1)
+        self.assertEqual(echo, {"echo": {"a": 1}})
+        self.assertFalse(healthy)
+
+        stats = client.get_stats()["nodes"]
+        self.assertEqual(stats["Node_01"]["count"], 6)
+        self.assertEqual(stats["Node_01"]["errors"], 0)
+        self.assertEqual(stats["Node_02"]["errors"], 1)
+
+    def test_per_node_limit(self):
+        client = NodeRPCClient(per_node_limit=2)
+        _Handler.peak = 0
+
+        async def run():
+            await asyncio.gather(*(
+                client.get(f"{self.base_url}/slow", node="Node_slow") for _ in range(6)
+            ))
+            await client.aclose()
+
+        asyncio.run(run())
+        self.assertEqual(_Handler.peak, 2)
+
+    def test_new_event_loop_closes_previous_client(self):
+        client = NodeRPCClient()
+        clients = []
+
+        async def call(close: bool):
+            await client.get(f"{self.base_url}/ok")
+            clients.append(client._client)
+            if close:
+                await client.aclose()
+
+        asyncio.run(call(close=False))
+        asyncio.run(call(close=True))
+
+        self.assertIsNot(clients[0], clients[1])
+        self.assertTrue(clients[0].is_closed)
+        self.assertTrue(clients[1].is_closed)
+
+        # 客户端所属的事件循环已结束时，关闭也不抛错
+        asyncio.run(call(close=False))
+        asyncio.run(client.aclose())
+        self.assertTrue(clients[2].is_closed)
+
+
+class TestSharedClientLifecycle(unittest.TestCase):
+    """组件关闭时不关闭共享客户端，进程退出时统一关闭"""
+
+    def setUp(self):
+        self._previous = node_rpc._node_rpc_client
+        node_rpc._node_rpc_client = None
+
+    def tearDown(self):
+        node_rpc._node_rpc_client = self._previous
+
+    def test_components_do_not_close_shared_client(self):
+        from fusion.node_executor import ExecutionPool
+        from shared.node_registry import NodeRegistry
+
+        async def run():
+            shared = node_rpc.get_node_rpc_client()
+            http_client = await shared._get_client()
+
+            pool = ExecutionPool()
+            registry = NodeRegistry()
+            self.assertIs(pool.rpc, shared)
+            self.assertIs(registry.rpc, shared)
+
+            await pool.close_all()
+            await registry.close()
+            self.assertFalse(http_client.is_closed)
+
+            await node_rpc.close_node_rpc_client()
+            self.assertTrue(http_client.is_closed)
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
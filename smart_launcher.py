@@ -4,10 +4,15 @@ UFO³ Galaxy - 智能节点启动器
 
 根据依赖关系智能启动节点，支持故障恢复和自动重启
 
+节点在硬依赖通过 /health 检查后立即并行启动（见 startup_engine.py），
+启动完成后打印每个节点的启动时间线和关键路径。
+
 作者：Manus AI
 日期：2026-01-23
 """
 
+import asyncio
+import heapq
 import json
 import os
 import sys
@@ -15,9 +20,11 @@ import time
 import subprocess
 import signal
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from collections import defaultdict
 
+from startup_engine import NodeSpec, NodeStartRecord, StartupEngine, StartupTrace, parse_node_specs
+
 # ANSI 颜色代码
 GREEN = "\033[92m"
 RED = "\033[91m"
@@ -34,6 +41,9 @@ class SmartLauncher:
         self.startup_times = {}  # node_name -> timestamp
         self.retry_counts = defaultdict(int)  # node_name -> retry_count
         self.max_retries = 3
+        self.max_parallel = int(os.getenv("UFO_STARTUP_CONCURRENCY", StartupEngine.DEFAULT_MAX_CONCURRENT))
+        self.ready_timeout = float(os.getenv("UFO_STARTUP_TIMEOUT", StartupEngine.DEFAULT_READY_TIMEOUT))
+        self.last_trace: Optional[StartupTrace] = None
         
     def _load_config(self) -> Dict:
         """加载配置文件"""
@@ -80,19 +90,18 @@ class SmartLauncher:
                 priority = filtered_nodes[node_name]["priority"]
                 queue.append((priority, node_name))
         
-        queue.sort()  # 按优先级排序
+        heapq.heapify(queue)  # 按优先级出队
         
         result = []
         while queue:
-            _, node_name = queue.pop(0)
+            _, node_name = heapq.heappop(queue)
             result.append(node_name)
             
             for neighbor in graph[node_name]:
                 in_degree[neighbor] -= 1
                 if in_degree[neighbor] == 0:
                     priority = filtered_nodes[neighbor]["priority"]
-                    queue.append((priority, neighbor))
-                    queue.sort()
+                    heapq.heappush(queue, (priority, neighbor))
         
         # 检查循环依赖
         if len(result) != len(filtered_nodes):
@@ -143,8 +152,49 @@ class SmartLauncher:
         # TODO: 可以添加 HTTP 健康检查
         return True
     
+    def _spawn(self, spec: NodeSpec) -> Optional[subprocess.Popen]:
+        """启动引擎的回调：拉起节点进程"""
+        if self._start_node(spec.name):
+            return self.processes[spec.name]
+        return None
+    
+    def _on_startup_event(self, event: str, record: NodeStartRecord):
+        """打印启动引擎的状态变化"""
+        if event == "healthy":
+            print(f"{GREEN}✓{RESET} {record.name} 已就绪 ({record.boot_seconds:.2f}s)")
+        elif event in ("failed", "timeout"):
+            print(f"{RED}✗{RESET} {record.name} 启动失败: {record.error}")
+        elif event == "skipped":
+            print(f"{YELLOW}警告: {record.name} 已跳过，{record.error}{RESET}")
+    
+    def _launch(self, node_names: List[str]) -> StartupTrace:
+        """按依赖图并行启动节点，并打印启动时间线"""
+        # 已在运行的节点不重复启动
+        names = [name for name in node_names if not self._check_node_health(name)]
+        
+        engine = StartupEngine(
+            parse_node_specs(self.config),
+            spawn=self._spawn,
+            max_concurrent=self.max_parallel,
+            ready_timeout=self.ready_timeout,
+            on_event=self._on_startup_event
+        )
+        
+        try:
+            trace = asyncio.run(engine.run(names))
+        except ValueError as e:
+            print(f"{RED}错误: {e}{RESET}")
+            sys.exit(1)
+        
+        self.last_trace = trace
+        print(f"\n{CYAN}启动时间线（并发上限 {trace.max_concurrent}）{RESET}")
+        for line in trace.format_lines():
+            print(line)
+        
+        return trace
+    
     def start_group(self, group: str):
-        """启动指定分组的所有节点"""
+        """启动指定分组的所有节点（分组外的依赖视为已由外部提供）"""
         if group not in self.config["groups"]:
             print(f"{RED}错误: 分组 {group} 不存在{RESET}")
             return
@@ -155,37 +205,21 @@ class SmartLauncher:
         print(f"{BLUE}{group_info['description']}{RESET}")
         print(f"{BLUE}{'='*80}{RESET}\n")
         
-        startup_order = self._get_startup_order(group)
-        startup_delay = group_info["startup_delay"]
-        
-        for node_name in startup_order:
-            node_info = self.config["nodes"][node_name]
-            
-            # 检查依赖是否已启动
-            for dep in node_info["dependencies"]:
-                if dep not in self.processes or not self._check_node_health(dep):
-                    print(f"{YELLOW}警告: {node_name} 的依赖 {dep} 未运行，跳过{RESET}")
-                    continue
-            
-            # 启动节点
-            self._start_node(node_name)
-            
-            # 等待节点启动
-            time.sleep(startup_delay)
+        self._launch(self._get_startup_order(group))
     
     def start_all(self):
-        """启动所有节点"""
+        """启动所有节点（各分组共用一张依赖图，不再逐组等待）"""
         print(f"\n{BLUE}{'='*80}{RESET}")
         print(f"{BLUE}启动完整系统{RESET}")
         print(f"{BLUE}{'='*80}{RESET}\n")
         
-        # 按分组顺序启动
         group_order = ["core", "academic", "development", "extended"]
+        groups = [group for group in group_order if group in self.config["groups"]]
         
-        for group in group_order:
-            if group in self.config["groups"]:
-                self.start_group(group)
-                print()
+        self._launch([
+            name for name in self._get_startup_order()
+            if self.config["nodes"][name]["group"] in groups
+        ])
     
     def stop_all(self):
         """停止所有节点"""
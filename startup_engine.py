@@ -0,0 +1,367 @@
+"""
+UFO³ Galaxy - 依赖感知的并行启动引擎
+=====================================
+
+按 node_dependencies.json 中的依赖图启动节点：
+
+1. 节点的硬依赖全部通过 /health 检查后立即启动，不再按分组串行等待
+2. 同时处于启动中的节点数量有上限
+3. 就绪检测使用指数退避的 /health 轮询（从几十毫秒开始，逐步放宽）
+4. 记录每个节点的排队、启动、就绪时间，并给出启动关键路径
+
+smart_launcher.py 与 system_manager.py 共用本引擎。
+
+作者：Manus AI
+日期：2026-01-23
+"""
+
+import asyncio
+import heapq
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from shared.node_rpc import get_node_rpc_client
+
+# =============================================================================
+# 数据结构
+# =============================================================================
+
+@dataclass
+class NodeSpec:
+    """启动引擎视角下的节点"""
+    name: str
+    port: int
+    dependencies: List[str] = field(default_factory=list)           # 硬依赖：就绪后才能启动
+    optional_dependencies: List[str] = field(default_factory=list)  # 软依赖：不阻塞启动
+    priority: int = 100                                             # 同时就绪时数值小者先启动
+    group: str = ""
+    health_check_path: str = "/health"
+
+@dataclass
+class NodeStartRecord:
+    """单个节点的启动记录（时间均为相对引擎开始的秒数）"""
+    name: str
+    status: str = "pending"           # pending/starting/healthy/failed/timeout/skipped
+    queued_at: Optional[float] = None  # 硬依赖全部就绪的时刻
+    spawned_at: Optional[float] = None
+    ready_at: Optional[float] = None
+    blocked_by: Optional[str] = None   # 最后一个就绪的硬依赖
+    health_polls: int = 0
+    error: Optional[str] = None
+    
+    @property
+    def boot_seconds(self) -> Optional[float]:
+        """进程启动到 /health 通过的耗时"""
+        if self.spawned_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.spawned_at
+    
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """依赖就绪后因并发上限排队的耗时"""
+        if self.queued_at is None or self.spawned_at is None:
+            return None
+        return self.spawned_at - self.queued_at
+
+@dataclass
+class StartupTrace:
+    """一次启动的完整记录"""
+    records: Dict[str, NodeStartRecord]
+    total_seconds: float
+    max_concurrent: int
+    
+    @property
+    def healthy(self) -> List[str]:
+        return [name for name, r in self.records.items() if r.status == "healthy"]
+    
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, r in self.records.items() if r.status not in ("healthy", "pending")]
+    
+    def critical_path(self) -> List[str]:
+        """
+        启动关键路径：从最后就绪的节点沿 blocked_by 回溯
+        
+        Returns:
+            从根节点到最后就绪节点的名称列表
+        """
+        ready = [r for r in self.records.values() if r.ready_at is not None]
+        if not ready:
+            return []
+        
+        path = []
+        record = max(ready, key=lambda r: r.ready_at)
+        while record is not None:
+            path.append(record.name)
+            record = self.records.get(record.blocked_by) if record.blocked_by else None
+        
+        return list(reversed(path))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(self.total_seconds, 3),
+            "max_concurrent": self.max_concurrent,
+            "healthy": len(self.healthy),
+            "failed": len(self.failed),
+            "critical_path": self.critical_path(),
+            "nodes": [
+                {**asdict(r), "boot_seconds": r.boot_seconds, "wait_seconds": r.wait_seconds}
+                for r in sorted(self.records.values(), key=self._sort_key)
+            ]
+        }
+    
+    def save(self, path: Path):
+        """以 JSON 保存启动记录"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+    
+    def format_lines(self) -> List[str]:
+        """按启动时间排列的文本时间线"""
+        critical = set(self.critical_path())
+        lines = [f"{'节点':<35}{'状态':<10}{'排队(s)':>9}{'启动(s)':>9}{'就绪(s)':>9}{'耗时(s)':>9}  等待依赖"]
+        
+        for r in sorted(self.records.values(), key=self._sort_key):
+            lines.append(
+                f"{('* ' if r.name in critical else '  ') + r.name:<35}{r.status:<10}"
+                f"{self._fmt(r.queued_at):>9}{self._fmt(r.spawned_at):>9}"
+                f"{self._fmt(r.ready_at):>9}{self._fmt(r.boot_seconds):>9}  "
+                f"{r.blocked_by or r.error or '-'}"
+            )
+        
+        lines.append(f"总耗时 {self.total_seconds:.2f}s，关键路径（*）: {' -> '.join(self.critical_path()) or '-'}")
+        return lines
+    
+    @staticmethod
+    def _sort_key(record: NodeStartRecord):
+        return (record.spawned_at is None, record.spawned_at or 0.0, record.name)
+    
+    @staticmethod
+    def _fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}"
+
+# =============================================================================
+# 依赖图
+# =============================================================================
+
+def load_node_specs(config_file: str = "node_dependencies.json") -> Dict[str, NodeSpec]:
+    """从 node_dependencies.json 读取节点定义"""
+    with open(config_file, "r", encoding="utf-8") as f:
+        return parse_node_specs(json.load(f))
+
+def parse_node_specs(config: Dict[str, Any]) -> Dict[str, NodeSpec]:
+    """把已加载的 node_dependencies.json 内容转换为节点定义"""
+    return {
+        name: NodeSpec(
+            name=name,
+            port=info["port"],
+            dependencies=list(info.get("dependencies", [])),
+            optional_dependencies=list(info.get("optional_dependencies", [])),
+            priority=info.get("priority", 100),
+            group=info.get("group", "")
+        )
+        for name, info in config["nodes"].items()
+    }
+
+def find_cycle(specs: Dict[str, NodeSpec]) -> Optional[List[str]]:
+    """
+    检查硬依赖是否成环（只考虑 specs 内部的边）
+    
+    Returns:
+        环上的节点列表，无环时为 None
+    """
+    in_degree = {name: 0 for name in specs}
+    dependents: Dict[str, List[str]] = {name: [] for name in specs}
+    for name, spec in specs.items():
+        for dep in set(spec.dependencies):
+            if dep in specs and dep != name:
+                in_degree[name] += 1
+                dependents[dep].append(name)
+    
+    queue = [name for name, degree in in_degree.items() if degree == 0]
+    while queue:
+        name = queue.pop()
+        for child in dependents[name]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                queue.append(child)
+    
+    remaining = [name for name, degree in in_degree.items() if degree > 0]
+    return sorted(remaining) or None
+
+# =============================================================================
+# 启动引擎
+# =============================================================================
+
+class StartupEngine:
+    """
+    依赖感知的并行启动引擎
+    
+    spawn 负责拉起进程（返回带 poll() 的进程对象，失败时返回 None），
+    引擎负责调度与就绪检测。依赖若不在本次启动的节点集合内，视为已由
+    外部提供，不阻塞启动；硬依赖启动失败时，所有下游节点都会被跳过。
+    """
+    
+    DEFAULT_MAX_CONCURRENT = 8
+    DEFAULT_READY_TIMEOUT = 30.0   # 秒
+    POLL_INITIAL_DELAY = 0.05      # 秒
+    POLL_MAX_DELAY = 1.0           # 秒
+    POLL_BACKOFF = 2.0
+    
+    def __init__(
+        self,
+        specs: Dict[str, NodeSpec],
+        spawn: Callable[[NodeSpec], Any],
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        check_health: Optional[Callable[[NodeSpec], Awaitable[bool]]] = None,
+        on_event: Optional[Callable[[str, NodeStartRecord], None]] = None
+    ):
+        """
+        Args:
+            specs: 可启动的节点（名称 -> NodeSpec）
+            spawn: 启动单个节点的回调
+            max_concurrent: 同时处于启动中（已拉起、尚未就绪）的节点上限
+            ready_timeout: 单个节点等待就绪的最长时间
+            check_health: 自定义健康检查，默认 GET http://localhost:<port><health_check_path>
+            on_event: 状态变化回调 (事件名, 记录)，事件名为 starting/healthy/failed/timeout/skipped
+        """
+        self.specs = specs
+        self.spawn = spawn
+        self.max_concurrent = max(1, max_concurrent)
+        self.ready_timeout = ready_timeout
+        self.check_health = check_health or self._http_health
+        self.on_event = on_event
+        self._started_at = 0.0
+    
+    async def run(self, names: Optional[Iterable[str]] = None) -> StartupTrace:
+        """
+        启动指定节点（默认全部）并等待它们就绪
+        
+        Raises:
+            ValueError: 节点不存在或硬依赖成环
+        """
+        selected = list(dict.fromkeys(names)) if names is not None else list(self.specs)
+        unknown = [name for name in selected if name not in self.specs]
+        if unknown:
+            raise ValueError(f"未知节点: {', '.join(unknown)}")
+        
+        specs = {name: self.specs[name] for name in selected}
+        cycle = find_cycle(specs)
+        if cycle:
+            raise ValueError(f"检测到循环依赖: {', '.join(cycle)}")
+        
+        remaining: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {name: [] for name in specs}
+        for name, spec in specs.items():
+            deps = {dep for dep in spec.dependencies if dep in specs and dep != name}
+            remaining[name] = len(deps)
+            for dep in deps:
+                dependents[dep].append(name)
+        
+        records = {name: NodeStartRecord(name=name) for name in specs}
+        self._started_at = time.monotonic()
+        
+        ready: List[tuple] = []
+        for name in specs:
+            if remaining[name] == 0:
+                records[name].queued_at = 0.0
+                heapq.heappush(ready, (specs[name].priority, name))
+        
+        running: Dict[asyncio.Task, str] = {}
+        
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrent:
+                    _, name = heapq.heappop(ready)
+                    task = asyncio.create_task(self._start_one(specs[name], records[name]))
+                    running[task] = name
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    name = running.pop(task)
+                    if task.result():
+                        now = self._elapsed()
+                        for child in dependents[name]:
+                            remaining[child] -= 1
+                            if remaining[child] == 0 and records[child].status == "pending":
+                                records[child].queued_at = now
+                                records[child].blocked_by = name
+                                heapq.heappush(ready, (specs[child].priority, child))
+                    else:
+                        self._skip_dependents(name, dependents, records)
+        finally:
+            for task in running:
+                task.cancel()
+        
+        return StartupTrace(records=records, total_seconds=self._elapsed(), max_concurrent=self.max_concurrent)
+    
+    async def _start_one(self, spec: NodeSpec, record: NodeStartRecord) -> bool:
+        """拉起节点并轮询 /health 直到就绪、超时或进程退出"""
+        record.status = "starting"
+        record.spawned_at = self._elapsed()
+        
+        try:
+            process = self.spawn(spec)
+        except Exception as e:
+            process = None
+            record.error = str(e)
+        
+        if process is None:
+            return self._finish(record, "failed", record.error or "未能拉起进程")
+        self._emit("starting", record)
+        
+        deadline = time.monotonic() + self.ready_timeout
+        delay = self.POLL_INITIAL_DELAY
+        
+        while True:
+            record.health_polls += 1
+            if await self.check_health(spec):
+                record.ready_at = self._elapsed()
+                return self._finish(record, "healthy")
+            
+            poll = getattr(process, "poll", None)
+            if poll is not None and poll() is not None:
+                return self._finish(record, "failed", f"进程已退出 (code {poll()})")
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._finish(record, "timeout", f"{self.ready_timeout:.0f}s 内未就绪")
+            
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * self.POLL_BACKOFF, self.POLL_MAX_DELAY)
+    
+    def _finish(self, record: NodeStartRecord, status: str, error: Optional[str] = None) -> bool:
+        record.status = status
+        record.error = error
+        self._emit(status, record)
+        return status == "healthy"
+    
+    def _skip_dependents(self, name: str, dependents: Dict[str, List[str]], records: Dict[str, NodeStartRecord]):
+        """硬依赖失败：跳过所有下游节点"""
+        stack = list(dependents[name])
+        seen: Set[str] = set()
+        while stack:
+            child = stack.pop()
+            if child in seen or records[child].status != "pending":
+                continue
+            seen.add(child)
+            records[child].status = "skipped"
+            records[child].error = f"依赖 {name} 未就绪"
+            self._emit("skipped", records[child])
+            stack.extend(dependents[child])
+    
+    async def _http_health(self, spec: NodeSpec) -> bool:
+        url = f"http://localhost:{spec.port}{spec.health_check_path}"
+        return await get_node_rpc_client().check_health(url, node=spec.name, timeout=2.0)
+    
+    def _emit(self, event: str, record: NodeStartRecord):
+        if self.on_event:
+            self.on_event(event, record)
+    
+    def _elapsed(self) -> float:
+        return time.monotonic() - self._started_at
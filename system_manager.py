@@ -10,6 +10,7 @@ UFO³ Galaxy 系统管理器
 3. 实时监控节点状态
 4. 自动重启失败的节点
 5. 生成系统报告
+6. 按依赖图并行启动（见 startup_engine.py）
 
 作者：Manus AI
 日期：2026-01-23
@@ -22,12 +23,14 @@ import json
 import signal
 import subprocess
 import asyncio
-import httpx
 from typing import Dict, List, Set, Optional
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+from shared.node_rpc import get_node_rpc_client
+from startup_engine import NodeSpec, NodeStartRecord, StartupEngine, StartupTrace, load_node_specs
+
 # ANSI 颜色代码
 GREEN = "\033[92m"
 RED = "\033[91m"
@@ -100,6 +103,11 @@ class SystemManager:
         self.processes: Dict[str, subprocess.Popen] = {}
         self.node_status: Dict[str, str] = {}
         
+        # 并行启动
+        self.max_parallel = int(os.getenv("UFO_STARTUP_CONCURRENCY", StartupEngine.DEFAULT_MAX_CONCURRENT))
+        self.ready_timeout = float(os.getenv("UFO_STARTUP_TIMEOUT", StartupEngine.DEFAULT_READY_TIMEOUT))
+        self.last_trace: Optional[StartupTrace] = None
+        
     def get_node_path(self, node_id: str, node_name: str) -> Optional[Path]:
         """获取节点路径"""
         # 尝试多种可能的路径格式
@@ -158,14 +166,11 @@ class SystemManager:
         """检查节点健康状态"""
         url = f"http://localhost:{config.port}{config.health_check_path}"
         
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                self.node_status[config.id] = "healthy"
-                return True
-        except Exception:
-            return False
+        # 共享连接池：启动轮询和周期检查都复用到各节点的长连接
+        if await get_node_rpc_client().check_health(url, node=f"Node_{config.id}", timeout=timeout):
+            self.node_status[config.id] = "healthy"
+            return True
+        return False
     
     async def wait_for_node(self, config: NodeConfig, max_wait: int = 30) -> bool:
         """等待节点启动"""
@@ -181,6 +186,95 @@ class SystemManager:
         self.node_status[config.id] = "timeout"
         return False
     
+    def _load_dependencies(self) -> Dict[str, NodeSpec]:
+        """读取 node_dependencies.json（节点目录名 -> NodeSpec），缺失时不做依赖约束"""
+        path = self.project_root / "node_dependencies.json"
+        if not path.exists():
+            return {}
+        
+        try:
+            return load_node_specs(str(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{YELLOW}⚠️  无法读取 {path.name}，按无依赖启动: {e}{RESET}")
+            return {}
+    
+    def _node_specs(self, configs: List[NodeConfig]) -> Dict[str, NodeSpec]:
+        """为启动引擎构建依赖图（只保留本次启动的节点之间的依赖）"""
+        dependencies = self._load_dependencies()
+        
+        dir_names = {}
+        for config in configs:
+            node_path = self.get_node_path(config.id, config.name)
+            dir_names[config.id] = node_path.name if node_path else f"Node_{config.id}_{config.name}"
+        
+        keys = {dir_name: f"Node_{config_id}" for config_id, dir_name in dir_names.items()}
+        
+        specs = {}
+        for config in configs:
+            key = f"Node_{config.id}"
+            spec = dependencies.get(dir_names[config.id])
+            specs[key] = NodeSpec(
+                name=key,
+                port=config.port,
+                dependencies=[keys[dep] for dep in spec.dependencies if dep in keys] if spec else [],
+                priority=spec.priority if spec else 100,
+                group=config.group,
+                health_check_path=config.health_check_path
+            )
+        
+        return specs
+    
+    async def start_nodes(self, configs: List[NodeConfig]) -> StartupTrace:
+        """
+        按依赖图并行启动节点
+        
+        硬依赖通过健康检查后立即启动下游节点，同时启动中的节点数受
+        max_parallel 限制；启动时间线保存到 logs/startup_trace.json。
+        """
+        configs = [config for config in configs if config.auto_start]
+        by_key = {f"Node_{config.id}": config for config in configs}
+        
+        def spawn(spec: NodeSpec) -> Optional[subprocess.Popen]:
+            config = by_key[spec.name]
+            return self.processes.get(config.id) if self.start_node(config) else None
+        
+        async def check_health(spec: NodeSpec) -> bool:
+            return await self.check_node_health(by_key[spec.name], timeout=2)
+        
+        def on_event(event: str, record: NodeStartRecord):
+            config = by_key[record.name]
+            if event == "healthy":
+                print(f"{GREEN}✅ 节点 {config.name} 已就绪 ({record.boot_seconds:.2f}s){RESET}")
+            elif event == "timeout":
+                print(f"{RED}❌ 节点 {config.name} 启动超时{RESET}")
+                self.node_status[config.id] = "timeout"
+            elif event == "failed":
+                print(f"{RED}❌ 节点 {config.name} 启动失败: {record.error}{RESET}")
+                if self.node_status.get(config.id) == "starting":
+                    self.node_status[config.id] = "failed"
+            elif event == "skipped":
+                print(f"{YELLOW}⏭️  节点 {config.name} 已跳过: {record.error}{RESET}")
+                self.node_status[config.id] = "skipped"
+        
+        engine = StartupEngine(
+            self._node_specs(configs),
+            spawn=spawn,
+            max_concurrent=self.max_parallel,
+            ready_timeout=self.ready_timeout,
+            check_health=check_health,
+            on_event=on_event
+        )
+        
+        trace = await engine.run()
+        self.last_trace = trace
+        trace.save(self.log_dir / "startup_trace.json")
+        
+        print(f"\n{CYAN}启动时间线（并发上限 {trace.max_concurrent}）{RESET}")
+        for line in trace.format_lines():
+            print(line)
+        
+        return trace
+    
     async def start_group(self, group: str, wait: bool = True):
         """启动一组节点"""
         if group not in NODES:
@@ -193,34 +287,21 @@ class SystemManager:
         print(f"{BLUE}启动节点组: {group.upper()}{RESET}")
         print(f"{BLUE}{'='*80}{RESET}\n")
         
-        # 启动所有节点
-        for config in configs:
-            if config.auto_start:
-                self.start_node(config)
-                await asyncio.sleep(2)  # 等待 2 秒再启动下一个
+        if not wait:
+            for config in configs:
+                if config.auto_start:
+                    self.start_node(config)
+            return
         
-        # 等待所有节点就绪
-        if wait:
-            print(f"\n{YELLOW}等待节点就绪...{RESET}\n")
-            
-            tasks = [
-                self.wait_for_node(config)
-                for config in configs
-                if config.auto_start
-            ]
-            
-            results = await asyncio.gather(*tasks)
-            
-            success_count = sum(results)
-            total_count = len(results)
-            
-            print(f"\n{BLUE}{'='*80}{RESET}")
-            print(f"{BLUE}节点组 {group.upper()} 启动完成{RESET}")
-            print(f"{BLUE}{'='*80}{RESET}")
-            print(f"{GREEN}✅ 成功: {success_count}/{total_count}{RESET}\n")
+        trace = await self.start_nodes(configs)
+        
+        print(f"\n{BLUE}{'='*80}{RESET}")
+        print(f"{BLUE}节点组 {group.upper()} 启动完成{RESET}")
+        print(f"{BLUE}{'='*80}{RESET}")
+        print(f"{GREEN}✅ 成功: {len(trace.healthy)}/{len(trace.records)}{RESET}\n")
     
     async def start_all(self, groups: List[str] = None):
-        """启动所有节点"""
+        """启动所有节点（各组共用一张依赖图并行启动）"""
         if groups is None:
             groups = ["core", "academic", "development", "extended"]
         
@@ -228,8 +309,11 @@ class SystemManager:
         print(f"{CYAN}UFO³ Galaxy 系统启动{RESET}")
         print(f"{CYAN}{'='*80}{RESET}\n")
         
-        for group in groups:
-            await self.start_group(group, wait=True)
+        configs = [config for group in groups for config in NODES.get(group, [])]
+        trace = await self.start_nodes(configs)
+        
+        print(f"\n{CYAN}{'='*80}{RESET}")
+        print(f"{GREEN}✅ 成功: {len(trace.healthy)}/{len(trace.records)}{RESET}\n")
     
     def stop_node(self, node_id: str):
         """停止单个节点"""
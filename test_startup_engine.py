@@ -0,0 +1,273 @@
+"""
+UFO³ Galaxy - 依赖感知启动引擎单元测试
+
+用假的 spawn / 健康检查在进程内模拟启动（每个节点拉起后经过固定时间才通过 /health），验证：
+
+1. 依赖顺序：节点只在全部硬依赖就绪后才拉起，blocked_by 与关键路径正确
+2. 并发上限与优先级
+3. 循环依赖在启动前被拒绝
+4. 硬依赖失败（拉起失败、进程退出、超时）时跳过所有下游节点，其余分支照常启动
+5. smart_launcher 使用引擎的节点定义，仓库中的 node_dependencies.json 无环
+
+用法:
+    python -m pytest test_startup_engine.py -q
+
+作者：Manus AI
+日期：2026-01-23
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from startup_engine import NodeSpec, StartupEngine, find_cycle, load_node_specs, parse_node_specs
+
+
+class FakeProcess:
+    def __init__(self, exit_code: Optional[int] = None):
+        self.exit_code = exit_code
+
+    def poll(self) -> Optional[int]:
+        return self.exit_code
+
+
+class FakeCluster:
+    """
+    模拟节点进程
+
+    boot: 节点拉起后多少秒通过健康检查；None 表示永远不就绪
+    spawn_fails: 拉起失败的节点；exits: 拉起后立即退出的节点
+    """
+
+    def __init__(self, boot: Dict[str, Optional[float]], spawn_fails=(), exits=()):
+        self.boot = boot
+        self.spawn_fails = set(spawn_fails)
+        self.exits = set(exits)
+        self.spawned: List[str] = []
+        self.spawned_at: Dict[str, float] = {}
+        self.ready: Dict[str, float] = {}
+        self.active = 0
+        self.peak = 0
+
+    def spawn(self, spec: NodeSpec):
+        if spec.name in self.spawn_fails:
+            return None
+        loop = asyncio.get_running_loop()
+        self.spawned.append(spec.name)
+        self.spawned_at[spec.name] = loop.time()
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        return FakeProcess(1 if spec.name in self.exits else None)
+
+    async def check_health(self, spec: NodeSpec) -> bool:
+        boot = self.boot.get(spec.name, 0.0)
+        if boot is None or spec.name in self.exits:
+            return False
+        if asyncio.get_running_loop().time() - self.spawned_at[spec.name] < boot:
+            return False
+        if spec.name not in self.ready:
+            self.ready[spec.name] = asyncio.get_running_loop().time()
+            self.active -= 1
+        return True
+
+
+class FastEngine(StartupEngine):
+    POLL_INITIAL_DELAY = 0.002
+    POLL_MAX_DELAY = 0.01
+
+
+def make_specs(dependencies: Dict[str, List[str]], priorities: Optional[Dict[str, int]] = None) -> Dict[str, NodeSpec]:
+    priorities = priorities or {}
+    return {
+        name: NodeSpec(name=name, port=9000 + i, dependencies=deps, priority=priorities.get(name, 100))
+        for i, (name, deps) in enumerate(dependencies.items())
+    }
+
+
+def run_engine(specs, cluster: FakeCluster, names=None, **kwargs):
+    events = []
+    engine = FastEngine(
+        specs,
+        spawn=cluster.spawn,
+        check_health=cluster.check_health,
+        on_event=lambda event, record: events.append((event, record.name)),
+        **kwargs
+    )
+    trace = asyncio.run(engine.run(names))
+    return trace, events
+
+
+# a -> b -> d，a -> c -> d，c -> e；f 独立
+DIAMOND = {
+    "a": [],
+    "b": ["a"],
+    "c": ["a"],
+    "d": ["b", "c"],
+    "e": ["c"],
+    "f": [],
+}
+
+
+class TestDependencyOrder(unittest.TestCase):
+
+    def test_nodes_start_after_their_dependencies(self):
+        boot = {"a": 0.03, "b": 0.05, "c": 0.01, "d": 0.0, "e": 0.0, "f": 0.02}
+        cluster = FakeCluster(boot)
+        trace, _ = run_engine(make_specs(DIAMOND), cluster)
+
+        self.assertEqual(sorted(trace.healthy), sorted(DIAMOND))
+        self.assertEqual(trace.failed, [])
+        for name, deps in DIAMOND.items():
+            for dep in deps:
+                self.assertGreaterEqual(cluster.spawned_at[name], cluster.ready[dep], f"{name} before {dep}")
+                self.assertGreaterEqual(trace.records[name].spawned_at, trace.records[dep].ready_at)
+
+        # 无依赖的节点一开始就并行拉起，不等待其他分支
+        self.assertEqual(set(cluster.spawned[:2]), {"a", "f"})
+        # d 由较晚就绪的 b 放行
+        self.assertEqual(trace.records["d"].blocked_by, "b")
+        self.assertEqual(trace.records["e"].blocked_by, "c")
+        self.assertEqual(trace.critical_path(), ["a", "b", "d"])
+
+    def test_dependencies_outside_the_run_do_not_block(self):
+        cluster = FakeCluster({})
+        trace, _ = run_engine(make_specs(DIAMOND), cluster, names=["b", "d"])
+        self.assertEqual(sorted(trace.records), ["b", "d"])
+        self.assertEqual(cluster.spawned, ["b", "d"])
+        self.assertEqual(trace.records["d"].blocked_by, "b")
+
+    def test_unknown_node(self):
+        with self.assertRaises(ValueError):
+            run_engine(make_specs(DIAMOND), FakeCluster({}), names=["a", "missing"])
+
+
+class TestConcurrency(unittest.TestCase):
+
+    def test_concurrency_cap(self):
+        specs = make_specs({f"n{i}": [] for i in range(10)})
+        cluster = FakeCluster({name: 0.02 for name in specs})
+        trace, _ = run_engine(specs, cluster, max_concurrent=3)
+        self.assertEqual(len(trace.healthy), 10)
+        self.assertEqual(cluster.peak, 3)
+        self.assertEqual(trace.max_concurrent, 3)
+
+    def test_priority_breaks_ties(self):
+        specs = make_specs({"low": [], "high": [], "mid": [], "child": ["low"]}, {"low": 30, "high": 10, "mid": 20, "child": 0})
+        cluster = FakeCluster({})
+        run_engine(specs, cluster, max_concurrent=1)
+        self.assertEqual(cluster.spawned, ["high", "mid", "low", "child"])
+
+
+class TestCycles(unittest.TestCase):
+
+    def test_find_cycle(self):
+        self.assertIsNone(find_cycle(make_specs(DIAMOND)))
+        self.assertIsNone(find_cycle(make_specs({"a": ["a"], "b": ["a", "outside"]})))
+
+        cycle = find_cycle(make_specs({"a": ["c"], "b": ["a"], "c": ["b"], "d": [], "e": ["d"]}))
+        self.assertEqual(cycle, ["a", "b", "c"])
+
+    def test_cycle_rejected_before_spawning(self):
+        cluster = FakeCluster({})
+        specs = make_specs({"a": ["b"], "b": ["a"], "c": []})
+        with self.assertRaises(ValueError) as context:
+            run_engine(specs, cluster)
+        self.assertIn("a", str(context.exception))
+        self.assertEqual(cluster.spawned, [])
+
+        # 不含环的子集仍可启动
+        trace, _ = run_engine(specs, cluster, names=["a", "c"])
+        self.assertEqual(sorted(trace.healthy), ["a", "c"])
+
+
+class TestFailures(unittest.TestCase):
+
+    def assert_failure_skips_dependents(self, cluster: FakeCluster, status: str, **kwargs):
+        trace, events = run_engine(make_specs(DIAMOND), cluster, **kwargs)
+        statuses = {name: record.status for name, record in trace.records.items()}
+
+        self.assertEqual(statuses["c"], status)
+        self.assertEqual(statuses["d"], "skipped")
+        self.assertEqual(statuses["e"], "skipped")
+        self.assertEqual({statuses[name] for name in ("a", "b", "f")}, {"healthy"})
+        self.assertNotIn("d", cluster.spawned)
+        self.assertNotIn("e", cluster.spawned)
+        self.assertIn("c", trace.records["d"].error)
+        self.assertEqual(sorted(trace.failed), ["c", "d", "e"])
+        self.assertIn(("skipped", "d"), events)
+        return trace
+
+    def test_spawn_failure(self):
+        self.assert_failure_skips_dependents(FakeCluster({}, spawn_fails={"c"}), "failed")
+
+    def test_process_exit(self):
+        trace = self.assert_failure_skips_dependents(FakeCluster({}, exits={"c"}), "failed")
+        self.assertIn("code 1", trace.records["c"].error)
+
+    def test_ready_timeout(self):
+        trace = self.assert_failure_skips_dependents(FakeCluster({"c": None}), "timeout", ready_timeout=0.05)
+        self.assertGreater(trace.records["c"].health_polls, 1)
+
+    def test_spawn_exception(self):
+        cluster = FakeCluster({})
+
+        def spawn(spec):
+            if spec.name == "a":
+                raise OSError("no such file")
+            return cluster.spawn(spec)
+
+        engine = FastEngine(make_specs(DIAMOND), spawn=spawn, check_health=cluster.check_health)
+        trace = asyncio.run(engine.run())
+        self.assertEqual(trace.records["a"].status, "failed")
+        self.assertEqual(trace.records["a"].error, "no such file")
+        self.assertEqual(trace.healthy, ["f"])
+
+
+class TestNodeSpecs(unittest.TestCase):
+
+    CONFIG = {
+        "nodes": {
+            "Node_00": {"port": 8000, "dependencies": [], "priority": 1, "group": "core"},
+            "Node_01": {"port": 8001, "dependencies": ["Node_00"], "optional_dependencies": ["Node_02"], "group": "core"},
+            "Node_02": {"port": 8002, "dependencies": ["Node_00", "Node_01"]},
+        }
+    }
+
+    def test_parse_and_load_agree(self):
+        specs = parse_node_specs(self.CONFIG)
+        self.assertEqual(specs["Node_01"].optional_dependencies, ["Node_02"])
+        self.assertEqual(specs["Node_02"].priority, 100)
+        self.assertEqual(specs["Node_02"].group, "")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "node_dependencies.json"
+            path.write_text(json.dumps(self.CONFIG), encoding="utf-8")
+            self.assertEqual(load_node_specs(str(path)), specs)
+
+    def test_repository_graph_is_acyclic(self):
+        specs = load_node_specs(str(PROJECT_ROOT / "node_dependencies.json"))
+        self.assertIsNone(find_cycle(specs))
+
+    def test_smart_launcher_uses_engine_specs(self):
+        from smart_launcher import SmartLauncher
+        launcher = SmartLauncher(str(PROJECT_ROOT / "node_dependencies.json"))
+        specs = load_node_specs(str(PROJECT_ROOT / "node_dependencies.json"))
+
+        order = launcher._get_startup_order()
+        position = {name: i for i, name in enumerate(order)}
+        self.assertEqual(set(order), set(specs))
+        for name, spec in specs.items():
+            for dep in spec.dependencies:
+                if dep in specs:
+                    self.assertLess(position[dep], position[name], f"{dep} -> {name}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -57,8 +57,13 @@ async def test_complexity_judge():
         if is_close:
             passed += 1
     
+    # Batch scoring must match per-prompt scoring
+    prompts = [prompt for prompt, _ in test_cases] * 2
+    batch_ok = judge.judge_batch(prompts) == [judge.judge(prompt) for prompt in prompts]
+    print(f"\n{'✅' if batch_ok else '❌'} judge_batch matches judge ({len(prompts)} prompts)")
+    
     print(f"\n→ Passed: {passed}/{len(test_cases)}")
-    return passed >= len(test_cases) * 0.7  # 70% pass rate
+    return batch_ok and passed >= len(test_cases) * 0.7  # 70% pass rate
 
 async def test_cost_estimator():
     """Test cost estimation."""